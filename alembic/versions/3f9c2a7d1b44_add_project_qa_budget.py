@@ -0,0 +1,30 @@
+"""Add project qa_budget
+
+Revision ID: 3f9c2a7d1b44
+Revises: 0bd0432e9e95
+Create Date: 2026-10-19 16:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9c2a7d1b44'
+down_revision: Union[str, None] = '0bd0432e9e95'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('projects') as batch_op:
+        batch_op.add_column(sa.Column('qa_budget', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('projects') as batch_op:
+        batch_op.drop_column('qa_budget')
@@ -0,0 +1,42 @@
+"""Add test_info and projects indexes
+
+Revision ID: 7c1e4b9a2d55
+Revises: 3f9c2a7d1b44
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c1e4b9a2d55'
+down_revision: Union[str, None] = '3f9c2a7d1b44'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # create_tables() builds the indexes of a fresh database from the models,
+    # so they may exist already
+    op.create_index(
+        'ix_test_info_project_id_last_test_conducted', 'test_info',
+        ['project_id', 'last_test_conducted'], if_not_exists=True
+    )
+    op.create_index('ix_test_info_user_id', 'test_info', ['user_id'], if_not_exists=True)
+    op.create_index(
+        'ix_projects_user_id_is_active', 'projects',
+        ['user_id', 'is_active'], if_not_exists=True
+    )
+    # refresh the planner statistics for the new indexes
+    op.execute(sa.text('ANALYZE'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_projects_user_id_is_active', table_name='projects', if_exists=True)
+    op.drop_index('ix_test_info_user_id', table_name='test_info', if_exists=True)
+    op.drop_index('ix_test_info_project_id_last_test_conducted', table_name='test_info', if_exists=True)
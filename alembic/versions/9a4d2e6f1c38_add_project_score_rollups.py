@@ -0,0 +1,68 @@
+"""Add project score rollups
+
+Revision ID: 9a4d2e6f1c38
+Revises: 7c1e4b9a2d55
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4d2e6f1c38'
+down_revision: Union[str, None] = '7c1e4b9a2d55'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ROLLUP_COLUMNS = (
+    'project_id', 'tests_total', 'tests_passed', 'hallucination_scored', 'hallucinations',
+    'helpfulness_scored', 'helpfulness_sum', 'last_test_conducted', 'updated_at'
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('project_score_rollups',
+    sa.Column('project_id', sa.String(), nullable=False),
+    sa.Column('tests_total', sa.Integer(), nullable=False),
+    sa.Column('tests_passed', sa.Integer(), nullable=False),
+    sa.Column('hallucination_scored', sa.Integer(), nullable=False),
+    sa.Column('hallucinations', sa.Integer(), nullable=False),
+    sa.Column('helpfulness_scored', sa.Integer(), nullable=False),
+    sa.Column('helpfulness_sum', sa.Float(), nullable=False),
+    sa.Column('last_test_conducted', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.project_id'], ),
+    sa.PrimaryKeyConstraint('project_id'),
+    if_not_exists=True
+    )
+    # backfill from the existing results, same as `python -m modules.monitor.rollups`;
+    # table literals of this revision's columns, since create_tables() may
+    # have built the table already in the shape of the current models
+    test_info = sa.table('test_info',
+        sa.column('project_id'), sa.column('test_status'), sa.column('hallucination_score'),
+        sa.column('helpfullness_score'), sa.column('last_test_conducted')
+    )
+    rollups = sa.table('project_score_rollups', *(sa.column(name) for name in ROLLUP_COLUMNS))
+    op.execute(rollups.insert().prefix_with('OR REPLACE').from_select(
+        ROLLUP_COLUMNS,
+        sa.select(
+            test_info.c.project_id,
+            sa.func.count(),
+            sa.func.sum(test_info.c.test_status == '1'),
+            sa.func.count(test_info.c.hallucination_score),
+            sa.func.coalesce(sa.func.sum(test_info.c.hallucination_score == 0), 0),
+            sa.func.count(test_info.c.helpfullness_score),
+            sa.func.coalesce(sa.func.sum(test_info.c.helpfullness_score), 0.0),
+            sa.func.max(test_info.c.last_test_conducted),
+            sa.func.datetime('now')
+        ).where(test_info.c.project_id.isnot(None)).group_by(test_info.c.project_id)
+    ))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('project_score_rollups')
@@ -0,0 +1,89 @@
+"""Add project score buckets and result latency
+
+Revision ID: a5e3c7b19d62
+Revises: 9a4d2e6f1c38
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a5e3c7b19d62'
+down_revision: Union[str, None] = '9a4d2e6f1c38'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# bucket_start of each granularity, in the format SQLAlchemy stores datetimes in
+BUCKET_STARTS = {
+    'hour': "strftime('%Y-%m-%d %H:00:00.000000', last_test_conducted)",
+    'day': "date(last_test_conducted) || ' 00:00:00.000000'",
+    'week': "date(last_test_conducted, 'weekday 0', '-6 days') || ' 00:00:00.000000'",
+}
+BUCKET_COLUMNS = (
+    'project_id', 'granularity', 'bucket_start', 'tests_total', 'tests_passed',
+    'hallucination_scored', 'hallucinations', 'helpfulness_scored', 'helpfulness_sum',
+    'latency_measured', 'latency_sum_ms', 'latency_max_ms'
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('test_info') as batch_op:
+        batch_op.add_column(sa.Column('response_latency_ms', sa.Float(), nullable=True))
+    op.create_table('project_score_buckets',
+    sa.Column('project_id', sa.String(), nullable=False),
+    sa.Column('granularity', sa.String(), nullable=False),
+    sa.Column('bucket_start', sa.DateTime(), nullable=False),
+    sa.Column('tests_total', sa.Integer(), nullable=False),
+    sa.Column('tests_passed', sa.Integer(), nullable=False),
+    sa.Column('hallucination_scored', sa.Integer(), nullable=False),
+    sa.Column('hallucinations', sa.Integer(), nullable=False),
+    sa.Column('helpfulness_scored', sa.Integer(), nullable=False),
+    sa.Column('helpfulness_sum', sa.Float(), nullable=False),
+    sa.Column('latency_measured', sa.Integer(), nullable=False),
+    sa.Column('latency_sum_ms', sa.Float(), nullable=False),
+    sa.Column('latency_max_ms', sa.Float(), nullable=True),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.project_id'], ),
+    sa.PrimaryKeyConstraint('project_id', 'granularity', 'bucket_start'),
+    if_not_exists=True
+    )
+    # backfill from the existing results, same as `python -m modules.monitor.rollups`;
+    # table literals of this revision's columns, since create_tables() may
+    # have built the table already in the shape of the current models
+    test_info = sa.table('test_info',
+        sa.column('project_id'), sa.column('test_status'), sa.column('hallucination_score'),
+        sa.column('helpfullness_score'), sa.column('response_latency_ms'), sa.column('last_test_conducted')
+    )
+    buckets = sa.table('project_score_buckets', *(sa.column(name) for name in BUCKET_COLUMNS))
+    for granularity, bucket_start in BUCKET_STARTS.items():
+        bucket_start = sa.literal_column(bucket_start)
+        op.execute(buckets.insert().prefix_with('OR REPLACE').from_select(
+            BUCKET_COLUMNS,
+            sa.select(
+                test_info.c.project_id,
+                sa.literal(granularity),
+                bucket_start,
+                sa.func.count(),
+                sa.func.sum(test_info.c.test_status == '1'),
+                sa.func.count(test_info.c.hallucination_score),
+                sa.func.coalesce(sa.func.sum(test_info.c.hallucination_score == 0), 0),
+                sa.func.count(test_info.c.helpfullness_score),
+                sa.func.coalesce(sa.func.sum(test_info.c.helpfullness_score), 0.0),
+                sa.func.count(test_info.c.response_latency_ms),
+                sa.func.coalesce(sa.func.sum(test_info.c.response_latency_ms), 0.0),
+                sa.func.max(test_info.c.response_latency_ms)
+            ).where(
+                test_info.c.project_id.isnot(None), test_info.c.last_test_conducted.isnot(None)
+            ).group_by(test_info.c.project_id, bucket_start)
+        ))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('project_score_buckets')
+    with op.batch_alter_table('test_info') as batch_op:
+        batch_op.drop_column('response_latency_ms')
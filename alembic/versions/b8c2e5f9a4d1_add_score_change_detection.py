@@ -0,0 +1,68 @@
+"""Add change-point detector state and regression events
+
+Revision ID: b8c2e5f9a4d1
+Revises: f1b6d8a3c5e7
+Create Date: 2026-10-20 03:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8c2e5f9a4d1'
+down_revision: Union[str, None] = 'f1b6d8a3c5e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # no backfill: detectors start with the next results and form their
+    # baseline from the first DETECTION_WARMUP_GROUPS groups of them
+    op.create_table('project_score_detectors',
+    sa.Column('project_id', sa.String(), nullable=False),
+    sa.Column('metric', sa.String(), nullable=False),
+    sa.Column('group_count', sa.Integer(), nullable=False),
+    sa.Column('group_sum', sa.Float(), nullable=False),
+    sa.Column('samples', sa.Integer(), nullable=False),
+    sa.Column('mean', sa.Float(), nullable=False),
+    sa.Column('variance', sa.Float(), nullable=False),
+    sa.Column('cusum_high', sa.Float(), nullable=False),
+    sa.Column('cusum_low', sa.Float(), nullable=False),
+    sa.Column('run_high', sa.Integer(), nullable=False),
+    sa.Column('run_low', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.project_id'], ),
+    sa.PrimaryKeyConstraint('project_id', 'metric'),
+    if_not_exists=True
+    )
+    op.create_table('regression_events',
+    sa.Column('event_id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('project_id', sa.String(), nullable=False),
+    sa.Column('metric', sa.String(), nullable=False),
+    sa.Column('direction', sa.String(), nullable=False),
+    sa.Column('detected_at', sa.DateTime(), nullable=False),
+    sa.Column('baseline_mean', sa.Float(), nullable=False),
+    sa.Column('baseline_std', sa.Float(), nullable=False),
+    sa.Column('shifted_mean', sa.Float(), nullable=False),
+    sa.Column('statistic', sa.Float(), nullable=False),
+    sa.Column('run_length', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.project_id'], ),
+    sa.PrimaryKeyConstraint('event_id'),
+    if_not_exists=True
+    )
+    op.create_index(
+        'ix_regression_events_project_id_detected_at', 'regression_events',
+        ['project_id', 'detected_at'], if_not_exists=True
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_regression_events_project_id_detected_at', table_name='regression_events', if_exists=True)
+    op.drop_table('regression_events')
+    op.drop_table('project_score_detectors')
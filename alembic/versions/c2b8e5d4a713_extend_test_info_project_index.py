@@ -0,0 +1,38 @@
+"""Extend the test_info project index with test_id
+
+Revision ID: c2b8e5d4a713
+Revises: a5e3c7b19d62
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2b8e5d4a713'
+down_revision: Union[str, None] = 'a5e3c7b19d62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # (last_test_conducted, test_id) is the order of /qa_data cursor pages
+    op.create_index(
+        'ix_test_info_project_id_last_test_conducted_test_id', 'test_info',
+        ['project_id', 'last_test_conducted', 'test_id'], if_not_exists=True
+    )
+    op.drop_index('ix_test_info_project_id_last_test_conducted', table_name='test_info', if_exists=True)
+    op.execute(sa.text('ANALYZE test_info'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(
+        'ix_test_info_project_id_last_test_conducted', 'test_info',
+        ['project_id', 'last_test_conducted'], if_not_exists=True
+    )
+    op.drop_index('ix_test_info_project_id_last_test_conducted_test_id', table_name='test_info', if_exists=True)
@@ -0,0 +1,38 @@
+"""Add latency sketches to the project score buckets
+
+Revision ID: d3a9f6b2c8e4
+Revises: b8c2e5f9a4d1
+Create Date: 2026-10-20 05:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3a9f6b2c8e4'
+down_revision: Union[str, None] = 'b8c2e5f9a4d1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def has_column(table: str, column: str) -> bool:
+    return column in {c['name'] for c in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # sketches are built in Python; existing buckets get theirs from
+    # `python -m modules.monitor.rollups`, until then their percentiles are null
+    # create_tables() may have built project_score_buckets with the column already
+    if not has_column('project_score_buckets', 'latency_sketch'):
+        with op.batch_alter_table('project_score_buckets') as batch_op:
+            batch_op.add_column(sa.Column('latency_sketch', sa.LargeBinary(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('project_score_buckets') as batch_op:
+        batch_op.drop_column('latency_sketch')
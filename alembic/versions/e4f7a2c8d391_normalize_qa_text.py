@@ -0,0 +1,75 @@
+"""Move QA pair texts out of test_info into qa_pairs
+
+Revision ID: e4f7a2c8d391
+Revises: c2b8e5d4a713
+Create Date: 2026-10-19 23:00:00.000000
+
+"""
+import hashlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4f7a2c8d391'
+down_revision: Union[str, None] = 'c2b8e5d4a713'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def qa_pair_hash(question, factual_answer):
+    # same as modules.monitor.models.qa_pair_hash at the time of this migration
+    return hashlib.sha256(f"{question}\x00{factual_answer}".encode("utf-8")).hexdigest()[:32]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('qa_pairs',
+    sa.Column('qa_hash', sa.String(), nullable=False),
+    sa.Column('question', sa.String(), nullable=False),
+    sa.Column('factual_answer', sa.String(), nullable=False),
+    sa.PrimaryKeyConstraint('qa_hash'),
+    if_not_exists=True
+    )
+    op.add_column('test_info', sa.Column('qa_hash', sa.String(), nullable=True))
+
+    # hashed inside SQLite, so the texts are copied with two set-based statements
+    op.get_bind().connection.driver_connection.create_function(
+        'qa_pair_hash', 2, qa_pair_hash, deterministic=True
+    )
+    op.execute(sa.text(
+        "INSERT OR IGNORE INTO qa_pairs (qa_hash, question, factual_answer) "
+        "SELECT qa_pair_hash(question, factual_answer), question, factual_answer "
+        "FROM test_info WHERE question IS NOT NULL AND factual_answer IS NOT NULL"
+    ))
+    op.execute(sa.text(
+        "UPDATE test_info SET qa_hash = qa_pair_hash(question, factual_answer) "
+        "WHERE question IS NOT NULL AND factual_answer IS NOT NULL"
+    ))
+
+    # the table is rebuilt without the text columns; the freed pages are
+    # reused by new rows, VACUUM returns them to the file system
+    with op.batch_alter_table('test_info') as batch_op:
+        batch_op.drop_column('question')
+        batch_op.drop_column('factual_answer')
+        batch_op.create_foreign_key('fk_test_info_qa_hash', 'qa_pairs', ['qa_hash'], ['qa_hash'])
+    op.execute(sa.text('ANALYZE test_info'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('test_info') as batch_op:
+        batch_op.add_column(sa.Column('question', sa.String(), nullable=False, server_default=''))
+        batch_op.add_column(sa.Column('factual_answer', sa.String(), nullable=False, server_default=''))
+    op.execute(sa.text(
+        "UPDATE test_info SET "
+        "question = (SELECT question FROM qa_pairs WHERE qa_pairs.qa_hash = test_info.qa_hash), "
+        "factual_answer = (SELECT factual_answer FROM qa_pairs WHERE qa_pairs.qa_hash = test_info.qa_hash) "
+        "WHERE qa_hash IS NOT NULL"
+    ))
+    with op.batch_alter_table('test_info') as batch_op:
+        batch_op.drop_constraint('fk_test_info_qa_hash', type_='foreignkey')
+        batch_op.drop_column('qa_hash')
+    op.drop_table('qa_pairs')
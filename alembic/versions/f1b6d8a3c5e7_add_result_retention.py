@@ -0,0 +1,46 @@
+"""Add per-project result retention and the compaction watermark
+
+Revision ID: f1b6d8a3c5e7
+Revises: e4f7a2c8d391
+Create Date: 2026-10-20 01:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1b6d8a3c5e7'
+down_revision: Union[str, None] = 'e4f7a2c8d391'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def has_column(table: str, column: str) -> bool:
+    return column in {c['name'] for c in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('projects') as batch_op:
+        batch_op.add_column(sa.Column('retention_days', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('results_compacted_before', sa.DateTime(), nullable=True))
+    # create_tables() may have built project_score_rollups with the column already
+    if not has_column('project_score_rollups', 'tests_compacted'):
+        with op.batch_alter_table('project_score_rollups') as batch_op:
+            batch_op.add_column(sa.Column('tests_compacted', sa.Integer(), nullable=False, server_default='0'))
+    # retention deletes the QA pairs no result references anymore
+    op.create_index('ix_test_info_qa_hash', 'test_info', ['qa_hash'], if_not_exists=True)
+    op.execute(sa.text('ANALYZE test_info'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_test_info_qa_hash', table_name='test_info', if_exists=True)
+    with op.batch_alter_table('project_score_rollups') as batch_op:
+        batch_op.drop_column('tests_compacted')
+    with op.batch_alter_table('projects') as batch_op:
+        batch_op.drop_column('results_compacted_before')
+        batch_op.drop_column('retention_days')
@@ -15,12 +15,18 @@ from modules.Auth import auth_routers
 from core.logger import logger
 from modules.project_connections import project_routers
 from modules.benchmark import routes as benchmark_routes
+from modules.ingestion import router as ingestion_router
+from modules.ingestion.admission import AdmissionMiddleware
 from modules.monitor import project_monitoror
 from modules import services
 import asyncio
 
 # Global variable to track monitor processes
 monitor_process = None
+# Ingestion worker processes started with the application
+ingestion_worker_processes = []
+# Retention and VACUUM of the SQLite database
+maintenance_process = None
 
 def run_monitor_in_process():
     """Run a single monitoring job in a separate process to avoid blocking the main application"""
@@ -65,6 +71,18 @@ def run_periodic_monitor_in_process():
     asyncio.set_event_loop(loop)
     loop.run_until_complete(run_periodically())
 
+def run_ingestion_worker_in_process():
+    """Run an ingestion worker in a separate process so parsing and QA generation never block the API"""
+    # This runs in a separate process
+    from modules.ingestion.worker import run_worker_in_process
+    run_worker_in_process()
+
+def run_maintenance_in_process():
+    """Run the periodic database maintenance (retention, incremental VACUUM) in a separate process"""
+    # This runs in a separate process
+    from modules.monitor.retention import run_maintenance_periodically
+    run_maintenance_periodically()
+
 async def startup_event():
     """
     Runs when the application starts.
@@ -84,6 +102,22 @@ async def startup_event():
         monitor_process.daemon = True  # This makes the process exit when the main process exits
         monitor_process.start()
         
+        # Start the ingestion workers that drain the benchmark job queue
+        from core.config import get_settings
+        for _ in range(get_settings().INGESTION_WORKERS):
+            worker_process = multiprocessing.Process(target=run_ingestion_worker_in_process)
+            worker_process.daemon = True
+            worker_process.start()
+            ingestion_worker_processes.append(worker_process)
+        logger.info(f"Started {len(ingestion_worker_processes)} ingestion worker processes")
+        
+        # Compact old results and release free pages in the background
+        global maintenance_process
+        if get_settings().RETENTION_ENABLED:
+            maintenance_process = multiprocessing.Process(target=run_maintenance_in_process)
+            maintenance_process.daemon = True
+            maintenance_process.start()
+        
         logger.info("OBAM AI application started successfully - monitoring running in separate process")
     except Exception as e:
         logger.error(f"Startup error: {e}")
@@ -113,6 +147,9 @@ application = FastAPI(
     on_startup=[startup_event] 
 )
 
+# Upload slots are taken before the request body is read; added before
+# CORS so that 429 responses still carry the CORS headers
+application.add_middleware(AdmissionMiddleware)
 application.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -137,5 +174,6 @@ application.include_router(auth_routers.router, prefix="/api/v1")
 application.include_router(services.router, prefix="/api/v1")
 application.include_router(project_routers.router, prefix="/api/v1")
 application.include_router(benchmark_routes.router, prefix="/api/v1")
+application.include_router(ingestion_router.router, prefix="/api/v1")
 
 
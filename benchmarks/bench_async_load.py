@@ -0,0 +1,200 @@
+"""
+p99 latency of the hot routes under mixed read/write traffic, with the
+request handlers on the sync session (as before) and on the async one.
+
+Serves /get-dashboard-data and /create-project from a scratch SQLite
+database through httpx's in-process ASGI transport. CLIENTS concurrent
+clients (8 by default) send REQUESTS requests in total, one create per
+WRITE_EVERY dashboard reads, while a background thread stands in for the
+test runners: every 100 ms it holds the write lock for 20 ms, as a batch
+of results being committed does. The "before" handlers are the previous
+route bodies, sync Session queries inside async def; the "after" run
+serves the routers of the application with get_async_db pointed at the
+scratch database.
+
+Keep CLIENTS under the 15 connections of the default pool: past it the
+"before" handlers hang, a connection checkout waiting on the event loop
+that would have to run to return a connection.
+
+Usage: python benchmarks/bench_async_load.py [CLIENTS]
+"""
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from uuid import uuid4
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+for name in ("MONGODB_URL", "MONGODB_DB", "EMAIL_PASSWORD", "LANGSMITH_API_KEY", "ANTHROPIC_API_KEY"):
+    os.environ.setdefault(name, "unused")
+
+import httpx  # noqa: E402
+from fastapi import Depends, FastAPI, HTTPException  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+from sqlalchemy.orm import Session, sessionmaker  # noqa: E402
+
+from core.database import Base, get_async_db  # noqa: E402
+from modules.Auth.models import Users  # noqa: E402
+from modules.Auth.schemas import AccessToken  # noqa: E402
+from modules.benchmark import routes as benchmark_routes  # noqa: E402
+from modules.monitor import models  # noqa: E402
+from modules.monitor.rollups import get_rollup  # noqa: E402
+from modules.project_connections import project_routers  # noqa: E402
+from modules.project_connections.models import Projects  # noqa: E402
+from modules.project_connections.schemas import ProjectCreate  # noqa: E402
+
+REQUESTS = 2000
+WRITE_EVERY = 5
+TOKEN = "bench-token"
+PROJECT = {
+    "project_name": "bench", "content_type": "application/json",
+    "target_url": "http://localhost", "end_point": "/chat",
+    "header_keys": [], "header_values": [], "payload_body": "{}",
+    "is_active": False, "test_interval_in_hrs": 24.0,
+    "benchmark_knowledge_id": "k"
+}
+
+
+def fill(path):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine, tables=[
+        Users.__table__, Projects.__table__, models.QAPairs.__table__, models.TestInfo.__table__,
+        models.ProjectScoreRollup.__table__, models.ProjectScoreBucket.__table__
+    ])
+    db = sessionmaker(bind=engine)()
+    db.add(Users(user_id="u1", name="bench", email="bench@example.com", password="x",
+                 isVerified=True, verification_token=TOKEN))
+    db.add(Projects(project_id="p0", user_id="u1", project_name="bench", registered_at=datetime.utcnow()))
+    db.add(models.ProjectScoreRollup(
+        project_id="p0", tests_total=1000, tests_passed=700, hallucination_scored=1000,
+        hallucinations=100, helpfulness_scored=1000, helpfulness_sum=800.0,
+        last_test_conducted=datetime.utcnow(), updated_at=datetime.utcnow()
+    ))
+    db.commit()
+    db.close()
+    engine.dispose()
+
+
+def sync_app(path):
+    """The routes as they were, blocking queries in async handlers."""
+    SessionLocal = sessionmaker(bind=create_engine(
+        f"sqlite:///{path}", connect_args={"check_same_thread": False}
+    ))
+
+    def get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+
+    @app.get("/api/v1/get-dashboard-data/{project_id}")
+    async def get_dash_board_data(project_id: str, db: Session = Depends(get_db)):
+        project = db.query(Projects).filter(Projects.project_id == project_id).first()
+        if not project:
+            raise HTTPException(status_code=404, detail="Project not found")
+        rollup = get_rollup(db, project_id)
+        return {"data": {"bench_mark_data_title": project.project_name, "tests_total": rollup.tests_total}}
+
+    @app.post("/api/v1/create-project/")
+    async def create_project(project: ProjectCreate, token_data: AccessToken, db: Session = Depends(get_db)):
+        user = db.query(Users).filter(Users.verification_token == token_data.access_token).first()
+        new_project = Projects(project_id=str(uuid4()), user_id=user.user_id,
+                               project_name=project.project_name, registered_at=datetime.utcnow())
+        db.add(new_project)
+        db.commit()
+        db.refresh(new_project)
+        return {"status": "ok", "project_id": new_project.project_id}
+
+    return app
+
+
+def async_app(path):
+    """The routers of the application, on an async session of the scratch database."""
+    AsyncSessionLocal = async_sessionmaker(
+        create_async_engine(f"sqlite+aiosqlite:///{path}"), autoflush=False, expire_on_commit=False
+    )
+
+    async def get_bench_db():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(project_routers.router, prefix="/api/v1")
+    app.include_router(benchmark_routes.router, prefix="/api/v1")
+    app.dependency_overrides[get_async_db] = get_bench_db
+    return app
+
+
+def hold_write_lock(path, stop):
+    """A test runner committing a batch: the write lock is held 20 ms out of every 100."""
+    conn = sqlite3.connect(path, isolation_level=None)
+    while not stop.is_set():
+        conn.execute("BEGIN IMMEDIATE")
+        time.sleep(0.02)
+        conn.execute("COMMIT")
+        time.sleep(0.08)
+    conn.close()
+
+
+async def load(app, clients):
+    latencies = {"read": [], "write": []}
+    sent = iter(range(REQUESTS))
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker():
+            for i in sent:
+                kind = "write" if i % WRITE_EVERY == 0 else "read"
+                began = time.perf_counter()
+                if kind == "write":
+                    response = await client.post("/api/v1/create-project/", json={
+                        "project": PROJECT, "token_data": {"access_token": TOKEN}
+                    })
+                else:
+                    response = await client.get("/api/v1/get-dashboard-data/p0")
+                assert response.status_code == 200, response.text
+                latencies[kind].append((time.perf_counter() - began) * 1000)
+
+        began = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(clients)))
+        elapsed = time.perf_counter() - began
+    return latencies, REQUESTS / elapsed
+
+
+def percentile(values, share):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * share))]
+
+
+def main():
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    print(f"{REQUESTS} requests from {clients} clients, one write per {WRITE_EVERY} requests, "
+          "write lock held 20 ms out of 100")
+    for label, build in (("sync session (before)", sync_app), ("async session (after)", async_app)):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "bench.db")
+            fill(path)
+            stop = threading.Event()
+            writer = threading.Thread(target=hold_write_lock, args=(path, stop))
+            writer.start()
+            try:
+                latencies, throughput = asyncio.run(load(build(path), clients))
+            finally:
+                stop.set()
+                writer.join()
+        print(f"  {label}  {throughput:6.0f} req/s")
+        for kind, values in latencies.items():
+            print(f"    {kind:5}  p50 {percentile(values, 0.5):7.2f} ms   "
+                  f"p99 {percentile(values, 0.99):7.2f} ms   max {max(values):7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
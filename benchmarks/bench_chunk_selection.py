@@ -0,0 +1,60 @@
+"""
+Chunk selection benchmark.
+
+Times ChunkSelector.select on synthetic corpora of 1,000 to 50,000
+1000-character chunks and reports its peak memory and how many distinct
+topics the selection covers compared to taking the first chunks. Beyond
+max_candidates (10,000) chunks a uniform sample is clustered.
+
+Usage: python benchmarks/bench_chunk_selection.py
+"""
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modules.benchmark.chunk_selector import ChunkSelector  # noqa: E402
+
+N_TOPICS = 40
+BUDGET_CHUNKS = 40
+
+
+def corpus(n_chunks, seed=0):
+    rng = random.Random(seed)
+    shared = [f"common{i}" for i in range(200)]
+    vocabularies = [[f"t{t}term{i}" for i in range(60)] for t in range(N_TOPICS)]
+    texts, topics = [], []
+    for i in range(n_chunks):
+        # documents are laid out topic after topic, like sections of a manual
+        topic = i * N_TOPICS // n_chunks
+        words = rng.choices(vocabularies[topic], k=90) + rng.choices(shared, k=60)
+        rng.shuffle(words)
+        texts.append(" ".join(words)[:1000])
+        topics.append(topic)
+    return texts, topics
+
+
+def main():
+    print(f"{'chunks':>8} {'select ms':>10} {'peak MB':>8} {'topics covered':>15} {'first-N covers':>15}")
+    for n_chunks in (1000, 2000, 5000, 10000, 50000):
+        texts, topics = corpus(n_chunks)
+        selector = ChunkSelector()
+        runs = []
+        for _ in range(3):
+            started = time.perf_counter()
+            selected = selector.select(texts, BUDGET_CHUNKS)
+            runs.append((time.perf_counter() - started) * 1000)
+        tracemalloc.start()
+        selector.select(texts, BUDGET_CHUNKS)
+        peak = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+        covered = len({topics[i] for i in selected})
+        first_n = len(set(topics[:BUDGET_CHUNKS]))
+        print(f"{n_chunks:>8} {min(runs):>10.1f} {peak:>8.1f} {covered:>15} {first_n:>15}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Chunking throughput benchmark.
+
+Chunks a synthetic SIZE_MB megabyte markdown-like document (8 by default:
+headings, paragraphs, lists and tables) with the StructuredChunker used by
+FileProcessor and with the previous RecursiveCharacterTextSplitter
+(1000 characters, 20 overlap), and reports MB/s, chunk count and the
+token size spread of the chunks.
+
+Usage: python benchmarks/bench_chunker.py [SIZE_MB] [MAX_TOKENS]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from langchain.schema import Document  # noqa: E402
+from langchain.text_splitter import RecursiveCharacterTextSplitter  # noqa: E402
+
+from modules.benchmark.chunker import StructuredChunker, count_tokens  # noqa: E402
+
+_word_rng = random.Random(7)
+WORDS = ["".join(_word_rng.choices("abcdefghijklmnopqrstuvwxyz", k=_word_rng.randint(2, 11))) for _ in range(3000)]
+
+
+def sentence(rng):
+    return " ".join(rng.choices(WORDS, k=rng.randint(6, 22))).capitalize() + "."
+
+
+def make_document(size, rng):
+    blocks, total = [], 0
+    while total < size:
+        roll = rng.random()
+        if roll < 0.08:
+            block = f"{'#' * rng.randint(1, 3)} {sentence(rng)[:-1]}"
+        elif roll < 0.2:
+            block = "\n".join(f"- {sentence(rng)}" for _ in range(rng.randint(2, 8)))
+        elif roll < 0.25:
+            block = "\n".join(
+                f"| {rng.choice(WORDS)} | {rng.randint(0, 10**6)} | {rng.choice(WORDS)} |"
+                for _ in range(rng.randint(3, 30))
+            )
+        else:
+            block = " ".join(sentence(rng) for _ in range(rng.randint(1, 12)))
+        blocks.append(block)
+        total += len(block) + 2
+    return "\n\n".join(blocks)
+
+
+def measure(name, split, text):
+    started = time.perf_counter()
+    chunks = split(text)
+    elapsed = time.perf_counter() - started
+    sizes = sorted(count_tokens(chunk) for chunk in chunks)
+    print(
+        f"{name:28} {len(text.encode('utf-8')) / elapsed / 1e6:8.1f} MB/s  {len(chunks):7d} chunks  "
+        f"tokens p50 {sizes[len(sizes) // 2]:4d}  p99 {sizes[int(len(sizes) * 0.99)]:4d}  max {sizes[-1]:4d}"
+    )
+
+
+def main():
+    size_mb = float(sys.argv[1]) if len(sys.argv) > 1 else 8.0
+    max_tokens = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    text = make_document(int(size_mb * 1e6), random.Random(1))
+
+    chunker = StructuredChunker(max_tokens=max_tokens)
+    splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=20, length_function=len)
+    measure(
+        f"StructuredChunker({max_tokens})",
+        lambda t: [d.page_content for d in chunker.chunk_documents([Document(page_content=t)])],
+        text
+    )
+    measure("RecursiveCharacterTextSplitter", splitter.split_text, text)
+
+
+if __name__ == "__main__":
+    main()
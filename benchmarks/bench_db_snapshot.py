@@ -0,0 +1,129 @@
+"""
+/download-database: snapshot time, download size and time by compression,
+and result commit latency while a snapshot is taken.
+
+Fills a scratch WAL database with ROWS results (500,000 by default), then
+for each compression takes a snapshot with the online backup API and
+reads it through compressed_chunks, as the route sends it, while a writer
+process commits a run of 10 results every 10 ms. "file as is" reads the
+live file without a snapshot, as FileResponse did: it misses whatever is
+still in the -wal file and can be torn by a checkpoint. Writer latencies
+are of the commits made during the snapshot and download; idle is the
+writer alone.
+
+Usage: python benchmarks/bench_db_snapshot.py [ROWS]
+"""
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+for name in ("MONGODB_URL", "MONGODB_DB", "EMAIL_PASSWORD", "LANGSMITH_API_KEY", "ANTHROPIC_API_KEY"):
+    os.environ.setdefault(name, "unused")
+
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from core.config import get_settings  # noqa: E402
+from core.database import Base, configure_sqlite  # noqa: E402
+from core.snapshot import compressed_chunks, remove_snapshot, snapshot_database  # noqa: E402
+from modules.monitor import models  # noqa: E402
+from modules.project_connections.models import Projects  # noqa: E402
+
+
+def session_factory(path):
+    engine = create_engine(f"sqlite:///{path}")
+    configure_sqlite(engine, get_settings())
+    return sessionmaker(bind=engine)
+
+
+def fill(path, rows):
+    make_session = session_factory(path)
+    Base.metadata.create_all(make_session.kw["bind"], tables=[
+        Projects.__table__, models.QAPairs.__table__, models.TestInfo.__table__
+    ])
+    db = make_session()
+    db.execute(models.QAPairs.__table__.insert(), [dict(qa_hash="h", question="q" * 150, factual_answer="f" * 600)])
+    start = datetime(2025, 1, 1)
+    for offset in range(0, rows, 50_000):
+        db.execute(models.TestInfo.__table__.insert(), [
+            dict(test_id=f"t{i:08d}", user_id="u1", project_id=f"p{i % 16}", test_status=str(i % 2),
+                 hallucination_score=i % 2, helpfullness_score=0.5, qa_hash="h",
+                 student_answer=f"answer {i} " + "word " * (i % 120), difficulty_level="easy",
+                 last_test_conducted=start + timedelta(seconds=i), response_latency_ms=120.0)
+            for i in range(offset, min(offset + 50_000, rows))
+        ])
+        db.commit()
+    db.close()
+
+
+def writer(path, stop, report):
+    """Commits a run of results every 10 ms until stopped, reporting commit latencies."""
+    db = session_factory(path)()
+    latencies = []
+    while not stop.is_set():
+        began = time.perf_counter()
+        db.execute(models.TestInfo.__table__.insert(), [
+            dict(test_id=str(uuid4()), user_id="u1", project_id="p0", test_status="1", qa_hash="h",
+                 student_answer="answer", difficulty_level="easy", last_test_conducted=datetime.utcnow())
+            for _ in range(10)
+        ])
+        db.commit()
+        latencies.append((time.perf_counter() - began) * 1000)
+        time.sleep(0.01)
+    report.put(latencies)
+
+
+def percentile(values, share):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * share))] if values else float("nan")
+
+
+def with_writer(path, work):
+    stop, report = multiprocessing.Event(), multiprocessing.Queue()
+    process = multiprocessing.Process(target=writer, args=(path, stop, report))
+    process.start()
+    time.sleep(0.5)
+    result = work()
+    stop.set()
+    latencies = report.get()
+    process.join()
+    return result, latencies
+
+
+def download(path, compression, tmp):
+    began = time.perf_counter()
+    snapshot_path = snapshot_database(path, tmp) if compression != "file as is" else path
+    snapshot_seconds = time.perf_counter() - began
+    size = sum(len(chunk) for chunk in compressed_chunks(
+        snapshot_path, "none" if compression == "file as is" else compression
+    ))
+    if snapshot_path != path:
+        remove_snapshot(snapshot_path)
+    return snapshot_seconds, time.perf_counter() - began, size
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        fill(path, rows)
+        print(f"{rows} results, database {os.path.getsize(path) / 1024 / 1024:.0f} MB")
+        _, idle = with_writer(path, lambda: time.sleep(3))
+        print(f"  writer idle: commit p50 {percentile(idle, 0.5):.1f} ms, p99 {percentile(idle, 0.99):.1f} ms")
+        for compression in ("file as is", "none", "zstd", "gzip"):
+            (snapshot_seconds, seconds, size), latencies = with_writer(
+                path, lambda: download(path, compression, tmp)
+            )
+            print(f"  {compression:10}  snapshot {snapshot_seconds:5.2f} s   total {seconds:6.2f} s   "
+                  f"{size / 1024 / 1024:7.1f} MB sent   writer commit p50 {percentile(latencies, 0.5):5.1f} ms "
+                  f"p99 {percentile(latencies, 0.99):6.1f} ms max {max(latencies):6.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Change-point detection: cost on the result write path, false alarms on
+steady scores and delay on shifted ones.
+
+Writes RUNS runs of 30 results (1,000 by default) over 16 projects
+through write_results, with and without the detector, and reports the
+time per run. Then feeds ScoreDetector 100,000 steady values of a 0/1
+score with 10% failures and of a latency with 2% slow outliers, counting
+the events, and reports after how many results a shift of the
+hallucination rate from 10% to 30% and of latency by 3 standard
+deviations is detected. Settings are the DETECTION_* defaults.
+
+Usage: python benchmarks/bench_detection.py [RUNS]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+for name in ("MONGODB_URL", "MONGODB_DB", "EMAIL_PASSWORD", "LANGSMITH_API_KEY", "ANTHROPIC_API_KEY"):
+    os.environ.setdefault(name, "unused")
+
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from core.config import get_settings  # noqa: E402
+from core.database import Base, configure_sqlite  # noqa: E402
+from modules.monitor import models  # noqa: E402
+from modules.monitor.detection import METRICS, STATE_COLUMNS, ScoreDetector  # noqa: E402
+from modules.monitor.writer import write_results  # noqa: E402
+from modules.project_connections.models import Projects  # noqa: E402
+
+PROJECTS = 16
+
+
+def make_run(rng, run, project_id, start):
+    return [
+        models.TestInfo(
+            test_id=f"{project_id}-{run}-{i}", user_id="u1", project_id=project_id, test_status="1",
+            hallucination_score=1 if rng.random() < 0.9 else 0, helpfullness_score=rng.random(),
+            last_test_conducted=start + timedelta(minutes=run, seconds=i), question=f"q{i}",
+            student_answer="a", factual_answer="f", difficulty_level="easy",
+            response_latency_ms=rng.gauss(200.0, 20.0)
+        )
+        for i in range(30)
+    ]
+
+
+def time_writes(path, runs, detector):
+    engine = create_engine(f"sqlite:///{path}")
+    configure_sqlite(engine, get_settings())
+    Base.metadata.create_all(engine, tables=[
+        Projects.__table__, models.QAPairs.__table__, models.TestInfo.__table__,
+        models.ProjectScoreRollup.__table__, models.ProjectScoreBucket.__table__,
+        models.ProjectScoreDetector.__table__, models.RegressionEvent.__table__
+    ])
+    db = sessionmaker(bind=engine)()
+    db.add_all([Projects(project_id=f"p{i}", user_id="u1") for i in range(PROJECTS)])
+    db.commit()
+    rng, start, elapsed = random.Random(1), datetime(2025, 1, 1), 0.0
+    for run in range(runs):
+        results = make_run(rng, run, f"p{run % PROJECTS}", start)
+        began = time.perf_counter()
+        write_results(db, f"p{run % PROJECTS}", results, detector=detector)
+        db.commit()
+        elapsed += time.perf_counter() - began
+    db.close()
+    engine.dispose()
+    return elapsed / runs * 1000
+
+
+def feed(detector, metric, values):
+    """Indexes of the values at which events were detected."""
+    floor = METRICS[metric][2]
+    state = dict.fromkeys(STATE_COLUMNS, 0)
+    return [index for index, value in enumerate(values) if detector.step(state, value, floor)]
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    detector = ScoreDetector.from_settings(get_settings())
+    with tempfile.TemporaryDirectory() as tmp:
+        without = time_writes(os.path.join(tmp, "without.db"), runs, None)
+        with_detector = time_writes(os.path.join(tmp, "with.db"), runs, detector)
+    print(f"{runs} runs of 30 results: write_results {without:.2f} ms per run, "
+          f"{with_detector:.2f} ms with detection")
+
+    rng = random.Random(2)
+    steady = {
+        "hallucination": [1.0 if rng.random() < 0.9 else 0.0 for _ in range(100_000)],
+        "latency_ms": [rng.gauss(1500, 300) if rng.random() < 0.02 else rng.gauss(200, 20) for _ in range(100_000)],
+    }
+    for metric, values in steady.items():
+        print(f"  steady {metric:14} {len(feed(detector, metric, values))} events in 100,000 results")
+
+    shifted = {
+        "hallucination": [1.0 if rng.random() < 0.9 else 0.0 for _ in range(5000)]
+        + [1.0 if rng.random() < 0.7 else 0.0 for _ in range(2000)],
+        "latency_ms": [rng.gauss(200, 20) for _ in range(5000)] + [rng.gauss(260, 20) for _ in range(2000)],
+    }
+    for metric, values in shifted.items():
+        detected = [index - 5000 for index in feed(detector, metric, values) if index >= 5000]
+        print(f"  shifted {metric:13} detected {detected[0] + 1 if detected else 'never'} results after the shift")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Throughput, output size and peak memory of result exports by format.
+
+Fills a scratch database with ROWS results (1,000,000 by default) of one
+project, about 600 character answers over 50 QA pairs, then exports them
+in a fresh process per format, discarding the output. "ORM .all()" loads
+every row before writing NDJSON, as an export without a streamed cursor
+would. Peak memory is the process's maximum resident set size less the
+size it had before the export, with memory-mapped I/O off so that it
+does not count database pages; SQLite's page cache is included.
+
+Usage: python benchmarks/bench_export.py [ROWS]
+"""
+import json
+import multiprocessing
+import os
+import random
+import resource
+import string
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+for name in ("MONGODB_URL", "MONGODB_DB", "EMAIL_PASSWORD", "LANGSMITH_API_KEY", "ANTHROPIC_API_KEY"):
+    os.environ.setdefault(name, "unused")
+
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from core.config import get_settings  # noqa: E402
+from core.database import Base, configure_sqlite  # noqa: E402
+from modules.monitor import models  # noqa: E402
+from modules.monitor.export import EXPORT_COLUMNS, export_results  # noqa: E402
+from modules.project_connections.models import Projects  # noqa: E402
+
+
+def fill(engine, rows):
+    rng = random.Random(1)
+    answers = ["".join(rng.choice(string.ascii_lowercase + " ") for _ in range(600)) for _ in range(1000)]
+    db = sessionmaker(bind=engine)()
+    db.execute(models.QAPairs.__table__.insert(), [
+        dict(qa_hash=f"h{i}", question=f"question {i} " * 10, factual_answer="answer " * 80) for i in range(50)
+    ])
+    start = datetime(2025, 1, 1)
+    for offset in range(0, rows, 50_000):
+        db.execute(models.TestInfo.__table__.insert(), [
+            dict(test_id=f"t{i:08d}", user_id="u1", project_id="p0", test_status=str(i % 2),
+                 hallucination_score=i % 2, helpfullness_score=0.5, qa_hash=f"h{i % 50}",
+                 student_answer=answers[i % 1000], difficulty_level="easy",
+                 last_test_conducted=start + timedelta(seconds=i), response_latency_ms=120.0)
+            for i in range(offset, min(offset + 50_000, rows))
+        ])
+        db.commit()
+    db.close()
+
+
+def orm_all(engine):
+    """Every row loaded through the ORM before any byte is written."""
+    db = sessionmaker(bind=engine)()
+    rows = db.query(models.TestInfo).filter(models.TestInfo.project_id == "p0").all()
+    for row in rows:
+        yield (json.dumps({name: str(getattr(row, name)) for name in EXPORT_COLUMNS}) + "\n").encode()
+    db.close()
+
+
+def measure(path, export_format, report):
+    engine = create_engine(f"sqlite:///{path}")
+    # mapped database pages would count as resident memory
+    configure_sqlite(engine, get_settings().model_copy(update={"SQLITE_MMAP_SIZE_BYTES": 0}))
+    baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    began = time.perf_counter()
+    chunks = orm_all(engine) if export_format == "orm" else export_results(engine, export_format, project_id="p0")
+    size = sum(len(chunk) for chunk in chunks)
+    elapsed = time.perf_counter() - began
+    report.put((elapsed, size, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline_kb))
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        engine = create_engine(f"sqlite:///{path}")
+        configure_sqlite(engine, get_settings())
+        Base.metadata.create_all(engine, tables=[
+            Projects.__table__, models.QAPairs.__table__, models.TestInfo.__table__
+        ])
+        fill(engine, rows)
+        engine.dispose()
+        print(f"{rows} results, database {os.path.getsize(path) / 1024 / 1024:.0f} MB, "
+              f"{get_settings().EXPORT_BATCH_ROWS} rows per batch")
+        for label, export_format in (("ORM .all() to NDJSON", "orm"), ("NDJSON", "ndjson"),
+                                     ("Arrow IPC", "arrow"), ("Parquet (zstd)", "parquet")):
+            report = multiprocessing.Queue()
+            process = multiprocessing.Process(target=measure, args=(path, export_format, report))
+            process.start()
+            elapsed, size, peak_kb = report.get()
+            process.join()
+            print(f"  {label:22} {rows / elapsed:9.0f} rows/s   {size / 1024 / 1024:7.1f} MB out   "
+                  f"peak memory +{peak_kb / 1024:7.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Per-format parse throughput of the benchmark file loaders.
+
+Builds a synthetic text, markdown and docx file of SIZE_MB megabytes
+(2 by default) and reports MB/s for the in-memory loaders used by
+FileProcessor against the previous path: the upload written to a
+NamedTemporaryFile and read back by a LangChain loader (TextLoader for
+.txt, UnstructuredFileLoader for .md and .docx, which is reported as
+unavailable when the unstructured package is not installed).
+
+Usage: python benchmarks/bench_file_loaders.py [SIZE_MB]
+"""
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+import zipfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modules.benchmark.loaders import NATIVE_LOADERS  # noqa: E402
+
+_word_rng = random.Random(7)
+WORDS = ["".join(_word_rng.choices("abcdefghijklmnopqrstuvwxyz", k=_word_rng.randint(3, 9))) for _ in range(2000)]
+W = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+
+
+def sentences(rng, size):
+    out, total = [], 0
+    while total < size:
+        sentence = " ".join(rng.choices(WORDS, k=rng.randint(8, 20))).capitalize() + "."
+        out.append(sentence)
+        total += len(sentence) + 1
+    return out
+
+
+def make_txt(size, rng):
+    return " ".join(sentences(rng, size)).encode("utf-8")
+
+
+def make_md(size, rng):
+    lines = []
+    for index, sentence in enumerate(sentences(rng, size)):
+        if index % 40 == 0:
+            lines.append(f"\n{'#' * (1 + index // 40 % 3)} Section {index}\n")
+        lines.append(sentence)
+    return "\n".join(lines).encode("utf-8")
+
+
+def make_docx(size, rng):
+    body = []
+    for index, sentence in enumerate(sentences(rng, size)):
+        style = '<w:pPr><w:pStyle w:val="Heading1"/></w:pPr>' if index % 40 == 0 else ""
+        body.append(f"<w:p>{style}<w:r><w:t>{sentence}</w:t></w:r></w:p>")
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr(
+            "word/document.xml",
+            f"<w:document {W}><w:body>{''.join(body)}</w:body></w:document>"
+        )
+    return buffer.getvalue()
+
+
+def tempfile_loader(loader_class):
+    def load(content, filename):
+        with tempfile.NamedTemporaryFile(delete=False, suffix=filename) as tmp:
+            tmp.write(content)
+            tmp_path = tmp.name
+        try:
+            return loader_class(tmp_path).load()
+        finally:
+            os.unlink(tmp_path)
+    return load
+
+
+def previous_loaders():
+    from langchain_community.document_loaders import TextLoader
+    loaders = {".txt": tempfile_loader(TextLoader)}
+    try:
+        import unstructured  # noqa: F401
+        from langchain_community.document_loaders import UnstructuredFileLoader
+        loaders[".md"] = loaders[".docx"] = tempfile_loader(UnstructuredFileLoader)
+    except ImportError:
+        pass
+    return loaders
+
+
+def throughput(load, content, filename, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        documents = load(content, filename)
+        best = min(best, time.perf_counter() - started)
+    return len(content) / best / 1e6, len(documents)
+
+
+def main():
+    size_mb = float(sys.argv[1]) if len(sys.argv) > 1 else 2.0
+    rng = random.Random(1)
+    size = int(size_mb * 1e6)
+    files = {
+        ".txt": make_txt(size, rng),
+        ".md": make_md(size, rng),
+        ".docx": make_docx(size, rng),
+    }
+    previous = previous_loaders()
+
+    print(f"{'format':8} {'bytes':>10} {'native MB/s':>12} {'docs':>6} {'previous MB/s':>14} {'speedup':>8}")
+    for ext, content in files.items():
+        filename = f"bench{ext}"
+        native_rate, native_docs = throughput(NATIVE_LOADERS[ext], content, filename)
+        if ext in previous:
+            previous_rate, _ = throughput(previous[ext], content, filename)
+            previous_text = f"{previous_rate:14.1f}"
+            speedup = f"{native_rate / previous_rate:7.1f}x"
+        else:
+            previous_text = f"{'unavailable':>14}"
+            speedup = f"{'-':>8}"
+        print(f"{ext:8} {len(content):10d} {native_rate:12.1f} {native_docs:6d} {previous_text} {speedup}")
+
+
+if __name__ == "__main__":
+    main()
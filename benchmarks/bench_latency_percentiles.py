@@ -0,0 +1,111 @@
+"""
+Latency percentiles over a window: raw result rows against merged bucket
+sketches.
+
+Fills a scratch database with ROWS results of one project (500,000 by
+default, one a minute, about a year), builds the score buckets and their
+latency sketches with rebuild_buckets, then times p50/p95/p99 for windows
+of a day, a month and a year: "raw rows" reads the window's latencies
+with the (project_id, last_test_conducted) index and sorts them, as a
+percentile endpoint without sketches would; "sketches" is
+latency_percentiles. Also reports the largest relative error against the
+exact values and the sketch bytes per bucket.
+
+Usage: python benchmarks/bench_latency_percentiles.py [ROWS]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+for name in ("MONGODB_URL", "MONGODB_DB", "EMAIL_PASSWORD", "LANGSMITH_API_KEY", "ANTHROPIC_API_KEY"):
+    os.environ.setdefault(name, "unused")
+
+from sqlalchemy import create_engine, func  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from core.config import get_settings  # noqa: E402
+from core.database import Base, configure_sqlite  # noqa: E402
+from modules.monitor import models  # noqa: E402
+from modules.monitor.history import latency_percentiles, rebuild_buckets  # noqa: E402
+from modules.project_connections.models import Projects  # noqa: E402
+
+QUANTILES = (0.5, 0.95, 0.99)
+START = datetime(2025, 1, 6)
+
+
+def fill(db, rows):
+    rng = random.Random(1)
+    db.add(Projects(project_id="p1", user_id="u1"))
+    db.execute(models.QAPairs.__table__.insert(), [dict(qa_hash="h", question="q", factual_answer="f")])
+    for offset in range(0, rows, 50_000):
+        db.execute(models.TestInfo.__table__.insert(), [
+            dict(test_id=f"t{i:08d}", user_id="u1", project_id="p1", test_status="1", qa_hash="h",
+                 hallucination_score=1, helpfullness_score=1.0, student_answer="a", difficulty_level="easy",
+                 last_test_conducted=START + timedelta(minutes=i),
+                 # a slow day each week
+                 response_latency_ms=rng.lognormvariate(5.3 if (i // 1440) % 7 == 3 else 5, 0.6))
+            for i in range(offset, min(offset + 50_000, rows))
+        ])
+    db.commit()
+
+
+def raw_percentiles(db, start, end):
+    latencies = sorted(latency for latency, in db.query(models.TestInfo.response_latency_ms).filter(
+        models.TestInfo.project_id == "p1",
+        models.TestInfo.last_test_conducted >= start,
+        models.TestInfo.last_test_conducted < end,
+        models.TestInfo.response_latency_ms.isnot(None)
+    ))
+    return {str(q): latencies[int(q * (len(latencies) - 1))] for q in QUANTILES}
+
+
+def best_of(work, repeat=5):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        began = time.perf_counter()
+        result = work()
+        best = min(best, time.perf_counter() - began)
+    return best * 1000, result
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        configure_sqlite(engine, get_settings())
+        Base.metadata.create_all(engine, tables=[
+            Projects.__table__, models.QAPairs.__table__, models.TestInfo.__table__, models.ProjectScoreBucket.__table__
+        ])
+        db = sessionmaker(bind=engine)()
+        fill(db, rows)
+        began = time.perf_counter()
+        buckets = rebuild_buckets(db)
+        sizes = db.query(
+            models.ProjectScoreBucket.granularity, func.avg(func.length(models.ProjectScoreBucket.latency_sketch))
+        ).group_by(models.ProjectScoreBucket.granularity).all()
+        print(f"{rows} results; {buckets} buckets with sketches rebuilt in {time.perf_counter() - began:.1f} s; "
+              + ", ".join(f"{name} sketch {size:.0f} B" for name, size in sizes))
+
+        # windows on hour boundaries: latency_percentiles rounds to hours
+        last = (START + timedelta(minutes=rows)).replace(minute=0)
+        windows = (
+            ("1 day", last - timedelta(days=1, hours=5), last - timedelta(hours=5)),
+            ("30 days", last - timedelta(days=30, hours=7), last - timedelta(hours=3)),
+            ("365 days", last - timedelta(days=365), last),
+        )
+        for label, start, end in windows:
+            raw_ms, exact = best_of(lambda: raw_percentiles(db, start, end))
+            sketch_ms, merged = best_of(lambda: latency_percentiles(db, "p1", start, end, QUANTILES))
+            error = max(abs(merged["quantiles"][q] - exact[q]) / exact[q] for q in exact)
+            print(f"  {label:9} raw rows {raw_ms:8.1f} ms   sketches {sketch_ms:6.1f} ms   "
+                  f"max relative error {error:.2%}")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
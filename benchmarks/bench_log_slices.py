@@ -0,0 +1,84 @@
+"""
+Time to serve slices of the application log.
+
+Writes app.log and 5 rotated files of 10 MB each (the RotatingFileHandler
+limits of core.logger) with DEBUG records carrying payloads, then times
+read_log for a tail, a filtered tail, a one minute time range and a
+request ID search, against reading the whole current file as
+/download-logs did. Sizes are of the response raw and gzip encoded.
+
+Usage: python benchmarks/bench_log_slices.py
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from contextlib import ExitStack
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.log_reader import LogQuery, log_files, read_log  # noqa: E402
+from core.snapshot import compress_stream  # noqa: E402
+
+FILE_BYTES = 10 * 1024 * 1024
+BACKUPS = 5
+LEVELS = ["DEBUG"] * 12 + ["INFO"] * 6 + ["WARNING", "ERROR"]
+
+
+def write_logs(path):
+    rng = random.Random(1)
+    at = datetime(2025, 1, 1)
+    for suffix in [f".{i}" for i in range(BACKUPS, 0, -1)] + [""]:
+        with open(f"{path}{suffix}", "w") as file:
+            while file.tell() < FILE_BYTES:
+                at += timedelta(milliseconds=rng.randint(1, 400))
+                payload = "x" * rng.choice((40, 80, 600))
+                file.write(f"{at:%Y-%m-%d %H:%M:%S},{at.microsecond // 1000:03d} - app_logger - "
+                           f"{rng.choice(LEVELS)} - Request {rng.getrandbits(64):016x}: payload {payload}\n")
+    return at
+
+
+def timed(path, query, tail, repeat=5):
+    best, raw, gzipped = float("inf"), 0, 0
+    for _ in range(repeat):
+        with ExitStack() as stack:
+            files = [stack.enter_context(open(name, "rb")) for name in log_files(path, BACKUPS)]
+            began = time.perf_counter()
+            chunks = list(read_log(files, query, tail))
+            best = min(best, time.perf_counter() - began)
+    raw = sum(map(len, chunks))
+    gzipped = sum(map(len, compress_stream(iter(chunks), "gzip")))
+    return best * 1000, raw, gzipped
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "app.log")
+        last = write_logs(path)
+        with open(path, "rb") as file:
+            # the request ID of a record in the middle of the current file
+            file.seek(FILE_BYTES // 2)
+            file.readline()
+            request_id = file.readline().split(b"Request ")[1][:16].decode()
+        print(f"{BACKUPS + 1} log files of {FILE_BYTES // 1024 // 1024} MB")
+
+        began = time.perf_counter()
+        with open(path, "rb") as file:
+            whole = file.read()
+        print(f"  {'whole app.log (before)':28} {(time.perf_counter() - began) * 1000:8.1f} ms "
+              f"{len(whole) / 1024:10.0f} KB")
+        cases = (
+            ("tail 100", LogQuery(), 100),
+            ("tail 100 ERROR", LogQuery(level="ERROR"), 100),
+            ("1 minute, 2 files back", LogQuery(since=last - timedelta(hours=3), until=last - timedelta(hours=3) + timedelta(minutes=1)), None),
+            ("request ID, all files", LogQuery(request_id=request_id), None),
+        )
+        for label, query, tail in cases:
+            ms, raw, gzipped = timed(path, query, tail)
+            print(f"  {label:28} {ms:8.1f} ms {raw / 1024:10.1f} KB, gzip {gzipped / 1024:.1f} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Peak memory of PDF ingestion, streaming vs load-everything.
+
+Writes a synthetic PAGES-page PDF (1,000 by default, ~3,000 characters of
+text per page) and chunks it in a fresh subprocess per mode, reporting
+peak RSS above the RSS after imports and the wall time:
+
+- previous:  PyPDFLoader.load() + RecursiveCharacterTextSplitter, all chunks kept
+- streaming: FileProcessor.iter_file_chunks, chunks handed on in batches
+             of CHUNK_CHECKPOINT_BATCH as the ingestion worker does
+
+Usage: python benchmarks/bench_pdf_streaming.py [PAGES]
+"""
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+_word_rng = random.Random(7)
+WORDS = ["".join(_word_rng.choices("abcdefghijklmnopqrstuvwxyz", k=_word_rng.randint(2, 10))) for _ in range(3000)]
+LINES_PER_PAGE = 50
+BATCH = 200
+
+
+def write_pdf(path, pages, rng):
+    """Minimal PDF: one Helvetica text stream per page."""
+    offsets = []
+    with open(path, "wb") as out:
+        def obj(number, body):
+            offsets.append((number, out.tell()))
+            out.write(f"{number} 0 obj\n".encode() + body + b"\nendobj\n")
+
+        out.write(b"%PDF-1.4\n")
+        first_page = 4
+        kids = " ".join(f"{first_page + 2 * i} 0 R" for i in range(pages))
+        obj(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+        obj(2, f"<< /Type /Pages /Kids [{kids}] /Count {pages} >>".encode())
+        obj(3, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+        for i in range(pages):
+            lines = []
+            for line in range(LINES_PER_PAGE):
+                text = " ".join(rng.choices(WORDS, k=10)).capitalize() + "."
+                lines.append(f"BT /F1 9 Tf 40 {800 - line * 15} Td ({text}) Tj ET")
+            stream = "\n".join(lines).encode()
+            obj(first_page + 2 * i, (
+                f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+                f"/Resources << /Font << /F1 3 0 R >> >> /Contents {first_page + 2 * i + 1} 0 R >>"
+            ).encode())
+            obj(first_page + 2 * i + 1, f"<< /Length {len(stream)} >>\nstream\n".encode() + stream + b"\nendstream")
+        xref = out.tell()
+        count = first_page + 2 * pages
+        out.write(f"xref\n0 {count}\n0000000000 65535 f \n".encode())
+        for _, offset in sorted(offsets):
+            out.write(f"{offset:010d} 00000 n \n".encode())
+        out.write(f"trailer\n<< /Size {count} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_mode(mode, path):
+    from langchain_community.document_loaders import PyPDFLoader
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+    from types import SimpleNamespace
+    from modules.benchmark.file_processer import FileProcessor
+
+    baseline = peak_rss_mb()
+    started = time.perf_counter()
+    if mode == "previous":
+        documents = PyPDFLoader(path).load()
+        splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=20, length_function=len)
+        chunks = splitter.split_documents(documents)
+        count = len(chunks)
+    else:
+        processor = FileProcessor(SimpleNamespace(chunks_collection=None))
+        batch, count = [], 0
+        for chunk in processor.iter_file_chunks(path, os.path.basename(path)):
+            batch.append(chunk.model_dump())
+            if len(batch) >= BATCH:
+                count += len(batch)
+                batch = []
+        count += len(batch)
+    elapsed = time.perf_counter() - started
+    print(f"{mode:10} {count:7d} chunks  {elapsed:6.2f} s  peak RSS +{peak_rss_mb() - baseline:7.1f} MB")
+
+
+def main():
+    if len(sys.argv) > 2 and sys.argv[1] == "--mode":
+        run_mode(sys.argv[2], sys.argv[3])
+        return
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    env = dict(os.environ)
+    for name in ("MONGODB_URL", "MONGODB_DB", "EMAIL_PASSWORD", "LANGSMITH_API_KEY", "ANTHROPIC_API_KEY"):
+        env.setdefault(name, "unused")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.pdf")
+        write_pdf(path, pages, random.Random(1))
+        print(f"{pages} pages, {os.path.getsize(path) / 1e6:.1f} MB")
+        for mode in ("previous", "streaming"):
+            subprocess.run([sys.executable, __file__, "--mode", mode, path], env=env, cwd=tmp, check=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Near-duplicate QA elimination benchmark.
+
+Builds N synthetic questions (100,000 by default) of which about 20% are
+perturbed copies of earlier ones (case, punctuation, contractions, one
+inserted word), runs the ingestion dedup step and reports time, dedup
+rate and precision/recall against the injected duplicates. Questions built
+from the same template that differ by a single word also count as false
+positives here, so precision is a lower bound.
+
+Usage: python benchmarks/bench_qa_dedup.py [N] [threshold]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modules.benchmark.dedup import NearDuplicateDetector, deduplicate  # noqa: E402
+
+TEMPLATES = [
+    "What is the {a} of the {b} described in section {n}?",
+    "How does the {b} affect the {a} when {c} is enabled?",
+    "Which {c} setting controls the {a} of {b} number {n}?",
+    "Why is the {a} of the {b} limited to {n} units?",
+    "When should the {c} be used instead of the {b}?",
+    "Who is responsible for approving the {a} of {b} {n}?",
+]
+_word_rng = random.Random(42)
+WORDS = ["".join(_word_rng.choices("abcdefghijklmnopqrstuvwxyz", k=_word_rng.randint(4, 10))) for _ in range(3000)]
+
+
+def perturb(question, rng):
+    variants = [
+        lambda q: q.lower(),
+        lambda q: q.rstrip("?"),
+        lambda q: q.replace("What is", "What's").replace("How does", "How do"),
+        lambda q: q.replace(" the ", " the exact ", 1),
+        lambda q: q.replace("?", " ?"),
+    ]
+    for variant in rng.sample(variants, 2):
+        question = variant(question)
+    return question
+
+
+def synthetic_questions(n, duplicate_share=0.2, seed=0):
+    rng = random.Random(seed)
+    questions, origin = [], []
+    for i in range(n):
+        if questions and rng.random() < duplicate_share:
+            source = rng.randrange(len(questions))
+            questions.append(perturb(questions[origin[source]], rng))
+            origin.append(origin[source])
+        else:
+            questions.append(rng.choice(TEMPLATES).format(
+                a=rng.choice(WORDS), b=rng.choice(WORDS), c=rng.choice(WORDS), n=rng.randrange(1000)
+            ))
+            origin.append(i)
+    return questions, origin
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    threshold = float(sys.argv[2]) if len(sys.argv) > 2 else 0.75
+    questions, origin = synthetic_questions(n)
+    injected = sum(1 for i, source in enumerate(origin) if source != i)
+
+    detector = NearDuplicateDetector(threshold=threshold)
+    started = time.perf_counter()
+    representatives = detector.representatives(questions)
+    elapsed = time.perf_counter() - started
+    items = [{"question": q, "answer": "", "difficulty_level": "easy"} for q in questions]
+    kept, removed = deduplicate(items, detector)
+
+    flagged = [i for i in range(n) if representatives[i] != i]
+    true_positives = sum(1 for i in flagged if origin[i] == origin[representatives[i]])
+    print(f"questions:            {n}")
+    print(f"threshold:            {threshold} ({detector.bands} bands x {detector.rows} rows)")
+    print(f"injected duplicates:  {injected}")
+    print(f"removed:              {removed} (dedup rate {removed / n:.2%})")
+    print(f"precision:            {true_positives / max(len(flagged), 1):.3f}")
+    print(f"recall:               {true_positives / max(injected, 1):.3f}")
+    print(f"time:                 {elapsed:.2f} s ({n / elapsed:,.0f} questions/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+/qa_data page latency by depth, page numbers (OFFSET) vs cursors.
+
+Fills a scratch SQLite database with ROWS test_info rows (1,000,000 by
+default), a fifth of them in the measured project, with the indexes the
+models declare, then times fetch_page at page 1, 100, 1,000, 10,000 and
+20,000 (10 results per page) both ways. The cursor of a deep page is taken
+from the last row of the previous page, as a client walking the pages
+would hold it. The unfiltered total comes from the project's rollup and is
+not part of the timing.
+
+Usage: python benchmarks/bench_qa_pagination.py [ROWS]
+"""
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+for name in ("MONGODB_URL", "MONGODB_DB", "EMAIL_PASSWORD", "LANGSMITH_API_KEY", "ANTHROPIC_API_KEY"):
+    os.environ.setdefault(name, "unused")
+
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.dialects import sqlite  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from sqlalchemy.schema import CreateIndex, CreateTable  # noqa: E402
+
+from modules.monitor.models import QAPairs, TestInfo  # noqa: E402
+from modules.monitor.pagination import (ResultFilters, encode_cursor,  # noqa: E402
+                                        fetch_page)
+from modules.project_connections.models import Projects  # noqa: E402
+
+PAGE_SIZE = 10
+PAGES = (1, 100, 1_000, 10_000, 20_000)
+REPEAT = 20
+BATCH = 100_000
+
+
+def fill(path, rows, rng):
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode = OFF")
+    dialect = sqlite.dialect()
+    for table in (Projects.__table__, QAPairs.__table__, TestInfo.__table__):
+        conn.execute(str(CreateTable(table).compile(dialect=dialect)))
+    started = datetime(2025, 1, 1)
+    for offset in range(0, rows, BATCH):
+        conn.executemany(
+            "INSERT INTO test_info (test_id, user_id, project_id, test_status, last_test_conducted, "
+            "qa_hash, student_answer, difficulty_level) "
+            "VALUES (?, 'u1', ?, ?, ?, 'h', 'answer', 'easy')",
+            (
+                # runs of 10 results share a timestamp, test_id breaks the ties
+                (f"t{i:08d}", "p0" if i % 5 == 0 else f"p{i % 50}", str(i % 2),
+                 # the format SQLAlchemy stores datetimes in
+                 (started + timedelta(minutes=i // 10)).strftime("%Y-%m-%d %H:%M:%S.%f"))
+                for i in range(offset, min(offset + BATCH, rows))
+            )
+        )
+    for index in TestInfo.__table__.indexes:
+        conn.execute(str(CreateIndex(index).compile(dialect=dialect)))
+    conn.execute("ANALYZE")
+    conn.commit()
+    conn.close()
+
+
+def timed(call):
+    timings = []
+    for _ in range(REPEAT):
+        began = time.perf_counter()
+        call()
+        timings.append((time.perf_counter() - began) * 1000)
+    return sorted(timings)[REPEAT // 2]
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        fill(path, rows, random.Random(1))
+        db = sessionmaker(bind=create_engine(f"sqlite:///{path}"))()
+        filters = ResultFilters()
+        project_rows = db.query(TestInfo).filter(TestInfo.project_id == "p0").count()
+        print(f"{rows} test_info rows, {project_rows} in the measured project, {PAGE_SIZE} per page")
+
+        for page in PAGES:
+            offset = (page - 1) * PAGE_SIZE
+            if offset >= project_rows:
+                break
+            cursor = None
+            if page > 1:
+                previous, _ = fetch_page(db, "p0", 1, filters, offset=offset - 1)
+                cursor = encode_cursor(previous[0])
+            by_offset = timed(lambda: fetch_page(db, "p0", PAGE_SIZE, filters, offset=offset))
+            by_cursor = timed(lambda: fetch_page(db, "p0", PAGE_SIZE, filters, cursor=cursor))
+            # same rows either way
+            assert [r.test_id for r in fetch_page(db, "p0", PAGE_SIZE, filters, offset=offset)[0]] == \
+                [r.test_id for r in fetch_page(db, "p0", PAGE_SIZE, filters, cursor=cursor)[0]]
+            print(f"  page {page:6d}   offset {by_offset:8.2f} ms   cursor {by_cursor:6.2f} ms")
+
+        count_ms = timed(lambda: db.query(TestInfo).filter(TestInfo.project_id == "p0").count())
+        print(f"  count() of the project, replaced by the rollup: {count_ms:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Database size and result insert throughput with QA texts inline in
+test_info (as before) and normalized into qa_pairs.
+
+Writes a synthetic year of hourly runs of one project with PAIRS QA pairs
+(50 by default): 8,760 runs, one transaction each, through the same Core
+executemany both ways. Questions are about 150 characters, reference
+answers about 600 and the target's answers about 600, drawn from a pool
+so they vary per run as a real endpoint's do. The "before" table is test_info as it was, with the
+question and factual_answer columns; "after" is insert_results, which
+stores each pair's texts once. Sizes are of the database file after a
+checkpoint, indexes included.
+
+Usage: python benchmarks/bench_qa_storage.py [PAIRS] [DAYS]
+"""
+import os
+import random
+import sqlite3
+import string
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+for name in ("MONGODB_URL", "MONGODB_DB", "EMAIL_PASSWORD", "LANGSMITH_API_KEY", "ANTHROPIC_API_KEY"):
+    os.environ.setdefault(name, "unused")
+
+from sqlalchemy import (Column, DateTime, Float, Index, MetaData, String, Table,  # noqa: E402
+                        create_engine, insert)
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from core.config import get_settings  # noqa: E402
+from core.database import Base, configure_sqlite  # noqa: E402
+from modules.monitor import models  # noqa: E402
+from modules.monitor.writer import insert_results  # noqa: E402
+from modules.project_connections.models import Projects  # noqa: E402
+
+# test_info before the texts moved to qa_pairs
+legacy_metadata = MetaData()
+legacy_test_info = Table(
+    "test_info", legacy_metadata,
+    Column("test_id", String, primary_key=True),
+    Column("user_id", String, primary_key=True),
+    Column("project_id", String),
+    Column("test_status", String, nullable=False),
+    Column("hallucination_score", Float),
+    Column("helpfullness_score", Float),
+    Column("last_test_conducted", DateTime),
+    Column("question", String, nullable=False),
+    Column("student_answer", String, nullable=False),
+    Column("factual_answer", String, nullable=False),
+    Column("difficulty_level", String, nullable=False),
+    Column("response_latency_ms", Float),
+    *(Index(index.name, *(column.name for column in index.columns)) for index in models.TestInfo.__table__.indexes),
+)
+
+
+def text(rng, length):
+    words = []
+    while sum(len(word) + 1 for word in words) < length:
+        words.append("".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(2, 9))))
+    return " ".join(words)
+
+
+def make_run(rng, pairs, answers, at):
+    return [
+        models.TestInfo(
+            test_id=str(uuid4()), user_id="u1", project_id="p0", test_status=str(rng.randint(0, 1)),
+            hallucination_score=rng.randint(0, 1), helpfullness_score=rng.random(),
+            last_test_conducted=at, question=question, factual_answer=factual_answer,
+            student_answer=rng.choice(answers), difficulty_level="easy",
+            response_latency_ms=rng.uniform(50, 2000)
+        )
+        for question, factual_answer in pairs
+    ]
+
+
+def legacy_insert(db, test_infos):
+    columns = [column.key for column in legacy_test_info.columns]
+    db.execute(insert(legacy_test_info), [
+        {name: getattr(test_info, name) for name in columns} for test_info in test_infos
+    ])
+
+
+def load(path, runs, write, create):
+    """Write the runs one transaction each; returns the file size and the time spent writing."""
+    engine = create_engine(f"sqlite:///{path}")
+    configure_sqlite(engine, get_settings())
+    create(engine)
+    db = sessionmaker(bind=engine)()
+    elapsed = 0.0
+    for run in runs:
+        began = time.perf_counter()
+        write(db, run)
+        db.commit()
+        elapsed += time.perf_counter() - began
+    db.close()
+    engine.dispose()
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    conn.close()
+    return os.path.getsize(path), elapsed
+
+
+def main():
+    pairs_count = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    days = int(sys.argv[2]) if len(sys.argv) > 2 else 365
+    rng = random.Random(1)
+    pairs = [(text(rng, 150), text(rng, 600)) for _ in range(pairs_count)]
+    start = datetime(2025, 1, 1)
+    answers = [text(rng, 600) for _ in range(1000)]
+    rows = days * 24 * pairs_count
+    print(f"{days * 24} hourly runs of {pairs_count} QA pairs, {rows} results")
+
+    def runs():
+        # the same rows for both layouts
+        run_rng = random.Random(2)
+        for hour in range(days * 24):
+            yield make_run(run_rng, pairs, answers, start + timedelta(hours=hour))
+
+    layouts = {
+        "texts inline (before)": (
+            legacy_insert,
+            lambda engine: (
+                Base.metadata.create_all(engine, tables=[Projects.__table__]),
+                legacy_metadata.create_all(engine),
+            )
+        ),
+        "qa_pairs (after)": (
+            insert_results,
+            lambda engine: Base.metadata.create_all(engine, tables=[
+                Projects.__table__, models.QAPairs.__table__, models.TestInfo.__table__
+            ])
+        ),
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, (write, create) in layouts.items():
+            size, elapsed = load(os.path.join(tmp, f"{len(label)}.db"), runs(), write, create)
+            print(f"  {label:22} {size / 1024 / 1024:8.1f} MB   {rows / elapsed:8.0f} results/s "
+                  f"({elapsed * 1000 / (days * 24):.2f} ms per run)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Database size and read latency before and after retention compaction.
+
+Writes DAYS (365 by default) of hourly runs of one project with 20 QA
+pairs each through write_results, with results, rollup and score buckets
+as the monitor stores them; student answers are about 600 characters.
+The project keeps RETENTION days (30 by default) of raw results; the
+maintenance job then compacts the older ones and releases the free pages
+with incremental VACUUM. Reported: the database file size, the time the
+compaction took, and the latency of a first /qa_data page, a page deep in
+the retained results and a year of daily score history.
+
+Usage: python benchmarks/bench_retention.py [DAYS] [RETENTION]
+"""
+import os
+import random
+import sqlite3
+import string
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+for name in ("MONGODB_URL", "MONGODB_DB", "EMAIL_PASSWORD", "LANGSMITH_API_KEY", "ANTHROPIC_API_KEY"):
+    os.environ.setdefault(name, "unused")
+
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from core.config import get_settings  # noqa: E402
+from core.database import Base, configure_sqlite  # noqa: E402
+from modules.monitor import models  # noqa: E402
+from modules.monitor.history import score_history  # noqa: E402
+from modules.monitor.pagination import ResultFilters, fetch_page  # noqa: E402
+from modules.monitor.retention import run_maintenance  # noqa: E402
+from modules.monitor.writer import write_results  # noqa: E402
+from modules.project_connections.models import Projects  # noqa: E402
+
+PAIRS = 20
+REPEAT = 50
+
+
+def text(rng, length):
+    return "".join(rng.choice(string.ascii_lowercase + " ") for _ in range(length))
+
+
+def size_mb(path):
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    conn.close()
+    return os.path.getsize(path) / 1024 / 1024
+
+
+def timed_ms(function):
+    began = time.perf_counter()
+    for _ in range(REPEAT):
+        function()
+    return (time.perf_counter() - began) * 1000 / REPEAT
+
+
+def reads(db, now, project):
+    filters = ResultFilters()
+    deep_cursor = fetch_page(db, "p0", 100, filters)[1]
+    for _ in range(50):
+        deep_cursor = fetch_page(db, "p0", 100, filters, cursor=deep_cursor)[1] or deep_cursor
+    return {
+        "first page": timed_ms(lambda: fetch_page(db, "p0", 10, filters)),
+        "page 5,000 results deep": timed_ms(lambda: fetch_page(db, "p0", 10, filters, cursor=deep_cursor)),
+        "year of daily history": timed_ms(lambda: score_history(
+            db, "p0", now - timedelta(days=365), now, "day", 500,
+            compacted_before=project.results_compacted_before
+        )),
+    }
+
+
+def main():
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 365
+    retention = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+    rng = random.Random(1)
+    answers = [text(rng, 600) for _ in range(500)]
+    now = datetime(2026, 1, 1)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        engine = create_engine(f"sqlite:///{path}")
+        configure_sqlite(engine, get_settings())
+        Base.metadata.create_all(engine, tables=[
+            Projects.__table__, models.QAPairs.__table__, models.TestInfo.__table__,
+            models.ProjectScoreRollup.__table__, models.ProjectScoreBucket.__table__
+        ])
+        db = sessionmaker(bind=engine)()
+        project = Projects(project_id="p0", retention_days=retention)
+        db.add(project)
+        db.commit()
+        for hour in range(days * 24, 0, -1):
+            at = now - timedelta(hours=hour)
+            write_results(db, "p0", [
+                models.TestInfo(
+                    test_id=f"{hour}-{i}", user_id="u1", project_id="p0", test_status=str(rng.randint(0, 1)),
+                    hallucination_score=rng.randint(0, 1), helpfullness_score=rng.random(),
+                    last_test_conducted=at, question=f"question {i} of week {hour // 168}",
+                    factual_answer="f" * 600, student_answer=rng.choice(answers), difficulty_level="easy",
+                    response_latency_ms=rng.uniform(50, 2000)
+                )
+                for i in range(PAIRS)
+            ])
+            db.commit()
+        print(f"{days} days of hourly runs of {PAIRS} QA pairs, {days * 24 * PAIRS} results, "
+              f"{retention} days retained")
+        before_size, before = size_mb(path), reads(db, now, project)
+
+        settings = get_settings().model_copy(update={"RETENTION_VACUUM_PAGES": 10 ** 9})
+        began = time.perf_counter()
+        totals = run_maintenance(db, settings, now=now)
+        compaction_s = time.perf_counter() - began
+        after_size, after = size_mb(path), reads(db, now, project)
+        db.close()
+        engine.dispose()
+
+    print(f"  compaction: {totals['results']} results, {totals['hour_buckets']} hour buckets, "
+          f"{totals['qa_pairs']} QA pairs deleted, {totals['pages_released']} pages released "
+          f"in {compaction_s:.1f} s")
+    print(f"  database file {before_size:8.1f} MB -> {after_size:6.1f} MB")
+    for label in before:
+        print(f"  {label:24} {before[label]:7.2f} ms -> {after[label]:6.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
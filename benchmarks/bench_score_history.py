@@ -0,0 +1,124 @@
+"""
+Score history endpoint latency over a year of data.
+
+Bulk loads the buckets of a year of hourly test runs (10 results per run)
+for PROJECTS projects (100 by default) into a scratch SQLite database,
+times add_to_buckets, the write path of TestRunner.add_results, then
+times score_history for typical windows of one project: the last week by
+hour, a year picked automatically (daily points), a year requested by
+hour (downsampled to days) and a year by week.
+
+Usage: python benchmarks/bench_score_history.py [PROJECTS]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+for name in ("MONGODB_URL", "MONGODB_DB", "EMAIL_PASSWORD", "LANGSMITH_API_KEY", "ANTHROPIC_API_KEY"):
+    os.environ.setdefault(name, "unused")
+
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from core.database import Base  # noqa: E402
+from modules.monitor import models  # noqa: E402
+from modules.monitor.history import (GRANULARITIES, add_to_buckets,  # noqa: E402
+                                     bucket_start, score_history)
+from modules.project_connections.models import Projects  # noqa: E402
+
+HOURS = 365 * 24
+RESULTS_PER_RUN = 10
+REPEAT = 50
+END = datetime(2026, 1, 1)
+
+
+def fill(db, projects, rng):
+    """Bucket rows of a year of hourly runs, bulk inserted."""
+    start = END - timedelta(hours=HOURS)
+    rows = {}
+    for project in range(projects):
+        for hour in range(HOURS):
+            at = start + timedelta(hours=hour)
+            passed = sum(rng.randint(0, 1) for _ in range(RESULTS_PER_RUN))
+            latencies = [rng.uniform(50, 2000) for _ in range(RESULTS_PER_RUN)]
+            for granularity in GRANULARITIES:
+                key = (f"p{project}", granularity, bucket_start(at, granularity))
+                row = rows.setdefault(key, dict(
+                    zip(("project_id", "granularity", "bucket_start"), key),
+                    tests_total=0, tests_passed=0, hallucination_scored=0, hallucinations=0,
+                    helpfulness_scored=0, helpfulness_sum=0.0, latency_measured=0,
+                    latency_sum_ms=0.0, latency_max_ms=0.0
+                ))
+                row["tests_total"] += RESULTS_PER_RUN
+                row["tests_passed"] += passed
+                row["hallucination_scored"] += RESULTS_PER_RUN
+                row["hallucinations"] += RESULTS_PER_RUN - passed
+                row["helpfulness_scored"] += RESULTS_PER_RUN
+                row["helpfulness_sum"] += passed
+                row["latency_measured"] += RESULTS_PER_RUN
+                row["latency_sum_ms"] += sum(latencies)
+                row["latency_max_ms"] = max(row["latency_max_ms"], *latencies)
+    db.execute(models.ProjectScoreBucket.__table__.insert(), list(rows.values()))
+    db.commit()
+
+
+def time_writes(db, rng, runs=500):
+    """Mean cost of add_to_buckets for one run of RESULTS_PER_RUN results, committed."""
+    began = time.perf_counter()
+    for run in range(runs):
+        results = [
+            models.TestInfo(
+                test_status=str(rng.randint(0, 1)),
+                hallucination_score=rng.randint(0, 1),
+                helpfullness_score=rng.random(),
+                last_test_conducted=END - timedelta(hours=run),
+                response_latency_ms=rng.uniform(50, 2000)
+            )
+            for _ in range(RESULTS_PER_RUN)
+        ]
+        add_to_buckets(db, "p0", results)
+        db.commit()
+    return (time.perf_counter() - began) * 1000 / runs
+
+
+def main():
+    projects = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(engine, tables=[
+            Projects.__table__, models.QAPairs.__table__, models.TestInfo.__table__, models.ProjectScoreBucket.__table__
+        ])
+        db = sessionmaker(bind=engine)()
+        started = time.perf_counter()
+        fill(db, projects, random.Random(1))
+        rows = db.query(models.ProjectScoreBucket).count()
+        print(f"{projects} projects, {HOURS * RESULTS_PER_RUN * projects} results, "
+              f"{rows} bucket rows, loaded in {time.perf_counter() - started:.0f} s")
+        print(f"  add_to_buckets + commit per run of {RESULTS_PER_RUN}: {time_writes(db, random.Random(2)):.2f} ms")
+
+        windows = {
+            "last week, hour": (END - timedelta(days=7), "hour"),
+            "last year, auto": (END - timedelta(days=365), None),
+            "last year, hour": (END - timedelta(days=365), "hour"),
+            "last year, week": (END - timedelta(days=365), "week"),
+        }
+        for label, (start, granularity) in windows.items():
+            timings = []
+            for i in range(REPEAT):
+                db.expunge_all()
+                began = time.perf_counter()
+                history = score_history(db, f"p{i % projects}", start, END, granularity, 500)
+                timings.append((time.perf_counter() - began) * 1000)
+            timings.sort()
+            print(f"  {label:17} {history['granularity']:5} x{history['buckets_per_point']} "
+                  f"{len(history['points']):4d} points  median {timings[len(timings) // 2]:6.2f} ms  "
+                  f"max {timings[-1]:6.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""
+Concurrent reads and result writes on SQLite, by journal mode and writer.
+
+READERS processes (4 by default), standing in for API workers, read a
+project's dashboard rollup and first /qa_data page every 10 ms while a
+monitor process runs 16 test runners, each committing a run of 10 results
+every 250 ms, for SECONDS seconds per configuration:
+
+  rollback journal, synchronous FULL, one commit per runner (as before)
+  WAL, synchronous NORMAL, one commit per runner
+  WAL, synchronous NORMAL, runs coalesced by the ResultWriter
+
+The scratch database starts with 200,000 results. Reported: read latency
+percentiles, results committed per second, and "database is locked"
+errors seen by readers and writers. The busy timeout is 1 s everywhere so
+lock waits show up as errors instead of a 5 s stall.
+
+Usage: python benchmarks/bench_sqlite_wal.py [READERS] [SECONDS]
+"""
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+for name in ("MONGODB_URL", "MONGODB_DB", "EMAIL_PASSWORD", "LANGSMITH_API_KEY", "ANTHROPIC_API_KEY"):
+    os.environ.setdefault(name, "unused")
+
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.exc import OperationalError  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from core.config import get_settings  # noqa: E402
+from core.database import Base, configure_sqlite  # noqa: E402
+from modules.monitor import models  # noqa: E402
+from modules.monitor.pagination import ResultFilters, fetch_page  # noqa: E402
+from modules.monitor.rollups import rebuild_rollups  # noqa: E402
+from modules.monitor.writer import ResultWriter, write_results  # noqa: E402
+from modules.project_connections.models import Projects  # noqa: E402
+
+RUNNERS = 16
+RESULTS_PER_RUN = 10
+RUN_EVERY_SECONDS = 0.25
+READ_EVERY_SECONDS = 0.01
+INITIAL_RESULTS = 200_000
+CONFIGURATIONS = (
+    ("rollback journal, FULL, commit per runner", "delete", "full", False),
+    ("WAL, NORMAL, commit per runner", "wal", "normal", False),
+    ("WAL, NORMAL, ResultWriter", "wal", "normal", True),
+)
+
+
+def results(project_id, count, at):
+    return [
+        models.TestInfo(
+            test_id=str(uuid4()), user_id="u1", project_id=project_id,
+            test_status="1", hallucination_score=1, helpfullness_score=0.8,
+            last_test_conducted=at, response_latency_ms=120.0, question="question",
+            student_answer="answer", factual_answer="fact", difficulty_level="easy"
+        )
+        for _ in range(count)
+    ]
+
+
+def fill(session_factory):
+    db = session_factory()
+    started = datetime(2025, 1, 1)
+    rows = [
+        dict(test_id=f"t{i:07d}", user_id="u1", project_id=f"p{i % RUNNERS}", test_status="1",
+             hallucination_score=1, helpfullness_score=0.8, qa_hash="h",
+             student_answer="answer", difficulty_level="easy",
+             last_test_conducted=started + timedelta(seconds=i))
+        for i in range(INITIAL_RESULTS)
+    ]
+    db.execute(models.TestInfo.__table__.insert(), rows)
+    db.commit()
+    rebuild_rollups(db)
+    db.close()
+
+
+def percentile(values, share):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * share))] if values else float("nan")
+
+
+def make_session_factory(path, journal_mode, synchronous, pool_size):
+    settings = get_settings().model_copy(update={
+        "SQLITE_JOURNAL_MODE": journal_mode,
+        "SQLITE_SYNCHRONOUS": synchronous,
+        "SQLITE_BUSY_TIMEOUT_MS": 1000,
+    })
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False},
+                           pool_size=pool_size, max_overflow=0)
+    configure_sqlite(engine, settings)
+    return sessionmaker(bind=engine)
+
+
+def reader(path, journal_mode, synchronous, index, stop, report):
+    """An API worker reading dashboards until stopped."""
+    session_factory = make_session_factory(path, journal_mode, synchronous, 1)
+    db = session_factory()
+    filters = ResultFilters()
+    read_ms, locked = [], 0
+    while not stop.is_set():
+        project_id = f"p{index % RUNNERS}"
+        began = time.perf_counter()
+        try:
+            db.get(models.ProjectScoreRollup, project_id)
+            fetch_page(db, project_id, 10, filters)
+            db.rollback()  # end the read transaction, as a request does
+        except OperationalError:
+            db.rollback()
+            locked += 1
+            continue
+        read_ms.append((time.perf_counter() - began) * 1000)
+        db.expunge_all()
+        index += 1
+        time.sleep(READ_EVERY_SECONDS)
+    db.close()
+    report.put((read_ms, locked))
+
+
+def monitor(path, journal_mode, synchronous, coalesce, stop, report):
+    """The monitor process: RUNNERS runners committing results until stopped."""
+    session_factory = make_session_factory(path, journal_mode, synchronous, RUNNERS + 1)
+    writer = ResultWriter(session_factory, batch_size=1000, max_delay_seconds=0.005)
+    written, locked = [0], [0]
+    lock = threading.Lock()
+
+    def runner(index):
+        project_id = f"p{index}"
+        while not stop.is_set():
+            batch = results(project_id, RESULTS_PER_RUN, datetime.utcnow())
+            try:
+                if coalesce:
+                    writer.write(project_id, batch)
+                else:
+                    db = session_factory()
+                    try:
+                        write_results(db, project_id, batch)
+                        db.commit()
+                    except Exception:
+                        db.rollback()
+                        raise
+                    finally:
+                        db.close()
+            except OperationalError:
+                with lock:
+                    locked[0] += 1
+            else:
+                with lock:
+                    written[0] += len(batch)
+            time.sleep(RUN_EVERY_SECONDS)
+
+    runners = [threading.Thread(target=runner, args=(i,)) for i in range(RUNNERS)]
+    for thread in runners:
+        thread.start()
+    for thread in runners:
+        thread.join()
+    report.put((written[0], locked[0], writer.transactions))
+
+
+def run(path, journal_mode, synchronous, coalesce, readers, seconds):
+    session_factory = make_session_factory(path, journal_mode, synchronous, 1)
+    Base.metadata.create_all(session_factory.kw["bind"], tables=[
+        Projects.__table__, models.QAPairs.__table__, models.TestInfo.__table__,
+        models.ProjectScoreRollup.__table__, models.ProjectScoreBucket.__table__
+    ])
+    fill(session_factory)
+    session_factory.kw["bind"].dispose()
+
+    stop = multiprocessing.Event()
+    read_reports, write_report = multiprocessing.Queue(), multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=reader, args=(path, journal_mode, synchronous, i, stop, read_reports))
+        for i in range(readers)
+    ]
+    processes.append(multiprocessing.Process(
+        target=monitor, args=(path, journal_mode, synchronous, coalesce, stop, write_report)
+    ))
+    for process in processes:
+        process.start()
+    time.sleep(seconds)
+    stop.set()
+    read_ms, errors = [], {"read": 0, "write": 0}
+    for _ in range(readers):
+        latencies, locked = read_reports.get()
+        read_ms += latencies
+        errors["read"] += locked
+    written, errors["write"], transactions = write_report.get()
+    for process in processes:
+        process.join()
+    return read_ms, errors, written / seconds, transactions
+
+
+def main():
+    readers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 10
+    print(f"{readers} reader processes, {RUNNERS} runners committing {RESULTS_PER_RUN} results "
+          f"every {RUN_EVERY_SECONDS * 1000:.0f} ms, {seconds:.0f} s each")
+    for label, journal_mode, synchronous, coalesce in CONFIGURATIONS:
+        with tempfile.TemporaryDirectory() as tmp:
+            read_ms, errors, per_second, transactions = run(
+                os.path.join(tmp, "bench.db"), journal_mode, synchronous, coalesce, readers, seconds
+            )
+        print(f"  {label}")
+        print(f"    reads  {len(read_ms) / seconds:7.0f}/s   p50 {percentile(read_ms, 0.5):6.2f} ms   "
+              f"p99 {percentile(read_ms, 0.99):7.2f} ms   locked {errors['read']}")
+        print(f"    writes {per_second:7.0f} results/s"
+              + (f" in {transactions / seconds:.0f} transactions/s" if coalesce else "")
+              + f"   locked {errors['write']}")
+
+
+if __name__ == "__main__":
+    main()
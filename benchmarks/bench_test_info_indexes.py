@@ -0,0 +1,144 @@
+"""
+Query plans and latency of the hot test_info / projects queries, before
+and after the indexes of migration 7c1e4b9a2d55.
+
+Fills a scratch SQLite database with ROWS test_info rows (10,000,000 by
+default) spread over 20,000 projects of 5,000 users, times each query
+without the indexes, creates the indexes the models declare, runs ANALYZE
+as the migration does and times the queries again. EXPLAIN QUERY PLAN is
+printed for both runs.
+
+Usage: python benchmarks/bench_test_info_indexes.py [ROWS] [DB_PATH]
+"""
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+for name in ("MONGODB_URL", "MONGODB_DB", "EMAIL_PASSWORD", "LANGSMITH_API_KEY", "ANTHROPIC_API_KEY"):
+    os.environ.setdefault(name, "unused")
+
+from sqlalchemy.dialects import sqlite  # noqa: E402
+from sqlalchemy.schema import CreateIndex, CreateTable  # noqa: E402
+
+from modules.Auth.models import Users  # noqa: E402
+from modules.monitor.models import TestInfo  # noqa: E402
+from modules.project_connections.models import Projects  # noqa: E402
+
+PROJECTS = 20_000
+USERS = 5_000
+BATCH = 100_000
+REPEAT = 200
+
+QUERIES = {
+    # project_monitoror: latest result of a project
+    "monitor latest test": (
+        "SELECT * FROM test_info WHERE project_id = :project "
+        "ORDER BY last_test_conducted DESC LIMIT 1"
+    ),
+    # get_qa_pairs_paginated: count, then one page
+    "qa pairs count": "SELECT count(*) FROM test_info WHERE project_id = :project",
+    "qa pairs page": "SELECT * FROM test_info WHERE project_id = :project LIMIT 10 OFFSET 100",
+    # get_dash_board_data: all results of a project, newest first
+    "dashboard results": (
+        "SELECT * FROM test_info WHERE project_id = :project "
+        "ORDER BY last_test_conducted DESC"
+    ),
+    "results of a user": "SELECT count(*) FROM test_info WHERE user_id = :user",
+    "active projects of a user": (
+        "SELECT * FROM projects WHERE user_id = :user AND is_active = 1"
+    ),
+    # every authenticated request
+    "user by token": "SELECT * FROM users WHERE verification_token = :token",
+}
+
+
+def create_schema(conn):
+    dialect = sqlite.dialect()
+    for model in (Users, Projects, TestInfo):
+        conn.execute(str(CreateTable(model.__table__).compile(dialect=dialect)))
+
+
+def create_indexes(conn):
+    dialect = sqlite.dialect()
+    for model in (Projects, TestInfo):
+        for index in model.__table__.indexes:
+            conn.execute(str(CreateIndex(index).compile(dialect=dialect)))
+    conn.execute("ANALYZE")
+
+
+def fill(conn, rows, rng):
+    started = datetime(2025, 1, 1)
+    conn.executemany(
+        "INSERT INTO users (user_id, name, email, password, isVerified, verification_token) "
+        "VALUES (?, ?, ?, 'x', 1, ?)",
+        ((f"u{i}", f"user {i}", f"u{i}@example.com", f"token-{i}") for i in range(USERS))
+    )
+    conn.executemany(
+        "INSERT INTO projects (project_id, user_id, project_name, is_active, test_interval_in_hrs) "
+        "VALUES (?, ?, ?, ?, 24)",
+        ((f"p{i}", f"u{i % USERS}", f"project {i}", int(rng.random() < 0.7)) for i in range(PROJECTS))
+    )
+    for offset in range(0, rows, BATCH):
+        conn.executemany(
+            "INSERT INTO test_info (test_id, user_id, project_id, test_status, hallucination_score, "
+            "helpfullness_score, last_test_conducted, qa_hash, student_answer, "
+            "difficulty_level) VALUES (?, ?, ?, 'completed', ?, ?, ?, 'h', 'a', 'easy')",
+            (
+                (
+                    f"t{i}", f"u{project % USERS}", f"p{project}", rng.random(), rng.random(),
+                    (started + timedelta(seconds=rng.randrange(30_000_000))).isoformat(" ")
+                )
+                for i in range(offset, min(offset + BATCH, rows))
+                for project in (rng.randrange(PROJECTS),)
+            )
+        )
+        conn.commit()
+
+
+def run_queries(conn, rng, label):
+    print(f"\n{label}")
+    for name, sql in QUERIES.items():
+        params = [
+            {"project": f"p{rng.randrange(PROJECTS)}", "user": f"u{rng.randrange(USERS)}",
+             "token": f"token-{rng.randrange(USERS)}"}
+            for _ in range(REPEAT)
+        ]
+        plan = " / ".join(row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params[0]))
+        # a full table scan takes seconds at 10M rows, time fewer calls then
+        calls = REPEAT if "SCAN test_info" not in plan else 3
+        started = time.perf_counter()
+        for args in params[:calls]:
+            conn.execute(sql, args).fetchall()
+        elapsed_ms = (time.perf_counter() - started) * 1000 / calls
+        print(f"  {name:27} {elapsed_ms:10.3f} ms   {plan}")
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    with tempfile.TemporaryDirectory() as tmp:
+        path = sys.argv[2] if len(sys.argv) > 2 else os.path.join(tmp, "bench.db")
+        conn = sqlite3.connect(path)
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        create_schema(conn)
+        started = time.perf_counter()
+        fill(conn, rows, random.Random(1))
+        print(f"{rows} test_info rows, {PROJECTS} projects, {USERS} users, "
+              f"filled in {time.perf_counter() - started:.0f} s, {os.path.getsize(path) / 1e9:.2f} GB")
+
+        run_queries(conn, random.Random(2), "without indexes")
+        started = time.perf_counter()
+        create_indexes(conn)
+        print(f"\nindexes created in {time.perf_counter() - started:.0f} s")
+        run_queries(conn, random.Random(2), "with indexes")
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
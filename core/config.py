@@ -1,10 +1,26 @@
 from pydantic_settings import BaseSettings
 import os
+from typing import Optional
 
 class Settings(BaseSettings):
     # SQLite Database Configuration
     DATABASE_URL: str = 'sqlite:///./app_database.db'
     DATABASE_ECHO: bool = False
+    DATABASE_POOL_SIZE: int = 5
+    DATABASE_MAX_OVERFLOW: int = 10
+    # PRAGMAs set on every SQLite connection; WAL lets readers run while the monitor commits
+    SQLITE_JOURNAL_MODE: str = "wal"  # wal, or delete for the rollback journal
+    SQLITE_SYNCHRONOUS: str = "normal"  # normal is durable across crashes in WAL mode, full on power loss
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_CACHE_SIZE_KB: int = 64 * 1024  # page cache per connection
+    SQLITE_MMAP_SIZE_BYTES: int = 256 * 1024 * 1024
+    SQLITE_AUTO_VACUUM: str = "incremental"  # takes effect on new databases, existing ones need one VACUUM
+    # /download-database: snapshots are copied here (system temp directory when unset) and compressed as sent
+    DATABASE_SNAPSHOT_DIR: Optional[str] = None
+    DATABASE_SNAPSHOT_COMPRESSION: str = "zstd"  # zstd, gzip or none
+    # Test results are written by one thread per process, in transactions of up to this many results
+    RESULT_WRITER_BATCH_SIZE: int = 1000
+    RESULT_WRITER_MAX_DELAY_SECONDS: float = 0.05  # waited for more results before committing
     BASE_URL : str = 'http://obamai.us-east-1.elasticbeanstalk.com/'
     # MongoDB Configuration
     MONGODB_URL: str 
@@ -12,6 +28,69 @@ class Settings(BaseSettings):
     EMAIL_PASSWORD: str
     LANGSMITH_API_KEY: str
     ANTHROPIC_API_KEY: str
+    # Ingestion Job Queue Configuration
+    INGESTION_SPOOL_DIR: str = './ingestion_spool'
+    INGESTION_WORKERS: int = 1  # worker processes started with the API, 0 to run them separately
+    INGESTION_LEASE_SECONDS: int = 300
+    INGESTION_MAX_ATTEMPTS: int = 3
+    INGESTION_RETRY_BACKOFF_SECONDS: int = 30
+    INGESTION_POLL_INTERVAL_SECONDS: float = 2.0
+    INGESTION_PROGRESS_WRITES_PER_SECOND: float = 1.0  # coalesced status writes per job
+    INGESTION_PROGRESS_POLL_SECONDS: float = 1.0  # status reads per watched project, shared by streams
+    INGESTION_PROGRESS_KEEPALIVE_SECONDS: float = 15.0
+    # Admission control: uploads spooled at once by each API process, and the job backlog
+    INGESTION_MAX_CONCURRENT_UPLOADS: int = 4
+    INGESTION_UPLOAD_QUEUE_SIZE: int = 16  # uploads waiting for a slot, beyond that 429
+    INGESTION_UPLOAD_WAIT_SECONDS: float = 10.0
+    INGESTION_MAX_UPLOADS_PER_USER: int = 2
+    INGESTION_MAX_QUEUED_JOBS: int = 100
+    INGESTION_MAX_ACTIVE_JOBS_PER_USER: int = 5
+    INGESTION_RETRY_AFTER_SECONDS: int = 5  # minimum Retry-After of a 429
+    # zip / tar.gz uploads, expanded entry by entry by the ingestion workers
+    INGESTION_ARCHIVE_MAX_BYTES: int = 200 * 1024 * 1024  # compressed, per request
+    INGESTION_ARCHIVE_MAX_ENTRIES: int = 5000
+    INGESTION_ARCHIVE_MAX_EXPANDED_BYTES: int = 1024 * 1024 * 1024
+    INGESTION_ARCHIVE_MAX_RATIO: float = 100.0
+    # Benchmark chunk size in estimated model tokens
+    CHUNK_MAX_TOKENS: int = 300
+    # chunks per ingestion checkpoint document, bounds worker memory on large files
+    CHUNK_CHECKPOINT_BATCH: int = 200
+    # QA pairs generated for a project that does not set its own qa_budget
+    QA_BUDGET_DEFAULT: int = 30
+    # chunks of a job sampled for topic clustering, bounds selection memory on large uploads
+    CHUNK_SELECTION_MAX_CANDIDATES: int = 10_000
+    # Send several chunks per QA generation request, up to this many input tokens
+    QA_PACKING_ENABLED: bool = True
+    QA_PACK_TOKEN_BUDGET: int = 6000
+    QA_PACK_MAX_CHUNKS: int = 8
+    # Near-duplicate QA pairs (estimated Jaccard of question shingles) removed at ingestion
+    QA_DEDUP_ENABLED: bool = True
+    QA_DEDUP_THRESHOLD: float = 0.75
+    QA_DEDUP_ACTION: str = "drop"  # drop, or merge into the kept pair's duplicate_questions
+    # Score history: points returned per request, longer windows use coarser buckets
+    SCORE_HISTORY_MAX_POINTS: int = 500
+    # Filtered /qa_data totals are recounted at most this often
+    QA_DATA_COUNT_CACHE_SECONDS: float = 60.0
+    # Result exports are read and encoded this many rows at a time
+    EXPORT_BATCH_ROWS: int = 10000
+    # Retention: raw results older than this many days are compacted into the
+    # day and week score buckets, for projects that do not set retention_days;
+    # None keeps raw results forever
+    RESULT_RETENTION_DAYS: Optional[int] = None
+    RETENTION_ENABLED: bool = True  # maintenance process started with the API
+    RETENTION_INTERVAL_SECONDS: int = 6 * 3600
+    RETENTION_DELETE_BATCH: int = 5000  # results deleted per transaction
+    RETENTION_VACUUM_PAGES: int = 10000  # free pages returned to the file system per run
+    # Change-point detection on each project's hallucination, helpfulness and
+    # latency as results are written: means of groups of results against an
+    # EWMA baseline, with a two-sided CUSUM in baseline standard deviations;
+    # shifts are recorded in regression_events
+    DETECTION_ENABLED: bool = True
+    DETECTION_GROUP_RESULTS: int = 10  # results per group mean
+    DETECTION_WARMUP_GROUPS: int = 10  # group means averaged into the first baseline
+    DETECTION_EWMA_ALPHA: float = 0.02
+    DETECTION_CUSUM_SLACK: float = 0.5  # k
+    DETECTION_CUSUM_THRESHOLD: float = 8.0  # h
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -1,6 +1,8 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from .config import Settings, get_settings
 from motor.motor_asyncio import AsyncIOMotorClient
 from typing import Annotated
@@ -10,10 +12,57 @@ from core.logger import logger
 Base = declarative_base()
 settings = Settings()
 SQL_ALCHEMMY_URL= settings.DATABASE_URL
-engine = create_engine(SQL_ALCHEMMY_URL, connect_args={"check_same_thread": False})
+# in-memory SQLite keeps its single connection pool
+POOL_ARGS = {} if SQL_ALCHEMMY_URL in ("sqlite://", "sqlite:///:memory:") else {
+    "pool_size": settings.DATABASE_POOL_SIZE, "max_overflow": settings.DATABASE_MAX_OVERFLOW
+}
+engine = create_engine(SQL_ALCHEMMY_URL, connect_args={"check_same_thread": False}, **POOL_ARGS)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine on the same database for request handlers: queries run on
+# aiosqlite's thread instead of blocking the event loop
+ASYNC_SQL_ALCHEMY_URL = SQL_ALCHEMMY_URL.replace("sqlite://", "sqlite+aiosqlite://", 1)
+# aiosqlite defaults to a new connection per session, pooled like the sync engine instead
+async_engine = create_async_engine(
+    ASYNC_SQL_ALCHEMY_URL, **(dict(POOL_ARGS, poolclass=AsyncAdaptedQueuePool) if POOL_ARGS else {})
+)
+
+
+def sqlite_pragmas(settings: Settings) -> list:
+    """PRAGMA statements run on each new SQLite connection, from the settings."""
+    return [
+        # only applies to a database without tables, and before journal_mode
+        # writes the header; see modules.monitor.retention for existing ones
+        f"PRAGMA auto_vacuum = {settings.SQLITE_AUTO_VACUUM}",
+        f"PRAGMA journal_mode = {settings.SQLITE_JOURNAL_MODE}",
+        f"PRAGMA synchronous = {settings.SQLITE_SYNCHRONOUS}",
+        f"PRAGMA busy_timeout = {int(settings.SQLITE_BUSY_TIMEOUT_MS)}",
+        # negative cache_size is in KiB instead of pages
+        f"PRAGMA cache_size = -{int(settings.SQLITE_CACHE_SIZE_KB)}",
+        f"PRAGMA mmap_size = {int(settings.SQLITE_MMAP_SIZE_BYTES)}",
+    ]
+
+
+def configure_sqlite(sync_engine, settings: Settings = settings) -> None:
+    """Run sqlite_pragmas on every connection the engine opens."""
+    if sync_engine.dialect.name != "sqlite":
+        return
+    pragmas = sqlite_pragmas(settings)
+
+    @event.listens_for(sync_engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+
+configure_sqlite(engine)
+configure_sqlite(async_engine.sync_engine)
+# objects stay readable after commit, so responses can be built from them
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 def create_tables():
     Base.metadata.create_all(bind=engine)
 # Base = declarative_base()
@@ -25,6 +74,13 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 async def get_mongodb(settings=None):
     """Get MongoDB connection asynchronously"""
     if settings is None:
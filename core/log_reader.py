@@ -0,0 +1,184 @@
+import logging
+import os
+import re
+from datetime import datetime
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+# start of a record written by core.logger's formatter; lines that do not
+# match (tracebacks, multi-line messages) continue the previous record
+RECORD_START = re.compile(
+    rb"^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}),\d{3} - .*? - (DEBUG|INFO|WARNING|ERROR|CRITICAL) - "
+)
+LEVEL_NUMBERS = {name.encode(): logging.getLevelName(name) for name in ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")}
+BLOCK_BYTES = 64 * 1024
+
+# (time, level number, record bytes with its line endings)
+Record = Tuple[datetime, int, bytes]
+
+
+class LogQuery(BaseModel):
+    since: Optional[datetime] = None  # server local time, as written in the log
+    until: Optional[datetime] = None
+    level: Optional[str] = None  # minimum level
+    request_id: Optional[str] = None
+
+    def is_empty(self) -> bool:
+        return not any(self.model_dump().values())
+
+    def matches(self, record: Record) -> bool:
+        at, level, text = record
+        if self.since and at < self.since:
+            return False
+        if self.until and at >= self.until:
+            return False
+        if self.level and level < logging.getLevelName(self.level.upper()):
+            return False
+        return not self.request_id or self.request_id.encode() in text
+
+
+def log_files(path: str, backup_count: int) -> List[str]:
+    """The log and its rotated files that exist, oldest first."""
+    candidates = [f"{path}.{i}" for i in range(backup_count, 0, -1)] + [path]
+    return [candidate for candidate in candidates if os.path.exists(candidate)]
+
+
+def _parse_start(line: bytes) -> Optional[Tuple[datetime, int]]:
+    # the digits are sliced out, strptime would take most of a scan's time
+    match = RECORD_START.match(line)
+    if not match:
+        return None
+    return (
+        datetime(int(line[0:4]), int(line[5:7]), int(line[8:10]), int(line[11:13]), int(line[14:16]), int(line[17:19])),
+        LEVEL_NUMBERS[match.group(2)]
+    )
+
+
+def _records_forward(file: BinaryIO, offset: int) -> Iterator[Record]:
+    """Records from offset, which is the start of a record, to the end of the file."""
+    file.seek(offset)
+    current, lines = None, []
+    for line in file:
+        start = _parse_start(line)
+        if start is not None:
+            if current is not None:
+                yield (*current, b"".join(lines))
+            current, lines = start, []
+        if current is not None:
+            lines.append(line)
+    if current is not None:
+        yield (*current, b"".join(lines))
+
+
+def _lines_backward(file: BinaryIO) -> Iterator[bytes]:
+    """Lines of a file, last first, read BLOCK_BYTES at a time from the end."""
+    position = file.seek(0, os.SEEK_END)
+    partial = b""
+    while position > 0:
+        size = min(BLOCK_BYTES, position)
+        position -= size
+        file.seek(position)
+        block = file.read(size) + partial
+        lines = block.splitlines(keepends=True)
+        # the first line may continue in the previous block
+        partial = lines.pop(0) if position > 0 else b""
+        yield from reversed(lines)
+    if partial:
+        yield partial
+
+
+def _records_backward(file: BinaryIO) -> Iterator[Record]:
+    """Records of a file, last first."""
+    lines = []
+    for line in _lines_backward(file):
+        lines.append(line)
+        start = _parse_start(line)
+        if start is not None:
+            yield (*start, b"".join(reversed(lines)))
+            lines = []
+
+
+def _seek_time(file: BinaryIO, since: datetime) -> int:
+    """
+    Offset of a record start at or before the first record at or after
+    since, found by bisecting the file's byte offsets: records are in time
+    order, so only about log2(size / BLOCK_BYTES) positions are read.
+    """
+    low, high = 0, file.seek(0, os.SEEK_END)
+    while high - low > BLOCK_BYTES:
+        middle = (low + high) // 2
+        file.seek(middle)
+        file.readline()  # rest of the line the offset fell into
+        position = file.tell()
+        start = None
+        while position < high:
+            line = file.readline()
+            if not line:
+                break
+            start = _parse_start(line)
+            if start is not None:
+                break
+            position = file.tell()
+        if start is None or position >= high:
+            high = middle
+        elif start[0] < since:
+            low = position
+        else:
+            high = middle
+    return low
+
+
+def read_log(files: List[BinaryIO], query: LogQuery, tail: Optional[int] = None) -> Iterator[bytes]:
+    """
+    Records matching query from open log files (oldest first), in order.
+
+    With tail, the last tail matching records: files are read backwards
+    from the end, so the cost is that of the records skipped, not of the
+    files. Otherwise records are read forwards, starting at since found by
+    bisection and stopping at until.
+
+    Args:
+        files: Open binary files, oldest first; opened by the caller
+            before reading so that a rotation meanwhile does not matter
+        query: Time range, minimum level and request ID
+        tail: Number of records to return from the end
+
+    Returns:
+        Iterator of chunks of whole records
+    """
+    if tail is not None:
+        records = []
+        for record in (record for file in reversed(files) for record in _records_backward(file)):
+            if query.since and record[0] < query.since:
+                break
+            if query.matches(record):
+                records.append(record[2])
+                if len(records) >= tail:
+                    break
+        yield from _batched(reversed(records))
+        return
+
+    def forward():
+        for file in files:
+            offset = _seek_time(file, query.since) if query.since else 0
+            for record in _records_forward(file, offset):
+                if query.until and record[0] >= query.until:
+                    return
+                if query.matches(record):
+                    yield record[2]
+
+    yield from _batched(forward())
+
+
+def _batched(records: Iterator[bytes]) -> Iterator[bytes]:
+    """Records joined into chunks of about BLOCK_BYTES."""
+    chunk, size = [], 0
+    for record in records:
+        chunk.append(record)
+        size += len(record)
+        if size >= BLOCK_BYTES:
+            yield b"".join(chunk)
+            chunk, size = [], 0
+    if chunk:
+        yield b"".join(chunk)
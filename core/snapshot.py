@@ -0,0 +1,107 @@
+import os
+import sqlite3
+import tempfile
+import zlib
+from typing import Iterable, Iterator, Optional
+
+import zstandard
+
+# compression: (media type, file name suffix)
+SNAPSHOT_COMPRESSIONS = {
+    "zstd": ("application/zstd", ".zst"),
+    "gzip": ("application/gzip", ".gz"),
+    "none": ("application/octet-stream", ""),
+}
+
+
+def snapshot_database(source_path: str, directory: Optional[str] = None) -> str:
+    """
+    Copy a SQLite database into a temporary file with the online backup API.
+
+    The copy is made in a single backup step, inside one read transaction
+    of the source: it is the database as of one commit, whatever is written
+    meanwhile. In WAL mode writers are not blocked; in rollback journal mode
+    they wait for the copy.
+
+    Args:
+        source_path: Database file
+        directory: Where to create the copy, the system temp directory by default
+
+    Returns:
+        str: Path of the copy, deleted by the caller
+    """
+    descriptor, path = tempfile.mkstemp(prefix="snapshot-", suffix=".db", dir=directory)
+    os.close(descriptor)
+    try:
+        source = sqlite3.connect(source_path, timeout=30)
+        destination = sqlite3.connect(path)
+        try:
+            source.backup(destination, pages=-1)
+            # the copy is a standalone file: no -wal beside it to ship
+            destination.execute("PRAGMA journal_mode = delete")
+        finally:
+            destination.close()
+            source.close()
+    except Exception:
+        os.remove(path)
+        raise
+    return path
+
+
+def _compressor(compression: str, level: Optional[int]):
+    if compression == "zstd":
+        return zstandard.ZstdCompressor(level=level or 3).compressobj()
+    if compression == "gzip":
+        # wbits 31: gzip header and trailer
+        return zlib.compressobj(level or 6, zlib.DEFLATED, 31)
+    return None
+
+
+def compress_stream(chunks: Iterable[bytes], compression: str = "zstd", level: Optional[int] = None) -> Iterator[bytes]:
+    """Compress a stream of chunks as it is read; none passes them through."""
+    if compression not in SNAPSHOT_COMPRESSIONS:
+        raise ValueError(f"compression must be one of: {', '.join(SNAPSHOT_COMPRESSIONS)}")
+    compressor = _compressor(compression, level)
+    for chunk in chunks:
+        chunk = compressor.compress(chunk) if compressor else chunk
+        if chunk:
+            yield chunk
+    if compressor:
+        yield compressor.flush()
+
+
+def compressed_chunks(
+    path: str,
+    compression: str = "zstd",
+    chunk_bytes: int = 1024 * 1024,
+    level: Optional[int] = None
+) -> Iterator[bytes]:
+    """
+    Read a file chunk by chunk, compressing as it goes.
+
+    Args:
+        path: File to send
+        compression: zstd, gzip or none
+        chunk_bytes: Bytes read at a time
+        level: Compression level, the format's default when None
+
+    Returns:
+        Iterator of compressed chunks
+    """
+    def read():
+        with open(path, "rb") as source:
+            while True:
+                chunk = source.read(chunk_bytes)
+                if not chunk:
+                    return
+                yield chunk
+
+    return compress_stream(read(), compression, level)
+
+
+def remove_snapshot(path: str) -> None:
+    """Delete a snapshot, if it is still there."""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -1,11 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import RedirectResponse, JSONResponse
 from fastapi.templating import Jinja2Templates
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from sqlalchemy.sql import func
 
-from core.database import SessionLocal, get_db
+from core.database import AsyncSessionLocal, SessionLocal, get_db
 from utils.auth_utils import AuthManager
 
 from .dependencies import get_auth_manager
@@ -89,11 +91,12 @@ async def login(credentials: Login, auth_manager: AuthManager = Depends(get_auth
     dict: A dictionary containing the user data if authenticated, else an error message.
     """
     try:
-        db = SessionLocal()
-        user = db.query(Users).filter(Users.email == credentials.email).first()
+        async with AsyncSessionLocal() as db:
+            user = await db.scalar(select(Users).where(Users.email == credentials.email))
         if user:
             
-            if not auth_manager.verify_password(credentials.password, user.password):
+            # bcrypt is slow by design, keep it off the event loop
+            if not await run_in_threadpool(auth_manager.verify_password, credentials.password, user.password):
                 raise HTTPException(
                     status_code=401, detail="Invalid Credentials.")
             user_dict = {"user_id": user.user_id,
@@ -112,8 +115,6 @@ async def login(credentials: Login, auth_manager: AuthManager = Depends(get_auth
                     "data": None}
     except Exception as e:
         return {"status": "error", "message": str(e), "data": None}
-    finally:
-        db.close()
 
 # ################# VERIFICATION #################################
 
@@ -0,0 +1,162 @@
+import math
+import random
+import string
+import zlib
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+# punctuation becomes whitespace so str.split() tokenizes, much faster than a regex
+PUNCTUATION_TABLE = str.maketrans({char: " " for char in string.punctuation})
+
+
+class ChunkSelector:
+    """
+    Picks the chunks that cover the most distinct topics of a document set.
+
+    Chunks are embedded locally as hashed TF-IDF vectors, grouped with
+    spherical k-means (one cluster per chunk the QA budget can pay for) and
+    the chunk closest to each cluster centroid is kept. Everything runs in
+    NumPy, so selection costs tens of milliseconds per thousand chunks and
+    needs no embedding service.
+
+    Vectors are dense, n_features floats per chunk, so at most
+    max_candidates chunks are clustered; larger sets are sampled uniformly
+    first, which bounds memory whatever the size of the upload.
+    """
+
+    def __init__(self, n_features: int = 512, max_iter: int = 10, max_candidates: int = 10_000):
+        self.n_features = n_features
+        self.max_iter = max_iter
+        self.max_candidates = max_candidates
+        self._bucket_cache: Dict[str, int] = {}
+
+    def _buckets(self, tokens: List[str]) -> List[int]:
+        cache = self._bucket_cache
+        for token in set(tokens).difference(cache):
+            # crc32 is stable across processes, unlike hash()
+            cache[token] = zlib.crc32(token.encode("utf-8")) % self.n_features
+        return [cache[token] for token in tokens]
+
+    def vectorize(self, texts: Sequence[str]) -> np.ndarray:
+        """Hashed, sublinear TF-IDF vectors with unit L2 norm, one row per text."""
+        # one row at a time, so only the float32 matrix outlives a text's tokens
+        counts = np.zeros((len(texts), self.n_features), dtype=np.float32)
+        for row, text in enumerate(texts):
+            buckets = self._buckets(text.lower().translate(PUNCTUATION_TABLE).split())
+            if buckets:
+                counts[row] = np.bincount(buckets, minlength=self.n_features)
+
+        document_frequency = np.count_nonzero(counts, axis=0)
+        idf = np.log((1.0 + len(texts)) / (1.0 + document_frequency)) + 1.0
+        # in place, the matrix is the only n x n_features array
+        vectors = np.log1p(counts, out=counts)
+        vectors *= idf.astype(np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        vectors /= norms
+        return vectors
+
+    def _init_centroids(self, vectors: np.ndarray, k: int) -> np.ndarray:
+        """
+        Farthest-first seeding: start from the most central chunk, then keep
+        adding the chunk least similar to every seed so far. Unlike random
+        k-means++ sampling it never seeds one topic twice while another
+        topic has no seed.
+        """
+        mean = vectors.mean(axis=0)
+        seeds = [int(np.argmax(vectors @ mean))]
+        similarity = vectors @ vectors[seeds[0]]
+        for _ in range(1, k):
+            seeds.append(int(np.argmin(similarity)))
+            similarity = np.maximum(similarity, vectors @ vectors[seeds[-1]])
+        return vectors[seeds].copy()
+
+    def cluster(self, vectors: np.ndarray, k: int) -> np.ndarray:
+        """Spherical k-means; returns the cluster label of every row."""
+        centroids = self._init_centroids(vectors, k)
+        labels = np.full(vectors.shape[0], -1)
+        for _ in range(self.max_iter):
+            new_labels = np.argmax(vectors @ centroids.T, axis=1)
+            if np.array_equal(new_labels, labels):
+                break
+            labels = new_labels
+            membership = np.zeros((k, vectors.shape[0]), dtype=vectors.dtype)
+            membership[labels, np.arange(vectors.shape[0])] = 1.0
+            sums = membership @ vectors
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            empty = norms[:, 0] == 0
+            norms[empty] = 1.0
+            # empty clusters keep their previous centroid
+            centroids = np.where(empty[:, None], centroids, sums / norms)
+        self._centroids = centroids
+        return labels
+
+    def select(self, texts: Sequence[str], k: int) -> List[int]:
+        """
+        Indices of at most k texts, one representative per topic cluster,
+        returned in their original order.
+        """
+        if k <= 0 or not texts:
+            return []
+        if k >= len(texts):
+            return list(range(len(texts)))
+        if len(texts) > self.max_candidates:
+            sample = [index for index, _ in reservoir_sample(range(len(texts)), self.max_candidates)]
+            return [sample[i] for i in self.select([texts[index] for index in sample], k)]
+
+        vectors = self.vectorize(texts)
+        labels = self.cluster(vectors, k)
+        similarity = np.einsum("ij,ij->i", vectors, self._centroids[labels])
+
+        selected = []
+        for cluster_id in np.unique(labels):
+            members = np.flatnonzero(labels == cluster_id)
+            selected.append(int(members[np.argmax(similarity[members])]))
+        return sorted(selected)
+
+
+class Reservoir:
+    """
+    Uniform sample of at most size items of a stream, holding no more than
+    size items at a time (Algorithm R). Items are offered one by one, so
+    the stream can be an async cursor.
+    """
+
+    def __init__(self, size: int, seed: int = 0):
+        self.size = size
+        self.seen = 0
+        self._rng = random.Random(seed)
+        self._sample: List[Tuple[int, Any]] = []
+
+    def add(self, item: Any) -> None:
+        position = self.seen
+        self.seen += 1
+        if position < self.size:
+            self._sample.append((position, item))
+            return
+        slot = self._rng.randrange(position + 1)
+        if slot < self.size:
+            self._sample[slot] = (position, item)
+
+    def sample(self) -> List[Tuple[int, Any]]:
+        """(position in the stream, item) pairs in stream order."""
+        return sorted(self._sample, key=lambda entry: entry[0])
+
+
+def reservoir_sample(items: Iterable[Any], size: int, seed: int = 0) -> List[Tuple[int, Any]]:
+    """
+    Uniform sample of at most size items of a stream.
+
+    Returns:
+        (position in the stream, item) pairs in stream order
+    """
+    reservoir = Reservoir(size, seed)
+    for item in items:
+        reservoir.add(item)
+    return reservoir.sample()
+
+
+def chunks_for_budget(qa_budget: int, questions_per_chunk: int) -> int:
+    """Number of chunks a QA budget pays for."""
+    return max(1, math.ceil(qa_budget / questions_per_chunk))
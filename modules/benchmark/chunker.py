@@ -0,0 +1,186 @@
+import re
+from typing import Iterable, Iterator, List, Optional
+
+from langchain.schema import Document
+
+class _CharTable(dict):
+    """str.translate table built lazily from a per-character rule."""
+
+    def __init__(self, rule):
+        super().__init__()
+        self.rule = rule
+
+    def __missing__(self, code):
+        self[code] = value = self.rule(chr(code))
+        return value
+
+
+def _is_ascii_letter(char):
+    return char.isascii() and char.isalpha()
+
+
+def _is_ascii_digit(char):
+    return char.isascii() and char.isdigit()
+
+
+# the token estimate follows the pre-tokenization of BPE tokenizers
+# (letter runs, digit runs, single marks); counting is done with
+# str.translate + split, several times faster than a regex findall
+LETTER_RUNS = _CharTable(lambda char: char if _is_ascii_letter(char) else " ")
+DIGIT_RUNS = _CharTable(lambda char: char if _is_ascii_digit(char) else " ")
+# punctuation and non-ASCII characters are kept, one token each
+SINGLE_MARKS = _CharTable(
+    lambda char: None if char.isspace() or _is_ascii_letter(char) or _is_ascii_digit(char) else char
+)
+LETTERS_PER_TOKEN = 6
+DIGITS_PER_TOKEN = 3
+
+HEADING_LINE = re.compile(r"^ {0,3}#{1,6}[ \t]")
+LIST_LINE = re.compile(r"^\s*(?:[-*+•]|\d{1,3}[.)])\s")
+TABLE_LINE = re.compile(r"^\s*\|")
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def count_tokens(text: str) -> int:
+    """
+    Local approximation of a BPE token count: words up to 6 letters are one
+    token, longer words one per 6 letters, numbers one per 3 digits,
+    punctuation and non-ASCII characters one each. Unlike a
+    characters-per-token rule it does not undercount punctuation-heavy text
+    such as tables and code.
+    """
+    tokens = len(text.translate(SINGLE_MARKS))
+    for word in text.translate(LETTER_RUNS).split():
+        tokens += (len(word) + LETTERS_PER_TOKEN - 1) // LETTERS_PER_TOKEN
+    for number in text.translate(DIGIT_RUNS).split():
+        tokens += (len(number) + DIGITS_PER_TOKEN - 1) // DIGITS_PER_TOKEN
+    return tokens
+
+
+class StructuredChunker:
+    """
+    Splits documents into chunks of at most max_tokens tokens along their
+    structure.
+
+    Each document (a PDF page, a markdown or docx section) is cut into
+    blocks: headings, paragraphs, lists and tables. Blocks are packed into
+    chunks in order; a heading always starts a new chunk and chunks never
+    span two documents, so page and section metadata stay exact. Blocks
+    larger than the budget are split between list items or table rows,
+    then between sentences, then between words.
+
+    chunk_documents is a generator: chunks are produced while the input
+    documents are consumed, so only the current document is held.
+    """
+
+    def __init__(self, max_tokens: int = 300):
+        if max_tokens < 1:
+            raise ValueError("max_tokens must be positive")
+        self.max_tokens = max_tokens
+
+    def chunk_documents(self, documents: Iterable[Document]) -> Iterator[Document]:
+        for document in documents:
+            for text in self.chunk_text(document.page_content):
+                yield Document(page_content=text, metadata=dict(document.metadata))
+
+    def chunk_text(self, text: str) -> Iterator[str]:
+        parts: List[str] = []
+        tokens = 0
+        for block, block_tokens, is_heading in self._blocks(text):
+            if parts and is_heading:
+                yield "\n\n".join(parts)
+                parts, tokens = [], 0
+            if block_tokens <= self.max_tokens:
+                pieces = [(block, block_tokens)]
+            else:
+                # the first piece fills the open chunk, so a heading is not
+                # left alone in front of a long paragraph
+                remaining = self.max_tokens - tokens
+                pieces = self._split_block(
+                    block, remaining if remaining >= self.max_tokens // 4 else self.max_tokens
+                )
+            for piece, piece_tokens in pieces:
+                if parts and tokens + piece_tokens > self.max_tokens:
+                    yield "\n\n".join(parts)
+                    parts, tokens = [], 0
+                parts.append(piece)
+                tokens += piece_tokens
+        if parts:
+            yield "\n\n".join(parts)
+
+    def _blocks(self, text: str) -> Iterator[tuple]:
+        """(text, tokens, is_heading) of every structural block."""
+        lines: List[str] = []
+        kind: Optional[str] = None
+
+        def flush():
+            block = "\n".join(lines).strip()
+            lines.clear()
+            return block
+
+        for line in text.splitlines():
+            if not line.strip():
+                # blank lines end paragraphs; lists and tables survive them
+                if kind == "paragraph":
+                    block = flush()
+                    if block:
+                        yield block, count_tokens(block), False
+                    kind = None
+                continue
+            if HEADING_LINE.match(line):
+                block = flush()
+                if block:
+                    yield block, count_tokens(block), False
+                kind = None
+                heading = line.strip()
+                yield heading, count_tokens(heading), True
+                continue
+            line_kind = (
+                "table" if TABLE_LINE.match(line)
+                else "list" if LIST_LINE.match(line)
+                else "list" if kind == "list" and line[:1].isspace()
+                else "paragraph"
+            )
+            if kind is not None and line_kind != kind:
+                block = flush()
+                if block:
+                    yield block, count_tokens(block), False
+            kind = line_kind
+            lines.append(line)
+        block = flush()
+        if block:
+            yield block, count_tokens(block), False
+
+    def _split_block(self, block: str, first_budget: int) -> Iterator[tuple]:
+        """Pieces of an oversized block; the first within first_budget, the rest within max_tokens."""
+        lines = block.splitlines()
+        if len(lines) > 1 and (TABLE_LINE.match(lines[0]) or LIST_LINE.match(lines[0])):
+            units = lines
+            separator = "\n"
+        else:
+            units = SENTENCE_END.split(block)
+            separator = " "
+        return self._pack(units, separator, first_budget, split_units=True)
+
+    def _pack(self, units: List[str], separator: str, first_budget: int, split_units: bool) -> Iterator[tuple]:
+        budget = first_budget
+        parts: List[str] = []
+        tokens = 0
+        for unit in units:
+            unit_tokens = count_tokens(unit)
+            if split_units and unit_tokens > self.max_tokens:
+                # a sentence or row over the budget is cut between words
+                if parts:
+                    yield separator.join(parts), tokens
+                    parts, tokens, budget = [], 0, self.max_tokens
+                for piece in self._pack(unit.split(), " ", budget, split_units=False):
+                    yield piece
+                    budget = self.max_tokens
+                continue
+            if parts and tokens + unit_tokens > budget:
+                yield separator.join(parts), tokens
+                parts, tokens, budget = [], 0, self.max_tokens
+            parts.append(unit)
+            tokens += unit_tokens
+        if parts:
+            yield separator.join(parts), tokens
@@ -0,0 +1,203 @@
+import string
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+# punctuation becomes whitespace before shingling
+PUNCTUATION_TABLE = str.maketrans({char: " " for char in string.punctuation})
+SEPARATOR = 0  # byte placed between texts, never part of a shingle
+
+
+class NearDuplicateDetector:
+    """
+    Finds near-duplicate texts with MinHash signatures and LSH banding.
+
+    Texts are normalized and cut into character shingles; each text gets a
+    MinHash signature whose agreement rate estimates the Jaccard similarity
+    of two shingle sets. Signatures are split into bands, texts sharing a
+    band become candidates, and candidates whose estimated similarity
+    reaches the threshold are grouped. Hashing, signatures and banding run
+    in NumPy, so 100k short questions are processed in seconds.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.75,
+        num_perm: int = 64,
+        shingle_size: int = 4,
+        seed: int = 1,
+        batch_shingles: int = 200_000
+    ):
+        if not 0 < threshold <= 1:
+            raise ValueError("threshold must be in (0, 1]")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.batch_shingles = batch_shingles
+        rng = np.random.default_rng(seed)
+        # odd multipliers keep the multiply-shift hash family universal
+        self._a = rng.integers(0, np.iinfo(np.uint64).max, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, np.iinfo(np.uint64).max, size=num_perm, dtype=np.uint64)
+        self.bands, self.rows = self._band_layout(threshold, num_perm)
+
+    @staticmethod
+    def _band_layout(threshold: float, num_perm: int) -> Tuple[int, int]:
+        """
+        Bands and rows per band whose LSH S-curve turns at the threshold,
+        (1/bands)^(1/rows) ~= threshold, leaning towards recall.
+        """
+        best = None
+        for rows in range(1, num_perm + 1):
+            if num_perm % rows:
+                continue
+            bands = num_perm // rows
+            turn = (1.0 / bands) ** (1.0 / rows)
+            # candidates below the threshold only cost a verification
+            score = abs(turn - threshold) + (0.1 if turn > threshold else 0.0)
+            if best is None or score < best[0]:
+                best = (score, bands, rows)
+        return best[1], best[2]
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return " ".join(text.lower().translate(PUNCTUATION_TABLE).split())
+
+    def _shingle_hashes(self, texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        32-bit hashes of every character shingle of every text.
+
+        Returns:
+            The hashes and, per text, the offset of its first hash (texts
+            without a shingle get an empty range)
+        """
+        k = self.shingle_size
+        encoded = [self.normalize(text).encode("utf-8") for text in texts]
+        # texts shorter than a shingle are hashed as one shingle, padded with spaces
+        encoded = [raw if len(raw) >= k or not raw else raw.ljust(k) for raw in encoded]
+        buffer = np.frombuffer(bytes([SEPARATOR]).join(encoded) + bytes([SEPARATOR]), dtype=np.uint8)
+
+        lengths = np.fromiter((len(raw) for raw in encoded), dtype=np.int64, count=len(encoded))
+        starts = np.concatenate(([0], np.cumsum(lengths + 1)[:-1]))
+        n_windows = np.maximum(lengths - k + 1, 0)
+
+        # polynomial hash of every window, computed with k shifted passes
+        window_hashes = np.zeros(max(len(buffer) - k + 1, 0), dtype=np.uint32)
+        for offset in range(k):
+            window_hashes = window_hashes * np.uint32(16777619) + buffer[offset:offset + len(window_hashes)]
+        window_hashes ^= window_hashes >> np.uint32(15)
+
+        # keep only windows that lie inside a single text
+        positions = np.repeat(starts, n_windows) + (
+            np.arange(n_windows.sum()) - np.repeat(np.cumsum(n_windows) - n_windows, n_windows)
+        )
+        offsets = np.concatenate(([0], np.cumsum(n_windows)))
+        return window_hashes[positions], offsets
+
+    def signatures(self, texts: Sequence[str]) -> np.ndarray:
+        """MinHash signatures, one row of num_perm values per text."""
+        hashes, offsets = self._shingle_hashes(texts)
+        signatures = np.full((len(texts), self.num_perm), np.iinfo(np.uint64).max, dtype=np.uint64)
+        counts = np.diff(offsets)
+        owners = np.repeat(np.arange(len(texts)), counts)
+
+        for start in range(0, len(hashes), self.batch_shingles):
+            batch = hashes[start:start + self.batch_shingles].astype(np.uint64)
+            batch_owners = owners[start:start + self.batch_shingles]
+            # multiply-shift hashing: (a * x + b) mod 2^64, high 32 bits;
+            # laid out one row per permutation so the reduction is contiguous
+            permuted = (self._a[:, None] * batch[None, :] + self._b[:, None]) >> np.uint64(32)
+            # owners are sorted, so a segmented min per text is a reduceat
+            boundaries = np.flatnonzero(np.r_[True, batch_owners[1:] != batch_owners[:-1]])
+            segment_min = np.minimum.reduceat(permuted, boundaries, axis=1).T
+            segment_owner = batch_owners[boundaries]
+            signatures[segment_owner] = np.minimum(signatures[segment_owner], segment_min)
+        return signatures
+
+    def representatives(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        For every text, the index of the earliest text it is a near duplicate
+        of (its own index when it is unique). Put texts that must be kept,
+        such as pairs already in a benchmark, first.
+        """
+        n = len(texts)
+        parent = np.arange(n)
+        if n < 2:
+            return parent
+        signatures = self.signatures(texts)
+        has_shingles = signatures[:, 0] != np.iinfo(np.uint64).max
+
+        pairs = []
+        for band in range(self.bands):
+            keys = np.ascontiguousarray(
+                signatures[:, band * self.rows:(band + 1) * self.rows]
+            ).view(np.dtype((np.void, 8 * self.rows))).ravel()
+            _, bucket = np.unique(keys, return_inverse=True)
+            leader = np.full(bucket.max() + 1, n, dtype=np.int64)
+            np.minimum.at(leader, bucket, np.arange(n))
+            leaders = leader[bucket]
+            members = np.flatnonzero((leaders != np.arange(n)) & has_shingles)
+            if len(members):
+                pairs.append(np.stack([leaders[members], members], axis=1))
+        if not pairs:
+            return parent
+
+        candidates = np.unique(np.concatenate(pairs), axis=0)
+        similarity = np.mean(
+            signatures[candidates[:, 0]] == signatures[candidates[:, 1]], axis=1
+        )
+        verified = candidates[similarity >= self.threshold]
+
+        # greedy assignment in text order: a text joins the earliest
+        # representative it matches, so A~B and B~C never chain A and C
+        # together when A and C differ
+        partners = {}
+        for left, right in verified[np.lexsort((verified[:, 0], verified[:, 1]))]:
+            partners.setdefault(int(right), []).append(int(left))
+        for right in sorted(partners):
+            for left in partners[right]:
+                if parent[left] == left:
+                    parent[right] = left
+                    break
+        return parent
+
+
+def deduplicate(
+    items: List[dict],
+    detector: NearDuplicateDetector,
+    key: str = "question",
+    keep: int = 0,
+    action: str = "drop"
+) -> Tuple[List[dict], int]:
+    """
+    Remove near-duplicate items, comparing them on one text field.
+
+    Args:
+        items: Dictionaries such as dumped QA pairs
+        detector: Configured NearDuplicateDetector
+        key: Field the comparison is made on
+        keep: Leading items that are always kept (already stored pairs);
+            they are compared against but never removed
+        action: "drop" discards duplicates, "merge" keeps their text on the
+            surviving item under duplicate_questions (survivors among the
+            `keep` items are updated in place)
+
+    Returns:
+        The kept items after the first `keep`, and the number removed
+    """
+    if action not in ("drop", "merge"):
+        raise ValueError(f"Unknown dedup action: {action}")
+    representatives = detector.representatives([item[key] for item in items])
+    kept, removed = [], 0
+    # the `keep` items are stored already: duplicates among them are neither
+    # removed nor merged, only the new items are
+    for index in range(keep, len(items)):
+        item = items[index]
+        representative = int(representatives[index])
+        if representative == index:
+            kept.append(item)
+            continue
+        removed += 1
+        if action == "merge":
+            survivor = items[representative]
+            survivor.setdefault("duplicate_questions", []).append(item[key])
+    return kept, removed
@@ -1,83 +1,73 @@
-from langchain_community.document_loaders import PyPDFLoader, TextLoader, UnstructuredFileLoader, Docx2txtLoader
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+from langchain_community.document_loaders import UnstructuredFileLoader
+from typing import Iterator
 import tempfile
 from motor.motor_asyncio import AsyncIOMotorClient
 from datetime import datetime
 from modules.benchmark.chunk import Chunk
+from modules.benchmark.chunker import StructuredChunker
+from modules.benchmark.loaders import NATIVE_LOADERS, STREAMING_LOADERS
+from core.config import get_settings
 from core.logger import logger
 import os
 
 class FileProcessor:
-    def __init__(self, db: AsyncIOMotorClient, chunk_size=1000, chunk_overlap=20):
+    def __init__(self, db: AsyncIOMotorClient, max_chunk_tokens: int = None):
         self.db = db
         self.chunks_collection = self.db.chunks_collection
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=chunk_size,
-            chunk_overlap=chunk_overlap,
-            length_function=len
+        # chunks are sized in estimated model tokens and cut along headings,
+        # paragraphs, lists and tables of each page or section
+        self.chunker = StructuredChunker(
+            max_tokens=max_chunk_tokens or get_settings().CHUNK_MAX_TOKENS
         )
         
+        # txt, md, docx and pdf are parsed in memory by NATIVE_LOADERS,
+        # other types need the upload written to a temporary file
         self.loader_mapping = {
-            ".pdf": PyPDFLoader,
-            ".txt": TextLoader,
             # Add more file types as needed
         }
 
     async def process_uploaded_file(self, uploaded_file):
-        with tempfile.NamedTemporaryFile(delete=False, suffix=uploaded_file.filename) as tmp:
-            content = await uploaded_file.read()
-            tmp.write(content)
-            tmp_path = tmp.name
-
-        try:
-            ext = os.path.splitext(uploaded_file.filename)[-1].lower()
-            loader_class = self.loader_mapping.get(ext, UnstructuredFileLoader)
-            loader = loader_class(tmp_path)
-
-            documents = loader.load()
-            chunks = self.text_splitter.split_documents(documents)
+        content = await uploaded_file.read()
+        return await self.process_file_content(content, uploaded_file.filename)
 
-            db_chunks = []
-            for i, chunk in enumerate(chunks):
-                chunk_data = Chunk(
-                    content=chunk.page_content,
-                    metadata={
-                        "source": uploaded_file.filename,
-                        "chunk_number": i + 1,
-                        **chunk.metadata
-                    }
-                )
-                db_chunks.append(chunk_data)  # Store in list instead of inserting into DB
-            
-            return db_chunks
-        finally:
-            os.unlink(tmp_path)
+    def load_documents(self, content: bytes, filename: str):
+        ext = os.path.splitext(filename)[-1].lower()
+        native_loader = NATIVE_LOADERS.get(ext)
+        if native_loader is not None:
+            return native_loader(content, filename)
 
-    async def process_file_content(self, content: bytes, filename: str):
         with tempfile.NamedTemporaryFile(delete=False, suffix=filename) as tmp:
             tmp.write(content)
             tmp_path = tmp.name
-
         try:
-            ext = os.path.splitext(filename)[-1].lower()
             loader_class = self.loader_mapping.get(ext, UnstructuredFileLoader)
-            loader = loader_class(tmp_path)
+            return loader_class(tmp_path).load()
+        finally:
+            os.unlink(tmp_path)
 
-            documents = loader.load()
-            chunks = self.text_splitter.split_documents(documents)
+    def _to_chunks(self, documents, filename: str) -> Iterator[Chunk]:
+        for i, chunk in enumerate(self.chunker.chunk_documents(documents)):
+            yield Chunk(
+                content=chunk.page_content,
+                metadata={
+                    **chunk.metadata,
+                    # loaders of temporary files report the temporary path
+                    "source": filename,
+                    "chunk_number": i + 1
+                }
+            )
 
-            db_chunks = []
-            for i, chunk in enumerate(chunks):
-                chunk_data = Chunk(
-                    content=chunk.page_content,
-                    metadata={
-                        "source": filename,
-                        "chunk_number": i + 1,
-                        **chunk.metadata
-                    }
-                )
-                db_chunks.append(chunk_data)
-            
-            return db_chunks
-        finally:
-            os.unlink(tmp_path)
\ No newline at end of file
+    def iter_file_chunks(self, path: str, filename: str) -> Iterator[Chunk]:
+        """
+        Chunks of a file on disk, produced as it is read. PDFs are parsed
+        page by page, so memory does not grow with the number of pages.
+        """
+        ext = os.path.splitext(filename)[-1].lower()
+        with open(path, "rb") as source:
+            if ext in STREAMING_LOADERS:
+                yield from self._to_chunks(STREAMING_LOADERS[ext](source, filename), filename)
+            else:
+                yield from self._to_chunks(self.load_documents(source.read(), filename), filename)
+
+    async def process_file_content(self, content: bytes, filename: str):
+        return list(self._to_chunks(self.load_documents(content, filename), filename))
@@ -0,0 +1,183 @@
+import io
+import re
+import zipfile
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Tuple
+from xml.etree.ElementTree import iterparse
+
+from langchain.schema import Document
+from pypdf import PdfReader
+from pypdf.generic import StreamObject
+
+# WordprocessingML namespace of document.xml elements
+W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+ATX_HEADING = re.compile(r"^ {0,3}(#{1,6})[ \t]+(.*?)[ \t#]*$")
+SETEXT_UNDERLINE = re.compile(r"^ {0,3}(=+|-+)[ \t]*$")
+FENCE = re.compile(r"^ {0,3}(```|~~~)")
+DOCX_HEADING_STYLE = re.compile(r"^(?:heading|berschrift|titre)\s*(\d)$", re.IGNORECASE)
+
+# (heading level or None for body text, text)
+Block = Tuple[Optional[int], str]
+
+
+def decode_text(content: bytes) -> str:
+    """Decode uploaded text, honouring a UTF-8/UTF-16 BOM and falling back to cp1252."""
+    if content.startswith((b"\xff\xfe", b"\xfe\xff")):
+        return content.decode("utf-16")
+    try:
+        return content.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        return content.decode("cp1252", errors="replace")
+
+
+def load_text(content: bytes, filename: str) -> List[Document]:
+    """Plain text as a single document."""
+    return [Document(page_content=decode_text(content), metadata={"source": filename})]
+
+
+def _sections(blocks: Iterable[Block], filename: str) -> List[Document]:
+    """
+    Group blocks into one document per heading. The heading text starts its
+    section and the path of enclosing headings is kept in the metadata, so
+    chunks stay within a section and know where they came from.
+    """
+    documents = []
+    path: List[Tuple[int, str]] = []
+    lines: List[str] = []
+
+    def close_section():
+        text = "\n".join(lines).strip()
+        if text:
+            metadata = {"source": filename}
+            if path:
+                metadata["section"] = " > ".join(title for _, title in path)
+            documents.append(Document(page_content=text, metadata=metadata))
+        lines.clear()
+
+    for level, text in blocks:
+        if level is None:
+            lines.append(text)
+            continue
+        close_section()
+        while path and path[-1][0] >= level:
+            path.pop()
+        path.append((level, text))
+        lines.append(text)
+    close_section()
+    return documents
+
+
+def _markdown_blocks(text: str) -> Iterable[Block]:
+    in_fence = None
+    previous = None
+    for line in text.splitlines():
+        fence = FENCE.match(line)
+        if in_fence:
+            if fence and fence.group(1) == in_fence:
+                in_fence = None
+        elif fence:
+            in_fence = fence.group(1)
+        elif previous is not None and previous.strip() and SETEXT_UNDERLINE.match(line):
+            # "Title\n=====" turns the previous line into a heading
+            yield 1 if line.strip().startswith("=") else 2, previous.strip()
+            previous = None
+            continue
+        else:
+            heading = ATX_HEADING.match(line)
+            if heading:
+                if previous is not None:
+                    yield None, previous
+                previous = None
+                yield len(heading.group(1)), heading.group(2)
+                continue
+        if previous is not None:
+            yield None, previous
+        previous = line
+    if previous is not None:
+        yield None, previous
+
+
+def load_markdown(content: bytes, filename: str) -> List[Document]:
+    """Markdown split into one document per heading section (ATX and setext, fences respected)."""
+    return _sections(_markdown_blocks(decode_text(content)), filename)
+
+
+def _docx_blocks(content: bytes) -> Iterable[Block]:
+    text_tag, tab_tag, p_tag, style_tag = W_NS + "t", W_NS + "tab", W_NS + "p", W_NS + "pStyle"
+    break_tags = (W_NS + "br", W_NS + "cr")
+    with zipfile.ZipFile(io.BytesIO(content)) as archive:
+        with archive.open("word/document.xml") as document_xml:
+            # runs and the paragraph style end before their paragraph does,
+            # so end events alone are enough
+            parts: List[str] = []
+            level = None
+            for _, element in iterparse(document_xml):
+                tag = element.tag
+                if tag == text_tag:
+                    parts.append(element.text or "")
+                elif tag == p_tag:
+                    text = "".join(parts)
+                    if text.strip():
+                        yield level, text
+                    parts, level = [], None
+                    # paragraphs are consumed as they end, keep memory flat
+                    element.clear()
+                elif tag == tab_tag:
+                    parts.append("\t")
+                elif tag in break_tags:
+                    parts.append("\n")
+                elif tag == style_tag:
+                    style = element.get(W_NS + "val", "")
+                    match = DOCX_HEADING_STYLE.match(style)
+                    if match:
+                        level = int(match.group(1))
+                    elif style.lower() == "title":
+                        level = 1
+
+
+def load_docx(content: bytes, filename: str) -> List[Document]:
+    """
+    Word documents read straight from the zip container. Paragraphs and
+    table cells are streamed out of word/document.xml and grouped into one
+    document per heading section.
+    """
+    return _sections(_docx_blocks(content), filename)
+
+
+def iter_pdf_pages(source: BinaryIO, filename: str) -> Iterator[Document]:
+    """
+    One document per PDF page, extracted only when the consumer asks for it.
+    pypdf reads objects from the file on demand, so with a file on disk as
+    source neither the whole file nor all pages are ever held in memory.
+    """
+    reader = PdfReader(source)
+    for page_number, page in enumerate(reader.pages):
+        cached = set(reader.resolved_objects)
+        text = page.extract_text() or ""
+        # pypdf keeps every object it resolves; drop the streams this page
+        # decoded (its content) so memory does not grow with the page count
+        for key in set(reader.resolved_objects) - cached:
+            if isinstance(reader.resolved_objects[key], StreamObject):
+                del reader.resolved_objects[key]
+        yield Document(
+            page_content=text,
+            metadata={"source": filename, "page": page_number}
+        )
+
+
+def load_pdf(content: bytes, filename: str) -> List[Document]:
+    return list(iter_pdf_pages(io.BytesIO(content), filename))
+
+
+# loaders that work on the uploaded bytes, no temporary file needed
+NATIVE_LOADERS = {
+    ".txt": load_text,
+    ".md": load_markdown,
+    ".markdown": load_markdown,
+    ".docx": load_docx,
+    ".pdf": load_pdf,
+}
+
+# loaders that read pages lazily from a file object
+STREAMING_LOADERS = {
+    ".pdf": iter_pdf_pages,
+}
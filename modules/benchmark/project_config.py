@@ -0,0 +1,99 @@
+import ast
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel, ConfigDict
+
+from core.logger import logger
+from modules.project_connections.models import Projects
+
+DEFAULT_HEADERS = (("Content-Type", "application/json"),)
+# header values that are safe to write to the logs, every other value is masked
+LOGGED_HEADERS = {"content-type", "accept"}
+
+
+def _split_header_column(value: Optional[str]) -> List[str]:
+    """
+    Items of a header_keys or header_values column. Projects created by
+    /create-project store them comma joined, those from project_connections
+    as the str() of a list.
+    """
+    if not value:
+        return []
+    if value.startswith("["):
+        try:
+            items = ast.literal_eval(value)
+        except (SyntaxError, ValueError):
+            items = None
+        if isinstance(items, (list, tuple)):
+            return [str(item) for item in items]
+    return value.split(",")
+
+
+def parse_headers(header_keys: Optional[str], header_values: Optional[str]) -> Tuple[Tuple[str, str], ...]:
+    """
+    Request headers of a project, with Content-Type application/json
+    unless the project sets its own.
+
+    Args:
+        header_keys: The projects.header_keys column
+        header_values: The projects.header_values column
+
+    Returns:
+        (name, value) pairs in the project's order
+    """
+    headers = {}
+    for key, value in zip(_split_header_column(header_keys), _split_header_column(header_values)):
+        key = key.strip()
+        if key:
+            headers[key] = value.strip()
+    names = {key.lower() for key in headers}
+    defaults = [(key, value) for key, value in DEFAULT_HEADERS if key.lower() not in names]
+    return tuple(defaults) + tuple(headers.items())
+
+
+def masked_headers(headers: Dict[str, str]) -> Dict[str, str]:
+    """A copy of request headers for the logs, with credentials such as auth headers masked."""
+    return {
+        key: value if key.lower() in LOGGED_HEADERS else "***"
+        for key, value in headers.items()
+    }
+
+
+class ProjectConfig(BaseModel):
+    """A project's target endpoint, loaded once at the start of a test run."""
+    model_config = ConfigDict(frozen=True)
+
+    project_id: str
+    target_url: Optional[str] = None
+    end_point: Optional[str] = None
+    payload_method: str = "post"
+    headers: Tuple[Tuple[str, str], ...] = DEFAULT_HEADERS
+    payload_template: str = "None"  # payload body as given to the payload planner
+
+    @classmethod
+    def from_project(cls, project: Projects) -> "ProjectConfig":
+        payload_method = project.payload_method
+        if payload_method is None:
+            payload_method = "post"
+            logger.warning(f"No payload_method specified for project {project.project_id}, defaulting to POST")
+        return cls(
+            project_id=project.project_id,
+            target_url=project.target_url,
+            end_point=project.end_point,
+            payload_method=payload_method,
+            headers=parse_headers(project.header_keys, project.header_values),
+            payload_template=str(project.payload_body),
+        )
+
+    def is_complete(self) -> bool:
+        return bool(self.target_url and self.end_point)
+
+    def payload_config(self, body: Any) -> Dict[str, Any]:
+        """A new payload configuration for trigger_payload, with body."""
+        return {
+            "target_url": self.target_url,
+            "end_point": self.end_point,
+            "payload_method": self.payload_method,
+            "body": body,
+            "headers": dict(self.headers),
+        }
@@ -1,8 +1,9 @@
 from pydantic import BaseModel, Field
-from typing import List
+from typing import Dict, List, Optional, Tuple
 from langchain.output_parsers import PydanticOutputParser
 from langchain_core.messages import SystemMessage, HumanMessage
 from modules.benchmark.qa_pair import QAPair
+from modules.benchmark.chunker import count_tokens
 from langchain_anthropic import ChatAnthropic
 from datetime import datetime
 from langchain_google_genai import ChatGoogleGenerativeAI
@@ -15,6 +16,7 @@ class QuestionAnswer(BaseModel):
     question: str = Field(..., description="The generated question")
     answer: str = Field(..., description="The correct answer to the question")
     difficulty_level: Literal["easy", "medium", "hard"] = Field(default="easy", description="The difficulty level of the question")
+    chunk_id: Optional[str] = Field(default=None, description="The id of the context chunk the question was generated from, when chunks are given with ids")
 
 class QAResponse(BaseModel):
     questions: List[QuestionAnswer]
@@ -37,6 +39,25 @@ class QAPrompt(BaseModel):
 3. Cover different aspects of the context
 4. Are factual and can be verified from the context.
 
+# Format the output as follows:
+{format_instructions}
+""",
+    )
+    
+    packed_human_prompt_template: str = Field(
+        default="""For EACH of the following context chunks, generate {num_questions} question-answer pairs.
+Every chunk is wrapped in <chunk id="..."> tags.
+
+# Context chunks:
+{chunks}
+
+# Requirements:
+1. Test key concepts and information from each chunk
+2. Have clear, unambiguous answers
+3. Cover different aspects of each chunk
+4. Are factual and can be verified from the chunk they were generated from.
+5. Set chunk_id of every pair to the id of the chunk it was generated from.
+
 # Format the output as follows:
 {format_instructions}
 """,
@@ -45,6 +66,15 @@ class QAPrompt(BaseModel):
     num_questions: int = Field(default=3, ge=1, le=10)
 
 
+def estimate_tokens(text: str) -> int:
+    """Estimated token count of a prompt fragment, same estimate the chunker sizes chunks with."""
+    return count_tokens(text) + 1
+
+
+# tokens added around every chunk by the <chunk id="..."> wrapper
+CHUNK_WRAPPER_TOKENS = 12
+
+
 class QAGenerator:
     def __init__(self, settings: Settings, db: AsyncIOMotorClient):
         self.db = db
@@ -60,6 +90,7 @@ class QAGenerator:
         self.llm = ChatAnthropic(
             model="claude-3-5-sonnet-latest",
             temperature=0.1,
+            max_tokens=4096,  # room for the QA pairs of a packed request
             api_key=settings.ANTHROPIC_API_KEY,
         )
         self.llm.with_structured_output(
@@ -106,3 +137,96 @@ class QAGenerator:
             return qa_pairs
         except Exception as e:
             raise RuntimeError(f"QA generation failed: {str(e)}")
+
+    def prompt_overhead_tokens(self, packed: bool) -> int:
+        """Estimated tokens every request spends on the system prompt, template and format instructions."""
+        template = (self.prompt_config.packed_human_prompt_template if packed
+                    else self.prompt_config.human_prompt_template)
+        return (estimate_tokens(self.prompt_config.system_prompt)
+                + estimate_tokens(template)
+                + estimate_tokens(self.format_instruction))
+
+    def unpacked_input_tokens(self, content: str) -> int:
+        """Estimated input tokens of a generate_qa request for one chunk."""
+        return self.prompt_overhead_tokens(packed=False) + estimate_tokens(content)
+
+    def pack_chunks(
+        self,
+        chunks: List[Tuple[str, str]],
+        token_budget: int,
+        max_chunks: int = 8
+    ) -> List[List[Tuple[str, str]]]:
+        """
+        Group (chunk_id, content) pairs into requests that fit a token budget.
+
+        Chunks keep their order; a chunk larger than the budget is sent alone.
+        max_chunks bounds the pack so the answer fits the model's output limit.
+        """
+        content_budget = token_budget - self.prompt_overhead_tokens(packed=True)
+        packs, current, current_tokens = [], [], 0
+        for chunk_id, content in chunks:
+            tokens = estimate_tokens(content) + CHUNK_WRAPPER_TOKENS
+            if current and (current_tokens + tokens > content_budget or len(current) >= max_chunks):
+                packs.append(current)
+                current, current_tokens = [], 0
+            current.append((chunk_id, content))
+            current_tokens += tokens
+        if current:
+            packs.append(current)
+        return packs
+
+    async def generate_qa_packed(
+        self,
+        chunks: List[Tuple[str, str]],
+        num_questions: int = 3
+    ) -> Tuple[Dict[str, List[QAPair]], dict]:
+        """
+        Generate QA pairs for several chunks in a single request.
+
+        Args:
+            chunks: (chunk_id, content) pairs, usually one pack from pack_chunks
+            num_questions: Questions per chunk
+
+        Returns:
+            QA pairs per chunk id, and the usage of the request: estimated
+            input tokens and the input tokens reported by the model, if any
+        """
+        chunk_ids = [chunk_id for chunk_id, _ in chunks]
+        prompt = self.prompt_config.packed_human_prompt_template.format(
+            chunks="\n\n".join(
+                f'<chunk id="{chunk_id}">\n{content}\n</chunk>' for chunk_id, content in chunks
+            ),
+            num_questions=num_questions,
+            format_instructions=self.format_instruction,
+        )
+        messages = [
+            SystemMessage(content=self.prompt_config.system_prompt),
+            HumanMessage(content=prompt)
+        ]
+        usage = {
+            "estimated_input_tokens": (estimate_tokens(self.prompt_config.system_prompt)
+                                       + estimate_tokens(prompt)),
+            "input_tokens": None
+        }
+        try:
+            response = await self.llm.ainvoke(messages)
+            usage_metadata = getattr(response, "usage_metadata", None) or {}
+            usage["input_tokens"] = usage_metadata.get("input_tokens")
+            parsed_response = self.parser.parse(response.content)
+        except Exception as e:
+            raise RuntimeError(f"Packed QA generation failed: {str(e)}")
+
+        qa_by_chunk: Dict[str, List[QAPair]] = {chunk_id: [] for chunk_id in chunk_ids}
+        for qa in parsed_response.questions:
+            chunk_id = qa.chunk_id
+            if chunk_id not in qa_by_chunk and len(chunk_ids) == 1:
+                chunk_id = chunk_ids[0]
+            if chunk_id not in qa_by_chunk:
+                # the model tagged the pair with an id that was not in the request
+                continue
+            qa_by_chunk[chunk_id].append(QAPair(
+                question=qa.question,
+                answer=qa.answer,
+                difficulty_level=qa.difficulty_level
+            ))
+        return qa_by_chunk, usage
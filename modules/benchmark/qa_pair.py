@@ -1,8 +1,12 @@
 from pydantic import Field
 from datetime import datetime
 from pydantic import BaseModel
+from typing import List, Optional
 
 class QAPair(BaseModel):
     question: str
     answer: str
     difficulty_level: str
+    duplicate_questions: List[str] = Field(default_factory=list)  # near duplicates merged into this pair
+    source_file: Optional[str] = None  # file the pair was generated from
+    chunk_id: Optional[str] = None  # "<filename>#<chunk_number>" of the source chunk
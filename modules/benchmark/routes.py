@@ -1,22 +1,33 @@
 from core.database import get_mongodb
 from fastapi import (
     APIRouter, UploadFile, File, Depends, HTTPException, 
-    BackgroundTasks, Form, status
+    Form, Header, Query, status
 )
-from modules.monitor.models import TestInfo
+from modules.monitor.models import ProjectScoreRollup, TestInfo
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from modules.project_connections.models import Projects
 from modules.project_connections.schemas import ProjectCreate
 from modules.Auth.models import Users
-from fastapi.responses import JSONResponse
-from modules.benchmark.file_processer import FileProcessor
-from modules.benchmark.qa_generator import QAGenerator
+from fastapi.responses import JSONResponse, StreamingResponse
 from modules.benchmark.schemas import (
     FileProcessingResponse as SchemaFileProcessingResponse
 )
-from typing import List
-from core.database import get_db
-from datetime import datetime
+from modules.ingestion.queue import (
+    active_job_filenames, enqueue_job, has_active_job, remove_spool,
+    spool_dir_for, spool_upload
+)
+from modules.Auth.schemas import AccessToken
+from modules.ingestion.admission import check_backlog, get_admission_controller
+from modules.ingestion.archives import is_archive
+from modules.ingestion.progress import ProgressBroker
+from modules.monitor.pagination import CountCache, ResultFilters, fetch_page
+from modules.monitor.rollups import get_rollup
+from typing import List, Optional, Set
+from contextlib import nullcontext
+from core.database import get_async_db, get_db
+from datetime import datetime, timedelta, timezone
 from core.config import get_settings
 from core.logger import logger
 from pydantic import BaseModel
@@ -25,41 +36,158 @@ from uuid import uuid4
 import traceback
 import json
 import io
+import os
 
 router = APIRouter(tags=["Benchmark"])
 
 
-async def get_file_processor():
-    """Dependency to get FileProcessor instance with MongoDB connection."""
+class TokenData(BaseModel):
+    """Schema for authentication token data."""
+    access_token: str
+
+
+MAX_FILE_SIZE = 20 * 1024 * 1024  # 20 MB max per file
+MAX_TOTAL_SIZE = 50 * 1024 * 1024  # 50 MB max total
+ALLOWED_EXTENSIONS = ['pdf', 'txt', 'docx', 'md']
+ARCHIVE_EXTENSIONS = ['zip', 'tar.gz', 'tgz']
+
+# shared by every progress stream of this process
+progress_broker = ProgressBroker(
+    poll_seconds=get_settings().INGESTION_PROGRESS_POLL_SECONDS
+)
+# filtered /qa_data totals, shared by the requests of this process
+qa_count_cache = CountCache(get_settings().QA_DATA_COUNT_CACHE_SECONDS)
+
+
+async def _spool_files(files: List[UploadFile], job_id: str):
+    """
+    Validate uploaded files and stream them to the job's spool directory.
+    
+    Archives (.zip, .tar.gz) have their own size cap; the ingestion
+    workers expand them entry by entry.
+    
+    Returns:
+        The spooled files (filename, spool_path, size_bytes) and the
+        validation errors of the rejected ones
+    """
     settings = get_settings()
-    try:
-        db = await get_mongodb(settings=settings)
-        return FileProcessor(db)
-    except Exception as e:
-        logger.error(f"Failed to create FileProcessor: {str(e)}")
+    spool_dir = spool_dir_for(job_id)
+    file_data = []
+    file_validation_errors = []
+    total_size = 0
+    archive_size = 0
+    archive_limit_mb = settings.INGESTION_ARCHIVE_MAX_BYTES // (1024 * 1024)
+    
+    for index, file in enumerate(files):
+        # Check file extension
+        file_ext = file.filename.lower().split('.')[-1]
+        archive = is_archive(file.filename)
+        if file_ext not in ALLOWED_EXTENSIONS and not archive:
+            file_validation_errors.append(
+                f"File {file.filename} has unsupported extension. "
+                f"Supported: {', '.join(ALLOWED_EXTENSIONS + ARCHIVE_EXTENSIONS)}"
+            )
+            continue
+        
+        # Stream the file to the spool, stopping at the size limit
+        spool_path = os.path.join(
+            spool_dir, f"{index}_{os.path.basename(file.filename)}"
+        )
+        if archive:
+            file_size = await spool_upload(
+                file, spool_path, settings.INGESTION_ARCHIVE_MAX_BYTES - archive_size
+            )
+            if file_size is None:
+                file_validation_errors.append(
+                    f"Archive {file.filename} exceeds the archive upload "
+                    f"maximum of {archive_limit_mb}MB"
+                )
+                continue
+            archive_size += file_size
+        else:
+            file_size = await spool_upload(file, spool_path, MAX_FILE_SIZE)
+            if file_size is None:
+                file_validation_errors.append(
+                    f"File {file.filename} exceeds maximum size of 20MB"
+                )
+                continue
+                
+            total_size += file_size
+            if total_size > MAX_TOTAL_SIZE:
+                os.unlink(spool_path)
+                file_validation_errors.append(
+                    "Total file size exceeds maximum of 50MB"
+                )
+                break
+        
+        file_data.append({
+            "filename": file.filename,
+            "spool_path": spool_path,
+            "size_bytes": file_size
+        })
+    return file_data, file_validation_errors
+
+
+def _upload_token(access_token: Optional[str], x_access_token: Optional[str]) -> str:
+    """The token of an upload, from its X-Access-Token header or else its access_token form field."""
+    token = x_access_token or access_token
+    if not token:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to initialize file processor"
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication token"
         )
+    return token
 
 
-async def get_qa_generator():
-    """Dependency to get QAGenerator instance with MongoDB connection."""
-    settings = get_settings()
-    try:
-        db = await get_mongodb(settings=settings)
-        return QAGenerator(settings=settings, db=db)
-    except Exception as e:
-        logger.error(f"Failed to create QAGenerator: {str(e)}")
+def _get_owned_project(db: Session, project_id: str, access_token: str) -> Projects:
+    """Authenticate the user and return their project, raising HTTPException otherwise."""
+    user = db.query(Users).filter(
+        Users.verification_token == access_token
+    ).first()
+    if not user or not user.isVerified:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to initialize QA generator"
+            status_code=status.HTTP_401_UNAUTHORIZED, 
+            detail="Invalid token or unauthorized user"
         )
+    
+    project = db.query(Projects).filter(
+        Projects.project_id == project_id
+    ).first()
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+    if project.user_id != user.user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You do not have permission to access this project"
+        )
+    return project
 
 
-class TokenData(BaseModel):
-    """Schema for authentication token data."""
-    access_token: str
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """A query parameter as the naive UTC datetime results are stored in; naive values are taken as UTC."""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+async def _stored_files(mongo_db: AsyncIOMotorClient, project_id: str) -> Set[str]:
+    """Files of a project's benchmark, whether they have QA pairs or only stored chunks."""
+    qa_doc = await mongo_db.qa_collection.find_one(
+        {"project_id": project_id}, {"files_processed": 1}
+    )
+    files = set((qa_doc or {}).get("files_processed", []))
+    files.update(await mongo_db.chunks_collection.distinct(
+        "source_file", {"project_id": project_id}
+    ))
+    # a project not ingested since chunks are stored per file has one document
+    legacy_chunk_doc = await mongo_db.chunks_collection.find_one(
+        {"project_id": project_id, "source_file": {"$exists": False}}, {"files_processed": 1}
+    )
+    files.update((legacy_chunk_doc or {}).get("files_processed", []))
+    return files
 
 
 @router.post(
@@ -69,30 +197,31 @@ class TokenData(BaseModel):
     summary="Process files to create benchmark project",
     description=(
         "Upload files and create a new benchmark project. "
-        "Files will be processed in the background."
+        "Files are queued and processed by the ingestion workers."
     )
 )
 async def process_file(
-    background_tasks: BackgroundTasks,
     files: List[UploadFile] = File(...),
     project_data: str = Form(...),
-    access_token: str = Form(...),
-    db: Session = Depends(get_db),
-    file_processor: FileProcessor = Depends(get_file_processor),
-    qa_generator: QAGenerator = Depends(get_qa_generator),
+    access_token: Optional[str] = Form(None),
+    x_access_token: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
     mongo_db: AsyncIOMotorClient = Depends(get_mongodb),
 ):
     """
-    Process uploaded files and create a benchmark project.
+    Create a benchmark project and enqueue its files for ingestion.
+    
+    The files are spooled to disk and a durable ingestion job is queued;
+    the ingestion workers parse, chunk and generate QA pairs for it.
     
     Args:
-        background_tasks: FastAPI background tasks manager
         files: List of uploaded files
         project_data: JSON string containing project configuration
         access_token: User authentication token
+        x_access_token: User authentication token sent as the X-Access-Token
+            header instead, so that the admission middleware can check the
+            user's upload slots before the body is read
         db: SQL database session
-        file_processor: File processor instance
-        qa_generator: QA generator instance
         mongo_db: MongoDB connection
         
     Returns:
@@ -130,9 +259,9 @@ async def process_file(
     # Process the request
     try:
         # Validate user authentication
-        user = db.query(Users).filter(
-            Users.verification_token == access_token
-        ).first()
+        user = await db.scalar(
+            select(Users).where(Users.verification_token == _upload_token(access_token, x_access_token))
+        )
         logger.info(user)
         if not user:
             logger.warning(
@@ -157,6 +286,31 @@ async def process_file(
             f"Request {request_id}: User {user.user_id} authenticated"
         )
         
+        # Refuse the upload while the ingestion backlog is full
+        await db.run_sync(check_backlog, user.user_id)
+        
+        # Validate files and spool them to disk for the ingestion workers
+        job_id = str(uuid4())
+        # the admission middleware holds the user's upload slot of a header token
+        with nullcontext() if x_access_token else get_admission_controller().user_slot(user.user_id):
+            file_data, file_validation_errors = await _spool_files(files, job_id)
+        
+        # Handle file validation errors
+        if file_validation_errors:
+            error_message = "; ".join(file_validation_errors)
+            logger.warning(
+                f"Request {request_id}: File validation errors: "
+                f"{error_message}"
+            )
+            
+            # If no valid files at all, the project is not created
+            if not file_data:
+                remove_spool(job_id)
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"No valid files to process: {error_message}"
+                )
+        
         # Create the project
         project_id = str(uuid4())
         new_project = Projects(
@@ -172,20 +326,23 @@ async def process_file(
             is_active=project.is_active,
             test_interval_in_hrs=project.test_interval_in_hrs,
             benchmark_knowledge_id=project.benchmark_knowledge_id,
+            qa_budget=project.qa_budget,
+            retention_days=project.retention_days,
             registered_at=datetime.utcnow()
         )
 
         # Save project to database
         try:
             db.add(new_project)
-            db.commit()
-            db.refresh(new_project)
+            await db.commit()
+            await db.refresh(new_project)
             logger.info(
                 f"Request {request_id}: Project {project_id} created "
                 f"for user {user.user_id}"
             )
         except Exception as e:
-            db.rollback()
+            await db.rollback()
+            remove_spool(job_id)
             db_error = f"Database error creating project: {str(e)}"
             logger.error(f"Request {request_id}: {db_error}")
             raise HTTPException(
@@ -193,78 +350,32 @@ async def process_file(
                 detail=f"Failed to create project: {str(e)}"
             )
         
-        # Read and validate file contents
-        file_data = []
-        file_validation_errors = []
-        total_size = 0
-        MAX_FILE_SIZE = 20 * 1024 * 1024  # 20 MB max per file
-        MAX_TOTAL_SIZE = 50 * 1024 * 1024  # 50 MB max total
-        
-        for file in files:
-            # Check file size by reading the file content first
-            content = await file.read()
-            file_size = len(content)
-            
-            if file_size > MAX_FILE_SIZE:
-                file_validation_errors.append(
-                    f"File {file.filename} exceeds maximum size of 20MB"
-                )
-                continue
-                
-            total_size += file_size
-            if total_size > MAX_TOTAL_SIZE:
-                file_validation_errors.append(
-                    "Total file size exceeds maximum of 50MB"
-                )
-                break
-            
-            # Check file extension
-            file_ext = file.filename.lower().split('.')[-1]
-            allowed_extensions = ['pdf', 'txt', 'docx', 'md']
-            if file_ext not in allowed_extensions:
-                file_validation_errors.append(
-                    f"File {file.filename} has unsupported extension. "
-                    f"Supported: {', '.join(allowed_extensions)}"
-                )
-                continue
-            
-            # Store the content we've already read
-            file_data.append({
-                "filename": file.filename,
-                "content": content
-            })
-        
-        # Handle file validation errors
-        if file_validation_errors:
-            error_message = "; ".join(file_validation_errors)
-            logger.warning(
-                f"Request {request_id}: File validation errors: "
-                f"{error_message}"
-            )
-            
-            # If no valid files at all, roll back the project
-            if not file_data:
-                db.delete(new_project)
-                db.commit()
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"No valid files to process: {error_message}"
-                )
-        
-        # Start background processing
-        logger.info(
-            f"Request {request_id}: Starting background processing "
-            f"of {len(file_data)} files"
-        )
-        background_tasks.add_task(
-            benchmark_creation_background_process,
-            request_id=request_id,
-            file_data=file_data,
+        # Enqueue the job, a worker picks it up and runs the pipeline
+        await mongo_db.process_status_collection.insert_one({
+            "project_id": project_id,
+            "job_id": job_id,
+            "user_id": user.user_id,
+            "status": "queued",
+            "queued_at": datetime.utcnow(),
+            "started_at": None,
+            "completed_at": None,
+            "files_total": len(file_data),
+            "files_processed": 0,
+            "chunks_generated": 0,
+            "qa_pairs_generated": 0,
+            "errors": []
+        })
+        await db.run_sync(
+            enqueue_job,
+            job_id=job_id,
+            project_id=project_id,
             user_id=user.user_id,
-            project_id=new_project.project_id,
-            file_processor=file_processor,
-            qa_generator=qa_generator,
-            db=mongo_db
+            request_id=request_id,
+            files=file_data
+        )
+        logger.info(
+            f"Request {request_id}: Enqueued ingestion job {job_id} "
+            f"with {len(file_data)} files"
         )
         
         return JSONResponse(
@@ -272,7 +383,8 @@ async def process_file(
             content={
                 "message": "Project creation started",
                 "project_id": project_id,
-                "status": "processing",
+                "job_id": job_id,
+                "status": "queued",
                 "errors": (file_validation_errors
                           if file_validation_errors else None)
             }
@@ -292,223 +404,226 @@ async def process_file(
         )
 
 
-async def benchmark_creation_background_process(
-    request_id: str,
-    file_data: List[dict],
-    user_id: str,
+@router.post(
+    "/projects/{project_id}/benchmark-files",
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Add files to a benchmark project",
+    description=(
+        "Upload files to an existing benchmark project. Only the new files "
+        "are parsed and QA-generated; the existing benchmark is kept."
+    )
+)
+async def add_benchmark_files(
     project_id: str,
-    file_processor: FileProcessor,
-    qa_generator: QAGenerator,
-    db: AsyncIOMotorClient
+    files: List[UploadFile] = File(...),
+    access_token: Optional[str] = Form(None),
+    x_access_token: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+    mongo_db: AsyncIOMotorClient = Depends(get_mongodb),
 ):
     """
-    Background task to process files and generate QA pairs.
+    Enqueue an ingestion job for files added to an existing benchmark.
+    
+    The job's store step merges the new chunks and QA pairs into the
+    project's documents, so earlier files are not reprocessed and the
+    project's test history is untouched.
     
     Args:
-        request_id: Unique identifier for logging
-        file_data: List of dictionaries with filename and content
-        user_id: User ID
-        project_id: Project ID
-        file_processor: File processor instance
-        qa_generator: QA generator instance
-        db: MongoDB connection
+        project_id: Project to add the files to
+        files: List of uploaded files
+        access_token: User authentication token
+        x_access_token: User authentication token sent as the X-Access-Token
+            header instead, checked by the admission middleware before the
+            body is read
+        db: SQL database session
+        mongo_db: MongoDB connection
+        
+    Returns:
+        JSONResponse with the queued job
     """
+    request_id = str(uuid4())
     logger.info(
-        f"Request {request_id}: Background processing started "
-        f"for project {project_id}"
+        f"Request {request_id}: Add files request received for project {project_id}"
     )
+    if not files:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No files uploaded"
+        )
+    project = await db.run_sync(_get_owned_project, project_id, _upload_token(access_token, x_access_token))
+    
+    # A new version of a file is uploaded after the old one is removed
+    existing_files = await _stored_files(mongo_db, project_id)
+    # a file of a queued or running job would be ingested twice
+    existing_files.update(await db.run_sync(active_job_filenames, project_id))
+    # entries of an archive are stored as "<archive>/<path in archive>"
+    existing_files |= {name.split("/", 1)[0] for name in existing_files}
+    duplicates = sorted({file.filename for file in files} & existing_files)
+    if duplicates:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=(
+                f"Files already in the benchmark or being ingested: {', '.join(duplicates)}. "
+                f"Remove them before uploading a new version."
+            )
+        )
     
-    # Get MongoDB collections
-    chunks_collection = db.chunks_collection
-    qa_collection = db.qa_collection
-    process_status_collection = db.process_status_collection
+    await db.run_sync(check_backlog, project.user_id)
     
-    # Create a status document to track progress
-    status_doc = {
+    job_id = str(uuid4())
+    # the admission middleware holds the user's upload slot of a header token
+    with nullcontext() if x_access_token else get_admission_controller().user_slot(project.user_id):
+        file_data, file_validation_errors = await _spool_files(files, job_id)
+    if not file_data:
+        remove_spool(job_id)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"No valid files to process: {'; '.join(file_validation_errors)}"
+        )
+    
+    await mongo_db.process_status_collection.insert_one({
         "project_id": project_id,
-        "user_id": user_id,
-        "status": "processing",
-        "started_at": datetime.utcnow(),
+        "job_id": job_id,
+        "job_type": "add_files",
+        "user_id": project.user_id,
+        "status": "queued",
+        "queued_at": datetime.utcnow(),
+        "started_at": None,
         "completed_at": None,
         "files_total": len(file_data),
         "files_processed": 0,
         "chunks_generated": 0,
         "qa_pairs_generated": 0,
         "errors": []
-    }
-    
-    # Insert initial status
-    await process_status_collection.insert_one(status_doc)
+    })
+    await db.run_sync(
+        enqueue_job,
+        job_id=job_id,
+        project_id=project_id,
+        user_id=project.user_id,
+        request_id=request_id,
+        files=file_data
+    )
+    logger.info(
+        f"Request {request_id}: Enqueued ingestion job {job_id} adding "
+        f"{len(file_data)} files to project {project_id}"
+    )
     
-    file_chunks = []
-    file_qa_pairs = []
-    processed_files = []
-    error_files = []
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content={
+            "message": "Adding files to benchmark",
+            "project_id": project_id,
+            "job_id": job_id,
+            "status": "queued",
+            "errors": file_validation_errors or None
+        }
+    )
 
-    try:
-        # Process each file
-        for index, file_info in enumerate(file_data):
-            try:
-                logger.info(
-                    f"Request {request_id}: Processing file "
-                    f"{index+1}/{len(file_data)}: {file_info['filename']}"
-                )
-                
-                # Process file into chunks
-                chunks = await file_processor.process_file_content(
-                    content=file_info["content"],
-                    filename=file_info["filename"]
-                )
-                
-                if not chunks:
-                    logger.warning(
-                        f"Request {request_id}: No chunks generated "
-                        f"for file {file_info['filename']}"
-                    )
-                    error_files.append({
-                        "filename": file_info["filename"],
-                        "error": "No content chunks could be extracted"
-                    })
-                    continue
-                    
-                file_chunks.extend(chunks)
-                processed_files.append(file_info["filename"])
-                
-                # Update status
-                await process_status_collection.update_one(
-                    {"project_id": project_id},
-                    {
-                        "$inc": {
-                            "files_processed": 1, 
-                            "chunks_generated": len(chunks)
-                        }
-                    }
-                )
-                
-                # Generate QA pairs for each chunk
-                chunk_qa_pairs = []
-                for chunk in chunks[:2]:
-                    try:
-                        qa_pairs = await qa_generator.generate_qa(
-                            chunk.content
-                        )
-                        chunk_qa_pairs.extend(qa_pairs)
-                    except Exception as e:
-                        logger.error(
-                            f"Request {request_id}: QA generation failed "
-                            f"for chunk in {file_info['filename']}: {str(e)}"
-                        )
-                        continue
-                
-                file_qa_pairs.extend(chunk_qa_pairs)
-                
-                # Update status
-                await process_status_collection.update_one(
-                    {"project_id": project_id},
-                    {"$inc": {"qa_pairs_generated": len(chunk_qa_pairs)}}
-                )
-                
-            except Exception as e:
-                error_message = (
-                    f"Failed to process file {file_info['filename']}: {str(e)}"
-                )
-                logger.error(f"Request {request_id}: {error_message}")
-                error_files.append({
-                    "filename": file_info["filename"],
-                    "error": str(e)
-                })
-                
-                # Update errors in status
-                await process_status_collection.update_one(
-                    {"project_id": project_id},
-                    {"$push": {"errors": error_message}}
-                )
-        
-        # Log summary
-        logger.info(
-            f"Request {request_id}: Generated {len(file_chunks)} chunks and "
-            f"{len(file_qa_pairs)} QA pairs from {len(processed_files)} files"
-        )
-        
-        # Create MongoDB documents
-        if file_chunks:
-            chunk_doc = {
-                "project_id": project_id,
-                "user_id": user_id,
-                "files_processed": processed_files,
-                "chunks": [chunk.model_dump() for chunk in file_chunks],
-                "timestamp": datetime.utcnow()
-            }
-            chunk_doc_result = await chunks_collection.insert_one(chunk_doc)
-            chunk_doc_id = str(chunk_doc_result.inserted_id)
-            logger.info(
-                f"Request {request_id}: Saved chunks to MongoDB, "
-                f"ID: {chunk_doc_id}"
-            )
-        else:
-            chunk_doc_id = None
-            logger.warning(f"Request {request_id}: No chunks to save")
-        
-        if file_qa_pairs:
-            qa_doc = {
-                "project_id": project_id,
-                "user_id": user_id,
-                "files_processed": processed_files,
-                "qa_pairs": [qa.model_dump() for qa in file_qa_pairs],
-                "timestamp": datetime.utcnow()
-            }
-            qa_doc_result = await qa_collection.insert_one(qa_doc)
-            qa_doc_id = str(qa_doc_result.inserted_id)
-            logger.info(
-                f"Request {request_id}: Saved QA pairs to MongoDB, "
-                f"ID: {qa_doc_id}"
-            )
-        else:
-            qa_doc_id = None
-            logger.warning(f"Request {request_id}: No QA pairs to save")
-        
-        # Update final status
-        completion_status = "completed"
-        if error_files and not processed_files:
-            completion_status = "failed"
-        elif error_files:
-            completion_status = "completed_with_errors"
-            
-        await process_status_collection.update_one(
-            {"project_id": project_id},
-            {
-                "$set": {
-                    "status": completion_status,
-                    "completed_at": datetime.utcnow(),
-                    "chunk_doc_id": chunk_doc_id,
-                    "qa_doc_id": qa_doc_id,
-                    "error_files": error_files
-                }
-            }
-        )
+
+@router.delete(
+    "/projects/{project_id}/benchmark-files/{filename:path}",
+    summary="Remove a file from a benchmark project",
+    description="Retire a file's chunks and QA pairs from a benchmark project"
+)
+async def remove_benchmark_file(
+    project_id: str,
+    filename: str,
+    token_data: AccessToken,
+    db: AsyncSession = Depends(get_async_db),
+    mongo_db: AsyncIOMotorClient = Depends(get_mongodb),
+):
+    """
+    Remove exactly the chunks and QA pairs generated from one file.
+    
+    Pairs are matched on their source_file, so pairs of other files and
+    the project's test history are left as they are.
+    
+    Args:
+        project_id: Project to remove the file from
+        filename: Name of the uploaded file to retire
+        token_data: User authentication token
+        db: SQL database session
+        mongo_db: MongoDB connection
         
-        logger.info(
-            f"Request {request_id}: Background processing completed "
-            f"with status: {completion_status}"
+    Returns:
+        Number of chunks and QA pairs removed
+    """
+    await db.run_sync(_get_owned_project, project_id, token_data.access_token)
+    
+    # a running job would write back the file's content when it stores
+    if await db.run_sync(has_active_job, project_id):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="An ingestion job is in progress for this project, retry when it finishes"
         )
-        
-    except Exception as e:
-        logger.error(
-            f"Request {request_id}: Critical error in background processing: "
-            f"{str(e)}\n{traceback.format_exc()}"
+    
+    # an archive name retires every document that came out of it
+    filenames = sorted(
+        name for name in await _stored_files(mongo_db, project_id)
+        if name == filename or name.startswith(f"{filename}/")
+    )
+    if not filenames:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"File {filename} is not part of this benchmark"
         )
-        
-        # Update status to failed
-        await process_status_collection.update_one(
-            {"project_id": project_id},
+    removed_files = set(filenames)
+    qa_doc = await mongo_db.qa_collection.find_one(
+        {"project_id": project_id}, {"qa_pairs.source_file": 1}
+    )
+    qa_removed = sum(
+        1 for qa in (qa_doc or {}).get("qa_pairs", []) if qa.get("source_file") in removed_files
+    )
+    file_chunks_query = {"project_id": project_id, "source_file": {"$in": filenames}}
+    chunks_removed = 0
+    async for chunk_doc in mongo_db.chunks_collection.find(file_chunks_query, {"chunk_count": 1}):
+        chunks_removed += chunk_doc.get("chunk_count", 0)
+    # a project not ingested since chunks are stored per file has one document
+    legacy_chunks_query = {"project_id": project_id, "source_file": {"$exists": False}}
+    legacy_chunk_doc = await mongo_db.chunks_collection.find_one(
+        legacy_chunks_query, {"chunks.metadata.source": 1}
+    )
+    chunks_removed += sum(
+        1 for chunk in (legacy_chunk_doc or {}).get("chunks", [])
+        if chunk.get("metadata", {}).get("source") in removed_files
+    )
+    
+    await mongo_db.qa_collection.update_one(
+        {"project_id": project_id},
+        {
+            "$pull": {
+                "qa_pairs": {"source_file": {"$in": filenames}},
+                "files_processed": {"$in": filenames}
+            },
+            "$set": {"timestamp": datetime.utcnow()}
+        }
+    )
+    await mongo_db.chunks_collection.delete_many(file_chunks_query)
+    if legacy_chunk_doc is not None:
+        await mongo_db.chunks_collection.update_one(
+            legacy_chunks_query,
             {
-                "$set": {
-                    "status": "failed",
-                    "completed_at": datetime.utcnow(),
+                "$pull": {
+                    "chunks": {"metadata.source": {"$in": filenames}},
+                    "files_processed": {"$in": filenames}
                 },
-                "$push": {"errors": f"Critical error: {str(e)}"}
+                "$set": {"timestamp": datetime.utcnow()}
             }
         )
+    logger.info(
+        f"Removed file {filename} from project {project_id}: "
+        f"{chunks_removed} chunks, {qa_removed} QA pairs"
+    )
+    
+    return JSONResponse(content={
+        "status": "ok",
+        "project_id": project_id,
+        "filename": filename,
+        "files_removed": filenames,
+        "chunks_removed": chunks_removed,
+        "qa_pairs_removed": qa_removed
+    })
 
 
 @router.get(
@@ -519,7 +634,7 @@ async def benchmark_creation_background_process(
 async def get_project_status(
     project_id: str,
     access_token: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     mongo_db: AsyncIOMotorClient = Depends(get_mongodb)
 ):
     """
@@ -535,9 +650,9 @@ async def get_project_status(
         Processing status information
     """
     # Validate user authentication
-    user = db.query(Users).filter(
-        Users.verification_token == access_token
-    ).first()
+    user = await db.scalar(
+        select(Users).where(Users.verification_token == access_token)
+    )
     
     if not user or not user.isVerified:
         raise HTTPException(
@@ -546,9 +661,9 @@ async def get_project_status(
         )
     
     # Get project
-    project = db.query(Projects).filter(
-        Projects.project_id == project_id
-    ).first()
+    project = await db.scalar(
+        select(Projects).where(Projects.project_id == project_id)
+    )
     if not project:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -564,7 +679,8 @@ async def get_project_status(
     
     # Get status from MongoDB
     status_doc = await mongo_db.process_status_collection.find_one(
-        {"project_id": project_id}
+        {"project_id": project_id},
+        sort=[("queued_at", -1)]
     )
     if not status_doc:
         raise HTTPException(
@@ -579,24 +695,103 @@ async def get_project_status(
 
 
 
+@router.get(
+    "/project-status/{project_id}/stream",
+    summary="Stream benchmark project processing status",
+    description=(
+        "Server-sent events with the processing status of a project, "
+        "pushed when it changes and closed once processing finishes"
+    )
+)
+async def stream_project_status(
+    project_id: str,
+    access_token: str,
+    db: AsyncSession = Depends(get_async_db),
+    mongo_db: AsyncIOMotorClient = Depends(get_mongodb)
+):
+    """
+    Push status updates of a project's file processing instead of polling.
+    
+    The user is authenticated once per stream. Status documents come from
+    the process-wide ProgressBroker, which reads each watched project once
+    per INGESTION_PROGRESS_POLL_SECONDS however many clients are connected.
+    
+    Args:
+        project_id: Project ID to follow
+        access_token: User authentication token
+        db: SQL database session
+        mongo_db: MongoDB connection
+        
+    Returns:
+        text/event-stream of "progress" events with the status document
+    """
+    await db.run_sync(_get_owned_project, project_id, access_token)
+    # the stream outlives the request's session, release it now
+    await db.close()
+    keepalive = get_settings().INGESTION_PROGRESS_KEEPALIVE_SECONDS
+
+    async def fetch_status(watched_project_id: str):
+        status_doc = await mongo_db.process_status_collection.find_one(
+            {"project_id": watched_project_id},
+            sort=[("queued_at", -1)]
+        )
+        if status_doc:
+            status_doc["_id"] = str(status_doc["_id"])
+        return status_doc
+
+    async def events():
+        async for status_doc in progress_broker.subscribe(
+            project_id, fetch_status, keepalive_seconds=keepalive
+        ):
+            if status_doc is None:
+                # comment line, keeps proxies from closing an idle stream
+                yield ": keepalive\n\n"
+                continue
+            yield f"event: progress\ndata: {json.dumps(status_doc, default=str)}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.get(
     "/qa_data/{project_id}",
     summary="Get paginated QA pairs for a project",
-    description="Get QA pairs with pagination support from SQLite database"
+    description=(
+        "Get a project's tested QA pairs, newest first, from SQLite database. "
+        "Pass next_cursor back as cursor for the next page"
+    )
 )
 async def get_qa_pairs_paginated(
     project_id: str,
-    page: int = 1,
+    page: Optional[int] = None,
     page_size: int = 10,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    difficulty: Optional[str] = None,
+    outcome: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get paginated QA pairs for a benchmark project from SQLite database.
     
+    Pages are ordered by (last_test_conducted, test_id), newest first.
+    Cursor pages cost the same at any depth and do not skip or repeat rows
+    while the monitor inserts results; page numbers still work but get
+    slower the deeper the page.
+    
     Args:
         project_id: Project ID to get QA pairs for
-        page: Page number (starts from 1)
+        page: Page number (starts from 1), instead of a cursor
         page_size: Number of QA pairs per page (default: 10, max: 100)
+        cursor: next_cursor of the previous page, omitted for the first page
+        difficulty: Only QA pairs of this difficulty level
+        outcome: "pass" or "fail", only results with that outcome
+        since: Only results tested at or after this time (UTC)
+        until: Only results tested before this time (UTC)
         db: SQLite database session
         
     Returns:
@@ -607,18 +802,30 @@ async def get_qa_pairs_paginated(
     """
     try:
         # Validate pagination parameters
-        if page < 1:
+        if page is not None and page < 1:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Page number must be greater than 0"
             )
         
+        if page is not None and cursor:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Use either page or cursor, not both"
+            )
+        
         if page_size < 1 or page_size > 100:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Page size must be between 1 and 100"
             )
         
+        if outcome is not None and outcome not in ("pass", "fail"):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail='outcome must be "pass" or "fail"'
+            )
+        
         # Validate project_id is not empty
         if not project_id or not project_id.strip():
             raise HTTPException(
@@ -626,11 +833,27 @@ async def get_qa_pairs_paginated(
                 detail="Project ID cannot be empty"
             )
         
-        # Get total count of QA pairs for the project
+        filters = ResultFilters(
+            difficulty=difficulty,
+            outcome=outcome,
+            since=_naive_utc(since),
+            until=_naive_utc(until)
+        )
+        
+        # Total from the project's rollup, less the results compacted by
+        # retention; filtered totals are counted once per QA_DATA_COUNT_CACHE_SECONDS.
+        # Rollups are backfilled by the migration and python -m modules.monitor.rollups,
+        # a project still without one is counted rather than rebuilt here
         try:
-            total_qa_pairs = db.query(TestInfo).filter(
-                TestInfo.project_id == project_id
-            ).count()
+            rollup = await db.get(ProjectScoreRollup, project_id)
+            project_total = (
+                rollup.tests_total - rollup.tests_compacted if rollup
+                else await db.run_sync(qa_count_cache.count, project_id, ResultFilters())
+            )
+            total_qa_pairs = (
+                project_total if filters.is_empty() or not project_total
+                else await db.run_sync(qa_count_cache.count, project_id, filters)
+            )
         except Exception as e:
             logger.error(f"Error counting QA pairs for project {project_id}: {str(e)}")
             raise HTTPException(
@@ -639,7 +862,7 @@ async def get_qa_pairs_paginated(
             )
         
         # Check if project has any QA pairs
-        if total_qa_pairs == 0:
+        if project_total == 0:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="No QA pairs found for this project"
@@ -649,20 +872,27 @@ async def get_qa_pairs_paginated(
         total_pages = (total_qa_pairs + page_size - 1) // page_size
         
         # Check if page is out of range
-        if page > total_pages:
+        if page is not None and page > max(total_pages, 1):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Page {page} not found. Total pages available: {total_pages}"
             )
         
-        # Calculate offset for pagination
-        offset = (page - 1) * page_size
-        
-        # Get paginated QA pairs from database
+        # Get the page from database
         try:
-            qa_pairs_query = db.query(TestInfo).filter(
-                TestInfo.project_id == project_id
-            ).offset(offset).limit(page_size).all()
+            qa_pairs_query, next_cursor = await db.run_sync(
+                fetch_page,
+                project_id,
+                page_size,
+                filters,
+                cursor=cursor,
+                offset=(page - 1) * page_size if page else 0
+            )
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
         except Exception as e:
             logger.error(f"Error fetching QA pairs for project {project_id}: {str(e)}")
             raise HTTPException(
@@ -675,10 +905,13 @@ async def get_qa_pairs_paginated(
         try:
             for qa_record in qa_pairs_query:
                 qa_pair = {
+                    "test_id": qa_record.test_id,
                     "question": qa_record.question.decode("utf-8") if isinstance(qa_record.question, bytes) else qa_record.question,
                     "student_answer": qa_record.student_answer.decode("utf-8") if isinstance(qa_record.student_answer, bytes) else qa_record.student_answer,
                     "difficulty_level": qa_record.difficulty_level,
-                    "factual_answer": qa_record.factual_answer.decode("utf-8") if isinstance(qa_record.factual_answer, bytes) else qa_record.factual_answer
+                    "factual_answer": qa_record.factual_answer.decode("utf-8") if isinstance(qa_record.factual_answer, bytes) else qa_record.factual_answer,
+                    "passed": qa_record.test_status == "1",
+                    "last_test_conducted": qa_record.last_test_conducted.isoformat()
                 }
                 serializable_qa_pairs.append(qa_pair)
         except Exception as e:
@@ -689,22 +922,27 @@ async def get_qa_pairs_paginated(
             )
         
         # Calculate pagination flags
-        has_next = page < total_pages
-        has_previous = page > 1
+        has_next = next_cursor is not None
         
         # Prepare response data
-        response_data = {
-            "qa_pairs": serializable_qa_pairs,
-            "pagination": {
+        pagination = {
+            "page_size": page_size,
+            "total_qa_pairs": total_qa_pairs,
+            "total_pages": total_pages,
+            "has_next": has_next,
+            "next_cursor": next_cursor
+        }
+        if page is not None:
+            has_previous = page > 1
+            pagination.update({
                 "current_page": page,
-                "page_size": page_size,
-                "total_qa_pairs": total_qa_pairs,
-                "total_pages": total_pages,
-                "has_next": has_next,
                 "has_previous": has_previous,
                 "next_page": page + 1 if has_next else None,
                 "previous_page": page - 1 if has_previous else None
-            }
+            })
+        response_data = {
+            "qa_pairs": serializable_qa_pairs,
+            "pagination": pagination
         }
         
         return JSONResponse(
@@ -724,10 +962,93 @@ async def get_qa_pairs_paginated(
         )
 
 
+@router.get(
+    "/export-results",
+    summary="Export test results",
+    description=(
+        "Stream a project's test results, or all of the user's, as Parquet, "
+        "Arrow IPC stream or NDJSON"
+    )
+)
+def export_test_results(
+    access_token: str,
+    project_id: Optional[str] = None,
+    export_format: str = Query("parquet", alias="format"),
+    difficulty: Optional[str] = None,
+    outcome: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Bulk export of TestInfo rows with their QA pair texts.
+    
+    Rows are read EXPORT_BATCH_ROWS at a time from a streamed cursor and
+    each batch is sent once encoded, so any number of rows is exported in
+    constant memory. A plain def: the handler and the stream both run in
+    the threadpool, off the event loop.
+    
+    Args:
+        access_token: User authentication token
+        project_id: Project to export, all of the user's projects when omitted
+        export_format: parquet, arrow or ndjson, the "format" query parameter
+        difficulty: Only results of this difficulty level
+        outcome: "pass" or "fail", only results with that outcome
+        since: Only results tested at or after this time (UTC)
+        until: Only results tested before this time (UTC)
+        db: SQL database session
+        
+    Returns:
+        Streamed file in the requested format
+    """
+    from modules.monitor.export import EXPORT_FORMATS, export_results
+
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"format must be one of: {', '.join(EXPORT_FORMATS)}"
+        )
+    if outcome is not None and outcome not in ("pass", "fail"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail='outcome must be "pass" or "fail"'
+        )
+    if project_id is not None:
+        user_id = _get_owned_project(db, project_id, access_token).user_id
+    else:
+        user = db.query(Users).filter(Users.verification_token == access_token).first()
+        if not user or not user.isVerified:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid token or unauthorized user"
+            )
+        user_id = user.user_id
+    filters = ResultFilters(
+        difficulty=difficulty,
+        outcome=outcome,
+        since=_naive_utc(since),
+        until=_naive_utc(until)
+    )
+    engine = db.get_bind()
+    # the stream reads on its own connection, release the request's session now
+    db.close()
+
+    media_type, extension = EXPORT_FORMATS[export_format]
+    chunks = export_results(
+        engine, export_format, project_id=project_id, user_id=None if project_id else user_id, filters=filters
+    )
+    logger.info(f"Exporting results of {'project ' + project_id if project_id else 'user ' + user_id} as {export_format}")
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="results-{project_id or user_id}.{extension}"'}
+    )
+
+
 @router.get("/get-dashboard-data/{project_id}")
 async def get_dash_board_data(
     project_id: str,
-    db: Session = Depends(get_db)):
+    db: AsyncSession = Depends(get_async_db)):
     """
     Returns dashboard data for a given project_id.
     { 
@@ -735,59 +1056,248 @@ async def get_dash_board_data(
         "last_run": ...,  # latest test time for project_id from test_info
         "bench_mark_data_title": ...,  # project name from projects table
         "avg_hallucination_score": ...,  # see logic below
-        "avg_helpfulness": ...  # see logic below
+        "avg_helpfulness": ...,  # see logic below
+        "tests_total": ...,  # results recorded for the project
+        "pass_rate": ...  # share of results with test_status "1"
       }
     }
     """
-    from modules.monitor.models import TestInfo
     from modules.project_connections.models import Projects
-    from sqlalchemy import desc
 
     # Get project info
-    project = db.query(Projects).filter(Projects.project_id == project_id).first()
+    project = await db.scalar(select(Projects).where(Projects.project_id == project_id))
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
-    # Get all test_info records for this project
-    test_records = db.query(TestInfo).filter(TestInfo.project_id == project_id).order_by(desc(TestInfo.last_test_conducted)).all()
+    # Scores are read from the project's rollup, kept up to date as results are added
+    rollup = await db.run_sync(get_rollup, project_id)
 
     # last_run: latest test time
-    last_run = test_records[0].last_test_conducted.isoformat() if test_records else None
+    last_run = (
+        rollup.last_test_conducted.isoformat()
+        if rollup and rollup.last_test_conducted else None
+    )
 
     # bench_mark_data_title: project name
     bench_mark_data_title = project.project_name
 
-    # avg_hallucination_score: 0 means hallucination, 1 means no hallucination
-    # If hallucination_score is 0, add 1 to hallucination count (means hallucination occurred)
-    # If hallucination_score is 1, add 0 (means no hallucination)
-    hallucination_sum = 0
-    hallucination_count = 0
-    for t in test_records:
-        if t.hallucination_score is not None:
-            if t.hallucination_score == 0:
-                hallucination_sum += 1
-            # else: add 0
-            hallucination_count += 1
-    avg_hallucination_score = (hallucination_sum / hallucination_count) if hallucination_count > 0 else None
-
-    # avg_helpfulness: if 0 means not helpful, add 0; if 1 or other, add that value
-    helpfulness_sum = 0
-    helpfulness_count = 0
-    for t in test_records:
-        if t.helpfullness_score is not None:
-            if t.helpfullness_score == 0:
-                helpfulness_sum += 0
-            else:
-                helpfulness_sum += t.helpfullness_score
-            helpfulness_count += 1
-    avg_helpfulness = (helpfulness_sum / helpfulness_count) if helpfulness_count > 0 else None
+    # avg_hallucination_score: share of scored results with hallucination_score 0
+    # (0 means hallucination, 1 means no hallucination)
+    avg_hallucination_score = (
+        rollup.hallucinations / rollup.hallucination_scored
+        if rollup and rollup.hallucination_scored else None
+    )
+
+    # avg_helpfulness: mean of the helpfulness scores
+    avg_helpfulness = (
+        rollup.helpfulness_sum / rollup.helpfulness_scored
+        if rollup and rollup.helpfulness_scored else None
+    )
 
     return JSONResponse(content={
         "data": {
             "last_run": last_run,
             "bench_mark_data_title": bench_mark_data_title,
             "avg_hallucination_score": round(avg_hallucination_score, 4) if avg_hallucination_score is not None else None,
-            "avg_helpfulness": avg_helpfulness
+            "avg_helpfulness": avg_helpfulness,
+            "tests_total": rollup.tests_total if rollup else 0,
+            "pass_rate": (
+                round(rollup.tests_passed / rollup.tests_total, 4)
+                if rollup and rollup.tests_total else None
+            )
         }
     })
-    
\ No newline at end of file
+    
+
+@router.get(
+    "/score-history/{project_id}",
+    summary="Get a project's scores over time",
+    description=(
+        "Hallucination, helpfulness, pass rate and target latency of a project "
+        "per hour, day or week, downsampled for long windows"
+    )
+)
+async def get_score_history(
+    project_id: str,
+    access_token: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    bucket: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Score history of a project from the pre-aggregated score buckets.
+    
+    Args:
+        project_id: Project ID
+        access_token: User authentication token
+        start: Window start (UTC), defaults to 30 days before end
+        end: Window end (UTC), defaults to now
+        bucket: hour, day or week; picked from the window when omitted and
+            coarsened when the window would exceed SCORE_HISTORY_MAX_POINTS
+        db: SQL database session
+        
+    Returns:
+        JSON response with the granularity used and one point per bucket
+        that has results
+    """
+    from modules.monitor.history import GRANULARITIES, score_history
+
+    if bucket is not None and bucket not in GRANULARITIES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"bucket must be one of: {', '.join(GRANULARITIES)}"
+        )
+    # stored timestamps are naive UTC
+    end = _naive_utc(end)
+    start = _naive_utc(start)
+    end = end or datetime.utcnow()
+    start = start or end - timedelta(days=30)
+    if start >= end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start must be before end"
+        )
+
+    project = await db.run_sync(_get_owned_project, project_id, access_token)
+    history = await db.run_sync(
+        score_history, project_id, start, end, bucket, get_settings().SCORE_HISTORY_MAX_POINTS,
+        compacted_before=project.results_compacted_before
+    )
+    return JSONResponse(content={
+        "project_id": project_id,
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        **history
+    })
+
+
+@router.get(
+    "/latency-percentiles/{project_id}",
+    summary="Get a project's target latency percentiles over a window",
+    description=(
+        "Target latency quantiles of a project over any window, merged from "
+        "the latency sketches of its score buckets, within 1% of the exact values"
+    )
+)
+async def get_latency_percentiles(
+    project_id: str,
+    access_token: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    quantiles: str = "0.5,0.95,0.99",
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Latency percentiles of a project from the score buckets' sketches.
+    
+    Args:
+        project_id: Project ID
+        access_token: User authentication token
+        start: Window start (UTC), defaults to 30 days before end; rounded
+            down to the hour, or to the day before the compaction watermark
+        end: Window end (UTC), defaults to now
+        quantiles: Comma separated quantiles between 0 and 1
+        db: SQL database session
+        
+    Returns:
+        JSON response with the number of latencies and the value of each
+        quantile, null when the window has none
+    """
+    from modules.monitor.history import latency_percentiles
+
+    try:
+        requested = [float(q) for q in quantiles.split(",")]
+    except ValueError:
+        requested = []
+    if not requested or len(requested) > 20 or not all(0 <= q <= 1 for q in requested):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="quantiles must be up to 20 comma separated numbers between 0 and 1"
+        )
+    # stored timestamps are naive UTC
+    end = _naive_utc(end)
+    start = _naive_utc(start)
+    end = end or datetime.utcnow()
+    start = start or end - timedelta(days=30)
+    if start >= end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start must be before end"
+        )
+
+    project = await db.run_sync(_get_owned_project, project_id, access_token)
+    percentiles = await db.run_sync(
+        latency_percentiles, project_id, start, end, requested,
+        compacted_before=project.results_compacted_before
+    )
+    return JSONResponse(content={
+        "project_id": project_id,
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        **percentiles
+    })
+
+@router.get(
+    "/regression-events/{project_id}",
+    summary="Get a project's detected score shifts",
+    description=(
+        "Shifts of a project's hallucination, helpfulness and target latency "
+        "found by change-point detection as results are written, newest first"
+    )
+)
+async def get_regression_events(
+    project_id: str,
+    access_token: str,
+    since: Optional[datetime] = None,
+    metric: Optional[str] = None,
+    limit: int = 100,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Regression events of a project.
+    
+    Args:
+        project_id: Project ID
+        access_token: User authentication token
+        since: Only events detected at or after this time (UTC)
+        metric: hallucination, helpfulness or latency_ms
+        limit: Maximum number of events, 1 to 1000
+        db: SQL database session
+        
+    Returns:
+        JSON response with the events; direction is worse for a
+        regression and better for an improvement
+    """
+    from modules.monitor.detection import METRICS, recent_events
+
+    if metric is not None and metric not in METRICS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"metric must be one of: {', '.join(METRICS)}"
+        )
+    if not 1 <= limit <= 1000:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="limit must be between 1 and 1000"
+        )
+    since = _naive_utc(since)
+
+    await db.run_sync(_get_owned_project, project_id, access_token)
+    events = await db.run_sync(recent_events, project_id, since=since, metric=metric, limit=limit)
+    return JSONResponse(content={
+        "project_id": project_id,
+        "events": [
+            {
+                "metric": event.metric,
+                "direction": event.direction,
+                "detected_at": event.detected_at.isoformat(),
+                "baseline_mean": event.baseline_mean,
+                "baseline_std": event.baseline_std,
+                "shifted_mean": event.shifted_mean,
+                "statistic": event.statistic,
+                "run_length": event.run_length,
+            }
+            for event in events
+        ]
+    })
@@ -1,4 +1,6 @@
+import asyncio
 import json
+import time
 import uuid
 from core.database import SessionLocal, get_mongodb
 from datetime import datetime
@@ -8,9 +10,11 @@ from langchain_anthropic import ChatAnthropic
 from motor.motor_asyncio import AsyncIOMotorClient
 from core.config import Settings, get_settings
 from langchain_core.messages import SystemMessage, HumanMessage
+from modules.benchmark.project_config import ProjectConfig, masked_headers
 from modules.benchmark.qa_pair import QAPair
 import requests
 from modules.monitor.models import TestInfo
+from modules.monitor.writer import get_result_writer
 from modules.project_connections.models import Projects
 from sqlalchemy.orm import Session
 from sqlalchemy import select
@@ -68,15 +72,22 @@ class TestRunner:
     def __init__(self, project_id):
         """Regular constructor - no async operations here"""
         self.project_id = project_id
-        self.db = SessionLocal()
+        # project configuration, loaded once per run by run()
+        self.config = None
         # Initialize these to None - they'll be set up in run()
         self.mongo_db = None
         self.qa_collection = None
         self.test_collection = None
+        # time the target endpoint took for the last get_student_answer call
+        self.last_response_latency_ms = None
     
-    def _fetch_payload_info_by_project_id(self):
-        """Fetch project info from SQL database"""
-        return self.db.query(Projects).filter(Projects.project_id==self.project_id).first()
+    def _load_project_config(self):
+        """Load the project's configuration from the SQL database, with a short-lived session"""
+        with SessionLocal() as db:
+            project = db.get(Projects, self.project_id)
+            if project is None:
+                return None
+            return ProjectConfig.from_project(project)
 
     async def run(self):
         """Run all tests for project"""
@@ -101,6 +112,8 @@ class TestRunner:
             qa_pairs = qa_doc.get("qa_pairs", [])
             qa_pairs = [QAPair(**qa) for qa in qa_pairs]
             user_id = qa_doc.get("user_id")
+            # the same configuration serves every QA pair of the run
+            self.config = self._load_project_config()
             # Run tests
             results = []
             for qa in qa_pairs:
@@ -110,56 +123,48 @@ class TestRunner:
                 if student_answer:
                     hallucination = await self._run_test_for_hallucinations(qa,student_answer)
                     helpfulness = await self._run_test_for_helpfullness(qa,student_answer)
-                    results.append({"question":qa.question,"student_answer":student_answer,"hallucination":hallucination,"helpfulness":helpfulness,"factual_answer":qa.answer,"difficulty_level":qa.difficulty_level})
-            self.add_results(results, user_id)
+                    results.append({"question":qa.question,"student_answer":student_answer,"hallucination":hallucination,"helpfulness":helpfulness,"factual_answer":qa.answer,"difficulty_level":qa.difficulty_level,"response_latency_ms":self.last_response_latency_ms})
+            # waits for the result writer's commit off the event loop, so
+            # runners finishing together share a transaction
+            await asyncio.to_thread(self.add_results, results, user_id)
             print(f"Results added for project {self.project_id}")
             logger.info(f"Results added for project {self.project_id}")
 
         except Exception as e:
             logger.error(f"Error in TestRunner.run: {str(e)}")
             raise
-        finally:
-            if self.db:
-                self.db.close()
     
         
     async def get_student_answer(self, qa_pair=None):
         """Get student answer from MongoDB"""
-        get_payload_info = self._fetch_payload_info_by_project_id()
+        if self.config is None:
+            self.config = self._load_project_config()
+        config = self.config
         
-        # Check if get_payload_info exists
-        if get_payload_info is None:
+        # Check if the project exists
+        if config is None:
             logger.error(f"No payload information found for project {self.project_id}")
             return None
             
-        # Convert project data to a payload configuration
         student_answer = None
-        
-        # Default to POST if payload_method is None
-        payload_method = get_payload_info.payload_method
-        if payload_method is None:
-            payload_method = "post"
-            logger.warning(f"No payload_method specified for project {self.project_id}, defaulting to POST")
-            
-        payload_config = {
-            "target_url": get_payload_info.target_url,
-            "end_point": get_payload_info.end_point,
-            "payload_method": payload_method,
-            "body": get_payload_info.payload_body,
-            "headers": {"Content-Type": "application/json"}
-        }
+        self.last_response_latency_ms = None
         
         # Check for other required fields
-        if not get_payload_info.target_url or not get_payload_info.end_point:
+        if not config.is_complete():
             logger.error(f"Missing target_url or end_point for project {self.project_id}")
             return None
             
         try:
-            print("Payload config being sent:", payload_config)
-            prepare_payload = await self.prepare_payload(str(payload_config.get("body")), user_query=qa_pair.question)
+            prepare_payload = await self.prepare_payload(config.payload_template, user_query=qa_pair.question)
             logger.info(f"final prepared payload: {prepare_payload}")
-            payload_config["body"] = prepare_payload
+            payload_config = config.payload_config(prepare_payload)
+            logger.info(
+                f"Sending payload to {payload_config['target_url']}{payload_config['end_point']} "
+                f"with headers {masked_headers(payload_config['headers'])}"
+            )
+            request_started = time.perf_counter()
             test_response = await trigger_payload(payload_config)
+            self.last_response_latency_ms = (time.perf_counter() - request_started) * 1000
             
             if test_response[0]:
                 student_answer = test_response[1]
@@ -222,7 +227,6 @@ class TestRunner:
         return helpfulness.get("Helpful")
     
     def add_results(self, results, user_id):
-        db = SessionLocal()
         try:
             test_info_objects = [
                 TestInfo(
@@ -236,19 +240,17 @@ class TestRunner:
                     last_test_conducted=datetime.utcnow(),
                     test_status=str(1 if result["hallucination"] < 0.5 and result["helpfulness"] > 0.5 else 0),
                     factual_answer = result["factual_answer"],
-                    difficulty_level = result["difficulty_level"]
+                    difficulty_level = result["difficulty_level"],
+                    response_latency_ms = result.get("response_latency_ms")
                 )
                 for result in results
             ]
-            db.add_all(test_info_objects)
-            db.commit()
+            # the dashboard rollup and score buckets are committed with the results
+            get_result_writer().write(self.project_id, test_info_objects)
             print("Committed test_info_objects:", test_info_objects)
         except Exception as e:
-            db.rollback()
             logger.error(f"Error adding test results: {str(e)}")
             raise
-        finally:
-            db.close()
 
 async def trigger_payload(payload_config):
     """Test payload
@@ -0,0 +1,254 @@
+import asyncio
+import json
+import math
+import re
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from datetime import datetime, timedelta
+from typing import Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from core.config import get_settings
+from core.database import AsyncSessionLocal
+from core.logger import logger
+from modules.Auth.models import Users
+from modules.ingestion.models import IngestionJob
+
+# upload endpoints guarded by the admission middleware
+UPLOAD_PATHS = re.compile(r"^/api/v1/(process-file|projects/[^/]+/benchmark-files)/?$")
+# header carrying an upload's access token, readable before the body
+ACCESS_TOKEN_HEADER = b"x-access-token"
+
+
+class AdmissionRejected(Exception):
+    """Raised when an upload cannot be admitted; carries the Retry-After hint."""
+
+    def __init__(self, detail: str, retry_after: int):
+        super().__init__(detail)
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+def too_many_requests(detail: str, retry_after: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail=detail,
+        headers={"Retry-After": str(retry_after)}
+    )
+
+
+class AdmissionController:
+    """
+    Limits how many ingestion uploads the API process handles at once.
+
+    At most max_active uploads are spooled concurrently; up to max_waiting
+    more wait at most wait_seconds for a slot, anything beyond is rejected
+    right away. Each user may have max_per_user uploads in flight. The
+    counters are exposed as metrics on the queue status endpoint.
+    """
+
+    def __init__(
+        self,
+        max_active: int,
+        max_waiting: int,
+        wait_seconds: float,
+        max_per_user: int,
+        retry_after: int
+    ):
+        self.max_active = max_active
+        self.max_waiting = max_waiting
+        self.wait_seconds = wait_seconds
+        self.max_per_user = max_per_user
+        self.retry_after = retry_after
+        self._slots = asyncio.Semaphore(max_active)
+        self.active = 0
+        self.waiting = 0
+        self.admitted_total = 0
+        self.rejected_total = 0
+        self._per_user = Counter()
+
+    async def acquire(self) -> None:
+        """Wait for an upload slot; raises AdmissionRejected when none frees up in time."""
+        if self.active >= self.max_active and self.waiting >= self.max_waiting:
+            self.rejected_total += 1
+            raise AdmissionRejected("Too many ingestion uploads in progress", self.retry_after)
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.wait_seconds)
+        except asyncio.TimeoutError:
+            self.rejected_total += 1
+            raise AdmissionRejected("Timed out waiting for an ingestion upload slot", self.retry_after)
+        finally:
+            self.waiting -= 1
+        self.active += 1
+        self.admitted_total += 1
+
+    def release(self) -> None:
+        self.active -= 1
+        self._slots.release()
+
+    @contextmanager
+    def user_slot(self, user_id: str):
+        """Hold one of the user's concurrent upload slots; raises HTTP 429 when they are all taken."""
+        if self._per_user[user_id] >= self.max_per_user:
+            self.rejected_total += 1
+            raise too_many_requests(
+                f"At most {self.max_per_user} uploads per user can run at once",
+                self.retry_after
+            )
+        self._per_user[user_id] += 1
+        try:
+            yield
+        finally:
+            self._per_user[user_id] -= 1
+            if not self._per_user[user_id]:
+                del self._per_user[user_id]
+
+    def metrics(self) -> dict:
+        return {
+            "active_uploads": self.active,
+            "waiting_uploads": self.waiting,
+            "max_active_uploads": self.max_active,
+            "max_waiting_uploads": self.max_waiting,
+            "users_uploading": len(self._per_user),
+            "admitted_total": self.admitted_total,
+            "rejected_total": self.rejected_total
+        }
+
+
+_controller: Optional[AdmissionController] = None
+
+
+def get_admission_controller() -> AdmissionController:
+    global _controller
+    if _controller is None:
+        settings = get_settings()
+        _controller = AdmissionController(
+            max_active=settings.INGESTION_MAX_CONCURRENT_UPLOADS,
+            max_waiting=settings.INGESTION_UPLOAD_QUEUE_SIZE,
+            wait_seconds=settings.INGESTION_UPLOAD_WAIT_SECONDS,
+            max_per_user=settings.INGESTION_MAX_UPLOADS_PER_USER,
+            retry_after=settings.INGESTION_RETRY_AFTER_SECONDS
+        )
+    return _controller
+
+
+async def verified_user_id(access_token: str) -> Optional[str]:
+    """The user an access token belongs to, None for an unknown token or unverified user."""
+    async with AsyncSessionLocal() as db:
+        user = await db.scalar(select(Users).where(Users.verification_token == access_token))
+    return user.user_id if user is not None and user.isVerified else None
+
+
+class AdmissionMiddleware:
+    """
+    ASGI middleware taking an upload slot and one of the user's upload
+    slots before the request body is read, so rejected uploads cost neither
+    memory nor disk. The user is known from the X-Access-Token header; an
+    upload passing its token as a form field only takes the upload slot
+    here, the route takes its user slot once the body is parsed.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "POST"
+            or not UPLOAD_PATHS.match(scope["path"])
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        # the token is checked first, unknown users never hold an upload slot
+        access_token = dict(scope.get("headers", [])).get(ACCESS_TOKEN_HEADER)
+        user_id = await verified_user_id(access_token.decode("latin-1")) if access_token else None
+        if access_token and user_id is None:
+            await self._reject(send, status.HTTP_401_UNAUTHORIZED, "Invalid token or unauthorized user")
+            return
+
+        controller = get_admission_controller()
+        try:
+            await controller.acquire()
+        except AdmissionRejected as e:
+            logger.warning(f"Rejected ingestion upload {scope['path']}: {e.detail}")
+            await self._reject(send, status.HTTP_429_TOO_MANY_REQUESTS, e.detail, {"Retry-After": str(e.retry_after)})
+            return
+        try:
+            with ExitStack() as stack:
+                if user_id is not None:
+                    try:
+                        stack.enter_context(controller.user_slot(user_id))
+                    except HTTPException as e:
+                        logger.warning(f"Rejected ingestion upload {scope['path']} of user {user_id}: {e.detail}")
+                        await self._reject(send, e.status_code, e.detail, e.headers)
+                        return
+                await self.app(scope, receive, send)
+        finally:
+            controller.release()
+
+    @staticmethod
+    async def _reject(send, status_code: int, detail: str, headers: Optional[dict] = None) -> None:
+        body = json.dumps({"detail": detail}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode())
+            ] + [(name.lower().encode(), value.encode()) for name, value in (headers or {}).items()]
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+def estimate_retry_after(db: Session, jobs_ahead: int) -> int:
+    """
+    Seconds until the workers can be expected to have worked off jobs_ahead
+    jobs, from the average duration of jobs finished in the last hour.
+    """
+    settings = get_settings()
+    since = datetime.utcnow() - timedelta(hours=1)
+    durations = [
+        (finished - started).total_seconds()
+        for started, finished in db.query(IngestionJob.started_at, IngestionJob.finished_at).filter(
+            IngestionJob.finished_at >= since,
+            IngestionJob.started_at.isnot(None)
+        ).all()
+    ]
+    average = sum(durations) / len(durations) if durations else settings.INGESTION_RETRY_AFTER_SECONDS
+    workers = max(settings.INGESTION_WORKERS, 1)
+    estimate = average * math.ceil(max(jobs_ahead, 1) / workers)
+    return int(min(max(estimate, settings.INGESTION_RETRY_AFTER_SECONDS), 900))
+
+
+def check_backlog(db: Session, user_id: str) -> None:
+    """
+    Refuse new ingestion jobs while the queue or the user's own backlog is
+    full, so uploads are not accepted faster than the workers drain them.
+
+    Raises:
+        HTTPException: 429 with a Retry-After estimate
+    """
+    settings = get_settings()
+    queued = db.query(func.count(IngestionJob.job_id)).filter(
+        IngestionJob.status == "queued"
+    ).scalar()
+    if queued >= settings.INGESTION_MAX_QUEUED_JOBS:
+        raise too_many_requests(
+            "The ingestion queue is full, retry later",
+            estimate_retry_after(db, queued - settings.INGESTION_MAX_QUEUED_JOBS + 1)
+        )
+    user_active = db.query(func.count(IngestionJob.job_id)).filter(
+        IngestionJob.user_id == user_id,
+        IngestionJob.status.in_(["queued", "running"])
+    ).scalar()
+    if user_active >= settings.INGESTION_MAX_ACTIVE_JOBS_PER_USER:
+        raise too_many_requests(
+            f"At most {settings.INGESTION_MAX_ACTIVE_JOBS_PER_USER} ingestion jobs "
+            f"per user can be queued or running",
+            estimate_retry_after(db, queued + 1)
+        )
@@ -0,0 +1,152 @@
+import os
+import posixpath
+import tarfile
+import zipfile
+from typing import BinaryIO, Iterator, Optional
+
+from pydantic import BaseModel
+
+COPY_BLOCK_SIZE = 1024 * 1024  # 1 MB
+ARCHIVE_SUFFIXES = (".zip", ".tar.gz", ".tgz")
+DOCUMENT_EXTENSIONS = (".pdf", ".txt", ".md", ".docx")
+
+
+class ArchiveLimitError(Exception):
+    """Raised when an archive exceeds a decompression limit; the archive is rejected."""
+
+
+class ArchiveLimits(BaseModel):
+    max_entries: int = 5000
+    max_entry_bytes: int = 20 * 1024 * 1024
+    max_total_bytes: int = 1024 * 1024 * 1024
+    max_ratio: float = 100.0  # uncompressed / compressed bytes
+
+
+class ArchiveEntry(BaseModel):
+    name: str  # path inside the archive
+    path: Optional[str]  # extracted file, None when the entry was rejected
+    size_bytes: int
+    error: Optional[str] = None
+
+
+def is_archive(filename: str) -> bool:
+    return filename.lower().endswith(ARCHIVE_SUFFIXES)
+
+
+def _is_clutter(name: str) -> bool:
+    """macOS resource forks and hidden files, skipped without reporting an error."""
+    parts = name.split("/")
+    return "__MACOSX" in parts or any(part.startswith(".") and part not in (".", "..") for part in parts)
+
+
+def _sniff_error(extension: str, head: bytes) -> Optional[str]:
+    """Reject entries whose content does not match their extension."""
+    if extension == ".pdf" and not head.startswith(b"%PDF"):
+        return "not a PDF file"
+    if extension == ".docx" and not head.startswith(b"PK\x03\x04"):
+        return "not a docx file"
+    if extension in (".txt", ".md") and b"\x00" in head and not head.startswith((b"\xff\xfe", b"\xfe\xff")):
+        return "binary content in a text file"
+    return None
+
+
+class _Budget:
+    """Uncompressed bytes written so far, checked against the limits while copying."""
+
+    def __init__(self, limits: ArchiveLimits, archive_bytes: int):
+        self.limits = limits
+        self.archive_bytes = max(archive_bytes, 1)
+        self.total = 0
+
+    def check_total(self):
+        if self.total > self.limits.max_total_bytes:
+            raise ArchiveLimitError(
+                f"Archive expands to more than {self.limits.max_total_bytes} bytes"
+            )
+        if self.total / self.archive_bytes > self.limits.max_ratio:
+            raise ArchiveLimitError(
+                f"Archive compression ratio exceeds {self.limits.max_ratio:.0f}:1"
+            )
+
+
+def _copy_entry(source: BinaryIO, path: str, budget: _Budget, compressed_size: Optional[int]):
+    """
+    Stream one entry to disk. Returns (size, error); oversized entries are
+    removed and reported, archive-wide limits raise ArchiveLimitError.
+    """
+    limits = budget.limits
+    size = 0
+    head = source.read(8)
+    error = _sniff_error(os.path.splitext(path)[1].lower(), head)
+    if error:
+        return 0, error
+    with open(path, "wb") as out:
+        block = head
+        while block:
+            size += len(block)
+            budget.total += len(block)
+            if size > limits.max_entry_bytes:
+                break
+            if compressed_size and size / max(compressed_size, 1) > limits.max_ratio:
+                out.close()
+                os.unlink(path)
+                raise ArchiveLimitError(
+                    f"Entry compression ratio exceeds {limits.max_ratio:.0f}:1"
+                )
+            budget.check_total()
+            out.write(block)
+            block = source.read(COPY_BLOCK_SIZE)
+    if size > limits.max_entry_bytes:
+        os.unlink(path)
+        return 0, f"exceeds maximum size of {limits.max_entry_bytes // (1024 * 1024)}MB"
+    return size, None
+
+
+def _members(archive_path: str):
+    """(name, compressed size or None, file object opener) of the regular file entries."""
+    if archive_path.lower().endswith(".zip"):
+        with zipfile.ZipFile(archive_path) as archive:
+            for info in archive.infolist():
+                if info.is_dir():
+                    continue
+                yield info.filename, info.compress_size, lambda info=info: archive.open(info)
+    else:
+        # "r|gz" reads the tar sequentially, the archive is never seeked or loaded whole
+        with tarfile.open(archive_path, mode="r|gz") as archive:
+            for member in archive:
+                if not member.isfile():
+                    # directories, links and devices are never extracted
+                    continue
+                yield member.name, None, lambda member=member: archive.extractfile(member)
+
+
+def expand_archive(archive_path: str, dest_dir: str, limits: ArchiveLimits) -> Iterator[ArchiveEntry]:
+    """
+    Extract the documents of a zip or tar.gz archive one entry at a time.
+
+    Entries are written under generated names in dest_dir, so paths inside
+    the archive (absolute, "..", links) can never escape it. Entries with an
+    unsupported extension or content that does not match it are yielded with
+    an error; nested archives are not expanded. Limits on entry count, total
+    size and compression ratio raise ArchiveLimitError.
+    """
+    os.makedirs(dest_dir, exist_ok=True)
+    budget = _Budget(limits, os.path.getsize(archive_path))
+    count = 0
+    for name, compressed_size, open_entry in _members(archive_path):
+        basename = posixpath.basename(name)
+        if _is_clutter(name):
+            continue
+        count += 1
+        if count > limits.max_entries:
+            raise ArchiveLimitError(f"Archive has more than {limits.max_entries} files")
+
+        extension = os.path.splitext(basename)[1].lower()
+        if extension not in DOCUMENT_EXTENSIONS:
+            yield ArchiveEntry(name=name, path=None, size_bytes=0, error="unsupported file type")
+            continue
+
+        path = os.path.join(dest_dir, f"{count}{extension}")
+        with open_entry() as source:
+            size, error = _copy_entry(source, path, budget, compressed_size)
+        yield ArchiveEntry(name=name, path=None if error else path, size_bytes=size, error=error)
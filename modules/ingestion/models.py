@@ -0,0 +1,38 @@
+from datetime import datetime
+
+from sqlalchemy import (Column, DateTime, ForeignKey, Integer, String)
+
+from core.database import Base
+
+
+# one row per benchmark ingestion request, leased by a worker while it runs
+class IngestionJob(Base):
+    __tablename__ = "ingestion_jobs"
+    job_id = Column(String, primary_key=True)
+    project_id = Column(String, ForeignKey("projects.project_id"), index=True)
+    user_id = Column(String, nullable=False)
+    request_id = Column(String)
+    status = Column(String, nullable=False, default="queued", index=True)  # queued, running, completed, completed_with_errors, failed
+    stage = Column(String, nullable=False, default="chunk")  # chunk, generate, store, done
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    lease_owner = Column(String, nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
+    available_at = Column(DateTime, default=datetime.utcnow)
+    last_error = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+
+# uploaded files of a job, spooled to disk so a retry can re-read them
+class IngestionJobFile(Base):
+    __tablename__ = "ingestion_job_files"
+    job_id = Column(String, ForeignKey("ingestion_jobs.job_id"), primary_key=True)
+    file_index = Column(Integer, primary_key=True)
+    filename = Column(String, nullable=False)
+    spool_path = Column(String, nullable=False)
+    size_bytes = Column(Integer, nullable=False, default=0)
+    status = Column(String, nullable=False, default="pending")  # pending, chunked, failed, expanded (archives)
+    chunk_count = Column(Integer, nullable=False, default=0)
+    error = Column(String, nullable=True)
@@ -0,0 +1,757 @@
+import os
+import shutil
+import tarfile
+import time
+import zipfile
+from collections import deque
+from datetime import datetime
+from typing import List
+from uuid import uuid4
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument
+from sqlalchemy.orm import Session
+
+from core.config import get_settings
+from core.logger import logger
+from modules.benchmark.chunk_selector import (ChunkSelector, Reservoir,
+                                              chunks_for_budget)
+from modules.benchmark.dedup import NearDuplicateDetector, deduplicate
+from modules.benchmark.file_processer import FileProcessor
+from modules.benchmark.qa_generator import QAGenerator
+from modules.ingestion.archives import (ArchiveLimitError, ArchiveLimits,
+                                        expand_archive, is_archive)
+from modules.ingestion.models import IngestionJob, IngestionJobFile
+from modules.ingestion.progress import CoalescedStatusWriter
+from modules.ingestion.queue import (remove_spool, renew_lease, set_job_stage,
+                                     spool_dir_for)
+from modules.project_connections.models import Projects
+
+QUESTIONS_PER_CHUNK = 3
+
+
+class IngestionPipeline:
+    """
+    Runs one ingestion job as a sequence of idempotent steps.
+
+    Every step checkpoints its output (chunks per file, QA pairs per chunk)
+    in ``ingestion_checkpoints`` and records its progress in SQL, so a job
+    that is retried after a crash resumes from the last finished unit of
+    work instead of starting over. The final store step replaces the
+    project's documents instead of inserting new ones, so running it twice
+    leaves a single copy.
+    """
+
+    def __init__(
+        self,
+        mongo_db: AsyncIOMotorClient,
+        file_processor: FileProcessor,
+        qa_generator: QAGenerator,
+        worker_id: str,
+        lease_seconds: int
+    ):
+        self.mongo_db = mongo_db
+        self.file_processor = file_processor
+        self.qa_generator = qa_generator
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self.checkpoints = mongo_db.ingestion_checkpoints
+        self.process_status_collection = mongo_db.process_status_collection
+        self.status_writer = CoalescedStatusWriter(
+            self.process_status_collection,
+            get_settings().INGESTION_PROGRESS_WRITES_PER_SECOND
+        )
+
+    async def run(self, db: Session, job: IngestionJob) -> str:
+        """
+        Run the remaining steps of a job.
+
+        Returns:
+            The completion status written to the job and its status document
+        """
+        files = db.query(IngestionJobFile).filter(
+            IngestionJobFile.job_id == job.job_id
+        ).order_by(IngestionJobFile.file_index).all()
+
+        await self._update_status(job, {
+            "status": "processing",
+            "attempts": job.attempts,
+            "started_at": job.started_at
+        })
+
+        if job.stage == "chunk":
+            files = await self._expand_archives(db, job, files)
+            await self._chunk_files(db, job, files)
+            self._advance(db, job, "generate")
+
+        if job.stage == "generate":
+            await self._generate_qa_pairs(db, job)
+            self._advance(db, job, "store")
+
+        completion_status = await self._store(db, job, files)
+        await self.checkpoints.delete_many({"job_id": job.job_id})
+        remove_spool(job.job_id)
+        return completion_status
+
+    async def finish_progress(self, job: IngestionJob) -> None:
+        """Write progress still buffered for a job that stopped running."""
+        updates, writes = await self.status_writer.close(job.project_id, job.job_id)
+        logger.info(
+            f"Request {job.request_id}: {updates} progress updates written "
+            f"as {writes} status writes"
+        )
+
+    def heartbeat(self, db: Session, job: IngestionJob) -> None:
+        renew_lease(db, job.job_id, self.worker_id, self.lease_seconds)
+
+    def _advance(self, db: Session, job: IngestionJob, stage: str) -> None:
+        set_job_stage(db, job.job_id, self.worker_id, stage)
+        job.stage = stage
+
+    async def _update_status(self, job: IngestionJob, fields: dict) -> None:
+        # coalesced: progress fields reach Mongo at most
+        # INGESTION_PROGRESS_WRITES_PER_SECOND times, status changes at once
+        await self.status_writer.update(job.project_id, job.job_id, fields)
+
+    async def _expand_archives(
+        self, db: Session, job: IngestionJob, files: List[IngestionJobFile]
+    ) -> List[IngestionJobFile]:
+        """
+        Replace every pending zip / tar.gz upload by its document entries.
+
+        Entries are streamed to the job's spool one at a time and become
+        job files of their own, named "<archive>/<path in archive>", so they
+        go through the same chunk and QA steps as plain uploads. The entries
+        and the archive's "expanded" status are committed together, so an
+        interrupted expansion is simply redone.
+
+        Returns:
+            The job's files after expansion
+        """
+        archives = [f for f in files if f.status == "pending" and is_archive(f.filename)]
+        if not archives:
+            return files
+
+        settings = get_settings()
+        limits = ArchiveLimits(
+            max_entries=settings.INGESTION_ARCHIVE_MAX_ENTRIES,
+            max_total_bytes=settings.INGESTION_ARCHIVE_MAX_EXPANDED_BYTES,
+            max_ratio=settings.INGESTION_ARCHIVE_MAX_RATIO
+        )
+        next_index = max(f.file_index for f in files) + 1
+        for archive_file in archives:
+            self.heartbeat(db, job)
+            dest_dir = os.path.join(spool_dir_for(job.job_id), f"{archive_file.file_index}_entries")
+            shutil.rmtree(dest_dir, ignore_errors=True)
+            entries = []
+            try:
+                for entry in expand_archive(archive_file.spool_path, dest_dir, limits):
+                    entries.append(IngestionJobFile(
+                        job_id=job.job_id,
+                        file_index=next_index + len(entries),
+                        filename=f"{archive_file.filename}/{entry.name}",
+                        spool_path=entry.path or "",
+                        size_bytes=entry.size_bytes,
+                        status="failed" if entry.error else "pending",
+                        chunk_count=0,
+                        error=entry.error
+                    ))
+                    if len(entries) % 200 == 0:
+                        self.heartbeat(db, job)
+            except (ArchiveLimitError, zipfile.BadZipFile, tarfile.TarError, EOFError, OSError) as e:
+                logger.error(
+                    f"Request {job.request_id}: Rejected archive "
+                    f"{archive_file.filename}: {str(e)}"
+                )
+                shutil.rmtree(dest_dir, ignore_errors=True)
+                archive_file.status = "failed"
+                archive_file.error = str(e)
+                db.commit()
+                continue
+
+            db.add_all(entries)
+            archive_file.status = "expanded"
+            db.commit()
+            next_index += len(entries)
+            logger.info(
+                f"Request {job.request_id}: Expanded archive {archive_file.filename} "
+                f"into {sum(1 for e in entries if e.status == 'pending')} documents "
+                f"({sum(1 for e in entries if e.status == 'failed')} rejected)"
+            )
+
+        files = db.query(IngestionJobFile).filter(
+            IngestionJobFile.job_id == job.job_id
+        ).order_by(IngestionJobFile.file_index).all()
+        await self._update_status(job, {
+            "files_total": sum(1 for f in files if f.status != "expanded")
+        })
+        await self._update_file_status(job, files)
+        return files
+
+    async def _chunk_files(self, db: Session, job: IngestionJob, files: List[IngestionJobFile]):
+        """
+        Parse and chunk every file that has not been chunked yet.
+
+        Files are read page by page and their chunks are checkpointed in
+        batches of CHUNK_CHECKPOINT_BATCH, so a worker holds one batch at a
+        time whatever the size of the document.
+        """
+        batch_size = get_settings().CHUNK_CHECKPOINT_BATCH
+        for index, job_file in enumerate(files):
+            if job_file.status != "pending":
+                continue
+            self.heartbeat(db, job)
+            logger.info(
+                f"Request {job.request_id}: Processing file "
+                f"{index+1}/{len(files)}: {job_file.filename}"
+            )
+            # batches of an interrupted attempt are rewritten from the start
+            await self.checkpoints.delete_many(
+                {"job_id": job.job_id, "kind": "chunks", "file_index": job_file.file_index}
+            )
+
+            chunk_count = 0
+            try:
+                batch = []
+                for chunk in self.file_processor.iter_file_chunks(
+                    job_file.spool_path, job_file.filename
+                ):
+                    batch.append(chunk.model_dump())
+                    if len(batch) >= batch_size:
+                        await self._write_chunk_batch(job, job_file, chunk_count // batch_size, batch)
+                        chunk_count += len(batch)
+                        batch = []
+                        self.heartbeat(db, job)
+                        await self._update_status(job, {
+                            "chunks_generated": sum(f.chunk_count for f in files) + chunk_count
+                        })
+                if batch:
+                    await self._write_chunk_batch(job, job_file, chunk_count // batch_size, batch)
+                    chunk_count += len(batch)
+            except Exception as e:
+                # a file that cannot be parsed will not parse on retry either
+                logger.error(
+                    f"Request {job.request_id}: Failed to process file "
+                    f"{job_file.filename}: {str(e)}"
+                )
+                await self.checkpoints.delete_many(
+                    {"job_id": job.job_id, "kind": "chunks", "file_index": job_file.file_index}
+                )
+                job_file.status = "failed"
+                job_file.error = str(e)
+                db.commit()
+                await self._update_file_status(job, files)
+                continue
+
+            if not chunk_count:
+                logger.warning(
+                    f"Request {job.request_id}: No chunks generated "
+                    f"for file {job_file.filename}"
+                )
+                job_file.status = "failed"
+                job_file.error = "No content chunks could be extracted"
+            else:
+                job_file.status = "chunked"
+                job_file.chunk_count = chunk_count
+            db.commit()
+            await self._update_file_status(job, files)
+
+    async def _write_chunk_batch(
+        self, job: IngestionJob, job_file: IngestionJobFile, batch_index: int, chunks: List[dict]
+    ):
+        await self.checkpoints.replace_one(
+            {
+                "job_id": job.job_id,
+                "kind": "chunks",
+                "file_index": job_file.file_index,
+                "batch": batch_index
+            },
+            {
+                "job_id": job.job_id,
+                "kind": "chunks",
+                "file_index": job_file.file_index,
+                "batch": batch_index,
+                "filename": job_file.filename,
+                "chunks": chunks
+            },
+            upsert=True
+        )
+
+    async def _update_file_status(self, job: IngestionJob, files: List[IngestionJobFile]):
+        failed = [f for f in files if f.status == "failed"]
+        await self._update_status(job, {
+            "files_processed": sum(1 for f in files if f.status == "chunked"),
+            "chunks_generated": sum(f.chunk_count for f in files),
+            "errors": [
+                f"Failed to process file {f.filename}: {f.error}" for f in failed
+            ]
+        })
+
+    async def _qa_budget(self, db: Session, job: IngestionJob) -> int:
+        """
+        QA pairs the job may generate: the project's budget less the pairs
+        stored for files the job does not replace, so adding files to a
+        benchmark does not grow it past its budget. As in _store, only
+        files chunked by the job replace their pairs; a file that failed
+        to parse keeps them, so they are counted.
+        """
+        project = db.get(Projects, job.project_id)
+        if project is not None and project.qa_budget:
+            budget = project.qa_budget
+        else:
+            budget = get_settings().QA_BUDGET_DEFAULT
+
+        job_filenames = {
+            filename for (filename,) in db.query(IngestionJobFile.filename).filter(
+                IngestionJobFile.job_id == job.job_id,
+                IngestionJobFile.status == "chunked"
+            )
+        }
+        qa_doc = await self.mongo_db.qa_collection.find_one(
+            {"project_id": job.project_id}, {"qa_pairs.source_file": 1}
+        ) or {}
+        kept_pairs = sum(
+            1 for qa in qa_doc.get("qa_pairs", []) if qa.get("source_file") not in job_filenames
+        )
+        return max(budget - kept_pairs, 0)
+
+    async def _iter_candidates(self, job: IngestionJob):
+        """The job's checkpointed chunks, one at a time in file and chunk order."""
+        async for chunk_doc in self.checkpoints.find(
+            {"job_id": job.job_id, "kind": "chunks"}
+        ).sort([("file_index", 1), ("batch", 1)]):
+            for chunk in chunk_doc["chunks"]:
+                yield {
+                    "chunk_key": f"{chunk_doc['file_index']}:{chunk['metadata']['chunk_number']}",
+                    "file_index": chunk_doc["file_index"],
+                    "filename": chunk_doc["filename"],
+                    "chunk_number": chunk["metadata"]["chunk_number"],
+                    "content": chunk["content"]
+                }
+
+    async def _select_chunks(self, db: Session, job: IngestionJob) -> List[dict]:
+        """
+        Chunks the project's QA budget is spent on, one per topic cluster
+        across all files of the job. The selection is checkpointed so a
+        retried job generates for the same chunks.
+
+        Checkpoints are streamed, and only a uniform sample of at most
+        CHUNK_SELECTION_MAX_CANDIDATES chunks is held for clustering.
+        """
+        selection = await self.checkpoints.find_one(
+            {"job_id": job.job_id, "kind": "selection"}
+        )
+        if selection is not None:
+            chunk_keys = selection["chunk_keys"]
+            wanted = set(chunk_keys)
+            by_key = {}
+            async for candidate in self._iter_candidates(job):
+                if candidate["chunk_key"] in wanted:
+                    by_key[candidate["chunk_key"]] = candidate
+            return [by_key[chunk_key] for chunk_key in chunk_keys]
+
+        max_candidates = get_settings().CHUNK_SELECTION_MAX_CANDIDATES
+        reservoir = Reservoir(max_candidates)
+        async for candidate in self._iter_candidates(job):
+            reservoir.add(candidate)
+        candidates = [candidate for _, candidate in reservoir.sample()]
+
+        qa_budget = await self._qa_budget(db, job)
+        if qa_budget:
+            budget_chunks = chunks_for_budget(qa_budget, QUESTIONS_PER_CHUNK)
+        else:
+            logger.warning(
+                f"Request {job.request_id}: The QA budget of project {job.project_id} "
+                f"is spent by its stored pairs, no QA pairs are generated"
+            )
+            budget_chunks = 0
+        started = time.perf_counter()
+        indices = ChunkSelector(max_candidates=max_candidates).select(
+            [candidate["content"] for candidate in candidates], budget_chunks
+        )
+        logger.info(
+            f"Request {job.request_id}: Selected {len(indices)} of "
+            f"{reservoir.seen} chunks ({len(candidates)} sampled) for QA generation in "
+            f"{(time.perf_counter() - started) * 1000:.1f} ms"
+        )
+        selected = [candidates[index] for index in indices]
+        await self.checkpoints.replace_one(
+            {"job_id": job.job_id, "kind": "selection"},
+            {
+                "job_id": job.job_id,
+                "kind": "selection",
+                "chunk_keys": [candidate["chunk_key"] for candidate in selected]
+            },
+            upsert=True
+        )
+        await self._update_status(job, {"chunks_selected": len(selected)})
+        return selected
+
+    async def _generate_qa_pairs(self, db: Session, job: IngestionJob):
+        """
+        Generate QA pairs for every selected chunk without a QA checkpoint.
+
+        With QA_PACKING_ENABLED several chunks share one request, so the
+        system prompt and format instructions are paid for once per pack
+        instead of once per chunk. Chunks of a pack that fails are retried
+        one per request; if a chunk still fails the stage raises, so the
+        job is retried and resumes from the checkpointed chunks.
+        """
+        settings = get_settings()
+        done = {
+            doc["chunk_key"]
+            async for doc in self.checkpoints.find(
+                {"job_id": job.job_id, "kind": "qa"}, {"chunk_key": 1}
+            )
+        }
+        qa_total = await self._qa_checkpoint_total(job)
+
+        pending = [
+            chunk for chunk in await self._select_chunks(db, job)
+            if chunk["chunk_key"] not in done
+        ]
+        chunks_by_key = {chunk["chunk_key"]: chunk for chunk in pending}
+        pairs = [(chunk["chunk_key"], chunk["content"]) for chunk in pending]
+        if settings.QA_PACKING_ENABLED:
+            packs = self.qa_generator.pack_chunks(
+                pairs, settings.QA_PACK_TOKEN_BUDGET, settings.QA_PACK_MAX_CHUNKS
+            )
+        else:
+            packs = [[pair] for pair in pairs]
+
+        queue = deque(packs)
+        failed_keys = []
+        while queue:
+            pack = queue.popleft()
+            self.heartbeat(db, job)
+            try:
+                if settings.QA_PACKING_ENABLED:
+                    qa_by_chunk, usage = await self.qa_generator.generate_qa_packed(
+                        pack, num_questions=QUESTIONS_PER_CHUNK
+                    )
+                else:
+                    chunk_key, content = pack[0]
+                    qa_by_chunk = {chunk_key: await self.qa_generator.generate_qa(
+                        content, num_questions=QUESTIONS_PER_CHUNK
+                    )}
+                    usage = {
+                        "estimated_input_tokens": self.qa_generator.unpacked_input_tokens(content),
+                        "input_tokens": None
+                    }
+            except Exception as e:
+                logger.error(
+                    f"Request {job.request_id}: QA generation failed for "
+                    f"{len(pack)} chunks of "
+                    f"{', '.join(sorted({chunks_by_key[key]['filename'] for key, _ in pack}))}: "
+                    f"{str(e)}"
+                )
+                qa_by_chunk, usage = {}, None
+
+            if len(pack) > 1:
+                # chunks of a failed pack, or left without pairs by the model,
+                # are requeued one per request
+                missing = [(key, content) for key, content in pack if not qa_by_chunk.get(key)]
+                if missing:
+                    logger.warning(
+                        f"Request {job.request_id}: Retrying {len(missing)} of {len(pack)} "
+                        f"chunks of a pack one chunk per request"
+                    )
+                queue.extend([pair] for pair in missing)
+                qa_by_chunk = {key: qa_pairs for key, qa_pairs in qa_by_chunk.items() if qa_pairs}
+            elif usage is None:
+                failed_keys.append(pack[0][0])
+                continue
+
+            call_id = uuid4().hex
+            for chunk_key, qa_pairs in qa_by_chunk.items():
+                chunk = chunks_by_key[chunk_key]
+                # provenance lets a file be retired with exactly its pairs
+                for qa in qa_pairs:
+                    qa.source_file = chunk["filename"]
+                    qa.chunk_id = f"{chunk['filename']}#{chunk['chunk_number']}"
+                await self.checkpoints.replace_one(
+                    {"job_id": job.job_id, "kind": "qa", "chunk_key": chunk_key},
+                    {
+                        "job_id": job.job_id,
+                        "kind": "qa",
+                        "chunk_key": chunk_key,
+                        "file_index": chunk["file_index"],
+                        "filename": chunk["filename"],
+                        "qa_count": len(qa_pairs),
+                        "qa_pairs": [qa.model_dump() for qa in qa_pairs],
+                        "llm_call_id": call_id,
+                        "call_estimated_input_tokens": usage["estimated_input_tokens"],
+                        "call_input_tokens": usage["input_tokens"],
+                        "unpacked_estimated_input_tokens": (
+                            self.qa_generator.unpacked_input_tokens(chunk["content"])
+                        )
+                    },
+                    upsert=True
+                )
+                qa_total += len(qa_pairs)
+            await self._update_status(job, {"qa_pairs_generated": qa_total})
+
+        if failed_keys:
+            # the stage fails and the job is retried; chunks with a QA
+            # checkpoint are not generated again
+            raise RuntimeError(
+                f"QA generation failed for {len(failed_keys)} chunks of "
+                f"{', '.join(sorted({chunks_by_key[key]['filename'] for key in failed_keys}))}"
+            )
+
+    async def _generation_stats(self, job: IngestionJob) -> dict:
+        """LLM calls and input tokens spent on QA generation, against one request per chunk."""
+        calls = {}
+        chunks = 0
+        unpacked_tokens = 0
+        async for doc in self.checkpoints.find(
+            {"job_id": job.job_id, "kind": "qa"},
+            {"llm_call_id": 1, "call_estimated_input_tokens": 1,
+             "call_input_tokens": 1, "unpacked_estimated_input_tokens": 1}
+        ):
+            chunks += 1
+            unpacked_tokens += doc.get("unpacked_estimated_input_tokens") or 0
+            calls[doc.get("llm_call_id")] = (
+                doc.get("call_estimated_input_tokens") or 0,
+                doc.get("call_input_tokens")
+            )
+
+        estimated_tokens = sum(estimated for estimated, _ in calls.values())
+        reported = [actual for _, actual in calls.values() if actual is not None]
+        return {
+            "packing_enabled": get_settings().QA_PACKING_ENABLED,
+            "chunks": chunks,
+            "llm_calls": len(calls),
+            "llm_calls_unpacked": chunks,
+            "estimated_input_tokens": estimated_tokens,
+            "estimated_input_tokens_unpacked": unpacked_tokens,
+            "reported_input_tokens": sum(reported) if len(reported) == len(calls) else None,
+            "call_reduction": round(1 - len(calls) / chunks, 4) if chunks else 0.0,
+            "token_reduction": (
+                round(1 - estimated_tokens / unpacked_tokens, 4) if unpacked_tokens else 0.0
+            )
+        }
+
+    async def _qa_checkpoint_total(self, job: IngestionJob) -> int:
+        total = 0
+        async for doc in self.checkpoints.find(
+            {"job_id": job.job_id, "kind": "qa"}, {"qa_count": 1}
+        ):
+            total += doc.get("qa_count", 0)
+        return total
+
+    def _deduplicate(self, job: IngestionJob, qa_pairs: List[dict], existing: List[dict] = ()):
+        """
+        Drop (or merge) near-duplicate QA pairs before they reach qa_collection.
+
+        Args:
+            existing: Pairs already stored for the project; new pairs that
+                duplicate them are removed, the existing ones are kept
+
+        Returns:
+            The surviving new pairs and the dedup statistics
+        """
+        settings = get_settings()
+        stats = {
+            "enabled": settings.QA_DEDUP_ENABLED,
+            "threshold": settings.QA_DEDUP_THRESHOLD,
+            "qa_pairs_before": len(qa_pairs),
+            "qa_pairs_after": len(qa_pairs),
+            "duplicates_removed": 0,
+            "dedup_rate": 0.0
+        }
+        if not settings.QA_DEDUP_ENABLED or not qa_pairs:
+            return qa_pairs, stats
+
+        started = time.perf_counter()
+        kept, removed = deduplicate(
+            list(existing) + qa_pairs,
+            NearDuplicateDetector(threshold=settings.QA_DEDUP_THRESHOLD),
+            keep=len(existing),
+            action=settings.QA_DEDUP_ACTION
+        )
+        stats.update({
+            "qa_pairs_after": len(kept),
+            "duplicates_removed": removed,
+            "dedup_rate": round(removed / len(qa_pairs), 4)
+        })
+        logger.info(
+            f"Request {job.request_id}: Removed {removed} near-duplicate QA pairs "
+            f"of {len(qa_pairs)} in {(time.perf_counter() - started) * 1000:.1f} ms"
+        )
+        return kept, stats
+
+    async def _store(self, db: Session, job: IngestionJob, files: List[IngestionJobFile]) -> str:
+        """
+        Merge the job's chunks and QA pairs into the project's documents.
+
+        Content previously stored for the job's files is replaced, content
+        of other files is kept, so adding files to a benchmark only costs
+        the new files. New pairs are deduplicated against the kept ones.
+        """
+        self.heartbeat(db, job)
+        processed_files = [f.filename for f in files if f.status == "chunked"]
+        # a file that failed to parse keeps whatever was stored for it before
+        job_filenames = set(processed_files)
+        error_files = [
+            {"filename": f.filename, "error": f.error}
+            for f in files if f.status == "failed"
+        ]
+
+        file_qa_pairs = []
+        async for qa_doc in self.checkpoints.find(
+            {"job_id": job.job_id, "kind": "qa"}
+        ).sort([("file_index", 1), ("chunk_key", 1)]):
+            file_qa_pairs.extend(qa_doc["qa_pairs"])
+
+        chunks_stored = await self._store_chunks(db, job, files)
+        logger.info(
+            f"Request {job.request_id}: Stored {chunks_stored} chunks and generated "
+            f"{len(file_qa_pairs)} QA pairs from {len(processed_files)} files"
+        )
+
+        existing_qa_doc = await self.mongo_db.qa_collection.find_one(
+            {"project_id": job.project_id}
+        ) or {}
+        # pairs stored before provenance was recorded have no source_file and are kept
+        kept_qa_pairs = [
+            qa for qa in existing_qa_doc.get("qa_pairs", [])
+            if qa.get("source_file") not in job_filenames
+        ]
+        qa_files = self._merge_files(existing_qa_doc, job_filenames, processed_files)
+
+        file_qa_pairs, dedup_stats = self._deduplicate(job, file_qa_pairs, kept_qa_pairs)
+        all_qa_pairs = kept_qa_pairs + file_qa_pairs
+
+        qa_doc_id = None
+        if not all_qa_pairs:
+            logger.warning(f"Request {job.request_id}: No QA pairs to save")
+        # an existing document is replaced even when empty, else the
+        # replaced files' pairs would stay
+        if all_qa_pairs or existing_qa_doc:
+            saved = await self.mongo_db.qa_collection.find_one_and_replace(
+                {"project_id": job.project_id},
+                {
+                    "project_id": job.project_id,
+                    "user_id": job.user_id,
+                    "files_processed": qa_files,
+                    "qa_pairs": all_qa_pairs,
+                    "timestamp": datetime.utcnow()
+                },
+                projection={"_id": 1},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+            qa_doc_id = str(saved["_id"])
+            logger.info(
+                f"Request {job.request_id}: Saved {len(all_qa_pairs)} QA pairs to MongoDB, "
+                f"ID: {qa_doc_id}"
+            )
+
+        generation_stats = await self._generation_stats(job)
+        logger.info(
+            f"Request {job.request_id}: QA generation used {generation_stats['llm_calls']} "
+            f"LLM calls for {generation_stats['chunks']} chunks, "
+            f"~{generation_stats['estimated_input_tokens']} input tokens "
+            f"(~{generation_stats['estimated_input_tokens_unpacked']} unpacked)"
+        )
+
+        completion_status = "completed"
+        if error_files and not processed_files:
+            completion_status = "failed"
+        elif error_files:
+            completion_status = "completed_with_errors"
+
+        await self._update_status(job, {
+            "status": completion_status,
+            "completed_at": datetime.utcnow(),
+            "qa_pairs_generated": dedup_stats["qa_pairs_before"],
+            "qa_pairs_stored": len(file_qa_pairs),
+            "qa_pairs_total": len(all_qa_pairs),
+            "chunks_stored": chunks_stored,
+            "qa_doc_id": qa_doc_id,
+            "error_files": error_files,
+            "generation_stats": generation_stats,
+            "dedup_stats": dedup_stats
+        })
+        return completion_status
+
+    @staticmethod
+    def _chunk_document(project_id: str, user_id: str, source_file: str, batch: int,
+                        chunks: List[dict]) -> dict:
+        return {
+            "project_id": project_id,
+            "user_id": user_id,
+            "source_file": source_file,
+            "batch": batch,
+            "chunk_count": len(chunks),
+            "chunks": chunks,
+            "timestamp": datetime.utcnow()
+        }
+
+    async def _store_chunks(self, db: Session, job: IngestionJob, files: List[IngestionJobFile]) -> int:
+        """
+        Replace the stored chunks of the job's files.
+
+        Chunks are stored one document per checkpoint batch, keyed by
+        (project_id, source_file, batch), so no document grows with the
+        project and a file's chunks are replaced or removed on their own.
+
+        Returns:
+            Number of chunks stored for the job's files
+        """
+        await self._split_legacy_chunk_doc(job)
+        stored = 0
+        for job_file in files:
+            if job_file.status != "chunked":
+                continue
+            self.heartbeat(db, job)
+            # a retried store rewrites the same documents
+            await self.mongo_db.chunks_collection.delete_many(
+                {"project_id": job.project_id, "source_file": job_file.filename}
+            )
+            async for chunk_doc in self.checkpoints.find(
+                {"job_id": job.job_id, "kind": "chunks", "file_index": job_file.file_index}
+            ).sort("batch", 1):
+                await self.mongo_db.chunks_collection.insert_one(self._chunk_document(
+                    job.project_id, job.user_id, job_file.filename,
+                    chunk_doc["batch"], chunk_doc["chunks"]
+                ))
+                stored += len(chunk_doc["chunks"])
+        return stored
+
+    async def _split_legacy_chunk_doc(self, job: IngestionJob) -> None:
+        """Split a project's single chunk document, written before chunks were stored per file."""
+        legacy_query = {"project_id": job.project_id, "source_file": {"$exists": False}}
+        legacy_doc = await self.mongo_db.chunks_collection.find_one(legacy_query)
+        if legacy_doc is None:
+            return
+        chunks_by_file = {}
+        for chunk in legacy_doc.get("chunks", []):
+            source = chunk.get("metadata", {}).get("source", "")
+            chunks_by_file.setdefault(source, []).append(chunk)
+
+        batch_size = get_settings().CHUNK_CHECKPOINT_BATCH
+        for source, chunks in chunks_by_file.items():
+            await self.mongo_db.chunks_collection.delete_many(
+                {"project_id": job.project_id, "source_file": source}
+            )
+            for start in range(0, len(chunks), batch_size):
+                await self.mongo_db.chunks_collection.insert_one(self._chunk_document(
+                    job.project_id, legacy_doc.get("user_id", job.user_id), source,
+                    start // batch_size, chunks[start:start + batch_size]
+                ))
+        await self.mongo_db.chunks_collection.delete_many(legacy_query)
+        logger.info(
+            f"Request {job.request_id}: Split the chunk document of project "
+            f"{job.project_id} into {len(chunks_by_file)} files"
+        )
+
+    @staticmethod
+    def _merge_files(existing_doc: dict, job_filenames: set, processed_files: List[str]) -> List[str]:
+        """files_processed of a project document after the job's files were (re)ingested."""
+        kept = [
+            filename for filename in existing_doc.get("files_processed", [])
+            if filename not in job_filenames
+        ]
+        return kept + processed_files
@@ -0,0 +1,158 @@
+import asyncio
+import time
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional, Set, Tuple
+
+from core.logger import logger
+
+TERMINAL_STATUSES = {"completed", "completed_with_errors", "failed"}
+
+
+class CoalescedStatusWriter:
+    """
+    Buffers status document updates of running jobs and writes them at most
+    max_writes_per_second times per job.
+
+    Fields set between two writes are merged, so a burst of per-file and
+    per-chunk progress updates costs one update_one. Updates that change
+    the job status are written immediately.
+    """
+
+    def __init__(self, collection, max_writes_per_second: float = 1.0):
+        self.collection = collection
+        self.min_interval = 1.0 / max_writes_per_second if max_writes_per_second > 0 else 0.0
+        self._pending: Dict[Tuple[str, str], dict] = {}
+        self._last_write: Dict[Tuple[str, str], float] = {}
+        # per job: [updates received, writes issued]
+        self._counts: Dict[Tuple[str, str], list] = {}
+
+    async def update(self, project_id: str, job_id: str, fields: dict) -> None:
+        key = (project_id, job_id)
+        self._pending.setdefault(key, {}).update(fields)
+        self._counts.setdefault(key, [0, 0])[0] += 1
+        last_write = self._last_write.get(key)
+        if (
+            "status" in fields
+            or last_write is None
+            or time.monotonic() - last_write >= self.min_interval
+        ):
+            await self.flush(project_id, job_id)
+
+    async def flush(self, project_id: str, job_id: str) -> None:
+        """Write the buffered fields of a job, if any."""
+        key = (project_id, job_id)
+        fields = self._pending.pop(key, None)
+        if not fields:
+            return
+        await self.collection.update_one(
+            {"project_id": project_id, "job_id": job_id},
+            {"$set": fields}
+        )
+        self._counts.setdefault(key, [0, 0])[1] += 1
+        self._last_write[key] = time.monotonic()
+
+    async def close(self, project_id: str, job_id: str) -> Tuple[int, int]:
+        """
+        Flush a finished job and forget it.
+
+        Returns:
+            The number of updates received for the job and of writes issued
+        """
+        await self.flush(project_id, job_id)
+        self._last_write.pop((project_id, job_id), None)
+        updates, writes = self._counts.pop((project_id, job_id), (0, 0))
+        return updates, writes
+
+
+class ProgressBroker:
+    """
+    In-process pub/sub for ingestion progress.
+
+    Streams subscribe to a project; the first subscriber starts one watcher
+    task per project that reads the latest status document every
+    poll_seconds and publishes it only when it changed. However many
+    clients follow a project, the API process reads its status once per
+    interval, and stops when the last subscriber leaves.
+
+    Each subscriber holds only the latest snapshot, so a slow client skips
+    intermediate progress instead of queueing it.
+    """
+
+    def __init__(self, poll_seconds: float = 1.0):
+        self.poll_seconds = poll_seconds
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._watchers: Dict[str, asyncio.Task] = {}
+        self._latest: Dict[str, dict] = {}
+
+    def publish(self, project_id: str, status_doc: dict) -> None:
+        self._latest[project_id] = status_doc
+        for queue in self._subscribers.get(project_id, ()):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(status_doc)
+
+    def subscriber_count(self, project_id: str) -> int:
+        return len(self._subscribers.get(project_id, ()))
+
+    async def subscribe(
+        self,
+        project_id: str,
+        fetch_status: Callable[[str], Awaitable[Optional[dict]]],
+        keepalive_seconds: float = 15.0
+    ) -> AsyncIterator[Optional[dict]]:
+        """
+        Yield status snapshots of a project as they change, ending after a
+        terminal status. None is yielded when nothing changed for
+        keepalive_seconds, so the caller can keep the connection open.
+
+        Args:
+            fetch_status: Reads the latest status document of a project;
+                the watcher uses the one of the first subscriber
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+        self._subscribers.setdefault(project_id, set()).add(queue)
+        if project_id in self._latest:
+            # late subscribers start from the snapshot the others already have
+            queue.put_nowait(self._latest[project_id])
+        if project_id not in self._watchers:
+            self._watchers[project_id] = asyncio.create_task(
+                self._watch(project_id, fetch_status)
+            )
+        try:
+            while True:
+                try:
+                    status_doc = await asyncio.wait_for(queue.get(), keepalive_seconds)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                yield status_doc
+                if status_doc.get("status") in TERMINAL_STATUSES:
+                    return
+        finally:
+            self._unsubscribe(project_id, queue)
+
+    def _unsubscribe(self, project_id: str, queue: asyncio.Queue) -> None:
+        subscribers = self._subscribers.get(project_id)
+        if subscribers is None:
+            return
+        subscribers.discard(queue)
+        if not subscribers:
+            del self._subscribers[project_id]
+            self._latest.pop(project_id, None)
+            watcher = self._watchers.pop(project_id, None)
+            if watcher is not None:
+                watcher.cancel()
+
+    async def _watch(self, project_id: str, fetch_status) -> None:
+        try:
+            while self._subscribers.get(project_id):
+                try:
+                    status_doc = await fetch_status(project_id)
+                except Exception as e:
+                    logger.error(f"Error reading progress of project {project_id}: {str(e)}")
+                    status_doc = None
+                if status_doc is not None and status_doc != self._latest.get(project_id):
+                    self.publish(project_id, status_doc)
+                await asyncio.sleep(self.poll_seconds)
+        finally:
+            if self._watchers.get(project_id) is asyncio.current_task():
+                del self._watchers[project_id]
@@ -0,0 +1,313 @@
+import os
+import shutil
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import and_, exists, func, or_, update
+from sqlalchemy.orm import Session, aliased
+
+from core.config import get_settings
+from core.logger import logger
+from modules.ingestion.models import IngestionJob, IngestionJobFile
+
+SPOOL_CHUNK_SIZE = 1024 * 1024  # 1 MB
+
+
+class LeaseLostError(Exception):
+    """Raised when a worker no longer holds the lease of the job it is running."""
+
+
+def spool_dir_for(job_id: str) -> str:
+    """Directory holding the uploaded files of a job."""
+    return os.path.join(get_settings().INGESTION_SPOOL_DIR, job_id)
+
+
+async def spool_upload(upload, path: str, max_bytes: int) -> Optional[int]:
+    """
+    Stream an uploaded file to disk without holding it in memory.
+
+    Returns:
+        Number of bytes written, or None if the file exceeded max_bytes
+        (the partial file is removed).
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    size = 0
+    with open(path, "wb") as out:
+        while True:
+            block = await upload.read(SPOOL_CHUNK_SIZE)
+            if not block:
+                break
+            size += len(block)
+            if size > max_bytes:
+                break
+            out.write(block)
+    if size > max_bytes:
+        os.unlink(path)
+        return None
+    return size
+
+
+def remove_spool(job_id: str) -> None:
+    shutil.rmtree(spool_dir_for(job_id), ignore_errors=True)
+
+
+def enqueue_job(
+    db: Session,
+    job_id: str,
+    project_id: str,
+    user_id: str,
+    request_id: str,
+    files: List[dict]
+) -> IngestionJob:
+    """
+    Persist a job and its spooled files so any worker can pick it up.
+
+    Args:
+        files: dictionaries with filename, spool_path and size_bytes
+    """
+    settings = get_settings()
+    job = IngestionJob(
+        job_id=job_id,
+        project_id=project_id,
+        user_id=user_id,
+        request_id=request_id,
+        status="queued",
+        stage="chunk",
+        attempts=0,
+        max_attempts=settings.INGESTION_MAX_ATTEMPTS,
+        available_at=datetime.utcnow(),
+        created_at=datetime.utcnow()
+    )
+    db.add(job)
+    db.add_all([
+        IngestionJobFile(
+            job_id=job_id,
+            file_index=index,
+            filename=file_info["filename"],
+            spool_path=file_info["spool_path"],
+            size_bytes=file_info["size_bytes"],
+            status="pending"
+        )
+        for index, file_info in enumerate(files)
+    ])
+    db.commit()
+    return job
+
+
+def _claimable(now: datetime):
+    # jobs of one project run one at a time, their store steps rewrite the same documents
+    other = aliased(IngestionJob)
+    project_busy = exists().where(
+        other.project_id == IngestionJob.project_id,
+        other.job_id != IngestionJob.job_id,
+        other.status == "running",
+        other.lease_expires_at >= now
+    )
+    return and_(
+        or_(
+            and_(IngestionJob.status == "queued", IngestionJob.available_at <= now),
+            and_(IngestionJob.status == "running", IngestionJob.lease_expires_at < now)
+        ),
+        ~project_busy
+    )
+
+
+def has_active_job(db: Session, project_id: str) -> bool:
+    """True while the project has a queued or running ingestion job."""
+    return db.query(
+        exists().where(
+            IngestionJob.project_id == project_id,
+            IngestionJob.status.in_(["queued", "running"])
+        )
+    ).scalar()
+
+
+def active_job_filenames(db: Session, project_id: str) -> List[str]:
+    """Files of the project's queued and running ingestion jobs."""
+    return [
+        filename for (filename,) in db.query(IngestionJobFile.filename).join(
+            IngestionJob, IngestionJob.job_id == IngestionJobFile.job_id
+        ).filter(
+            IngestionJob.project_id == project_id,
+            IngestionJob.status.in_(["queued", "running"])
+        )
+    ]
+
+
+def fail_exhausted_jobs(db: Session) -> List[IngestionJob]:
+    """
+    Mark jobs whose lease expired after their last allowed attempt as failed.
+
+    Returns:
+        The jobs that were failed, so callers can update their status documents
+    """
+    now = datetime.utcnow()
+    exhausted = db.query(IngestionJob).filter(
+        IngestionJob.status == "running",
+        IngestionJob.lease_expires_at < now,
+        IngestionJob.attempts >= IngestionJob.max_attempts
+    ).all()
+    for job in exhausted:
+        job.status = "failed"
+        job.lease_owner = None
+        job.lease_expires_at = None
+        job.finished_at = now
+        job.last_error = job.last_error or "Lease expired on final attempt"
+    if exhausted:
+        db.commit()
+    return exhausted
+
+
+def claim_next_job(db: Session, worker_id: str, lease_seconds: int) -> Optional[IngestionJob]:
+    """
+    Lease the oldest runnable job to a worker.
+
+    Expired leases are reclaimable, so a job held by a crashed worker is
+    picked up again once its lease runs out. The conditional UPDATE makes
+    the claim safe when several workers poll at the same time.
+    """
+    now = datetime.utcnow()
+    candidate = db.query(IngestionJob.job_id).filter(
+        _claimable(now),
+        IngestionJob.attempts < IngestionJob.max_attempts
+    ).order_by(IngestionJob.created_at).first()
+    if candidate is None:
+        return None
+
+    result = db.execute(
+        update(IngestionJob)
+        .where(IngestionJob.job_id == candidate.job_id, _claimable(now))
+        .values(
+            status="running",
+            lease_owner=worker_id,
+            lease_expires_at=now + timedelta(seconds=lease_seconds),
+            attempts=IngestionJob.attempts + 1,
+            started_at=func.coalesce(IngestionJob.started_at, now)
+        )
+    )
+    db.commit()
+    if result.rowcount != 1:
+        # another worker claimed it first
+        return None
+    return db.get(IngestionJob, candidate.job_id)
+
+
+def renew_lease(db: Session, job_id: str, worker_id: str, lease_seconds: int) -> None:
+    """Extend the lease of a running job; raises LeaseLostError if it was taken over."""
+    result = db.execute(
+        update(IngestionJob)
+        .where(
+            IngestionJob.job_id == job_id,
+            IngestionJob.lease_owner == worker_id,
+            IngestionJob.status == "running"
+        )
+        .values(lease_expires_at=datetime.utcnow() + timedelta(seconds=lease_seconds))
+    )
+    db.commit()
+    if result.rowcount != 1:
+        raise LeaseLostError(f"Worker {worker_id} lost the lease on job {job_id}")
+
+
+def set_job_stage(db: Session, job_id: str, worker_id: str, stage: str) -> None:
+    result = db.execute(
+        update(IngestionJob)
+        .where(IngestionJob.job_id == job_id, IngestionJob.lease_owner == worker_id)
+        .values(stage=stage)
+    )
+    db.commit()
+    if result.rowcount != 1:
+        raise LeaseLostError(f"Worker {worker_id} lost the lease on job {job_id}")
+
+
+def complete_job(db: Session, job_id: str, worker_id: str, status: str) -> None:
+    db.execute(
+        update(IngestionJob)
+        .where(IngestionJob.job_id == job_id, IngestionJob.lease_owner == worker_id)
+        .values(
+            status=status,
+            stage="done",
+            lease_owner=None,
+            lease_expires_at=None,
+            finished_at=datetime.utcnow()
+        )
+    )
+    db.commit()
+
+
+def release_failed_attempt(db: Session, job_id: str, worker_id: str, error: str) -> bool:
+    """
+    Give a job back to the queue after a failed attempt.
+
+    Returns:
+        True if the job will be retried, False if it ran out of attempts
+    """
+    settings = get_settings()
+    job = db.get(IngestionJob, job_id)
+    if job is None or job.lease_owner != worker_id:
+        return False
+    now = datetime.utcnow()
+    job.last_error = error
+    job.lease_owner = None
+    job.lease_expires_at = None
+    retry = job.attempts < job.max_attempts
+    if retry:
+        job.status = "queued"
+        job.available_at = now + timedelta(
+            seconds=settings.INGESTION_RETRY_BACKOFF_SECONDS * job.attempts
+        )
+    else:
+        job.status = "failed"
+        job.finished_at = now
+    db.commit()
+    logger.warning(
+        f"Ingestion job {job_id} attempt {job.attempts} failed "
+        f"({'retrying' if retry else 'giving up'}): {error}"
+    )
+    return retry
+
+
+def queue_stats(db: Session, user_id: str) -> dict:
+    """Depth and job ages of a user's part of the queue, for the status endpoint."""
+    now = datetime.utcnow()
+    counts = dict(
+        db.query(IngestionJob.status, func.count(IngestionJob.job_id))
+        .filter(IngestionJob.user_id == user_id)
+        .group_by(IngestionJob.status)
+        .all()
+    )
+    active_jobs = db.query(IngestionJob).filter(
+        IngestionJob.user_id == user_id,
+        IngestionJob.status.in_(["queued", "running"])
+    ).order_by(IngestionJob.created_at).all()
+
+    def age(since):
+        return round((now - since).total_seconds(), 1) if since else None
+
+    oldest_queued = next((job for job in active_jobs if job.status == "queued"), None)
+    oldest_running = next((job for job in active_jobs if job.status == "running"), None)
+    return {
+        "queue_depth": counts.get("queued", 0),
+        "running": counts.get("running", 0),
+        "completed": counts.get("completed", 0) + counts.get("completed_with_errors", 0),
+        "failed": counts.get("failed", 0),
+        "oldest_queued_age_seconds": age(oldest_queued.created_at) if oldest_queued else None,
+        "oldest_running_age_seconds": age(oldest_running.created_at) if oldest_running else None,
+        "jobs": [
+            {
+                "job_id": job.job_id,
+                "project_id": job.project_id,
+                "status": job.status,
+                "stage": job.stage,
+                "attempts": job.attempts,
+                "max_attempts": job.max_attempts,
+                "age_seconds": age(job.created_at),
+                "lease_owner": job.lease_owner,
+                "lease_expires_in_seconds": (
+                    round((job.lease_expires_at - now).total_seconds(), 1)
+                    if job.lease_expires_at else None
+                ),
+                "last_error": job.last_error
+            }
+            for job in active_jobs
+        ]
+    }
@@ -0,0 +1,38 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session
+
+from core.database import get_db
+from modules.Auth.models import Users
+from modules.ingestion.admission import get_admission_controller
+from modules.ingestion.queue import queue_stats
+
+router = APIRouter(tags=["INGESTION"])
+
+
+@router.get(
+    "/ingestion/queue-status",
+    summary="Get ingestion queue status",
+    description=(
+        "Queued and running benchmark ingestion jobs of the user and their ages, "
+        "and the uploads admitted, waiting and rejected by this API process"
+    )
+)
+async def get_queue_status(access_token: str, db: Session = Depends(get_db)):
+    """
+    Returns the depth of the user's part of the ingestion queue, the age of
+    their active jobs and the admission control counters.
+    
+    Args:
+        access_token: User authentication token
+        db: SQL database session
+    """
+    user = db.query(Users).filter(Users.verification_token == access_token).first()
+    if not user or not user.isVerified:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token or unauthorized user"
+        )
+    stats = queue_stats(db, user.user_id)
+    stats["admission"] = get_admission_controller().metrics()
+    return JSONResponse(content=stats)
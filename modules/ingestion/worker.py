@@ -0,0 +1,108 @@
+import asyncio
+import os
+import socket
+import traceback
+from datetime import datetime
+
+from core.config import get_settings
+from core.database import SessionLocal, create_tables, get_mongodb
+from core.logger import logger
+from modules.benchmark.file_processer import FileProcessor
+from modules.benchmark.qa_generator import QAGenerator
+from modules.ingestion.models import IngestionJob
+from modules.ingestion.pipeline import IngestionPipeline
+from modules.ingestion.queue import (LeaseLostError, claim_next_job,
+                                     complete_job, fail_exhausted_jobs,
+                                     release_failed_attempt)
+# models referenced by foreign keys must be registered before create_tables
+from modules.project_connections.models import Projects  # noqa: F401
+
+
+async def _mark_status_failed(mongo_db, job: IngestionJob, error: str):
+    await mongo_db.process_status_collection.update_one(
+        {"project_id": job.project_id, "job_id": job.job_id},
+        {
+            "$set": {"status": "failed", "completed_at": datetime.utcnow()},
+            "$push": {"errors": f"Critical error: {error}"}
+        }
+    )
+
+
+async def run_worker(worker_id: str = None, once: bool = False):
+    """
+    Poll the ingestion queue and run leased jobs until cancelled.
+
+    Args:
+        worker_id: Lease owner name, defaults to host:pid
+        once: Return after the queue is found empty (used by tests and scripts)
+    """
+    settings = get_settings()
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+    mongo_db = await get_mongodb(settings=settings)
+    await mongo_db.ingestion_checkpoints.create_index([("job_id", 1), ("kind", 1)])
+    await mongo_db.chunks_collection.create_index([("project_id", 1), ("source_file", 1), ("batch", 1)])
+    pipeline = IngestionPipeline(
+        mongo_db=mongo_db,
+        file_processor=FileProcessor(mongo_db),
+        qa_generator=QAGenerator(settings=settings, db=mongo_db),
+        worker_id=worker_id,
+        lease_seconds=settings.INGESTION_LEASE_SECONDS
+    )
+    logger.info(f"Ingestion worker {worker_id} started")
+
+    while True:
+        db = SessionLocal()
+        try:
+            for job in fail_exhausted_jobs(db):
+                await _mark_status_failed(mongo_db, job, job.last_error)
+
+            job = claim_next_job(db, worker_id, settings.INGESTION_LEASE_SECONDS)
+            if job is None:
+                if once:
+                    return
+                await asyncio.sleep(settings.INGESTION_POLL_INTERVAL_SECONDS)
+                continue
+
+            logger.info(
+                f"Request {job.request_id}: Worker {worker_id} running ingestion job "
+                f"{job.job_id} for project {job.project_id} "
+                f"(attempt {job.attempts}/{job.max_attempts}, stage {job.stage})"
+            )
+            try:
+                completion_status = await pipeline.run(db, job)
+                complete_job(db, job.job_id, worker_id, completion_status)
+                logger.info(
+                    f"Request {job.request_id}: Background processing completed "
+                    f"with status: {completion_status}"
+                )
+            except LeaseLostError as e:
+                # another worker took the job over, leave it alone
+                db.rollback()
+                logger.warning(str(e))
+            except Exception as e:
+                db.rollback()
+                logger.error(
+                    f"Request {job.request_id}: Critical error in background processing: "
+                    f"{str(e)}\n{traceback.format_exc()}"
+                )
+                if not release_failed_attempt(db, job.job_id, worker_id, str(e)):
+                    await _mark_status_failed(mongo_db, job, str(e))
+            finally:
+                await pipeline.finish_progress(job)
+        except Exception as e:
+            logger.error(f"Error in ingestion worker {worker_id}: {str(e)}")
+            await asyncio.sleep(settings.INGESTION_POLL_INTERVAL_SECONDS)
+        finally:
+            db.close()
+
+
+def run_worker_in_process():
+    """Entry point for a dedicated worker process"""
+    create_tables()
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    loop.run_until_complete(run_worker())
+
+
+if __name__ == "__main__":
+    run_worker_in_process()
@@ -0,0 +1,191 @@
+import math
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from core.config import Settings
+from core.logger import logger
+from modules.monitor.models import ProjectScoreDetector, RegressionEvent, TestInfo
+
+# metrics watched per project: the value of a result, the sign of a shift
+# that is a regression, and the smallest standard deviation assumed, so
+# that a baseline of identical values does not make every change infinite.
+# A hallucination score of 0 is a hallucination, as the rollups count it.
+METRICS: Dict[str, tuple] = {
+    "hallucination": (lambda test_info: test_info.hallucination_score, -1, 0.05),
+    "helpfulness": (lambda test_info: test_info.helpfullness_score, -1, 0.05),
+    "latency_ms": (lambda test_info: test_info.response_latency_ms, 1, 1.0),
+}
+STATE_COLUMNS = (
+    "group_count", "group_sum", "samples", "mean", "variance", "cusum_high", "cusum_low", "run_high", "run_low"
+)
+
+
+class ScoreDetector:
+    """
+    Online change-point detection on each project's scores.
+
+    Every metric of a project keeps one ProjectScoreDetector row. Results
+    are averaged in groups of group_size, so that scores of 0 or 1 and
+    latency outliers reach the detector about normally distributed. An
+    EWMA of the group means and their variance is the baseline, and a
+    two-sided CUSUM sums the deviations from it in baseline standard
+    deviations. A batch of results updates the rows in O(1) work per
+    result and never reads past results. When a CUSUM exceeds threshold,
+    a RegressionEvent records the shift, and the following groups form a
+    new baseline.
+    """
+
+    def __init__(self, group_size: int, warmup: int, alpha: float, slack: float, threshold: float):
+        self.group_size = group_size  # results per group mean
+        self.warmup = warmup  # group means averaged into the first baseline
+        self.alpha = alpha  # EWMA weight of a new result
+        self.slack = slack  # k: deviations below this many standard deviations are ignored
+        self.threshold = threshold  # h: CUSUM value that is a shift
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "ScoreDetector":
+        return cls(
+            group_size=settings.DETECTION_GROUP_RESULTS,
+            warmup=settings.DETECTION_WARMUP_GROUPS,
+            alpha=settings.DETECTION_EWMA_ALPHA,
+            slack=settings.DETECTION_CUSUM_SLACK,
+            threshold=settings.DETECTION_CUSUM_THRESHOLD,
+        )
+
+    def step(self, state: dict, value: float, floor: float) -> Optional[dict]:
+        """
+        Add one value to a metric's state, in place.
+
+        Args:
+            state: STATE_COLUMNS of the metric
+            value: The result's value of the metric
+            floor: Smallest standard deviation of a group mean
+
+        Returns:
+            None, or the detected shift: side (1 up, -1 down), baseline
+            mean and standard deviation, the mean of the group that crossed
+            threshold, CUSUM value and the number of groups it accumulated
+            over
+        """
+        state["group_count"] += 1
+        state["group_sum"] += value
+        if state["group_count"] < self.group_size:
+            return None
+        value = state["group_sum"] / state["group_count"]
+        state.update(group_count=0, group_sum=0.0)
+
+        state["samples"] += 1
+        if state["samples"] <= self.warmup:
+            # running mean and population variance of the first groups
+            delta = value - state["mean"]
+            state["mean"] += delta / state["samples"]
+            state["variance"] += (delta * (value - state["mean"]) - state["variance"]) / state["samples"]
+            return None
+
+        mean, deviation = state["mean"], max(math.sqrt(state["variance"]), floor)
+        z = (value - mean) / deviation
+        state["cusum_high"] = max(0.0, state["cusum_high"] + z - self.slack)
+        state["cusum_low"] = max(0.0, state["cusum_low"] - z - self.slack)
+        state["run_high"] = state["run_high"] + 1 if state["cusum_high"] > 0 else 0
+        state["run_low"] = state["run_low"] + 1 if state["cusum_low"] > 0 else 0
+
+        side = 1 if state["cusum_high"] > self.threshold else -1 if state["cusum_low"] > self.threshold else 0
+        if side:
+            shift = dict(
+                side=side, baseline_mean=mean, baseline_std=deviation, shifted_mean=value,
+                statistic=state["cusum_high"] if side > 0 else state["cusum_low"],
+                run_length=state["run_high"] if side > 0 else state["run_low"]
+            )
+            # the next warmup groups form the baseline of the new level
+            state.update(samples=0, mean=0.0, variance=0.0, cusum_high=0.0, cusum_low=0.0, run_high=0, run_low=0)
+            return shift
+
+        # exponentially weighted mean and variance
+        delta = value - mean
+        state["mean"] = mean + self.alpha * delta
+        state["variance"] = (1 - self.alpha) * (state["variance"] + self.alpha * delta * delta)
+        return None
+
+    def update(self, db: Session, project_id: str, test_infos: Iterable[TestInfo]) -> List[RegressionEvent]:
+        """
+        Add test results to the project's detectors, in the caller's
+        transaction, in the order they were conducted.
+
+        The states are read and written back in the transaction that
+        inserts the results; in SQLite it holds the write lock by then, so
+        concurrent writers update them one after the other.
+
+        Returns:
+            The events detected, added to the session
+        """
+        ordered = sorted(
+            (t for t in test_infos if t.last_test_conducted is not None), key=lambda t: t.last_test_conducted
+        )
+        if not ordered:
+            return []
+        table = ProjectScoreDetector.__table__
+        states = {
+            row.metric: {name: getattr(row, name) for name in STATE_COLUMNS}
+            for row in db.execute(select(table).where(table.c.project_id == project_id))
+        }
+
+        events, changed = [], set()
+        for test_info in ordered:
+            for metric, (value_of, worse, floor) in METRICS.items():
+                value = value_of(test_info)
+                if value is None:
+                    continue
+                state = states.setdefault(metric, dict.fromkeys(STATE_COLUMNS, 0))
+                changed.add(metric)
+                shift = self.step(state, float(value), floor)
+                if shift is None:
+                    continue
+                side = shift.pop("side")
+                events.append(RegressionEvent(
+                    project_id=project_id,
+                    metric=metric,
+                    direction="worse" if side == worse else "better",
+                    detected_at=test_info.last_test_conducted,
+                    **shift
+                ))
+
+        if changed:
+            now = datetime.utcnow()
+            db.execute(_detector_upsert(), [
+                dict(project_id=project_id, metric=metric, updated_at=now, **states[metric]) for metric in changed
+            ])
+        for event in events:
+            if event.direction == "worse":
+                logger.warning(
+                    f"Project {project_id}: {event.metric} regressed from {event.baseline_mean:.3f} "
+                    f"to about {event.shifted_mean:.3f} at {event.detected_at}"
+                )
+        db.add_all(events)
+        return events
+
+
+@lru_cache(maxsize=None)
+def _detector_upsert():
+    """The state upsert, built once so SQLAlchemy compiles it once."""
+    table = ProjectScoreDetector.__table__
+    statement = insert(table)
+    return statement.on_conflict_do_update(
+        index_elements=[table.c.project_id, table.c.metric],
+        set_={name: statement.excluded[name] for name in STATE_COLUMNS + ("updated_at",)}
+    )
+
+
+def recent_events(db: Session, project_id: str, since: Optional[datetime] = None,
+                  metric: Optional[str] = None, limit: int = 100) -> List[RegressionEvent]:
+    """A project's events, newest first."""
+    query = db.query(RegressionEvent).filter(RegressionEvent.project_id == project_id)
+    if since is not None:
+        query = query.filter(RegressionEvent.detected_at >= since)
+    if metric is not None:
+        query = query.filter(RegressionEvent.metric == metric)
+    return query.order_by(RegressionEvent.detected_at.desc(), RegressionEvent.event_id.desc()).limit(limit).all()
@@ -0,0 +1,211 @@
+import json
+from datetime import datetime
+from typing import Iterator, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.engine import Engine
+
+from core.config import get_settings
+from modules.monitor.models import QAPairs, TestInfo
+from modules.monitor.pagination import ResultFilters
+
+# exported columns, in order; question and factual_answer come from qa_pairs
+EXPORT_COLUMNS = (
+    "test_id", "user_id", "project_id", "test_status", "hallucination_score",
+    "helpfullness_score", "last_test_conducted", "question", "factual_answer",
+    "student_answer", "difficulty_level", "response_latency_ms"
+)
+FLOAT_COLUMNS = ("hallucination_score", "helpfullness_score", "response_latency_ms")
+
+# format: (media type, file extension)
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+
+def export_statement(project_id: Optional[str] = None, user_id: Optional[str] = None,
+                     filters: Optional[ResultFilters] = None):
+    """
+    Select of the exported columns for a project's or a user's results.
+    A project's results are read in (last_test_conducted, test_id) order of
+    its index, a user's in the order of the user_id index.
+    """
+    columns = [
+        getattr(QAPairs, name) if name in ("question", "factual_answer") else getattr(TestInfo, name)
+        for name in EXPORT_COLUMNS
+    ]
+    statement = select(*columns).outerjoin(QAPairs, QAPairs.qa_hash == TestInfo.qa_hash)
+    if project_id is not None:
+        statement = statement.where(TestInfo.project_id == project_id).order_by(
+            TestInfo.last_test_conducted, TestInfo.test_id
+        )
+    if user_id is not None:
+        statement = statement.where(TestInfo.user_id == user_id)
+    if filters is not None:
+        statement = statement.where(*filters.conditions())
+    return statement
+
+
+def iter_batches(engine: Engine, statement, batch_rows: int) -> Iterator[List[tuple]]:
+    """
+    Rows of statement, batch_rows at a time, from a cursor stepped as the
+    batches are consumed: memory use does not depend on the row count. The
+    rows come from one read transaction, a consistent snapshot in WAL mode.
+    """
+    with engine.connect() as connection:
+        result = connection.execution_options(stream_results=True, yield_per=batch_rows).execute(statement)
+        for partition in result.partitions():
+            yield [tuple(row) for row in partition]
+
+
+def _arrow_schema():
+    import pyarrow as pa
+
+    return pa.schema([
+        (name, pa.float64() if name in FLOAT_COLUMNS
+         else pa.timestamp("us") if name == "last_test_conducted" else pa.string())
+        for name in EXPORT_COLUMNS
+    ])
+
+
+def _record_batch(schema, rows: List[tuple]):
+    import pyarrow as pa
+
+    columns = list(zip(*rows))
+    return pa.record_batch(
+        [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+        schema=schema
+    )
+
+
+class _ChunkSink:
+    """Write-only file object collecting what pyarrow writes, drained after each batch."""
+
+    closed = False
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data, self._chunks = b"".join(self._chunks), []
+        return data
+
+
+def _json_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def encode_ndjson(batches: Iterator[List[tuple]]) -> Iterator[bytes]:
+    """One JSON object per row and line."""
+    for rows in batches:
+        yield "".join(
+            json.dumps(dict(zip(EXPORT_COLUMNS, map(_json_value, row)))) + "\n" for row in rows
+        ).encode("utf-8")
+
+
+def encode_arrow(batches: Iterator[List[tuple]]) -> Iterator[bytes]:
+    """Arrow IPC stream format, one record batch per batch of rows."""
+    import pyarrow as pa
+
+    schema = _arrow_schema()
+    sink = _ChunkSink()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        for rows in batches:
+            writer.write_batch(_record_batch(schema, rows))
+            yield sink.drain()
+    yield sink.drain()
+
+
+def encode_parquet(batches: Iterator[List[tuple]]) -> Iterator[bytes]:
+    """Parquet with zstd compression, one row group per batch of rows; the footer comes last."""
+    import pyarrow.parquet as pq
+
+    schema = _arrow_schema()
+    sink = _ChunkSink()
+    with pq.ParquetWriter(sink, schema, compression="zstd") as writer:
+        for rows in batches:
+            writer.write_batch(_record_batch(schema, rows))
+            yield sink.drain()
+    yield sink.drain()
+
+
+ENCODERS = {"ndjson": encode_ndjson, "arrow": encode_arrow, "parquet": encode_parquet}
+
+
+def export_results(
+    engine: Engine,
+    export_format: str,
+    project_id: Optional[str] = None,
+    user_id: Optional[str] = None,
+    filters: Optional[ResultFilters] = None,
+    batch_rows: Optional[int] = None
+) -> Iterator[bytes]:
+    """
+    Stream a project's or a user's results in the given format.
+
+    Args:
+        engine: Database engine, a connection is held while the stream is read
+        export_format: ndjson, arrow or parquet
+        project_id: Only this project's results
+        user_id: Only this user's results
+        filters: Difficulty, outcome and time range filters
+        batch_rows: Rows read and encoded at a time, EXPORT_BATCH_ROWS by default
+
+    Returns:
+        Iterator of encoded chunks, about one per batch
+    """
+    if export_format not in ENCODERS:
+        raise ValueError(f"format must be one of: {', '.join(ENCODERS)}")
+    batches = iter_batches(
+        engine, export_statement(project_id, user_id, filters), batch_rows or get_settings().EXPORT_BATCH_ROWS
+    )
+    return ENCODERS[export_format](batches)
+
+
+def main():
+    """
+    Export results to a file:
+    python -m modules.monitor.export (--project ID | --user ID) [--format parquet] [--since T] [--until T] OUTPUT
+    """
+    import argparse
+    import sys
+
+    from core.database import engine
+
+    parser = argparse.ArgumentParser(description="Export test results")
+    owner = parser.add_mutually_exclusive_group(required=True)
+    owner.add_argument("--project", help="project_id of the results")
+    owner.add_argument("--user", help="user_id of the results")
+    parser.add_argument("--format", choices=list(ENCODERS), default="parquet")
+    parser.add_argument("--since", type=datetime.fromisoformat, help="tested at or after, UTC")
+    parser.add_argument("--until", type=datetime.fromisoformat, help="tested before, UTC")
+    parser.add_argument("output", help="file to write, - for stdout")
+    args = parser.parse_args()
+
+    chunks = export_results(
+        engine, args.format, project_id=args.project, user_id=args.user,
+        filters=ResultFilters(since=args.since, until=args.until)
+    )
+    output = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+    try:
+        for chunk in chunks:
+            output.write(chunk)
+    finally:
+        if output is not sys.stdout.buffer:
+            output.close()
+
+
+if __name__ == "__main__":
+    main()
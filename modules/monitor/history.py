@@ -0,0 +1,411 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from sqlalchemy import and_, bindparam, case, func, literal, or_, select, update
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from modules.monitor.models import ProjectScoreBucket, TestInfo
+from modules.monitor.rollups import COUNTER_COLUMNS, summarize_results, uncompacted_results
+from modules.monitor.sketch import LatencySketch, merge_sketches
+from modules.project_connections.models import Projects
+
+# bucket sizes, finest first
+GRANULARITIES = {
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+    "week": timedelta(weeks=1),
+}
+BUCKET_COUNTER_COLUMNS = COUNTER_COLUMNS + ("latency_measured", "latency_sum_ms")
+# latency percentiles of each history point, from the merged sketches
+HISTORY_QUANTILES = {"p50_latency_ms": 0.5, "p95_latency_ms": 0.95, "p99_latency_ms": 0.99}
+
+# bucket_start as SQLite expressions, in the format SQLAlchemy stores datetimes in
+BUCKET_START_SQL = {
+    "hour": func.strftime("%Y-%m-%d %H:00:00.000000", TestInfo.last_test_conducted),
+    "day": func.date(TestInfo.last_test_conducted).concat(" 00:00:00.000000"),
+    "week": func.date(TestInfo.last_test_conducted, "weekday 0", "-6 days").concat(" 00:00:00.000000"),
+}
+
+
+def bucket_start(timestamp: datetime, granularity: str) -> datetime:
+    """Start of the hour, day or week (from Monday) holding timestamp."""
+    if granularity == "hour":
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    day = timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+    if granularity == "day":
+        return day
+    return day - timedelta(days=day.weekday())
+
+
+def summarize_bucket(test_infos: List[TestInfo]) -> dict:
+    """Rollup increments of the results in one bucket, with target latency."""
+    summary = summarize_results(test_infos)
+    del summary["last_test_conducted"]
+    latencies = [t.response_latency_ms for t in test_infos if t.response_latency_ms is not None]
+    summary["latency_measured"] = len(latencies)
+    summary["latency_sum_ms"] = float(sum(latencies))
+    summary["latency_max_ms"] = max(latencies) if latencies else None
+    return summary
+
+
+def add_to_buckets(db: Session, project_id: str, test_infos: Iterable[TestInfo]) -> None:
+    """
+    Add test results to the project's hour, day and week buckets, in the
+    caller's transaction. Like add_to_rollup, each bucket is one upsert
+    adding the increments to the stored counters.
+    """
+    grouped = defaultdict(list)
+    for test_info in test_infos:
+        if test_info.last_test_conducted is None:
+            continue
+        for granularity in GRANULARITIES:
+            grouped[granularity, bucket_start(test_info.last_test_conducted, granularity)].append(test_info)
+
+    if grouped:
+        db.execute(_bucket_upsert(), [
+            dict(project_id=project_id, granularity=granularity, bucket_start=start, **summarize_bucket(bucket_results))
+            for (granularity, start), bucket_results in grouped.items()
+        ])
+        add_to_sketches(db, project_id, grouped)
+
+
+def add_to_sketches(db: Session, project_id: str, grouped: Dict[tuple, List[TestInfo]]) -> None:
+    """
+    Merge the latencies of results into the latency sketches of their
+    buckets, which exist by now. Sketches cannot be added in SQL, so they
+    are read and written back; the transaction holds SQLite's write lock
+    since the results were inserted, so concurrent writers merge one
+    after the other.
+    """
+    sketches = {}
+    for key, bucket_results in grouped.items():
+        latencies = [t.response_latency_ms for t in bucket_results if t.response_latency_ms is not None]
+        if latencies:
+            sketches[key] = LatencySketch().update(latencies)
+    if not sketches:
+        return
+    table = ProjectScoreBucket.__table__
+    stored = db.execute(select(table.c.granularity, table.c.bucket_start, table.c.latency_sketch).where(
+        table.c.project_id == project_id,
+        table.c.bucket_start.in_({start for _, start in sketches})
+    ))
+    for granularity, start, blob in stored:
+        if blob and (granularity, start) in sketches:
+            sketches[granularity, start].merge(LatencySketch.from_bytes(blob))
+    _write_sketches(db, project_id, sketches)
+
+
+def _write_sketches(db: Session, project_id: str, sketches: Dict[tuple, LatencySketch]) -> None:
+    db.execute(_sketch_update(), [
+        dict(b_project_id=project_id, b_granularity=granularity, b_bucket_start=start, latency_sketch=sketch.to_bytes())
+        for (granularity, start), sketch in sketches.items()
+    ])
+
+
+@lru_cache(maxsize=None)
+def _sketch_update():
+    table = ProjectScoreBucket.__table__
+    return update(table).where(
+        table.c.project_id == bindparam("b_project_id"),
+        table.c.granularity == bindparam("b_granularity"),
+        table.c.bucket_start == bindparam("b_bucket_start")
+    )
+
+
+@lru_cache(maxsize=None)
+def _bucket_upsert():
+    """The bucket upsert, built once so SQLAlchemy compiles it once; executed with one parameter set per bucket."""
+    table = ProjectScoreBucket.__table__
+    statement = insert(table)
+    updates = {name: table.c[name] + statement.excluded[name] for name in BUCKET_COUNTER_COLUMNS}
+    # max() of SQLite returns NULL if any argument is NULL
+    updates["latency_max_ms"] = func.max(
+        func.coalesce(table.c.latency_max_ms, statement.excluded.latency_max_ms),
+        func.coalesce(statement.excluded.latency_max_ms, table.c.latency_max_ms)
+    )
+    return statement.on_conflict_do_update(
+        index_elements=[table.c.project_id, table.c.granularity, table.c.bucket_start],
+        set_=updates
+    )
+
+
+def rebuild_buckets(db: Session, project_id: Optional[str] = None) -> int:
+    """
+    Recompute the buckets from test_info, for one project or all of them.
+    Buckets from before a project's compaction watermark hold the only
+    record of its compacted results and are kept.
+
+    Args:
+        db: Database session, committed here
+        project_id: Project to rebuild, None for every project
+
+    Returns:
+        int: Number of bucket rows written
+    """
+    watermark = select(Projects.results_compacted_before).where(
+        Projects.project_id == ProjectScoreBucket.project_id
+    ).scalar_subquery()
+    deleted = db.query(ProjectScoreBucket).filter(
+        or_(watermark.is_(None), ProjectScoreBucket.bucket_start >= watermark)
+    )
+    if project_id is not None:
+        deleted = deleted.filter(ProjectScoreBucket.project_id == project_id)
+    written = 0
+    try:
+        deleted.delete(synchronize_session=False)
+        for granularity, start in BUCKET_START_SQL.items():
+            aggregates = select(
+                TestInfo.project_id,
+                literal(granularity),
+                start,
+                func.count(),
+                func.sum(case((TestInfo.test_status == "1", 1), else_=0)),
+                func.count(TestInfo.hallucination_score),
+                func.sum(case((TestInfo.hallucination_score == 0, 1), else_=0)),
+                func.count(TestInfo.helpfullness_score),
+                func.coalesce(func.sum(TestInfo.helpfullness_score), 0.0),
+                func.count(TestInfo.response_latency_ms),
+                func.coalesce(func.sum(TestInfo.response_latency_ms), 0.0),
+                func.max(TestInfo.response_latency_ms)
+            ).outerjoin(
+                Projects, Projects.project_id == TestInfo.project_id
+            ).where(
+                TestInfo.project_id.isnot(None),
+                TestInfo.last_test_conducted.isnot(None),
+                uncompacted_results()
+            ).group_by(TestInfo.project_id, start)
+            if project_id is not None:
+                aggregates = aggregates.where(TestInfo.project_id == project_id)
+            result = db.execute(insert(ProjectScoreBucket.__table__).from_select(
+                ["project_id", "granularity", "bucket_start", *BUCKET_COUNTER_COLUMNS, "latency_max_ms"],
+                aggregates
+            ))
+            written += result.rowcount
+        rebuild_sketches(db, project_id)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return written
+
+
+def rebuild_sketches(db: Session, project_id: Optional[str] = None) -> None:
+    """
+    Latency sketches of the buckets rebuild_buckets wrote, from the results
+    in test_info, read in index order one project at a time. Buckets kept
+    from before a compaction watermark keep their sketches.
+    """
+    latencies = select(
+        TestInfo.project_id, TestInfo.last_test_conducted, TestInfo.response_latency_ms
+    ).outerjoin(
+        Projects, Projects.project_id == TestInfo.project_id
+    ).where(
+        TestInfo.project_id.isnot(None),
+        TestInfo.last_test_conducted.isnot(None),
+        TestInfo.response_latency_ms.isnot(None),
+        uncompacted_results()
+    ).order_by(TestInfo.project_id)
+    if project_id is not None:
+        latencies = latencies.where(TestInfo.project_id == project_id)
+
+    current, sketches = None, defaultdict(LatencySketch)
+    for row_project_id, conducted, latency in db.execute(latencies.execution_options(yield_per=10000)):
+        if row_project_id != current:
+            if sketches:
+                _write_sketches(db, current, sketches)
+            current, sketches = row_project_id, defaultdict(LatencySketch)
+        for granularity in GRANULARITIES:
+            sketches[granularity, bucket_start(conducted, granularity)].add(latency)
+    if sketches:
+        _write_sketches(db, current, sketches)
+
+
+def choose_resolution(start: datetime, end: datetime, granularity: Optional[str], max_points: int) -> tuple:
+    """
+    Stored granularity to read and how many of its buckets to merge per
+    point, so the window has at most max_points points.
+
+    Without a requested granularity the finest one that fits is used; a
+    requested one is coarsened (hour, day, week, then several weeks per
+    point) only when the window would have more than max_points points.
+
+    Returns:
+        tuple: (granularity, buckets merged per point)
+    """
+    names = list(GRANULARITIES)
+    candidates = names if granularity is None else names[names.index(granularity):]
+    span = end - start
+    for name in candidates:
+        if span / GRANULARITIES[name] <= max_points:
+            return name, 1
+    weeks = span / GRANULARITIES["week"]
+    return "week", int(-(-weeks // max_points))
+
+
+def _ratio(numerator, denominator, digits=4):
+    return round(numerator / denominator, digits) if denominator else None
+
+
+def _point(bucket_start_at: datetime, rows: List[tuple]) -> dict:
+    """One history point from (bucket_start, *BUCKET_COUNTER_COLUMNS, latency_max_ms, latency_sketch) rows."""
+    if len(rows) == 1:
+        _, total, passed, h_scored, hallucinations, help_scored, help_sum, l_measured, l_sum, l_max, sketch = rows[0]
+        sketch = merge_sketches([sketch])
+    else:
+        columns = list(zip(*rows))
+        total, passed, h_scored, hallucinations, help_scored, help_sum, l_measured, l_sum = map(sum, columns[1:9])
+        maxima = [value for value in columns[9] if value is not None]
+        l_max = max(maxima) if maxima else None
+        sketch = merge_sketches(columns[10])
+    percentiles = {name: _rounded(sketch.quantile(q)) for name, q in HISTORY_QUANTILES.items()}
+    return {
+        "bucket_start": bucket_start_at.isoformat(),
+        "tests_total": total,
+        "pass_rate": _ratio(passed, total),
+        # same meaning as the dashboard: share of scored results that hallucinated
+        "avg_hallucination_score": _ratio(hallucinations, h_scored),
+        "avg_helpfulness": _ratio(help_sum, help_scored),
+        "avg_latency_ms": _ratio(l_sum, l_measured, digits=1),
+        "max_latency_ms": l_max,
+        **percentiles,
+    }
+
+
+def _rounded(value: Optional[float]) -> Optional[float]:
+    return round(value, 1) if value is not None else None
+
+
+def score_history(
+    db: Session,
+    project_id: str,
+    start: datetime,
+    end: datetime,
+    granularity: Optional[str],
+    max_points: int,
+    compacted_before: Optional[datetime] = None
+) -> dict:
+    """
+    Score points of a project between start and end, read from the bucket
+    table with one range scan of its primary key.
+
+    Args:
+        db: Database session
+        project_id: Project to read
+        start: Window start (UTC), inclusive
+        end: Window end (UTC), exclusive
+        granularity: hour, day, week, or None to pick one from the window
+        max_points: Downsampling limit
+        compacted_before: The project's compaction watermark, hour buckets
+            before it were removed by retention and days are read instead
+
+    Returns:
+        dict with the granularity used, buckets per point and the points;
+        buckets without results are omitted
+    """
+    stored, merge = choose_resolution(start, end, granularity, max_points)
+    if stored == "hour" and compacted_before is not None and start < compacted_before:
+        stored, merge = choose_resolution(start, end, "day", max_points)
+    first_bucket = bucket_start(start, stored)
+    # plain rows in _point's column order, without building ORM objects
+    columns = [
+        getattr(ProjectScoreBucket, name)
+        for name in ("bucket_start", *BUCKET_COUNTER_COLUMNS, "latency_max_ms", "latency_sketch")
+    ]
+    rows = db.query(*columns).filter(
+        ProjectScoreBucket.project_id == project_id,
+        ProjectScoreBucket.granularity == stored,
+        ProjectScoreBucket.bucket_start >= first_bucket,
+        ProjectScoreBucket.bucket_start < end
+    ).order_by(ProjectScoreBucket.bucket_start).all()
+
+    # merged points are aligned on the first bucket of the window
+    step = GRANULARITIES[stored] * merge
+    points = defaultdict(list)
+    for row in rows:
+        points[first_bucket + (row.bucket_start - first_bucket) // step * step].append(row)
+    return {
+        "granularity": stored,
+        "buckets_per_point": merge,
+        "points": [_point(point_start, points[point_start]) for point_start in sorted(points)],
+    }
+
+
+def _ceil_bucket(timestamp: datetime, granularity: str) -> datetime:
+    start = bucket_start(timestamp, granularity)
+    return start if start == timestamp else start + GRANULARITIES[granularity]
+
+
+def covering_buckets(start: datetime, end: datetime, granularities: Sequence[str] = ("week", "day", "hour")) -> List[tuple]:
+    """
+    The fewest buckets covering start to end: whole weeks in the middle,
+    then whole days, then hours at the edges. start is rounded down to
+    its bucket of the finest granularity, the last bucket may extend past
+    end.
+
+    Returns:
+        list of (granularity, first bucket_start, bucket_start limit) ranges
+    """
+    if start >= end:
+        return []
+    granularity, finer = granularities[0], granularities[1:]
+    if not finer:
+        return [(granularity, bucket_start(start, granularity), end)]
+    low, high = _ceil_bucket(start, granularity), bucket_start(end, granularity)
+    if low >= high:
+        return covering_buckets(start, end, finer)
+    return covering_buckets(start, low, finer) + [(granularity, low, high)] + covering_buckets(high, end, finer)
+
+
+def latency_percentiles(
+    db: Session,
+    project_id: str,
+    start: datetime,
+    end: datetime,
+    quantiles: Sequence[float],
+    compacted_before: Optional[datetime] = None
+) -> dict:
+    """
+    Target latency quantiles of a project between start and end, merged
+    from the latency sketches of the covering buckets: about a dozen
+    sketches for any window, each quantile within the sketches' relative
+    accuracy.
+
+    Args:
+        db: Database session
+        project_id: Project to read
+        start: Window start (UTC), rounded down to the hour
+        end: Window end (UTC)
+        quantiles: Quantiles between 0 and 1
+        compacted_before: The project's compaction watermark, before it
+            hour buckets were removed and the window is rounded to days
+
+    Returns:
+        dict with the number of latencies and each quantile's value
+    """
+    if compacted_before is not None and start < compacted_before:
+        # the watermark is a Monday, so both parts align with the buckets
+        ranges = covering_buckets(start, min(end, compacted_before), ("week", "day"))
+        ranges += covering_buckets(compacted_before, end)
+    else:
+        ranges = covering_buckets(start, end)
+    if not ranges:
+        return {"latency_measured": 0, "quantiles": {str(q): None for q in quantiles}}
+    blobs = db.query(ProjectScoreBucket.latency_sketch).filter(
+        ProjectScoreBucket.project_id == project_id,
+        or_(*(
+            and_(
+                ProjectScoreBucket.granularity == granularity,
+                ProjectScoreBucket.bucket_start >= low,
+                ProjectScoreBucket.bucket_start < high
+            )
+            for granularity, low, high in ranges
+        ))
+    ).all()
+    sketch = merge_sketches(blob for blob, in blobs)
+    return {
+        "latency_measured": sketch.count,
+        "quantiles": {str(q): _rounded(sketch.quantile(q)) for q in quantiles},
+    }
@@ -1,13 +1,27 @@
+import hashlib
 from datetime import datetime
 
-from sqlalchemy import (Boolean, Column, DateTime, Float, ForeignKey, Integer,
-                        String, create_engine, desc)
+from sqlalchemy import (Boolean, Column, DateTime, Float, ForeignKey, Index,
+                        Integer, LargeBinary, String, create_engine, desc)
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
 from core.database import Base
 
 
+def qa_pair_hash(question: str, factual_answer: str) -> str:
+    """Content key of a QA pair: the first 128 bits of the SHA-256 of its texts."""
+    return hashlib.sha256(f"{question}\x00{factual_answer}".encode("utf-8")).hexdigest()[:32]
+
+
+# question and reference answer of a QA pair, stored once and shared by all its test results
+class QAPairs(Base):
+    __tablename__ = "qa_pairs"
+    qa_hash = Column(String, primary_key=True)  # qa_pair_hash(question, factual_answer)
+    question = Column(String, nullable=False)
+    factual_answer = Column(String, nullable=False)
+
+
 # unique value inserted for user id
 class TestInfo(Base):
     __tablename__ = "test_info"
@@ -18,7 +32,116 @@ class TestInfo(Base):
     hallucination_score = Column(Float, nullable=True)
     helpfullness_score = Column(Float, nullable=True)
     last_test_conducted = Column(DateTime, default=datetime.utcnow)
-    question = Column(String, nullable=False)
+    qa_hash = Column(String, ForeignKey("qa_pairs.qa_hash"), nullable=True)
     student_answer = Column(String, nullable=False)
-    factual_answer = Column(String, nullable=False)
     difficulty_level = Column(String, nullable=False)
+    response_latency_ms = Column(Float, nullable=True)  # time the target endpoint took to answer
+
+    # loaded in the same query as the result, the texts are read with it
+    qa_pair = relationship(QAPairs, lazy="joined")
+
+    __table_args__ = (
+        # results of a project, newest first: monitor and QA pair pages, test_id
+        # breaks ties so cursor pages are read in index order
+        Index("ix_test_info_project_id_last_test_conducted_test_id", "project_id", "last_test_conducted", "test_id"),
+        Index("ix_test_info_user_id", "user_id"),
+        # QA pairs still referenced, checked when retention deletes results
+        Index("ix_test_info_qa_hash", "qa_hash"),
+    )
+
+    def __init__(self, question: str = None, factual_answer: str = None, **kwargs):
+        """
+        question and factual_answer are kept on the new result until it is
+        written, which stores them in qa_pairs once (see insert_results).
+        """
+        super().__init__(**kwargs)
+        self._question = question
+        self._factual_answer = factual_answer
+        if question is not None and factual_answer is not None and self.qa_hash is None:
+            self.qa_hash = qa_pair_hash(question, factual_answer)
+
+    @property
+    def question(self):
+        pending = getattr(self, "_question", None)
+        return pending if pending is not None else (self.qa_pair.question if self.qa_pair else None)
+
+    @property
+    def factual_answer(self):
+        pending = getattr(self, "_factual_answer", None)
+        return pending if pending is not None else (self.qa_pair.factual_answer if self.qa_pair else None)
+
+    def qa_pair_row(self):
+        """The qa_pairs row of a new result, None for a result read from the database."""
+        if getattr(self, "_question", None) is None or getattr(self, "_factual_answer", None) is None:
+            return None
+        return {"qa_hash": self.qa_hash, "question": self._question, "factual_answer": self._factual_answer}
+
+
+# running totals of a project's test results, maintained by TestRunner.add_results
+class ProjectScoreRollup(Base):
+    __tablename__ = "project_score_rollups"
+    project_id = Column(String, ForeignKey("projects.project_id"), primary_key=True)
+    tests_total = Column(Integer, nullable=False, default=0)
+    tests_passed = Column(Integer, nullable=False, default=0)  # test_status "1"
+    hallucination_scored = Column(Integer, nullable=False, default=0)  # results with a hallucination score
+    hallucinations = Column(Integer, nullable=False, default=0)  # hallucination score 0
+    helpfulness_scored = Column(Integer, nullable=False, default=0)
+    helpfulness_sum = Column(Float, nullable=False, default=0.0)
+    tests_compacted = Column(Integer, nullable=False, default=0, server_default="0")  # of tests_total, raw results removed by retention
+    last_test_conducted = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+
+# score totals of a project per hour, day and week, maintained by TestRunner.add_results
+class ProjectScoreBucket(Base):
+    __tablename__ = "project_score_buckets"
+    project_id = Column(String, ForeignKey("projects.project_id"), primary_key=True)
+    granularity = Column(String, primary_key=True)  # hour, day, week
+    bucket_start = Column(DateTime, primary_key=True)  # UTC, weeks start on Monday
+    tests_total = Column(Integer, nullable=False, default=0)
+    tests_passed = Column(Integer, nullable=False, default=0)
+    hallucination_scored = Column(Integer, nullable=False, default=0)
+    hallucinations = Column(Integer, nullable=False, default=0)
+    helpfulness_scored = Column(Integer, nullable=False, default=0)
+    helpfulness_sum = Column(Float, nullable=False, default=0.0)
+    latency_measured = Column(Integer, nullable=False, default=0)
+    latency_sum_ms = Column(Float, nullable=False, default=0.0)
+    latency_max_ms = Column(Float, nullable=True)
+    latency_sketch = Column(LargeBinary, nullable=True)  # LatencySketch.to_bytes() of the bucket's latencies
+
+
+# change-point detector state of a project's metric, maintained by TestRunner.add_results
+class ProjectScoreDetector(Base):
+    __tablename__ = "project_score_detectors"
+    project_id = Column(String, ForeignKey("projects.project_id"), primary_key=True)
+    metric = Column(String, primary_key=True)  # hallucination, helpfulness, latency_ms
+    group_count = Column(Integer, nullable=False, default=0)  # results of the group not complete yet
+    group_sum = Column(Float, nullable=False, default=0.0)
+    samples = Column(Integer, nullable=False, default=0)  # complete groups
+    mean = Column(Float, nullable=False, default=0.0)  # baseline of group means, EWMA after the warmup groups
+    variance = Column(Float, nullable=False, default=0.0)
+    cusum_high = Column(Float, nullable=False, default=0.0)  # in baseline standard deviations
+    cusum_low = Column(Float, nullable=False, default=0.0)
+    run_high = Column(Integer, nullable=False, default=0)  # groups since the CUSUM was last 0
+    run_low = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+
+# a shift of a project's metric found by its detector
+class RegressionEvent(Base):
+    __tablename__ = "regression_events"
+    event_id = Column(Integer, primary_key=True, autoincrement=True)
+    project_id = Column(String, ForeignKey("projects.project_id"), nullable=False)
+    metric = Column(String, nullable=False)
+    direction = Column(String, nullable=False)  # worse (a regression) or better
+    detected_at = Column(DateTime, nullable=False)  # last_test_conducted of the result that crossed the threshold
+    baseline_mean = Column(Float, nullable=False)
+    baseline_std = Column(Float, nullable=False)
+    shifted_mean = Column(Float, nullable=False)  # mean of the group of results that crossed the threshold
+    statistic = Column(Float, nullable=False)  # CUSUM value
+    run_length = Column(Integer, nullable=False)  # groups of results the CUSUM accumulated over
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_regression_events_project_id_detected_at", "project_id", "detected_at"),
+    )
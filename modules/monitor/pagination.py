@@ -0,0 +1,127 @@
+import base64
+import json
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import Query, Session
+
+from modules.monitor.models import TestInfo
+
+
+class ResultFilters(BaseModel):
+    difficulty: Optional[str] = None
+    outcome: Optional[str] = None  # pass or fail
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+
+    def is_empty(self) -> bool:
+        return not any(self.model_dump().values())
+
+    def conditions(self) -> list:
+        """The filters as conditions on TestInfo columns."""
+        conditions = []
+        if self.difficulty:
+            conditions.append(TestInfo.difficulty_level == self.difficulty)
+        if self.outcome:
+            conditions.append(TestInfo.test_status == ("1" if self.outcome == "pass" else "0"))
+        if self.since:
+            conditions.append(TestInfo.last_test_conducted >= self.since)
+        if self.until:
+            conditions.append(TestInfo.last_test_conducted < self.until)
+        return conditions
+
+
+def encode_cursor(test_info: TestInfo) -> str:
+    """Opaque cursor pointing after test_info in (last_test_conducted, test_id) order."""
+    position = [test_info.last_test_conducted.isoformat(), test_info.test_id]
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    """
+    Returns:
+        tuple: (last_test_conducted, test_id)
+
+    Raises:
+        ValueError: The cursor was not produced by encode_cursor
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        last_test_conducted, test_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(last_test_conducted), str(test_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def filtered_results(db: Session, project_id: str, filters: ResultFilters) -> Query:
+    return db.query(TestInfo).filter(
+        TestInfo.project_id == project_id,
+        TestInfo.last_test_conducted.isnot(None),
+        *filters.conditions()
+    )
+
+
+def fetch_page(
+    db: Session,
+    project_id: str,
+    page_size: int,
+    filters: ResultFilters,
+    cursor: Optional[str] = None,
+    offset: int = 0
+) -> tuple:
+    """
+    One page of a project's results, newest first.
+
+    With a cursor the page starts right after the cursor's row: an index
+    range scan on (project_id, last_test_conducted, test_id) whose cost
+    does not depend on how deep the page is, and rows inserted meanwhile
+    cannot shift the page. offset is kept for page-number clients.
+
+    Returns:
+        tuple: (rows, cursor of the next page or None)
+    """
+    query = filtered_results(db, project_id, filters)
+    if cursor:
+        last_test_conducted, test_id = decode_cursor(cursor)
+        # row value comparison written out, so SQLite seeks the index on its first column
+        query = query.filter(
+            TestInfo.last_test_conducted <= last_test_conducted,
+            or_(
+                TestInfo.last_test_conducted < last_test_conducted,
+                and_(TestInfo.last_test_conducted == last_test_conducted, TestInfo.test_id < test_id)
+            )
+        )
+    rows: List[TestInfo] = query.order_by(
+        TestInfo.last_test_conducted.desc(), TestInfo.test_id.desc()
+    ).offset(offset).limit(page_size + 1).all()
+    next_cursor = encode_cursor(rows[page_size - 1]) if len(rows) > page_size else None
+    return rows[:page_size], next_cursor
+
+
+class CountCache:
+    """
+    Result counts per project and filter set, kept for ttl_seconds so that
+    paging through a filtered list counts it once.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    def count(self, db: Session, project_id: str, filters: ResultFilters) -> int:
+        key = (project_id, filters.model_dump_json())
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry and entry[0] > now:
+            return entry[1]
+        total = filtered_results(db, project_id, filters).with_entities(func.count()).scalar()
+        self._entries[key] = (now + self.ttl_seconds, total)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return total
@@ -28,7 +28,13 @@ async def project_monitoror():
         
         for project in projects:
             if project.is_active:
-                project_test_info = db.execute(select(TestInfo).filter(TestInfo.project_id == project.project_id)).first()
+                # latest result of the project, an index seek on (project_id, last_test_conducted)
+                project_test_info = db.execute(
+                    select(TestInfo)
+                    .filter(TestInfo.project_id == project.project_id)
+                    .order_by(TestInfo.last_test_conducted.desc())
+                    .limit(1)
+                ).first()
                 
                 # Check if project needs testing
                 should_test = False
@@ -0,0 +1,233 @@
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import delete, exists, literal_column, select, update
+from sqlalchemy.orm import Session
+
+from core.config import Settings, get_settings
+from core.logger import logger
+from modules.monitor.history import bucket_start, rebuild_buckets
+from modules.monitor.models import ProjectScoreBucket, ProjectScoreRollup, QAPairs, TestInfo
+from modules.monitor.rollups import get_rollup
+from modules.project_connections.models import Projects
+
+# PRAGMA auto_vacuum value of a database in incremental mode
+AUTO_VACUUM_INCREMENTAL = 2
+# qa_hash values per orphan check, below SQLite's bound parameter limit
+QA_HASH_CHUNK = 500
+
+
+def retention_cutoff(now: datetime, retention_days: int) -> datetime:
+    """
+    Results before this are compacted: the start of the week (Monday)
+    holding now - retention_days, so every day and week bucket before the
+    cutoff is complete when its raw results go.
+    """
+    return bucket_start(now - timedelta(days=retention_days), "week")
+
+
+def project_retention_days(project: Projects, settings: Settings) -> Optional[int]:
+    """Days of raw results the project keeps, None to keep them all."""
+    days = project.retention_days if project.retention_days is not None else settings.RESULT_RETENTION_DAYS
+    if days is not None and days < 1:
+        logger.warning(f"Ignoring retention of {days} days of project {project.project_id}")
+        return None
+    return days
+
+
+def compact_project(db: Session, project: Projects, cutoff: datetime, batch_size: int) -> dict:
+    """
+    Delete a project's raw results from before cutoff, with their hour
+    buckets and the QA pair texts no other result uses. Their day and week
+    buckets and the rollup keep the totals.
+
+    The watermark is committed first, so rollups and buckets rebuilt while
+    the results are being deleted count each result once; results are
+    deleted batch_size per transaction, so the monitor's writes wait for
+    one batch at most.
+
+    Args:
+        db: Database session, committed here
+        project: Project to compact
+        cutoff: Results before this are deleted, a Monday at midnight
+        batch_size: Results deleted per transaction
+
+    Returns:
+        dict with the results, hour buckets and QA pairs deleted
+    """
+    project_id = project.project_id
+    deleted = {"results": 0, "hour_buckets": 0, "qa_pairs": 0}
+    # built while the raw results are still there
+    if get_rollup(db, project_id) is None:
+        return deleted
+    if not db.query(ProjectScoreBucket.project_id).filter(
+        ProjectScoreBucket.project_id == project_id, ProjectScoreBucket.granularity == "day"
+    ).first():
+        logger.info(f"Building score buckets of project {project_id} before compacting it")
+        rebuild_buckets(db, project_id)
+
+    if project.results_compacted_before is None or project.results_compacted_before < cutoff:
+        project.results_compacted_before = cutoff
+        db.commit()
+
+    rowid = literal_column("rowid")
+    qa_hashes = set()
+    try:
+        while True:
+            rows = db.execute(
+                select(rowid, TestInfo.qa_hash).where(
+                    TestInfo.project_id == project_id,
+                    TestInfo.last_test_conducted < cutoff
+                ).limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            db.execute(delete(TestInfo.__table__).where(rowid.in_([row[0] for row in rows])))
+            db.execute(
+                update(ProjectScoreRollup)
+                .where(ProjectScoreRollup.project_id == project_id)
+                .values(tests_compacted=ProjectScoreRollup.tests_compacted + len(rows))
+            )
+            db.commit()
+            deleted["results"] += len(rows)
+            qa_hashes.update(row[1] for row in rows if row[1] is not None)
+
+        deleted["hour_buckets"] = db.query(ProjectScoreBucket).filter(
+            ProjectScoreBucket.project_id == project_id,
+            ProjectScoreBucket.granularity == "hour",
+            ProjectScoreBucket.bucket_start < cutoff
+        ).delete(synchronize_session=False)
+
+        # QA pairs are shared by projects with the same texts
+        qa_hashes = sorted(qa_hashes)
+        for i in range(0, len(qa_hashes), QA_HASH_CHUNK):
+            deleted["qa_pairs"] += db.execute(delete(QAPairs).where(
+                QAPairs.qa_hash.in_(qa_hashes[i:i + QA_HASH_CHUNK]),
+                ~exists().where(TestInfo.qa_hash == QAPairs.qa_hash)
+            )).rowcount
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return deleted
+
+
+def incremental_vacuum(db: Session, pages: int) -> int:
+    """
+    Return up to pages free pages to the file system.
+
+    Returns:
+        int: Pages released, 0 when the database is not in incremental
+        auto_vacuum mode (see enable_incremental_vacuum)
+    """
+    connection = db.connection()
+    if connection.exec_driver_sql("PRAGMA auto_vacuum").scalar() != AUTO_VACUUM_INCREMENTAL:
+        return 0
+    free_pages = connection.exec_driver_sql("PRAGMA freelist_count").scalar()
+    # execute() of the sqlite3 driver steps the pragma once, releasing one
+    # page; executescript runs it to completion
+    connection.connection.driver_connection.executescript(f"PRAGMA incremental_vacuum({int(pages)})")
+    released = free_pages - connection.exec_driver_sql("PRAGMA freelist_count").scalar()
+    db.commit()
+    return released
+
+
+def enable_incremental_vacuum(engine) -> None:
+    """
+    Switch an existing database to incremental auto_vacuum. Takes one full
+    VACUUM, which rewrites the file and holds the write lock meanwhile.
+    """
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.exec_driver_sql("PRAGMA auto_vacuum = INCREMENTAL")
+        connection.exec_driver_sql("VACUUM")
+
+
+def run_maintenance(db: Session, settings: Settings = None, now: datetime = None) -> dict:
+    """
+    Compact every project with a retention period, then release free pages.
+
+    Args:
+        db: Database session, committed here
+        settings: Retention settings, get_settings() by default
+        now: Current time (UTC)
+
+    Returns:
+        dict with the projects compacted, the rows deleted and the pages released
+    """
+    settings = settings or get_settings()
+    now = now or datetime.utcnow()
+    totals = {"projects": 0, "results": 0, "hour_buckets": 0, "qa_pairs": 0}
+    projects = db.query(Projects)
+    if settings.RESULT_RETENTION_DAYS is None:
+        projects = projects.filter(Projects.retention_days.isnot(None))
+    for project in projects.all():
+        retention_days = project_retention_days(project, settings)
+        if retention_days is None:
+            continue
+        deleted = compact_project(db, project, retention_cutoff(now, retention_days), settings.RETENTION_DELETE_BATCH)
+        if deleted["results"]:
+            logger.info(
+                f"Compacted {deleted['results']} results of project {project.project_id} "
+                f"older than {retention_days} days"
+            )
+            totals["projects"] += 1
+        for name, count in deleted.items():
+            totals[name] += count
+
+    totals["pages_released"] = incremental_vacuum(db, settings.RETENTION_VACUUM_PAGES)
+    if totals["results"] and not totals["pages_released"] and db.connection().exec_driver_sql(
+        "PRAGMA auto_vacuum"
+    ).scalar() != AUTO_VACUUM_INCREMENTAL:
+        logger.info(
+            "Freed pages are reused but the database file does not shrink; "
+            "run python -m modules.monitor.retention --enable-incremental-vacuum once"
+        )
+    return totals
+
+
+def run_maintenance_periodically():
+    """Run the maintenance job every RETENTION_INTERVAL_SECONDS, in a process of its own."""
+    from core.database import SessionLocal
+
+    settings = get_settings()
+    while True:
+        db = SessionLocal()
+        try:
+            totals = run_maintenance(db, settings)
+            logger.info(f"Database maintenance finished: {totals}")
+        except Exception as e:
+            logger.error(f"Error in database maintenance: {e}")
+        finally:
+            db.close()
+        time.sleep(settings.RETENTION_INTERVAL_SECONDS)
+
+
+def main():
+    """
+    Run the maintenance job once:
+    python -m modules.monitor.retention [--enable-incremental-vacuum]
+    """
+    import sys
+
+    from core.database import SessionLocal, create_tables, engine
+
+    create_tables()
+    if "--enable-incremental-vacuum" in sys.argv[1:]:
+        enable_incremental_vacuum(engine)
+        print("Database switched to incremental auto_vacuum")
+    db = SessionLocal()
+    try:
+        totals = run_maintenance(db)
+        logger.info(f"Database maintenance finished: {totals}")
+        print(
+            f"Compacted {totals['results']} results of {totals['projects']} projects, "
+            f"deleted {totals['hour_buckets']} hour buckets and {totals['qa_pairs']} QA pairs, "
+            f"released {totals['pages_released']} pages"
+        )
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+from datetime import datetime
+from functools import lru_cache
+from typing import Iterable, Optional
+
+from sqlalchemy import case, func, or_, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from core.logger import logger
+from modules.monitor.models import ProjectScoreBucket, ProjectScoreRollup, TestInfo
+from modules.project_connections.models import Projects
+
+# columns summed when results are added to an existing rollup
+COUNTER_COLUMNS = (
+    "tests_total", "tests_passed", "hallucination_scored",
+    "hallucinations", "helpfulness_scored", "helpfulness_sum"
+)
+
+
+def summarize_results(test_infos: Iterable[TestInfo]) -> dict:
+    """
+    Rollup increments of a batch of test results.
+
+    Args:
+        test_infos: TestInfo rows of one project
+
+    Returns:
+        dict with the counter columns and the latest last_test_conducted
+    """
+    summary = dict.fromkeys(COUNTER_COLUMNS, 0)
+    summary["helpfulness_sum"] = 0.0
+    summary["last_test_conducted"] = None
+    for test_info in test_infos:
+        summary["tests_total"] += 1
+        if test_info.test_status == "1":
+            summary["tests_passed"] += 1
+        if test_info.hallucination_score is not None:
+            summary["hallucination_scored"] += 1
+            if test_info.hallucination_score == 0:
+                summary["hallucinations"] += 1
+        if test_info.helpfullness_score is not None:
+            summary["helpfulness_scored"] += 1
+            summary["helpfulness_sum"] += test_info.helpfullness_score
+        if test_info.last_test_conducted is not None and (
+            summary["last_test_conducted"] is None
+            or test_info.last_test_conducted > summary["last_test_conducted"]
+        ):
+            summary["last_test_conducted"] = test_info.last_test_conducted
+    return summary
+
+
+def add_to_rollup(db: Session, project_id: str, test_infos: Iterable[TestInfo]) -> None:
+    """
+    Add test results to the project's rollup, in the caller's transaction.
+
+    A single upsert adds the increments to the stored counters, so
+    concurrent writers never overwrite each other's totals. The caller
+    commits together with the TestInfo rows.
+    """
+    summary = summarize_results(test_infos)
+    if not summary["tests_total"]:
+        return
+    db.execute(_rollup_upsert(), dict(project_id=project_id, updated_at=datetime.utcnow(), **summary))
+
+
+@lru_cache(maxsize=None)
+def _rollup_upsert():
+    """The rollup upsert, built once so SQLAlchemy compiles it once."""
+    table = ProjectScoreRollup.__table__
+    statement = insert(table)
+    updates = {name: table.c[name] + statement.excluded[name] for name in COUNTER_COLUMNS}
+    updates["last_test_conducted"] = func.max(
+        func.coalesce(table.c.last_test_conducted, statement.excluded.last_test_conducted),
+        func.coalesce(statement.excluded.last_test_conducted, table.c.last_test_conducted)
+    )
+    updates["tests_compacted"] = table.c.tests_compacted + statement.excluded.tests_compacted
+    updates["updated_at"] = statement.excluded.updated_at
+    return statement.on_conflict_do_update(index_elements=[table.c.project_id], set_=updates)
+
+
+def uncompacted_results():
+    """
+    Condition on TestInfo, joined with Projects, for the results after the
+    project's compaction watermark; the older ones are counted in its day
+    buckets.
+    """
+    return or_(
+        Projects.results_compacted_before.is_(None),
+        TestInfo.last_test_conducted >= Projects.results_compacted_before
+    )
+
+
+def compacted_totals(project_id: Optional[str] = None):
+    """
+    Select of the day bucket totals from before each project's compaction
+    watermark: project_id, the counter columns, and the start of the last
+    compacted day.
+    """
+    statement = select(
+        ProjectScoreBucket.project_id,
+        *(func.sum(getattr(ProjectScoreBucket, name)) for name in COUNTER_COLUMNS),
+        func.max(ProjectScoreBucket.bucket_start)
+    ).join(
+        Projects, Projects.project_id == ProjectScoreBucket.project_id
+    ).where(
+        ProjectScoreBucket.granularity == "day",
+        ProjectScoreBucket.bucket_start < Projects.results_compacted_before
+    ).group_by(ProjectScoreBucket.project_id)
+    if project_id is not None:
+        statement = statement.where(ProjectScoreBucket.project_id == project_id)
+    return statement
+
+
+def rebuild_rollups(db: Session, project_id: Optional[str] = None) -> int:
+    """
+    Recompute rollups from test_info, for one project or all of them.
+    Results compacted by retention are added back from the day buckets.
+
+    Args:
+        db: Database session, committed here
+        project_id: Project to rebuild, None for every project
+
+    Returns:
+        int: Number of rollup rows written
+    """
+    aggregates = select(
+        TestInfo.project_id,
+        func.count(),
+        func.sum(case((TestInfo.test_status == "1", 1), else_=0)),
+        func.count(TestInfo.hallucination_score),
+        func.sum(case((TestInfo.hallucination_score == 0, 1), else_=0)),
+        func.count(TestInfo.helpfullness_score),
+        func.coalesce(func.sum(TestInfo.helpfullness_score), 0.0),
+        func.max(TestInfo.last_test_conducted),
+        func.datetime("now")
+    ).outerjoin(
+        Projects, Projects.project_id == TestInfo.project_id
+    ).where(
+        TestInfo.project_id.isnot(None), uncompacted_results()
+    ).group_by(TestInfo.project_id)
+    deleted = db.query(ProjectScoreRollup)
+    if project_id is not None:
+        aggregates = aggregates.where(TestInfo.project_id == project_id)
+        deleted = deleted.filter(ProjectScoreRollup.project_id == project_id)
+    try:
+        deleted.delete(synchronize_session=False)
+        db.execute(
+            insert(ProjectScoreRollup.__table__).from_select(
+                ["project_id", *COUNTER_COLUMNS, "last_test_conducted", "updated_at"],
+                aggregates
+            )
+        )
+        now = datetime.utcnow()
+        for compacted_project_id, *counters, last_day in db.execute(compacted_totals(project_id)).all():
+            summary = dict(zip(COUNTER_COLUMNS, counters))
+            db.execute(_rollup_upsert(), dict(
+                project_id=compacted_project_id, tests_compacted=summary["tests_total"],
+                last_test_conducted=last_day, updated_at=now, **summary
+            ))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    # projects with only compacted results are not in the insert's rowcount
+    return deleted.count()
+
+
+def get_rollup(db: Session, project_id: str) -> Optional[ProjectScoreRollup]:
+    """
+    The project's rollup; built from test_info the first time it is read
+    for a project with results from before rollups existed.
+    """
+    rollup = db.get(ProjectScoreRollup, project_id)
+    if rollup is None and db.query(TestInfo.test_id).filter(TestInfo.project_id == project_id).first():
+        logger.info(f"Building score rollup of project {project_id}")
+        rebuild_rollups(db, project_id)
+        rollup = db.get(ProjectScoreRollup, project_id)
+    return rollup
+
+
+def main():
+    """Backfill rollups and score buckets: python -m modules.monitor.rollups [project_id]"""
+    import sys
+
+    from core.database import SessionLocal, create_tables
+    from modules.monitor.history import rebuild_buckets
+
+    create_tables()
+    db = SessionLocal()
+    try:
+        project_id = sys.argv[1] if len(sys.argv) > 1 else None
+        rollups = rebuild_rollups(db, project_id)
+        buckets = rebuild_buckets(db, project_id)
+        logger.info(f"Rebuilt {rollups} project score rollups and {buckets} score buckets")
+        print(f"Rebuilt {rollups} project score rollups and {buckets} score buckets")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+import queue
+import threading
+from collections import defaultdict
+from concurrent.futures import Future
+from datetime import datetime
+from functools import lru_cache
+from typing import Callable, List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from core.config import get_settings
+from core.logger import logger
+from modules.monitor.detection import ScoreDetector
+from modules.monitor.history import add_to_buckets
+from modules.monitor.models import QAPairs, TestInfo
+from modules.monitor.rollups import add_to_rollup
+
+
+def store_qa_pairs(db: Session, test_infos: List[TestInfo]) -> None:
+    """Insert the QA pair texts of new results that are not stored yet."""
+    rows = {}
+    for test_info in test_infos:
+        row = test_info.qa_pair_row()
+        if row is not None:
+            rows[row["qa_hash"]] = row
+    if rows:
+        db.execute(_qa_pair_insert(), list(rows.values()))
+
+
+@lru_cache(maxsize=None)
+def _qa_pair_insert():
+    return sqlite_insert(QAPairs.__table__).on_conflict_do_nothing(index_elements=["qa_hash"])
+
+
+def insert_results(db: Session, test_infos: List[TestInfo]) -> None:
+    """
+    Insert TestInfo rows with one executemany, without the ORM unit of
+    work: the objects stay transient and are not refreshed. Their QA pair
+    texts go to qa_pairs, the rows only reference them.
+    """
+    store_qa_pairs(db, test_infos)
+    now = datetime.utcnow()
+    for test_info in test_infos:
+        if test_info.last_test_conducted is None:
+            test_info.last_test_conducted = now
+    columns = [column.key for column in TestInfo.__table__.columns]
+    db.execute(insert(TestInfo.__table__), [
+        {name: getattr(test_info, name) for name in columns} for test_info in test_infos
+    ])
+
+
+def write_results(db: Session, project_id: str, test_infos: List[TestInfo],
+                  detector: Optional[ScoreDetector] = None) -> None:
+    """Add a project's results with their rollup, score buckets and detectors, in the caller's transaction."""
+    insert_results(db, test_infos)
+    add_to_rollup(db, project_id, test_infos)
+    add_to_buckets(db, project_id, test_infos)
+    if detector is not None:
+        detector.update(db, project_id, test_infos)
+
+
+class ResultWriter:
+    """
+    The single path test results take to the database in a process.
+
+    Runners concurrently finishing their tests submit their results; one
+    thread commits them as one transaction, waiting up to
+    max_delay_seconds for further submissions, up to batch_size results.
+    The SQLite write lock is then taken once per transaction instead of
+    once per runner. A transaction that fails is retried one submission at a
+    time, so a bad batch only fails its own submitter.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], batch_size: int, max_delay_seconds: float,
+                 detector: Optional[ScoreDetector] = None):
+        self.session_factory = session_factory
+        self.detector = detector  # change-point detection, updated in the results' transaction
+        self.batch_size = batch_size
+        self.max_delay_seconds = max_delay_seconds
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.transactions = 0
+
+    def submit(self, project_id: str, test_infos: List[TestInfo]) -> Future:
+        """
+        Queue results for writing.
+
+        Returns:
+            Future: resolved once the results are committed, or with the error
+        """
+        future = Future()
+        if not test_infos:
+            future.set_result(0)
+            return future
+        self._start()
+        self._queue.put((project_id, test_infos, future))
+        return future
+
+    def write(self, project_id: str, test_infos: List[TestInfo]) -> int:
+        """Queue results and wait until they are committed."""
+        return self.submit(project_id, test_infos).result()
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="result-writer", daemon=True)
+                self._thread.start()
+
+    def _next_batch(self) -> list:
+        batch = [self._queue.get()]
+        size = len(batch[0][1])
+        while size < self.batch_size:
+            try:
+                item = self._queue.get(timeout=self.max_delay_seconds)
+            except queue.Empty:
+                break
+            batch.append(item)
+            size += len(item[1])
+        return batch
+
+    def _commit(self, batch: list) -> None:
+        by_project = defaultdict(list)
+        for project_id, test_infos, _ in batch:
+            by_project[project_id].extend(test_infos)
+        db = self.session_factory()
+        try:
+            insert_results(db, [test_info for _, test_infos, _ in batch for test_info in test_infos])
+            # one rollup, bucket and detector upsert per project of the batch
+            for project_id, test_infos in by_project.items():
+                add_to_rollup(db, project_id, test_infos)
+                add_to_buckets(db, project_id, test_infos)
+                if self.detector is not None:
+                    self.detector.update(db, project_id, test_infos)
+            db.commit()
+            self.transactions += 1
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            try:
+                self._commit(batch)
+            except Exception as e:
+                if len(batch) == 1:
+                    batch[0][2].set_exception(e)
+                    continue
+                logger.warning(f"Result batch of {len(batch)} submissions failed, writing them one by one: {e}")
+                for item in batch:
+                    try:
+                        self._commit([item])
+                    except Exception as item_error:
+                        item[2].set_exception(item_error)
+                    else:
+                        item[2].set_result(len(item[1]))
+                continue
+            for _, test_infos, future in batch:
+                future.set_result(len(test_infos))
+
+
+_result_writer: Optional[ResultWriter] = None
+_result_writer_lock = threading.Lock()
+
+
+def get_result_writer() -> ResultWriter:
+    """The result writer of this process."""
+    global _result_writer
+    with _result_writer_lock:
+        if _result_writer is None:
+            from core.database import SessionLocal
+
+            settings = get_settings()
+            _result_writer = ResultWriter(
+                SessionLocal,
+                batch_size=settings.RESULT_WRITER_BATCH_SIZE,
+                max_delay_seconds=settings.RESULT_WRITER_MAX_DELAY_SECONDS,
+                detector=ScoreDetector.from_settings(settings) if settings.DETECTION_ENABLED else None
+            )
+        return _result_writer
@@ -1,7 +1,7 @@
 from datetime import datetime
 
-from sqlalchemy import (Boolean, Column, DateTime, Float, ForeignKey, Integer,
-                        String, create_engine, desc)
+from sqlalchemy import (Boolean, Column, DateTime, Float, ForeignKey, Index,
+                        Integer, String, create_engine, desc)
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from core.database import Base
@@ -21,4 +21,11 @@ class Projects(Base):
     is_active = Column(Boolean)
     test_interval_in_hrs = Column(Float)
     benchmark_knowledge_id = Column(String)
+    qa_budget = Column(Integer, nullable=True) # QA pairs generated per ingestion, defaults to QA_BUDGET_DEFAULT
+    retention_days = Column(Integer, nullable=True) # raw results kept, defaults to RESULT_RETENTION_DAYS
+    results_compacted_before = Column(DateTime, nullable=True) # raw results before this were compacted into score buckets
     registered_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_projects_user_id_is_active", "user_id", "is_active"),
+    )
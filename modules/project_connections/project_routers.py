@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from core.database import get_db
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from core.database import get_async_db
 from modules.Auth.schemas import AccessToken
 from modules.project_connections.models import Projects
 from modules.Auth.models import Users
@@ -16,12 +17,12 @@ router = APIRouter(tags=["PROJECT CONNECTIONS"])
 async def create_project(
     project: ProjectCreate,
     token_data: AccessToken,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     try:
-        user = db.query(Users).filter(
+        user = await db.scalar(select(Users).where(
             Users.verification_token == token_data.access_token
-        ).first()
+        ))
         
         if not user or not user.isVerified:
             raise HTTPException(
@@ -57,12 +58,14 @@ async def create_project(
             is_active=project.is_active,
             test_interval_in_hrs=project.test_interval_in_hrs,
             benchmark_knowledge_id=project.benchmark_knowledge_id,
+            qa_budget=project.qa_budget,
+            retention_days=project.retention_days,
             registered_at=datetime.utcnow()
         )
 
         db.add(new_project)
-        db.commit()
-        db.refresh(new_project)
+        await db.commit()
+        await db.refresh(new_project)
         
         logger.info(
             f"Project created successfully with ID: {new_project.project_id}"
@@ -76,21 +79,21 @@ async def create_project(
 
     except Exception as e:
         logger.error(f"Error creating project: {str(e)}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
     finally:
-        db.close()
+        await db.close()
 
 @router.put("/update-project/{project_id}")
-async def update_project(project_id: str, project: ProjectCreate, token_data: AccessToken, db: Session = Depends(get_db)):
+async def update_project(project_id: str, project: ProjectCreate, token_data: AccessToken, db: AsyncSession = Depends(get_async_db)):
     try:
-        user = db.query(Users).filter(Users.verification_token == token_data.access_token).first()
+        user = await db.scalar(select(Users).where(Users.verification_token == token_data.access_token))
         
         if not user or not user.isVerified:
             raise HTTPException(status_code=401, detail="Invalid token or unauthorized user")
 
-        existing_project = db.query(Projects).filter(Projects.project_id == project_id).first()
+        existing_project = await db.scalar(select(Projects).where(Projects.project_id == project_id))
         
         if not existing_project:
             raise HTTPException(status_code=404, detail="Project not found")
@@ -106,31 +109,35 @@ async def update_project(project_id: str, project: ProjectCreate, token_data: Ac
         existing_project.payload_body = str(project.payload_body)
         existing_project.is_active = project.is_active
         existing_project.test_interval_in_hrs = project.test_interval_in_hrs
+        if project.qa_budget is not None:
+            existing_project.qa_budget = project.qa_budget
+        if project.retention_days is not None:
+            existing_project.retention_days = project.retention_days
 
-        db.commit()
-        db.refresh(existing_project)
+        await db.commit()
+        await db.refresh(existing_project)
         logger.info(f"Project with ID {project_id} updated successfully")
 
         return {"status": "ok", "message": "Project updated successfully"}
 
     except Exception as e:
         logger.error(f"Error updating project: {str(e)}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
     finally:
-        db.close()
+        await db.close()
 
 
 @router.delete("/delete-project/{project_id}")
-async def delete_project(project_id: str, token_data: AccessToken, db: Session = Depends(get_db)):
+async def delete_project(project_id: str, token_data: AccessToken, db: AsyncSession = Depends(get_async_db)):
     try:
-        user = db.query(Users).filter(Users.verification_token == token_data.access_token).first()
+        user = await db.scalar(select(Users).where(Users.verification_token == token_data.access_token))
         
         if not user or not user.isVerified:
             raise HTTPException(status_code=401, detail="Invalid token or unauthorized user")
 
-        existing_project = db.query(Projects).filter(Projects.project_id == project_id).first()
+        existing_project = await db.scalar(select(Projects).where(Projects.project_id == project_id))
         
         if not existing_project:
             raise HTTPException(status_code=404, detail="Project not found")
@@ -138,30 +145,32 @@ async def delete_project(project_id: str, token_data: AccessToken, db: Session =
         if existing_project.user_id!= user.user_id:
             raise HTTPException(status_code=401, detail="Unauthorized user")
 
-        db.delete(existing_project)
-        db.commit()
+        await db.delete(existing_project)
+        await db.commit()
         logger.info(f"Project with ID {project_id} deleted successfully")   
 
         return {"status": "ok", "message": "Project deleted successfully"}
 
     except Exception as e:
         logger.error(f"Error deleting project: {str(e)}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
     finally:
-        db.close()
+        await db.close()
 
 
 @router.post("/total-projects/")
-async def total_projects(token_data: AccessToken, db: Session = Depends(get_db)):
+async def total_projects(token_data: AccessToken, db: AsyncSession = Depends(get_async_db)):
     try:
-        user = db.query(Users).filter(Users.verification_token == token_data.access_token).first()
+        user = await db.scalar(select(Users).where(Users.verification_token == token_data.access_token))
         
         if not user or not user.isVerified:
             raise HTTPException(status_code=401, detail="Invalid token or unauthorized user")
 
-        total_projects = db.query(Projects).filter(Projects.user_id == user.user_id).count()
+        total_projects = await db.scalar(
+            select(func.count()).select_from(Projects).where(Projects.user_id == user.user_id)
+        )
         logger.info(f"Total projects retrieved successfully")
 
         return {"status": "ok", "message": "Total projects retrieved successfully", "total_projects": total_projects}
@@ -171,18 +180,18 @@ async def total_projects(token_data: AccessToken, db: Session = Depends(get_db))
         raise HTTPException(status_code=500, detail=str(e))
 
     finally:
-        db.close()
+        await db.close()
 
 
 @router.post("/all-projects/")
-async def all_projects(token_data: AccessToken, db: Session = Depends(get_db)):
+async def all_projects(token_data: AccessToken, db: AsyncSession = Depends(get_async_db)):
     try:
-        user = db.query(Users).filter(Users.verification_token == token_data.access_token).first()
+        user = await db.scalar(select(Users).where(Users.verification_token == token_data.access_token))
         
         if not user or not user.isVerified:
             raise HTTPException(status_code=401, detail="Invalid token or unauthorized user")
 
-        projects = db.query(Projects).filter(Projects.user_id == user.user_id).all()
+        projects = (await db.scalars(select(Projects).where(Projects.user_id == user.user_id))).all()
         logger.info(f"All projects retrieved successfully for user {user.user_id}")
 
         return {"status": "ok", "message": "All projects retrieved successfully", "projects": projects}
@@ -192,7 +201,7 @@ async def all_projects(token_data: AccessToken, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=str(e))
 
     finally:
-        db.close()
+        await db.close()
 
 from enum import Enum
 class Status(str, Enum):
@@ -200,14 +209,14 @@ class Status(str, Enum):
     DEACTIVATE = "deactivate"
 
 @router.post("/activate-project/{project_id}")
-async def activate_project(project_id: str, status: Status, token_data: AccessToken, db: Session = Depends(get_db)):
+async def activate_project(project_id: str, status: Status, token_data: AccessToken, db: AsyncSession = Depends(get_async_db)):
     try:
-        user = db.query(Users).filter(Users.verification_token == token_data.access_token).first()
+        user = await db.scalar(select(Users).where(Users.verification_token == token_data.access_token))
         
         if not user or not user.isVerified:
             raise HTTPException(status_code=401, detail="Invalid token or unauthorized user")
 
-        existing_project = db.query(Projects).filter(Projects.project_id == project_id).first()
+        existing_project = await db.scalar(select(Projects).where(Projects.project_id == project_id))
         
         if not existing_project:
             raise HTTPException(status_code=404, detail="Project not found")
@@ -220,16 +229,16 @@ async def activate_project(project_id: str, status: Status, token_data: AccessTo
         elif status == "activate":
             existing_project.is_active = True
             message = "Project activated successfully"
-        db.commit()
-        db.refresh(existing_project)
+        await db.commit()
+        await db.refresh(existing_project)
         logger.info(f"Project with ID {project_id} activated successfully")
 
         return {"status": "ok", "message": message}
 
     except Exception as e:
         logger.error(f"Error activating project: {str(e)}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
     finally:
-        db.close()
\ No newline at end of file
+        await db.close()
\ No newline at end of file
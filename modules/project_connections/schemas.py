@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Dict,List
+from pydantic import BaseModel, Field
+from typing import Dict,List,Optional
 class ProjectCreate(BaseModel):
     project_name: str
     content_type: str
@@ -11,6 +11,8 @@ class ProjectCreate(BaseModel):
     is_active: bool
     test_interval_in_hrs: float
     benchmark_knowledge_id: str
+    qa_budget: Optional[int] = Field(default=None, ge=1)
+    retention_days: Optional[int] = Field(default=None, ge=1)
 
 
 class ProjectUpdate(BaseModel):
@@ -23,4 +25,6 @@ class ProjectUpdate(BaseModel):
     header_values:List[str]
     is_active: bool
     test_interval_in_hrs: float
-    benchmark_knowledge_id:str
\ No newline at end of file
+    benchmark_knowledge_id:str
+    qa_budget: Optional[int] = Field(default=None, ge=1)
+    retention_days: Optional[int] = Field(default=None, ge=1)
\ No newline at end of file
@@ -1,15 +1,71 @@
-from fastapi import HTTPException,APIRouter
-from fastapi.responses import FileResponse
+from fastapi import HTTPException,APIRouter,Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from .Auth.schemas import AccessToken
-from core.database import SessionLocal
+from core.config import get_settings
+from core.database import SessionLocal, engine
+from core.log_reader import LogQuery, log_files, read_log
+from core.logger import file_handler, logger
+from core.snapshot import (SNAPSHOT_COMPRESSIONS, compress_stream, compressed_chunks, remove_snapshot,
+                           snapshot_database)
 from .Auth.models import Users
+from datetime import datetime
+from typing import Optional
 import os
 
 
 router = APIRouter(tags=["SERVICES"])
 
+
+def _naive_local(value: Optional[datetime]) -> Optional[datetime]:
+    """A query time as the naive server local time the log is written in; naive values are taken as local."""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone().replace(tzinfo=None)
+
+
+def _accepts_gzip(accept_encoding: str) -> bool:
+    """Whether an Accept-Encoding header allows gzip: listed, or covered by *, with a q-value above 0."""
+    weights = {}
+    for entry in accept_encoding.lower().split(","):
+        coding, _, params = entry.partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if coding.strip():
+            weights[coding.strip()] = q
+    return weights.get("gzip", weights.get("x-gzip", weights.get("*", 0.0))) > 0
+
+
 @router.post("/download-database")
-async def download_database(token_data: AccessToken):
+async def download_database(token_data: AccessToken, compression: Optional[str] = None):
+    """
+    Download a consistent snapshot of the SQLite database.
+    
+    The snapshot is copied with SQLite's online backup API into a temporary
+    file, so it is the database as of one commit even while the monitor
+    writes, and is compressed as it is streamed.
+    
+    Args:
+        token_data: User authentication token
+        compression: zstd, gzip or none, DATABASE_SNAPSHOT_COMPRESSION by default
+        
+    Returns:
+        app_database.db, .db.zst or .db.gz as an attachment
+    """
+    settings = get_settings()
+    compression = compression or settings.DATABASE_SNAPSHOT_COMPRESSION
+    if compression not in SNAPSHOT_COMPRESSIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"compression must be one of: {', '.join(SNAPSHOT_COMPRESSIONS)}"
+        )
     try:
         # Get user from database
         db = SessionLocal()
@@ -17,30 +73,89 @@ async def download_database(token_data: AccessToken):
         
         if not user or not user.isVerified:
             raise HTTPException(status_code=401, detail="Invalid token or unauthorized user")
-        
-        db_path = "./app_database.db" 
-        return FileResponse(
-            path=db_path,
-            filename="app_database.db",
-            media_type="application/octet-stream"
-        )
     except Exception as e:
         raise HTTPException(status_code=401, detail="Invalid token")
     finally:
         db.close()
 
+    try:
+        snapshot_path = await run_in_threadpool(
+            snapshot_database, engine.url.database, settings.DATABASE_SNAPSHOT_DIR
+        )
+    except Exception as e:
+        logger.error(f"Error taking database snapshot: {e}")
+        raise HTTPException(status_code=500, detail="Failed to take database snapshot")
+    logger.info(f"Sending database snapshot to user {user.user_id}, {compression} compressed")
+
+    media_type, suffix = SNAPSHOT_COMPRESSIONS[compression]
+    return StreamingResponse(
+        compressed_chunks(snapshot_path, compression),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="app_database.db{suffix}"'},
+        # runs once the response is sent or the client disconnected
+        background=BackgroundTask(remove_snapshot, snapshot_path)
+    )
+
 @router.get("/download-logs")
-async def download_logs():
+async def download_logs(
+    request: Request,
+    tail: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    level: Optional[str] = None,
+    request_id: Optional[str] = None
+):
+    """
+    Download the application log, or the records matching the query options.
+    
+    Without options app.log is sent whole. With any option the rotated files
+    are searched too: tail reads them backwards from the end, since is found
+    by bisecting each file, so a slice costs about what it returns. The
+    response is gzip encoded when the client accepts it.
+    
+    Args:
+        request: Incoming request, for its Accept-Encoding
+        tail: Only the last this many matching records
+        since: Only records at or after this time, server local time as logged
+            unless it has a UTC offset
+        until: Only records before this time
+        level: Minimum level: DEBUG, INFO, WARNING, ERROR or CRITICAL
+        request_id: Only records mentioning this request ID
+        
+    Returns:
+        text/plain stream of log records
+    """
     # Specify the path to your log file
-    log_file_path = "app.log"
+    log_file_path = file_handler.baseFilename
     
     # Check if the file exists
     if not os.path.exists(log_file_path):
         raise HTTPException(status_code=404, detail="Log file not found")
+    if tail is not None and tail < 1:
+        raise HTTPException(status_code=400, detail="tail must be greater than 0")
+    if level is not None and level.upper() not in ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"):
+        raise HTTPException(status_code=400, detail="level must be DEBUG, INFO, WARNING, ERROR or CRITICAL")
+    
+    query = LogQuery(since=_naive_local(since), until=_naive_local(until), level=level, request_id=request_id)
+    # opened now, a rotation while the response is sent renames them without moving them
+    files = [open(path, "rb") for path in log_files(log_file_path, file_handler.backupCount)]
+    
+    def close_files():
+        for file in files:
+            file.close()
     
-    # Return the file as a downloadable response
-    return FileResponse(
-        path=log_file_path,
-        filename="app.log",  # This determines the download filename
-        media_type="application/octet-stream"  # Forces download in most browsers
-    )
\ No newline at end of file
+    if query.is_empty() and tail is None:
+        # as before, the current file whole
+        chunks = iter(lambda: files[-1].read(1024 * 1024), b"")
+    else:
+        chunks = read_log(files, query, tail)
+    headers = {"Content-Disposition": 'attachment; filename="app.log"', "Vary": "Accept-Encoding"}
+    if _accepts_gzip(request.headers.get("accept-encoding", "")):
+        chunks = compress_stream(chunks, "gzip")
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(
+        chunks,
+        media_type="text/plain; charset=utf-8",
+        headers=headers,
+        background=BackgroundTask(close_files)
+    )
@@ -0,0 +1,102 @@
+import asyncio
+import os
+import sys
+from datetime import datetime
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+# Add the root directory to the Python path to import modules properly
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, parent_dir)
+
+from core.database import Base, get_async_db  # noqa: E402
+from modules.Auth.models import Users  # noqa: E402
+from modules.benchmark import routes as benchmark_routes  # noqa: E402
+from modules.monitor import models  # noqa: E402
+from modules.project_connections.models import Projects  # noqa: E402
+
+TOKEN = "token-u1"
+
+# tables of the test results and everything maintained as they are written
+MONITOR_TABLES = (
+    Users, Projects, models.QAPairs, models.TestInfo, models.ProjectScoreRollup, models.ProjectScoreBucket,
+    models.ProjectScoreDetector, models.RegressionEvent
+)
+
+
+@pytest.fixture
+def make_session(tmp_path):
+    """Sessions of a file database with the monitor tables, one the async routes can open too."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    Base.metadata.create_all(engine, tables=[model.__table__ for model in MONITOR_TABLES])
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def db(make_session):
+    session = make_session()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def get_route(tmp_path, make_session):
+    """
+    GET a benchmark route on the test database through the async session;
+    user u1 signs in with TOKEN.
+    """
+    db = make_session()
+    db.add(Users(user_id="u1", name="u1", email="u1@example.com", password="x",
+                 isVerified=True, verification_token=TOKEN))
+    db.commit()
+    db.close()
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'app.db'}")
+    session_factory = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    async def get_test_db():
+        async with session_factory() as session:
+            yield session
+
+    application = FastAPI()
+    application.include_router(benchmark_routes.router, prefix="/api/v1")
+    application.dependency_overrides[get_async_db] = get_test_db
+
+    def get(url):
+        async def send():
+            transport = httpx.ASGITransport(app=application)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await client.get(url)
+        return asyncio.run(send())
+
+    yield get
+    asyncio.run(async_engine.dispose())
+
+
+def make_result(test_id: str, at: datetime, project_id: str = "p1", hallucination=None, helpfulness=None,
+                latency=None, test_status=None, question="q", difficulty="easy") -> models.TestInfo:
+    """
+    A test result; unless test_status is given it passes like a monitor
+    run does, without hallucination and with helpfulness above 0.5.
+    """
+    if test_status is None:
+        test_status = "1" if hallucination == 1 and (helpfulness or 0) > 0.5 else "0"
+    return models.TestInfo(
+        test_id=test_id,
+        user_id="u1",
+        project_id=project_id,
+        test_status=test_status,
+        hallucination_score=hallucination,
+        helpfullness_score=helpfulness,
+        last_test_conducted=at,
+        question=question,
+        student_answer="a",
+        factual_answer="f",
+        difficulty_level=difficulty,
+        response_latency_ms=latency
+    )
@@ -0,0 +1,146 @@
+"""In-memory stand-in for the few Motor collection methods the ingestion code uses."""
+import copy
+from types import SimpleNamespace
+
+from bson import ObjectId
+
+OPERATORS = {
+    "$in": lambda value, operand: value in operand,
+    "$nin": lambda value, operand: value not in operand,
+    "$ne": lambda value, operand: value != operand,
+    "$exists": lambda value, operand: (value is not None) == operand,
+}
+
+
+def _get(doc, key):
+    for part in key.split("."):
+        if not isinstance(doc, dict):
+            return None
+        doc = doc.get(part)
+    return doc
+
+
+def _is_operators(condition):
+    return isinstance(condition, dict) and condition and all(name in OPERATORS for name in condition)
+
+
+def _matches_value(value, condition):
+    if _is_operators(condition):
+        return all(OPERATORS[name](value, operand) for name, operand in condition.items())
+    return value == condition
+
+
+def matches(doc, query):
+    return all(_matches_value(_get(doc, key), condition) for key, condition in query.items())
+
+
+def pull(values, condition):
+    """Array elements left by a $pull of condition."""
+    if isinstance(condition, dict) and not _is_operators(condition):
+        return [value for value in values if not (isinstance(value, dict) and matches(value, condition))]
+    return [value for value in values if not _matches_value(value, condition)]
+
+
+def project(doc, projection):
+    if not projection:
+        return copy.deepcopy(doc)
+    # a dotted path returns its whole top-level field
+    included = {key.split(".")[0] for key, flag in projection.items() if flag}
+    if included:
+        return {key: copy.deepcopy(doc[key]) for key in included | {"_id"} if key in doc}
+    return {key: copy.deepcopy(value) for key, value in doc.items() if key not in projection}
+
+
+class MemoryCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, keys, direction=None):
+        if isinstance(keys, str):
+            keys = [(keys, direction or 1)]
+        for key, order in reversed(keys):
+            self.docs.sort(key=lambda doc: _get(doc, key), reverse=order < 0)
+        return self
+
+    def __aiter__(self):
+        self._iterator = iter(self.docs)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iterator)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class MemoryCollection:
+    def __init__(self):
+        self.docs = []
+        self.writes = 0
+
+    def find(self, query=None, projection=None):
+        return MemoryCursor([project(doc, projection) for doc in self.docs if matches(doc, query or {})])
+
+    async def find_one(self, query=None, projection=None, sort=None):
+        cursor = self.find(query, projection)
+        if sort:
+            cursor.sort(sort)
+        return cursor.docs[0] if cursor.docs else None
+
+    async def distinct(self, key, query=None):
+        values = []
+        for doc in self.docs:
+            value = _get(doc, key)
+            if matches(doc, query or {}) and value is not None and value not in values:
+                values.append(value)
+        return values
+
+    async def insert_one(self, doc):
+        doc.setdefault("_id", ObjectId())
+        self.docs.append(copy.deepcopy(doc))
+        self.writes += 1
+        return SimpleNamespace(inserted_id=doc["_id"])
+
+    async def replace_one(self, query, replacement, upsert=False):
+        self.writes += 1
+        for index, doc in enumerate(self.docs):
+            if matches(doc, query):
+                self.docs[index] = dict(copy.deepcopy(replacement), _id=doc["_id"])
+                return SimpleNamespace(matched_count=1)
+        if upsert:
+            self.docs.append(dict(copy.deepcopy(replacement), _id=ObjectId()))
+        return SimpleNamespace(matched_count=0)
+
+    async def find_one_and_replace(self, query, replacement, projection=None, upsert=False, return_document=None):
+        await self.replace_one(query, replacement, upsert=upsert)
+        return await self.find_one(query, projection)
+
+    async def update_one(self, query, update, upsert=False):
+        self.writes += 1
+        for doc in self.docs:
+            if matches(doc, query):
+                doc.update(copy.deepcopy(update.get("$set", {})))
+                for key, condition in update.get("$pull", {}).items():
+                    doc[key] = pull(doc.get(key, []), condition)
+                return SimpleNamespace(matched_count=1)
+        if upsert:
+            await self.insert_one(dict(query, **update.get("$set", {})))
+        return SimpleNamespace(matched_count=0)
+
+    async def delete_many(self, query):
+        before = len(self.docs)
+        self.docs = [doc for doc in self.docs if not matches(doc, query)]
+        self.writes += 1
+        return SimpleNamespace(deleted_count=before - len(self.docs))
+
+    async def create_index(self, *args, **kwargs):
+        return None
+
+
+class MemoryDatabase:
+    """Collections are created on first access, like attributes of a Motor database."""
+
+    def __getattr__(self, name):
+        collection = MemoryCollection()
+        setattr(self, name, collection)
+        return collection
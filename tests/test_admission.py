@@ -0,0 +1,204 @@
+import asyncio
+import os
+import sys
+
+import pytest
+from fastapi import HTTPException
+
+# Add the root directory to the Python path to import modules properly
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, parent_dir)
+
+from modules.ingestion.admission import (AdmissionController,  # noqa: E402
+                                         AdmissionMiddleware,
+                                         AdmissionRejected)
+
+
+def make_controller(**overrides):
+    settings = dict(max_active=1, max_waiting=1, wait_seconds=0.2, max_per_user=1, retry_after=7)
+    settings.update(overrides)
+    return AdmissionController(**settings)
+
+
+def test_waiting_room_is_bounded():
+    async def scenario():
+        controller = make_controller()
+        await controller.acquire()
+        waiter = asyncio.ensure_future(controller.acquire())
+        await asyncio.sleep(0)
+        assert controller.metrics()["waiting_uploads"] == 1
+
+        # the waiting room is full, the third upload is rejected right away
+        with pytest.raises(AdmissionRejected) as rejected:
+            await controller.acquire()
+        assert rejected.value.retry_after == 7
+
+        controller.release()
+        await waiter
+        assert controller.metrics()["active_uploads"] == 1
+
+        # nobody releases the slot, the next waiter times out
+        with pytest.raises(AdmissionRejected):
+            await controller.acquire()
+        metrics = controller.metrics()
+        assert (metrics["admitted_total"], metrics["rejected_total"], metrics["waiting_uploads"]) == (2, 2, 0)
+
+    asyncio.run(scenario())
+
+
+def test_per_user_limit():
+    controller = make_controller()
+    with controller.user_slot("alice"):
+        with pytest.raises(HTTPException) as rejected:
+            with controller.user_slot("alice"):
+                pass
+        assert rejected.value.status_code == 429
+        assert rejected.value.headers["Retry-After"] == "7"
+        with controller.user_slot("bob"):
+            assert controller.metrics()["users_uploading"] == 2
+    assert controller.metrics()["users_uploading"] == 0
+
+
+def test_middleware_rejects_before_reading_the_body(monkeypatch):
+    controller = make_controller(max_waiting=0)
+    monkeypatch.setattr("modules.ingestion.admission._controller", controller)
+    calls = []
+
+    async def app(scope, receive, send):
+        calls.append(scope["path"])
+
+    async def scenario():
+        middleware = AdmissionMiddleware(app)
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        async def receive():
+            raise AssertionError("the body must not be read")
+
+        await controller.acquire()
+        await middleware({"type": "http", "method": "POST", "path": "/api/v1/process-file"}, receive, send)
+        await middleware({"type": "http", "method": "GET", "path": "/api/v1/projects"}, receive, send)
+        return sent
+
+    sent = asyncio.run(scenario())
+    assert sent[0]["status"] == 429
+    assert (b"retry-after", b"7") in sent[0]["headers"]
+    assert calls == ["/api/v1/projects"]
+
+
+def test_middleware_takes_the_user_slot_before_reading_the_body(monkeypatch):
+    controller = make_controller(max_active=4)
+    monkeypatch.setattr("modules.ingestion.admission._controller", controller)
+
+    async def verified_user_id(access_token):
+        return {"token-alice": "alice", "token-bob": "bob"}.get(access_token)
+
+    monkeypatch.setattr("modules.ingestion.admission.verified_user_id", verified_user_id)
+
+    async def scenario():
+        uploading = asyncio.Event()
+        finish = asyncio.Event()
+
+        async def app(scope, receive, send):
+            # a slow upload holding alice's only slot
+            await receive()
+            uploading.set()
+            await finish.wait()
+            await send({"type": "http.response.start", "status": 202, "headers": []})
+            await send({"type": "http.response.body", "body": b""})
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def receive_nothing():
+            raise AssertionError("the body must not be read")
+
+        def upload(token):
+            sent = []
+
+            async def send(message):
+                sent.append(message)
+
+            scope = {"type": "http", "method": "POST", "path": "/api/v1/projects/p1/benchmark-files",
+                     "headers": [(b"x-access-token", token.encode())]}
+            return scope, send, sent
+
+        middleware = AdmissionMiddleware(app)
+        scope, send, first = upload("token-alice")
+        running = asyncio.ensure_future(middleware(scope, receive, send))
+        await uploading.wait()
+
+        scope, send, second = upload("token-alice")
+        await middleware(scope, receive_nothing, send)
+        scope, send, unknown = upload("bad")
+        await middleware(scope, receive_nothing, send)
+        assert controller.metrics()["active_uploads"] == 1
+
+        finish.set()
+        await running
+        return first, second, unknown
+
+    first, second, unknown = asyncio.run(scenario())
+    assert first[0]["status"] == 202
+    assert second[0]["status"] == 429
+    assert (b"retry-after", b"7") in second[0]["headers"]
+    assert unknown[0]["status"] == 401
+    metrics = controller.metrics()
+    assert (metrics["active_uploads"], metrics["users_uploading"], metrics["rejected_total"]) == (0, 0, 1)
+
+
+def test_middleware_leaves_a_form_token_to_the_route(monkeypatch):
+    controller = make_controller()
+    monkeypatch.setattr("modules.ingestion.admission._controller", controller)
+    admitted = []
+
+    async def app(scope, receive, send):
+        admitted.append(controller.metrics())
+
+    async def scenario():
+        async def receive():
+            raise AssertionError("the body is read by the route")
+
+        async def send(message):
+            raise AssertionError("the route responds")
+
+        await AdmissionMiddleware(app)({"type": "http", "method": "POST", "path": "/api/v1/process-file",
+                                        "headers": []}, receive, send)
+
+    asyncio.run(scenario())
+    assert [(metrics["active_uploads"], metrics["users_uploading"]) for metrics in admitted] == [(1, 0)]
+    assert controller.metrics()["active_uploads"] == 0
+
+
+def test_middleware_checks_the_token_before_taking_a_slot(monkeypatch):
+    controller = make_controller(max_waiting=0)
+    monkeypatch.setattr("modules.ingestion.admission._controller", controller)
+
+    async def verified_user_id(access_token):
+        return None
+
+    monkeypatch.setattr("modules.ingestion.admission.verified_user_id", verified_user_id)
+
+    async def app(scope, receive, send):
+        raise AssertionError("an unknown user must not reach the route")
+
+    async def scenario():
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        async def receive():
+            raise AssertionError("the body must not be read")
+
+        # all upload slots are taken, the bad token is still answered with 401 right away
+        await controller.acquire()
+        await AdmissionMiddleware(app)({"type": "http", "method": "POST", "path": "/api/v1/process-file",
+                                        "headers": [(b"x-access-token", b"bad")]}, receive, send)
+        return sent
+
+    sent = asyncio.run(scenario())
+    assert sent[0]["status"] == 401
+    assert controller.metrics()["rejected_total"] == 0
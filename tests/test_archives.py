@@ -0,0 +1,78 @@
+import io
+import os
+import sys
+import tarfile
+import zipfile
+
+import pytest
+
+# Add the root directory to the Python path to import modules properly
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, parent_dir)
+
+from modules.ingestion.archives import (ArchiveLimitError, ArchiveLimits,  # noqa: E402
+                                        expand_archive, is_archive)
+
+
+def write_zip(path, entries):
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, data in entries.items():
+            archive.writestr(name, data)
+
+
+def test_zip_entries_are_extracted_and_checked(tmp_path):
+    archive_path = str(tmp_path / "docs.zip")
+    write_zip(archive_path, {
+        "guide/intro.md": b"# Intro\nHello",
+        "../../escape.txt": b"still extracted inside the spool",
+        "report.pdf": b"not really a pdf",
+        "image.png": b"\x89PNG",
+        "__MACOSX/._intro.md": b"resource fork",
+        ".DS_Store": b"clutter",
+    })
+    entries = list(expand_archive(archive_path, str(tmp_path / "out"), ArchiveLimits()))
+
+    by_name = {entry.name: entry for entry in entries}
+    assert set(by_name) == {"guide/intro.md", "../../escape.txt", "report.pdf", "image.png"}
+    assert by_name["report.pdf"].error == "not a PDF file"
+    assert by_name["image.png"].error == "unsupported file type"
+    for name in ("guide/intro.md", "../../escape.txt"):
+        entry = by_name[name]
+        assert entry.error is None
+        assert os.path.dirname(entry.path) == str(tmp_path / "out")
+    with open(by_name["guide/intro.md"].path, "rb") as extracted:
+        assert extracted.read() == b"# Intro\nHello"
+
+
+def test_tar_gz_is_read_sequentially(tmp_path):
+    archive_path = str(tmp_path / "docs.tar.gz")
+    with tarfile.open(archive_path, "w:gz") as archive:
+        for name, data in {"a.txt": b"alpha", "dir/b.md": b"# beta"}.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+        link = tarfile.TarInfo("link.txt")
+        link.type = tarfile.SYMTYPE
+        link.linkname = "/etc/passwd"
+        archive.addfile(link)
+    entries = list(expand_archive(archive_path, str(tmp_path / "out"), ArchiveLimits()))
+    assert [(entry.name, entry.size_bytes) for entry in entries] == [("a.txt", 5), ("dir/b.md", 6)]
+    assert is_archive("docs.tar.gz") and is_archive("DOCS.ZIP") and not is_archive("a.pdf")
+
+
+def test_decompression_bombs_are_rejected(tmp_path):
+    archive_path = str(tmp_path / "bomb.zip")
+    write_zip(archive_path, {"zeros.txt": b" " * (10 * 1024 * 1024)})
+    with pytest.raises(ArchiveLimitError):
+        list(expand_archive(archive_path, str(tmp_path / "out"), ArchiveLimits(max_ratio=100)))
+
+
+def test_entry_and_count_limits(tmp_path):
+    archive_path = str(tmp_path / "many.zip")
+    write_zip(archive_path, {f"{i}.txt": os.urandom(2048).hex().encode() for i in range(5)})
+    limits = ArchiveLimits(max_entry_bytes=1024)
+    entries = list(expand_archive(archive_path, str(tmp_path / "out"), limits))
+    assert all(entry.error.startswith("exceeds maximum size") for entry in entries)
+
+    with pytest.raises(ArchiveLimitError):
+        list(expand_archive(archive_path, str(tmp_path / "out2"), ArchiveLimits(max_entries=3)))
@@ -0,0 +1,96 @@
+import asyncio
+import os
+import sys
+from datetime import datetime
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+# Add the root directory to the Python path to import modules properly
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, parent_dir)
+
+from core.database import Base, get_async_db  # noqa: E402
+from modules.Auth.models import Users  # noqa: E402
+from modules.benchmark import routes as benchmark_routes  # noqa: E402
+from modules.monitor import models  # noqa: E402
+from modules.project_connections import project_routers  # noqa: E402
+from modules.project_connections.models import Projects  # noqa: E402
+
+TOKEN = "token-u1"
+PROJECT = {
+    "project_name": "support bot", "content_type": "application/json",
+    "target_url": "http://localhost", "end_point": "/chat",
+    "header_keys": [], "header_values": [], "payload_body": "{}",
+    "is_active": False, "test_interval_in_hrs": 24.0,
+    "benchmark_knowledge_id": "k1"
+}
+
+
+@pytest.fixture
+def app(tmp_path):
+    path = tmp_path / "app.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine, tables=[
+        Users.__table__, Projects.__table__, models.QAPairs.__table__, models.TestInfo.__table__,
+        models.ProjectScoreRollup.__table__, models.ProjectScoreBucket.__table__
+    ])
+    db = sessionmaker(bind=engine)()
+    db.add(Users(user_id="u1", name="u1", email="u1@example.com", password="x",
+                 isVerified=True, verification_token=TOKEN))
+    db.add(models.TestInfo(
+        test_id="t1", user_id="u1", project_id="p1", test_status="1",
+        hallucination_score=1, helpfullness_score=0.5,
+        last_test_conducted=datetime(2025, 1, 1), question="q",
+        student_answer="a", factual_answer="f", difficulty_level="easy"
+    ))
+    db.add(Projects(project_id="p1", user_id="u1", project_name="faq", registered_at=datetime.utcnow()))
+    db.commit()
+    db.close()
+    engine.dispose()
+
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    session_factory = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    async def get_test_db():
+        async with session_factory() as session:
+            yield session
+
+    application = FastAPI()
+    application.include_router(project_routers.router, prefix="/api/v1")
+    application.include_router(benchmark_routes.router, prefix="/api/v1")
+    application.dependency_overrides[get_async_db] = get_test_db
+    return application
+
+
+def request(app, method, url, **kwargs):
+    async def send():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.request(method, url, **kwargs)
+    return asyncio.run(send())
+
+
+def test_create_and_list_projects(app):
+    response = request(app, "POST", "/api/v1/create-project/", json={
+        "project": PROJECT, "token_data": {"access_token": TOKEN}
+    })
+    assert response.json()["status"] == "ok"
+
+    total = request(app, "POST", "/api/v1/total-projects/", json={"access_token": TOKEN})
+    assert total.json()["total_projects"] == 2
+
+
+def test_dashboard_builds_rollup_through_async_session(app):
+    response = request(app, "GET", "/api/v1/get-dashboard-data/p1")
+    data = response.json()["data"]
+    assert data["bench_mark_data_title"] == "faq"
+    assert data["tests_total"] == 1
+    assert data["pass_rate"] == 1.0
+
+    missing = request(app, "GET", "/api/v1/get-dashboard-data/nope")
+    assert missing.status_code == 404
@@ -0,0 +1,172 @@
+import asyncio
+import os
+import sys
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+# Add the root directory to the Python path to import modules properly
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, parent_dir)
+
+from core.database import Base, get_async_db, get_mongodb  # noqa: E402
+from modules.Auth.models import Users  # noqa: E402
+from modules.benchmark import routes as benchmark_routes  # noqa: E402
+from modules.ingestion.models import IngestionJob, IngestionJobFile  # noqa: E402
+from modules.ingestion.queue import enqueue_job  # noqa: E402
+from modules.project_connections.models import Projects  # noqa: E402
+from tests.memory_mongo import MemoryDatabase  # noqa: E402
+
+TOKEN = "token-u1"
+
+
+def qa_pair(source_file):
+    return {"question": f"about {source_file}", "answer": "a", "source_file": source_file}
+
+
+def chunk_doc(source_file, batch, count):
+    return {
+        "project_id": "p1", "user_id": "u1", "source_file": source_file, "batch": batch,
+        "chunk_count": count, "chunks": [{"content": "c", "metadata": {"source": source_file}}] * count
+    }
+
+
+@pytest.fixture
+def mongo_db():
+    mongo_db = MemoryDatabase()
+    # b.txt was chunked but none of its chunks were selected for QA generation
+    asyncio.run(mongo_db.qa_collection.insert_one({
+        "project_id": "p1", "user_id": "u1", "files_processed": ["a.txt", "docs.zip/x.md"],
+        "qa_pairs": [qa_pair("a.txt"), qa_pair("a.txt"), qa_pair("docs.zip/x.md")]
+    }))
+    for doc in (chunk_doc("a.txt", 0, 3), chunk_doc("b.txt", 0, 200), chunk_doc("b.txt", 1, 5),
+                chunk_doc("docs.zip/x.md", 0, 2)):
+        asyncio.run(mongo_db.chunks_collection.insert_one(doc))
+    return mongo_db
+
+
+@pytest.fixture
+def app(tmp_path, mongo_db, monkeypatch):
+    monkeypatch.setenv("INGESTION_SPOOL_DIR", str(tmp_path / "spool"))
+    path = tmp_path / "app.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine, tables=[
+        Users.__table__, Projects.__table__, IngestionJob.__table__, IngestionJobFile.__table__
+    ])
+    db = sessionmaker(bind=engine)()
+    db.add(Users(user_id="u1", name="u1", email="u1@example.com", password="x",
+                 isVerified=True, verification_token=TOKEN))
+    db.add(Projects(project_id="p1", user_id="u1"))
+    db.commit()
+    db.close()
+    engine.dispose()
+
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    session_factory = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    async def get_test_db():
+        async with session_factory() as session:
+            yield session
+
+    application = FastAPI()
+    application.include_router(benchmark_routes.router, prefix="/api/v1")
+    application.dependency_overrides[get_async_db] = get_test_db
+    application.dependency_overrides[get_mongodb] = lambda: mongo_db
+    application.state.engine = engine
+    return application
+
+
+def request(app, method, url, **kwargs):
+    async def send():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.request(method, url, **kwargs)
+    return asyncio.run(send())
+
+
+def upload(app, *filenames, data=None, headers=None):
+    return request(
+        app, "POST", "/api/v1/projects/p1/benchmark-files",
+        data={"access_token": TOKEN} if data is None and headers is None else data, headers=headers,
+        files=[("files", (filename, b"some text", "text/plain")) for filename in filenames]
+    )
+
+
+def remove(app, filename):
+    return request(app, "DELETE", f"/api/v1/projects/p1/benchmark-files/{filename}",
+                   json={"access_token": TOKEN})
+
+
+def test_add_files_enqueues_a_job(app, mongo_db):
+    response = upload(app, "c.txt")
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+    db = sessionmaker(bind=app.state.engine)()
+    assert db.get(IngestionJob, job_id).status == "queued"
+    assert [f.filename for f in db.query(IngestionJobFile).filter(IngestionJobFile.job_id == job_id)] == ["c.txt"]
+    db.close()
+    status = asyncio.run(mongo_db.process_status_collection.find_one({"job_id": job_id}))
+    assert (status["job_type"], status["files_total"]) == ("add_files", 1)
+
+
+@pytest.mark.parametrize("filename", ["a.txt", "b.txt", "docs.zip"])
+def test_add_files_refuses_stored_files(app, filename):
+    # b.txt has only chunks, docs.zip only its entries
+    response = upload(app, "c.txt", filename)
+    assert response.status_code == 409
+    assert response.json()["detail"].startswith(f"Files already in the benchmark or being ingested: {filename}.")
+
+
+def test_add_files_refuses_files_of_an_active_job(app):
+    assert upload(app, "c.txt").status_code == 202
+    response = upload(app, "c.txt")
+    assert response.status_code == 409
+    assert "c.txt" in response.json()["detail"]
+
+
+def test_add_files_takes_the_token_from_the_header(app):
+    assert upload(app, "c.txt", headers={"X-Access-Token": TOKEN}).status_code == 202
+
+
+def test_add_files_checks_the_token(app):
+    assert upload(app, "c.txt", data={"access_token": "bad"}).status_code == 401
+    assert upload(app, "c.txt", headers={"X-Access-Token": "bad"}).status_code == 401
+    assert upload(app, "c.txt", data={}).status_code == 401
+
+
+def test_remove_file_with_pairs_and_chunks(app, mongo_db):
+    response = remove(app, "a.txt")
+    assert response.status_code == 200
+    assert {key: response.json()[key] for key in ("files_removed", "chunks_removed", "qa_pairs_removed")} == {
+        "files_removed": ["a.txt"], "chunks_removed": 3, "qa_pairs_removed": 2
+    }
+    qa_doc = mongo_db.qa_collection.docs[0]
+    assert qa_doc["files_processed"] == ["docs.zip/x.md"]
+    assert [qa["source_file"] for qa in qa_doc["qa_pairs"]] == ["docs.zip/x.md"]
+    assert sorted({doc["source_file"] for doc in mongo_db.chunks_collection.docs}) == ["b.txt", "docs.zip/x.md"]
+
+
+def test_remove_file_with_chunks_only(app, mongo_db):
+    response = remove(app, "b.txt")
+    assert response.status_code == 200
+    assert (response.json()["chunks_removed"], response.json()["qa_pairs_removed"]) == (205, 0)
+    assert "b.txt" not in {doc["source_file"] for doc in mongo_db.chunks_collection.docs}
+    assert remove(app, "b.txt").status_code == 404
+
+
+def test_remove_archive_retires_its_entries(app):
+    response = remove(app, "docs.zip")
+    assert response.json()["files_removed"] == ["docs.zip/x.md"]
+    assert (response.json()["chunks_removed"], response.json()["qa_pairs_removed"]) == (2, 1)
+
+
+def test_remove_waits_for_a_running_job(app, mongo_db):
+    db = sessionmaker(bind=app.state.engine)()
+    enqueue_job(db, "j1", "p1", "u1", "r1", [{"filename": "c.txt", "spool_path": "/spool/c.txt", "size_bytes": 1}])
+    db.close()
+    assert remove(app, "a.txt").status_code == 409
+    assert len(mongo_db.qa_collection.docs[0]["qa_pairs"]) == 3
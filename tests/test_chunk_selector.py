@@ -0,0 +1,86 @@
+import os
+import random
+import sys
+
+import pytest
+from pydantic import ValidationError
+
+# Add the root directory to the Python path to import modules properly
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, parent_dir)
+
+from modules.benchmark.chunk_selector import ChunkSelector, chunks_for_budget, reservoir_sample  # noqa: E402
+from modules.project_connections.schemas import ProjectCreate, ProjectUpdate  # noqa: E402
+
+PROJECT_FIELDS = dict(project_name="n", content_type="c", target_url="https://example.com", end_point="/chat",
+                      header_keys=[], header_values=[], is_active=True, test_interval_in_hrs=1.0,
+                      benchmark_knowledge_id="k")
+
+
+def topic_corpus(n_topics, chunks_per_topic, seed=7):
+    """Chunks drawn from disjoint topic vocabularies, topics interleaved."""
+    rng = random.Random(seed)
+    vocabularies = [[f"topic{t}word{i}" for i in range(30)] for t in range(n_topics)]
+    texts, topics = [], []
+    for i in range(n_topics * chunks_per_topic):
+        topic = i % n_topics
+        texts.append(" ".join(rng.choices(vocabularies[topic], k=80)))
+        topics.append(topic)
+    return texts, topics
+
+
+def test_select_covers_every_topic():
+    """One representative per topic when the budget matches the topic count."""
+    texts, topics = topic_corpus(n_topics=8, chunks_per_topic=25)
+    selected = ChunkSelector().select(texts, 8)
+    assert len(selected) == 8
+    assert {topics[i] for i in selected} == set(range(8))
+
+
+def test_select_is_sorted_and_deterministic():
+    texts, _ = topic_corpus(n_topics=5, chunks_per_topic=10)
+    first = ChunkSelector().select(texts, 5)
+    assert first == sorted(first)
+    assert first == ChunkSelector().select(texts, 5)
+
+
+def test_select_small_inputs():
+    assert ChunkSelector().select([], 3) == []
+    assert ChunkSelector().select(["a b", "c d"], 0) == []
+    assert ChunkSelector().select(["a b", "c d"], 5) == [0, 1]
+
+
+def test_large_inputs_are_sampled_before_clustering():
+    texts, topics = topic_corpus(n_topics=6, chunks_per_topic=200)
+    selected = ChunkSelector(max_candidates=300).select(texts, 6)
+    # indices of the full list, one per topic
+    assert selected == sorted(selected) and max(selected) < len(texts)
+    assert {topics[i] for i in selected} == set(range(6))
+    assert selected == ChunkSelector(max_candidates=300).select(texts, 6)
+
+
+def test_reservoir_sample():
+    sample = reservoir_sample((f"item{i}" for i in range(10_000)), 500)
+    positions = [position for position, _ in sample]
+    assert len(sample) == 500 and positions == sorted(set(positions))
+    assert all(item == f"item{position}" for position, item in sample)
+    # uniform: about as many from each half of the stream
+    assert 200 < sum(position < 5000 for position in positions) < 300
+    assert reservoir_sample(range(3), 5) == [(0, 0), (1, 1), (2, 2)]
+
+
+def test_chunks_for_budget():
+    assert chunks_for_budget(30, 3) == 10
+    assert chunks_for_budget(31, 3) == 11
+    assert chunks_for_budget(0, 3) == 1
+
+
+@pytest.mark.parametrize("schema, fields", [
+    (ProjectCreate, dict(PROJECT_FIELDS, payload_body="{}")), (ProjectUpdate, dict(PROJECT_FIELDS, project_id="p1"))
+])
+def test_qa_budget_must_be_positive(schema, fields):
+    assert schema(**fields, qa_budget=1).qa_budget == 1
+    assert schema(**fields).qa_budget is None
+    for value in (0, -5):
+        with pytest.raises(ValidationError):
+            schema(**fields, qa_budget=value)
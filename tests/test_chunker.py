@@ -0,0 +1,56 @@
+import os
+import sys
+
+# Add the root directory to the Python path to import modules properly
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, parent_dir)
+
+from langchain.schema import Document  # noqa: E402
+
+from modules.benchmark.chunker import StructuredChunker, count_tokens  # noqa: E402
+
+
+def test_count_tokens_splits_long_words_and_numbers():
+    assert count_tokens("the cat sat") == 3
+    assert count_tokens("internationalization") == 4
+    assert count_tokens("| a | b |") == 5
+    assert count_tokens("1234567") == 3
+
+
+def test_chunks_stay_within_budget_and_start_at_headings():
+    text = (
+        "# Setup\n"
+        "Install the package first.\n\n"
+        "- download it\n"
+        "- unpack it\n"
+        "- run the installer\n\n"
+        "## Usage\n"
+        + " ".join(f"Step {i} is described here." for i in range(40))
+    )
+    chunks = list(StructuredChunker(max_tokens=30).chunk_text(text))
+    assert all(count_tokens(chunk) <= 30 for chunk in chunks)
+    assert chunks[0].startswith("# Setup")
+    # the short list is kept whole, in the chunk of its heading
+    assert "- download it\n- unpack it\n- run the installer" in chunks[0]
+    assert chunks[1].startswith("## Usage")
+    # long paragraphs are split between sentences
+    assert all(chunk.endswith(".") for chunk in chunks[1:])
+
+
+def test_oversized_tables_are_split_between_rows():
+    table = "\n".join(f"| row {i} | value {i} |" for i in range(20))
+    chunks = list(StructuredChunker(max_tokens=40).chunk_text(table))
+    assert len(chunks) > 1
+    for chunk in chunks:
+        assert all(line.startswith("| row") and line.endswith("|") for line in chunk.splitlines())
+
+
+def test_documents_are_chunked_lazily_with_their_metadata():
+    def pages():
+        yield Document(page_content="First page text.", metadata={"source": "a.pdf", "page": 0})
+        raise RuntimeError("second page must not be read yet")
+
+    chunks = StructuredChunker(max_tokens=50).chunk_documents(pages())
+    first = next(chunks)
+    assert first.page_content == "First page text."
+    assert first.metadata == {"source": "a.pdf", "page": 0}
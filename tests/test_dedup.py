@@ -0,0 +1,70 @@
+import os
+import sys
+
+# Add the root directory to the Python path to import modules properly
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, parent_dir)
+
+from modules.benchmark.dedup import NearDuplicateDetector, deduplicate  # noqa: E402
+
+
+def qa(question):
+    return {"question": question, "answer": "answer", "difficulty_level": "easy"}
+
+
+def test_near_duplicates_map_to_earliest_question():
+    questions = [
+        "What is the maximum file size allowed for uploads?",
+        "Who approves travel expenses above the monthly limit?",
+        "what is the maximum file size allowed for uploads",
+        "What is the maximum file size allowed for uploads ?",
+    ]
+    representatives = NearDuplicateDetector(threshold=0.75).representatives(questions)
+    assert list(representatives) == [0, 1, 0, 0]
+
+
+def test_distinct_questions_are_kept():
+    questions = [
+        "What is the capital of France?",
+        "Who wrote the play Hamlet?",
+        "How many moons does Jupiter have?",
+        "",
+        "",
+    ]
+    representatives = NearDuplicateDetector().representatives(questions)
+    assert list(representatives) == list(range(len(questions)))
+
+
+def test_deduplicate_drop_keeps_existing_pairs_out_of_result():
+    existing = [qa("What is the refund policy for damaged items?")]
+    new = [
+        qa("What is the refund policy for damaged items"),
+        qa("Which courier delivers orders outside the city?"),
+    ]
+    kept, removed = deduplicate(existing + new, NearDuplicateDetector(), keep=1)
+    assert removed == 1
+    assert [item["question"] for item in kept] == ["Which courier delivers orders outside the city?"]
+
+
+def test_deduplicate_merge_records_duplicate_questions():
+    items = [qa("Who signs off on new vendor contracts?"), qa("Who signs off on new vendor contracts")]
+    kept, removed = deduplicate(items, NearDuplicateDetector(), action="merge")
+    assert removed == 1
+    assert kept[0]["duplicate_questions"] == ["Who signs off on new vendor contracts"]
+
+
+def test_duplicates_among_existing_pairs_are_not_counted():
+    existing = [
+        qa("How long is the warranty on refurbished laptops?"),
+        qa("How long is the warranty on refurbished laptops"),
+    ]
+    new = [
+        qa("how long is the warranty on refurbished laptops?"),
+        qa("Where can employees park overnight?"),
+    ]
+    kept, removed = deduplicate(existing + new, NearDuplicateDetector(), keep=2, action="merge")
+    assert removed == 1
+    assert [item["question"] for item in kept] == ["Where can employees park overnight?"]
+    # only the new duplicate is merged into the stored pair
+    assert existing[0]["duplicate_questions"] == ["how long is the warranty on refurbished laptops?"]
+    assert "duplicate_questions" not in existing[1]
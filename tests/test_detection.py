@@ -0,0 +1,103 @@
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+# Add the root directory to the Python path to import modules properly
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, parent_dir)
+
+from modules.monitor import models  # noqa: E402
+from modules.monitor.detection import STATE_COLUMNS, ScoreDetector  # noqa: E402
+from modules.monitor.writer import write_results  # noqa: E402
+from modules.project_connections.models import Projects  # noqa: E402
+from tests.conftest import TOKEN, make_result  # noqa: E402
+
+START = datetime(2025, 1, 1)
+
+
+@pytest.fixture(autouse=True)
+def projects(make_session):
+    db = make_session()
+    db.add_all([Projects(project_id="p1", user_id="u1"), Projects(project_id="p2", user_id="u1")])
+    db.commit()
+    db.close()
+
+
+def detector():
+    return ScoreDetector(group_size=10, warmup=10, alpha=0.02, slack=0.5, threshold=8.0)
+
+
+def make_results(project_id, start, count, latency_mean, rng):
+    return [
+        make_result(f"{project_id}-{start}-{i}", START + timedelta(minutes=start + i), project_id,
+                    hallucination=1 if rng.random() < 0.9 else 0, helpfulness=1.0,
+                    latency=rng.gauss(latency_mean, 20.0), test_status="1", question=f"q{i % 20}")
+        for i in range(count)
+    ]
+
+
+def test_latency_shift_is_detected_once(make_session):
+    rng = random.Random(7)
+    db = make_session()
+    # runs of 20 results at a steady latency, then the target slows down
+    for run in range(30):
+        write_results(db, "p1", make_results("p1", run * 20, 20, 200.0, rng), detector=detector())
+        db.commit()
+    assert db.query(models.RegressionEvent).filter_by(metric="latency_ms").count() == 0
+
+    write_results(db, "p1", make_results("p1", 600, 20, 260.0, rng), detector=detector())
+    db.commit()
+    event = db.query(models.RegressionEvent).filter_by(metric="latency_ms").one()
+    assert event.direction == "worse"
+    assert event.detected_at < START + timedelta(minutes=610)
+    assert abs(event.baseline_mean - 200.0) < 10
+    assert abs(event.shifted_mean - 260.0) < 25
+
+    # the new level is the baseline, it is not reported again
+    write_results(db, "p1", make_results("p1", 620, 100, 260.0, rng), detector=detector())
+    db.commit()
+    assert db.query(models.RegressionEvent).filter_by(metric="latency_ms").count() == 1
+    assert db.query(models.RegressionEvent).filter_by(project_id="p2").count() == 0
+    db.close()
+
+
+def detector_states(db, project_id):
+    return {
+        row.metric: [getattr(row, name) for name in STATE_COLUMNS]
+        for row in db.query(models.ProjectScoreDetector).filter_by(project_id=project_id)
+    }
+
+
+def test_state_does_not_depend_on_batching(make_session):
+    db = make_session()
+    write_results(db, "p1", make_results("p1", 0, 300, 200.0, random.Random(3)), detector=detector())
+    db.commit()
+    results = make_results("p2", 0, 300, 200.0, random.Random(3))
+    for offset in range(0, 300, 7):
+        write_results(db, "p2", results[offset:offset + 7], detector=detector())
+        db.commit()
+
+    single, batched = detector_states(db, "p1"), detector_states(db, "p2")
+    assert set(single) == {"hallucination", "helpfulness", "latency_ms"}
+    for metric in single:
+        assert batched[metric] == pytest.approx(single[metric])
+    db.close()
+
+
+def test_regression_events_route(db, get_route):
+    write_results(db, "p1", make_results("p1", 0, 200, 200.0, random.Random(1)), detector=detector())
+    write_results(db, "p1", make_results("p1", 200, 20, 400.0, random.Random(2)), detector=detector())
+    db.add(Projects(project_id="p3", user_id="u2"))
+    db.commit()
+
+    response = get_route(f"/api/v1/regression-events/p1?metric=latency_ms&access_token={TOKEN}")
+    assert response.status_code == 200
+    events = response.json()["events"]
+    assert [event["direction"] for event in events] == ["worse"]
+    assert get_route(f"/api/v1/regression-events/p1?metric=accuracy&access_token={TOKEN}").status_code == 400
+    assert get_route("/api/v1/regression-events/p1?access_token=bad").status_code == 401
+    assert get_route(f"/api/v1/regression-events/p3?access_token={TOKEN}").status_code == 403
+    assert get_route(f"/api/v1/regression-events/missing?access_token={TOKEN}").status_code == 404
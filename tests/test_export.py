@@ -0,0 +1,129 @@
+import asyncio
+import io
+import json
+import os
+import sys
+from datetime import datetime, timedelta
+
+import httpx
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Add the root directory to the Python path to import modules properly
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, parent_dir)
+
+from core.database import Base, get_db  # noqa: E402
+from modules.Auth.models import Users  # noqa: E402
+from modules.benchmark import routes as benchmark_routes  # noqa: E402
+from modules.monitor import models  # noqa: E402
+from modules.monitor.export import EXPORT_COLUMNS, export_results  # noqa: E402
+from modules.monitor.pagination import ResultFilters  # noqa: E402
+from modules.monitor.writer import insert_results  # noqa: E402
+from modules.project_connections.models import Projects  # noqa: E402
+
+TOKEN = "token-u1"
+START = datetime(2025, 1, 1)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine, tables=[
+        Users.__table__, Projects.__table__, models.QAPairs.__table__, models.TestInfo.__table__
+    ])
+    db = sessionmaker(bind=engine)()
+    db.add(Users(user_id="u1", name="u1", email="u1@example.com", password="x",
+                 isVerified=True, verification_token=TOKEN))
+    db.add_all([Projects(project_id=p, user_id="u1") for p in ("p1", "p2")])
+    insert_results(db, [
+        models.TestInfo(
+            test_id=f"t{i:04d}", user_id="u1", project_id="p1" if i < 250 else "p2",
+            test_status=str(i % 2), hallucination_score=1, helpfullness_score=0.5,
+            last_test_conducted=START + timedelta(minutes=i), question=f"q{i % 7}",
+            factual_answer="f", student_answer=f"answer {i}", difficulty_level="easy",
+            response_latency_ms=None if i % 3 else 100.0
+        )
+        for i in range(300)
+    ])
+    db.commit()
+    db.close()
+    return engine
+
+
+def test_ndjson_streams_in_batches(engine):
+    chunks = list(export_results(engine, "ndjson", project_id="p1", batch_rows=100))
+    assert len(chunks) == 3
+    rows = [json.loads(line) for chunk in chunks for line in chunk.decode().splitlines()]
+    assert [row["test_id"] for row in rows] == [f"t{i:04d}" for i in range(250)]
+    assert rows[8] == {
+        "test_id": "t0008", "user_id": "u1", "project_id": "p1", "test_status": "0",
+        "hallucination_score": 1.0, "helpfullness_score": 0.5,
+        "last_test_conducted": "2025-01-01T00:08:00", "question": "q1", "factual_answer": "f",
+        "student_answer": "answer 8", "difficulty_level": "easy", "response_latency_ms": None
+    }
+
+
+def test_arrow_and_parquet_round_trip(engine):
+    stream = b"".join(export_results(engine, "arrow", user_id="u1", batch_rows=64))
+    table = pa.ipc.open_stream(stream).read_all()
+    assert table.num_rows == 300
+    assert table.schema.names == list(EXPORT_COLUMNS)
+
+    parquet = pq.ParquetFile(io.BytesIO(b"".join(
+        export_results(engine, "parquet", project_id="p2", batch_rows=20)
+    )))
+    assert parquet.metadata.num_rows == 50
+    assert parquet.metadata.num_row_groups == 3
+    table = parquet.read()
+    assert table.column("last_test_conducted")[0].as_py() == START + timedelta(minutes=250)
+    assert table.column("question").to_pylist()[:2] == ["q5", "q6"]
+
+
+def test_export_filters(engine):
+    filters = ResultFilters(outcome="pass", since=START + timedelta(minutes=100))
+    rows = [
+        json.loads(line)
+        for chunk in export_results(engine, "ndjson", project_id="p1", filters=filters)
+        for line in chunk.decode().splitlines()
+    ]
+    assert len(rows) == 75
+    assert {row["test_status"] for row in rows} == {"1"}
+
+
+def test_export_route(engine):
+    application = FastAPI()
+    application.include_router(benchmark_routes.router, prefix="/api/v1")
+    session_factory = sessionmaker(bind=engine)
+
+    def get_test_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    application.dependency_overrides[get_db] = get_test_db
+
+    async def send(url):
+        transport = httpx.ASGITransport(app=application)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get(url)
+
+    response = asyncio.run(send(f"/api/v1/export-results?access_token={TOKEN}&project_id=p2&format=parquet"))
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/vnd.apache.parquet"
+    assert pq.read_table(io.BytesIO(response.content)).num_rows == 50
+
+    response = asyncio.run(send(f"/api/v1/export-results?access_token={TOKEN}&format=ndjson"))
+    assert len(response.text.splitlines()) == 300
+    # an aware since is converted to the naive UTC results are stored in: 03:40 UTC
+    response = asyncio.run(send(f"/api/v1/export-results?access_token={TOKEN}&format=ndjson"
+                                "&since=2025-01-01T04:40:00%2B01:00"))
+    assert len(response.text.splitlines()) == 80
+    assert asyncio.run(send("/api/v1/export-results?access_token=bad")).status_code == 401
+    assert asyncio.run(send(f"/api/v1/export-results?access_token={TOKEN}&format=csv")).status_code == 400
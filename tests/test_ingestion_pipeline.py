@@ -0,0 +1,223 @@
+import asyncio
+import os
+import sys
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Add the root directory to the Python path to import modules properly
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, parent_dir)
+
+from core.config import get_settings  # noqa: E402
+from core.database import Base  # noqa: E402
+from modules.benchmark.chunk_selector import ChunkSelector  # noqa: E402
+from modules.ingestion import pipeline as pipeline_module  # noqa: E402
+from modules.ingestion.models import IngestionJob, IngestionJobFile  # noqa: E402
+from modules.ingestion.pipeline import IngestionPipeline  # noqa: E402
+from modules.ingestion.queue import claim_next_job, enqueue_job  # noqa: E402
+from modules.project_connections.models import Projects  # noqa: E402
+from tests.memory_mongo import MemoryDatabase  # noqa: E402
+from tests.test_qa_generator import ScriptedLLM, make_generator, qa_reply  # noqa: E402
+
+CHUNKS = 4
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    Base.metadata.create_all(engine, tables=[
+        Projects.__table__, IngestionJob.__table__, IngestionJobFile.__table__
+    ])
+    session = sessionmaker(bind=engine)()
+    # a budget that pays for every chunk
+    session.add(Projects(project_id="p1", user_id="u1", qa_budget=3 * CHUNKS))
+    session.commit()
+    yield session
+    session.close()
+
+
+def leased_job(db):
+    enqueue_job(db, "j1", "p1", "u1", "r1", [{"filename": "a.txt", "spool_path": "/spool/a.txt", "size_bytes": 1}])
+    return claim_next_job(db, "w1", lease_seconds=300)
+
+
+def make_pipeline(mongo_db, replies):
+    return IngestionPipeline(mongo_db, None, make_generator(replies), "w1", lease_seconds=300)
+
+
+def add_chunks(mongo_db, filename="a.txt", file_index=0, count=CHUNKS, batch=0, first=0):
+    asyncio.run(mongo_db.ingestion_checkpoints.insert_one({
+        "job_id": "j1", "kind": "chunks", "file_index": file_index, "batch": batch, "filename": filename,
+        "chunks": [
+            {"content": f"content of chunk {i}", "metadata": {"source": filename, "chunk_number": i}}
+            for i in range(first, first + count)
+        ]
+    }))
+
+
+def qa_checkpoints(mongo_db):
+    return {
+        doc["chunk_key"]: [qa["question"] for qa in doc["qa_pairs"]]
+        for doc in mongo_db.ingestion_checkpoints.docs if doc["kind"] == "qa"
+    }
+
+
+def test_failed_pack_is_retried_one_chunk_per_request(db):
+    mongo_db = MemoryDatabase()
+    add_chunks(mongo_db)
+    replies = ["malformed"] + [qa_reply((None, f"question {i}")) for i in range(CHUNKS)]
+    pipeline = make_pipeline(mongo_db, replies)
+    asyncio.run(pipeline._generate_qa_pairs(db, leased_job(db)))
+
+    assert qa_checkpoints(mongo_db) == {f"0:{i}": [f"question {i}"] for i in range(CHUNKS)}
+    prompts = pipeline.qa_generator.llm.prompts
+    assert len(prompts) == 1 + CHUNKS
+    # each retry carries its own chunk only
+    assert all(prompt.count("content of chunk") == 1 and f"content of chunk {i}" in prompt
+               for i, prompt in enumerate(prompts[1:]))
+
+
+def test_chunks_left_without_pairs_are_retried(db):
+    mongo_db = MemoryDatabase()
+    add_chunks(mongo_db)
+    replies = [
+        qa_reply(("0:0", "packed 0"), ("0:2", "packed 2")),
+        qa_reply((None, "single 1")),
+        qa_reply((None, "single 3")),
+    ]
+    pipeline = make_pipeline(mongo_db, replies)
+    asyncio.run(pipeline._generate_qa_pairs(db, leased_job(db)))
+    assert qa_checkpoints(mongo_db) == {
+        "0:0": ["packed 0"], "0:1": ["single 1"], "0:2": ["packed 2"], "0:3": ["single 3"]
+    }
+    qa = next(doc for doc in mongo_db.ingestion_checkpoints.docs if doc.get("chunk_key") == "0:3")["qa_pairs"][0]
+    assert (qa["source_file"], qa["chunk_id"]) == ("a.txt", "a.txt#3")
+
+
+def test_stage_fails_when_a_chunk_keeps_failing(db):
+    mongo_db = MemoryDatabase()
+    add_chunks(mongo_db)
+    job = leased_job(db)
+    replies = [
+        qa_reply(("0:0", "packed 0"), ("0:1", "packed 1"), ("0:2", "packed 2")),
+        RuntimeError("overloaded"),
+    ]
+    pipeline = make_pipeline(mongo_db, replies)
+    with pytest.raises(RuntimeError, match="QA generation failed for 1 chunks of a.txt"):
+        asyncio.run(pipeline._generate_qa_pairs(db, job))
+    assert sorted(qa_checkpoints(mongo_db)) == ["0:0", "0:1", "0:2"]
+
+    # the retried job only generates the missing chunk
+    pipeline.qa_generator.llm = ScriptedLLM([qa_reply((None, "single 3"))])
+    asyncio.run(pipeline._generate_qa_pairs(db, job))
+    assert len(pipeline.qa_generator.llm.prompts) == 1
+    assert qa_checkpoints(mongo_db)["0:3"] == ["single 3"]
+
+
+def test_selection_clusters_a_bounded_sample(db, monkeypatch):
+    monkeypatch.setattr(pipeline_module, "get_settings", lambda: get_settings().model_copy(
+        update={"CHUNK_SELECTION_MAX_CANDIDATES": 6}
+    ))
+    clustered = []
+    select = ChunkSelector.select
+
+    def recording_select(selector, texts, k):
+        clustered.append(len(texts))
+        return select(selector, texts, k)
+
+    monkeypatch.setattr(ChunkSelector, "select", recording_select)
+    mongo_db = MemoryDatabase()
+    for batch in range(5):
+        add_chunks(mongo_db, batch=batch, first=batch * CHUNKS)
+    job = leased_job(db)
+    pipeline = make_pipeline(mongo_db, [])
+
+    selected = asyncio.run(pipeline._select_chunks(db, job))
+    assert clustered == [6]
+    assert len(selected) == CHUNKS
+    assert all(chunk["content"] == f"content of chunk {chunk['chunk_number']}" for chunk in selected)
+
+    # a retried job reads its selection back without clustering again
+    assert asyncio.run(pipeline._select_chunks(db, job)) == selected
+    assert clustered == [6]
+
+
+def test_store_writes_chunk_documents_per_file_batch(db):
+    mongo_db = MemoryDatabase()
+    # the project's single document of an earlier ingestion, a.txt is replaced
+    asyncio.run(mongo_db.chunks_collection.insert_one({
+        "project_id": "p1", "user_id": "u1", "files_processed": ["a.txt", "b.txt"],
+        "chunks": [
+            {"content": "old a", "metadata": {"source": "a.txt", "chunk_number": 0}},
+            {"content": "b 0", "metadata": {"source": "b.txt", "chunk_number": 0}},
+            {"content": "b 1", "metadata": {"source": "b.txt", "chunk_number": 1}},
+        ]
+    }))
+    add_chunks(mongo_db)
+    add_chunks(mongo_db, batch=1, first=CHUNKS, count=1)
+    job = leased_job(db)
+    files = db.query(IngestionJobFile).all()
+    files[0].status, files[0].chunk_count = "chunked", CHUNKS + 1
+    db.commit()
+    asyncio.run(mongo_db.process_status_collection.insert_one({"project_id": "p1", "job_id": "j1"}))
+    pipeline = make_pipeline(mongo_db, [])
+
+    # storing twice, as a retried job does, leaves one copy
+    for _ in range(2):
+        assert asyncio.run(pipeline._store(db, job, files)) == "completed"
+    documents = sorted(
+        (doc["source_file"], doc["batch"], doc["chunk_count"], [chunk["content"] for chunk in doc["chunks"]])
+        for doc in mongo_db.chunks_collection.docs
+    )
+    assert documents == [
+        ("a.txt", 0, CHUNKS, [f"content of chunk {i}" for i in range(CHUNKS)]),
+        ("a.txt", 1, 1, [f"content of chunk {CHUNKS}"]),
+        ("b.txt", 0, 2, ["b 0", "b 1"]),
+    ]
+    status = asyncio.run(mongo_db.process_status_collection.find_one({"job_id": "j1"}))
+    assert status["chunks_stored"] == CHUNKS + 1
+
+
+def test_budget_counts_the_pairs_already_stored(db):
+    mongo_db = MemoryDatabase()
+    # a.txt is replaced by the job, the pairs of old.txt are kept
+    asyncio.run(mongo_db.qa_collection.insert_one({"project_id": "p1", "qa_pairs": (
+        [{"question": "q", "source_file": "old.txt"}] * 9 + [{"question": "q", "source_file": "a.txt"}] * 3
+    )}))
+    for batch in range(3):
+        add_chunks(mongo_db, batch=batch, first=batch * CHUNKS)
+    job = leased_job(db)
+    job_file = db.query(IngestionJobFile).one()
+    pipeline = make_pipeline(mongo_db, [])
+    # a.txt failed to parse, _store keeps its pairs so they count
+    job_file.status = "failed"
+    db.commit()
+    assert asyncio.run(pipeline._qa_budget(db, job)) == 0
+
+    job_file.status = "chunked"
+    db.commit()
+    assert asyncio.run(pipeline._qa_budget(db, job)) == 3 * CHUNKS - 9
+    assert len(asyncio.run(pipeline._select_chunks(db, job))) == 1
+
+    # the budget is spent, no chunk is selected
+    mongo_db.qa_collection.docs[0]["qa_pairs"] *= 2
+    asyncio.run(mongo_db.ingestion_checkpoints.delete_many({"kind": "selection"}))
+    assert asyncio.run(pipeline._qa_budget(db, job)) == 0
+    assert asyncio.run(pipeline._select_chunks(db, job)) == []
+
+
+def test_store_replaces_the_pairs_of_a_file_that_yields_none(db):
+    mongo_db = MemoryDatabase()
+    asyncio.run(mongo_db.qa_collection.insert_one({
+        "project_id": "p1", "files_processed": ["a.txt"], "qa_pairs": [{"question": "old", "source_file": "a.txt"}]
+    }))
+    add_chunks(mongo_db)
+    job = leased_job(db)
+    files = db.query(IngestionJobFile).all()
+    files[0].status = "chunked"
+    db.commit()
+    asyncio.run(make_pipeline(mongo_db, [])._store(db, job, files))
+    qa_doc = mongo_db.qa_collection.docs[0]
+    assert (qa_doc["qa_pairs"], qa_doc["files_processed"]) == ([], ["a.txt"])
@@ -0,0 +1,119 @@
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+# Add the root directory to the Python path to import modules properly
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, parent_dir)
+
+from modules.monitor import models  # noqa: E402
+from modules.monitor.history import (add_to_buckets, covering_buckets,  # noqa: E402
+                                     latency_percentiles, rebuild_buckets, score_history)
+from modules.monitor.sketch import RELATIVE_ACCURACY, LatencySketch  # noqa: E402
+from modules.project_connections.models import Projects  # noqa: E402
+from tests.conftest import TOKEN, make_result  # noqa: E402
+
+START = datetime(2026, 3, 2)  # a Monday
+
+
+def exact_quantile(values, q):
+    values = sorted(values)
+    return values[int(q * (len(values) - 1))]
+
+
+def test_quantiles_within_relative_accuracy():
+    rng = random.Random(5)
+    values = [rng.lognormvariate(5, 1) for _ in range(20_000)] + [0.0] * 100
+    sketch = LatencySketch().update(values)
+    for q in (0.001, 0.25, 0.5, 0.9, 0.95, 0.99, 0.999):
+        assert sketch.quantile(q) == pytest.approx(exact_quantile(values, q), rel=RELATIVE_ACCURACY, abs=1e-9)
+    assert LatencySketch().quantile(0.5) is None
+
+    # merging the sketches of parts is the sketch of the whole
+    parts = [LatencySketch().update(values[i::3]) for i in range(3)]
+    merged = parts[0].merge(parts[1]).merge(parts[2])
+    assert (merged.bins, merged.zero_count, merged.count) == (sketch.bins, sketch.zero_count, sketch.count)
+
+    encoded = sketch.to_bytes()
+    decoded = LatencySketch.from_bytes(encoded)
+    assert (decoded.bins, decoded.zero_count, decoded.count) == (sketch.bins, sketch.zero_count, sketch.count)
+    # about 2 bytes a bin
+    assert len(encoded) < 3 * len(sketch.bins)
+
+
+def test_covering_buckets():
+    start, end = START + timedelta(days=2, hours=21, minutes=30), START + timedelta(days=23, hours=2, minutes=10)
+    assert covering_buckets(start, end) == [
+        ("hour", START + timedelta(days=2, hours=21), START + timedelta(days=3)),
+        ("day", START + timedelta(days=3), START + timedelta(days=7)),
+        ("week", START + timedelta(days=7), START + timedelta(days=21)),
+        ("day", START + timedelta(days=21), START + timedelta(days=23)),
+        ("hour", START + timedelta(days=23), end),
+    ]
+    assert covering_buckets(START + timedelta(hours=1), START + timedelta(hours=5)) == [
+        ("hour", START + timedelta(hours=1), START + timedelta(hours=5))
+    ]
+
+
+def test_percentiles_of_any_window_match_results(db):
+    rng = random.Random(9)
+    results = [
+        make_result(f"t{i}", START + timedelta(minutes=37 * i), test_status="1",
+                    latency=rng.lognormvariate(5, 0.8) if i % 10 else None)
+        for i in range(3000)
+    ]
+    for offset in range(0, len(results), 30):
+        batch = results[offset:offset + 30]
+        db.add_all(batch)
+        add_to_buckets(db, "p1", batch)
+        db.commit()
+
+    windows = [
+        (START + timedelta(days=3, hours=5), START + timedelta(days=50, hours=13)),
+        (START + timedelta(hours=2), START + timedelta(hours=9)),
+        (START, START + timedelta(days=90)),
+    ]
+    for start, end in windows:
+        latencies = [
+            t.response_latency_ms for t in results
+            if t.response_latency_ms is not None and start <= t.last_test_conducted < end
+        ]
+        percentiles = latency_percentiles(db, "p1", start, end, [0.5, 0.95, 0.99])
+        assert percentiles["latency_measured"] == len(latencies)
+        for q in (0.5, 0.95, 0.99):
+            # rounded to 0.1 ms
+            assert percentiles["quantiles"][str(q)] == pytest.approx(
+                exact_quantile(latencies, q), rel=RELATIVE_ACCURACY, abs=0.05
+            )
+
+    on_write = {
+        (row.granularity, row.bucket_start): row.latency_sketch for row in db.query(models.ProjectScoreBucket)
+    }
+    rebuild_buckets(db)
+    db.expire_all()
+    assert {
+        (row.granularity, row.bucket_start): row.latency_sketch for row in db.query(models.ProjectScoreBucket)
+    } == on_write
+
+    point = score_history(db, "p1", START, START + timedelta(days=1), "day", 500)["points"][0]
+    day = [t.response_latency_ms for t in results if t.response_latency_ms is not None
+           and t.last_test_conducted < START + timedelta(days=1)]
+    assert point["p95_latency_ms"] == pytest.approx(exact_quantile(day, 0.95), rel=RELATIVE_ACCURACY, abs=0.05)
+
+
+def test_latency_percentiles_route(db, get_route):
+    db.add_all([Projects(project_id="p1", user_id="u1"), Projects(project_id="p2", user_id="u2")])
+    results = [make_result(f"t{i}", START + timedelta(minutes=i), latency=100.0) for i in range(3)]
+    db.add_all(results)
+    add_to_buckets(db, "p1", results)
+    db.commit()
+    url = "/api/v1/latency-percentiles/{}?start=2026-03-02T00:00:00&end=2026-03-03T00:00:00&access_token={}"
+    response = get_route(url.format("p1", TOKEN))
+    assert response.status_code == 200
+    assert response.json()["latency_measured"] == 3
+    assert get_route(url.format("p1", "bad")).status_code == 401
+    assert get_route(url.format("p2", TOKEN)).status_code == 403
+    assert get_route(url.format("p3", TOKEN)).status_code == 404
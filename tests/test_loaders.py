@@ -0,0 +1,64 @@
+import io
+import os
+import sys
+import zipfile
+
+# Add the root directory to the Python path to import modules properly
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, parent_dir)
+
+from modules.benchmark.loaders import load_docx, load_markdown, load_text  # noqa: E402
+
+W = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+
+
+def make_docx(paragraphs):
+    body = ""
+    for style, text in paragraphs:
+        properties = f'<w:pPr><w:pStyle w:val="{style}"/></w:pPr>' if style else ""
+        body += f"<w:p>{properties}<w:r><w:t>{text}</w:t></w:r></w:p>"
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("word/document.xml", f"<w:document {W}><w:body>{body}</w:body></w:document>")
+    return buffer.getvalue()
+
+
+def test_text_decodes_bom_and_legacy_encodings():
+    assert load_text("\ufeffcafé".encode("utf-8"), "a.txt")[0].page_content == "café"
+    assert load_text("café".encode("cp1252"), "a.txt")[0].page_content == "café"
+    assert load_text("café".encode("utf-16"), "a.txt")[0].metadata == {"source": "a.txt"}
+
+
+def test_markdown_is_split_into_heading_sections():
+    markdown = (
+        "Intro line\n"
+        "# Setup\n"
+        "Install it.\n"
+        "## Linux\n"
+        "Use apt.\n"
+        "```\n"
+        "# not a heading\n"
+        "```\n"
+        "Usage\n"
+        "=====\n"
+        "Run it.\n"
+    ).encode("utf-8")
+    documents = load_markdown(markdown, "guide.md")
+    assert [doc.metadata.get("section") for doc in documents] == [
+        None, "Setup", "Setup > Linux", "Usage"
+    ]
+    assert "# not a heading" in documents[2].page_content
+    assert documents[3].page_content == "Usage\nRun it."
+
+
+def test_docx_paragraphs_are_grouped_by_heading_style():
+    content = make_docx([
+        ("Title", "Handbook"),
+        (None, "Welcome."),
+        ("Heading2", "Leave"),
+        (None, "Ask your manager."),
+    ])
+    documents = load_docx(content, "handbook.docx")
+    assert [doc.metadata["section"] for doc in documents] == ["Handbook", "Handbook > Leave"]
+    assert documents[1].page_content == "Leave\nAsk your manager."
+    assert documents[0].metadata["source"] == "handbook.docx"
@@ -0,0 +1,118 @@
+import asyncio
+import os
+import sys
+from contextlib import ExitStack
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+# Add the root directory to the Python path to import modules properly
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, parent_dir)
+
+from core.log_reader import LogQuery, log_files, read_log  # noqa: E402
+from modules import services  # noqa: E402
+
+START = datetime(2025, 1, 1)
+LEVELS = ("DEBUG", "INFO", "INFO", "WARNING", "ERROR")
+
+
+def record(i):
+    at = START + timedelta(seconds=i)
+    line = f"{at:%Y-%m-%d %H:%M:%S},000 - app_logger - {LEVELS[i % 5]} - Request r{i % 50}: event {i}\n"
+    if i % 5 == 4:
+        line += "Traceback (most recent call last):\n  ValueError: event failed\n"
+    return line
+
+
+@pytest.fixture
+def log_path(tmp_path):
+    """app.log with 3 rotated files of 5,000 records each, records 0-19,999 oldest first."""
+    path = tmp_path / "app.log"
+    for index, suffix in enumerate((".3", ".2", ".1", "")):
+        with open(f"{path}{suffix}", "w") as file:
+            file.writelines(record(i) for i in range(index * 5000, (index + 1) * 5000))
+    return str(path)
+
+
+def query_log(log_path, query, tail=None):
+    with ExitStack() as stack:
+        files = [stack.enter_context(open(path, "rb")) for path in log_files(log_path, 5)]
+        return b"".join(read_log(files, query, tail)).decode()
+
+
+def events(text):
+    return [int(line.rsplit(" ", 1)[1]) for line in text.splitlines() if " - app_logger - " in line]
+
+
+def test_tail_reads_across_rotated_files(log_path):
+    assert events(query_log(log_path, LogQuery(), tail=3)) == [19997, 19998, 19999]
+    text = query_log(log_path, LogQuery(level="error"), tail=2)
+    assert events(text) == [19994, 19999]
+    # the traceback lines stay with their record
+    assert text.count("ValueError: event failed") == 2
+    assert events(query_log(log_path, LogQuery(request_id="r7:"), tail=300)) == list(range(7, 20000, 50))[-300:]
+
+
+def test_time_range_is_found_by_bisection(log_path):
+    query = LogQuery(since=START + timedelta(seconds=7321), until=START + timedelta(seconds=12010))
+    assert events(query_log(log_path, query)) == list(range(7321, 12010))
+    query = LogQuery(since=START + timedelta(seconds=19990), level="WARNING")
+    assert events(query_log(log_path, query)) == [19993, 19994, 19998, 19999]
+    assert events(query_log(log_path, LogQuery(since=START + timedelta(days=1)))) == []
+
+
+def test_tail_with_since_stops_at_since(log_path):
+    query = LogQuery(since=START + timedelta(seconds=19995))
+    assert events(query_log(log_path, query, tail=100)) == list(range(19995, 20000))
+
+
+def test_download_logs_route(log_path, monkeypatch):
+    monkeypatch.setattr(services, "file_handler", SimpleNamespace(baseFilename=log_path, backupCount=5))
+    application = FastAPI()
+    application.include_router(services.router, prefix="/api/v1")
+
+    async def get(url, **kwargs):
+        transport = httpx.ASGITransport(app=application)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get(url, **kwargs)
+
+    response = asyncio.run(get("/api/v1/download-logs?tail=5&level=warning"))
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert events(response.text) == [19989, 19993, 19994, 19998, 19999]
+
+    # without options, the current file as before
+    response = asyncio.run(get("/api/v1/download-logs", headers={"Accept-Encoding": "identity"}))
+    assert "content-encoding" not in response.headers
+    assert events(response.text) == list(range(15000, 20000))
+    response = asyncio.run(get("/api/v1/download-logs?tail=1", headers={"Accept-Encoding": "gzip;q=0"}))
+    assert "content-encoding" not in response.headers
+
+    # an aware since is compared in the server local time the log is written in
+    since = (START + timedelta(seconds=19996)).astimezone().astimezone(timezone.utc)
+    response = asyncio.run(get(f"/api/v1/download-logs?since={since:%Y-%m-%dT%H:%M:%S}Z"))
+    assert response.status_code == 200
+    assert events(response.text) == [19996, 19997, 19998, 19999]
+
+    assert asyncio.run(get("/api/v1/download-logs?level=verbose")).status_code == 400
+    assert asyncio.run(get("/api/v1/download-logs?tail=0")).status_code == 400
+
+
+@pytest.mark.parametrize("accept_encoding, accepted", [
+    ("gzip, deflate, br", True),
+    ("deflate;q=1.0, gzip;q=0.5", True),
+    ("gzip;q=0", False),
+    ("gzip; q=0.0, identity", False),
+    ("*", True),
+    ("*;q=0", False),
+    ("gzip;q=0, *", False),
+    ("br, *;q=0.1", True),
+    ("identity", False),
+    ("", False),
+])
+def test_accepts_gzip(accept_encoding, accepted):
+    assert services._accepts_gzip(accept_encoding) is accepted
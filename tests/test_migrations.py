@@ -0,0 +1,57 @@
+import os
+import shutil
+import sys
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, text
+
+# Add the root directory to the Python path to import modules properly
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, parent_dir)
+
+from core.database import Base  # noqa: E402
+from modules.Auth import models as auth_models  # noqa: E402,F401
+from modules.ingestion import models as ingestion_models  # noqa: E402,F401
+from modules.monitor import models as monitor_models  # noqa: E402,F401
+from modules.project_connections import models as project_models  # noqa: E402,F401
+
+
+@pytest.mark.parametrize("create_tables_at", [None, "0bd0432e9e95", "7c1e4b9a2d55", "f1b6d8a3c5e7"])
+def test_upgrade_after_create_tables(tmp_path, create_tables_at):
+    # the application runs create_tables() at startup, so the tables a
+    # migration adds may exist already in the shape of the current models
+    path = tmp_path / "app.db"
+    shutil.copy(os.path.join(parent_dir, "app_database.db"), path)
+    config = Config(os.path.join(parent_dir, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(parent_dir, "alembic"))
+    config.set_main_option("sqlalchemy.url", f"sqlite:///{path}")
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.begin() as conn:
+        conn.execute(text("INSERT OR IGNORE INTO projects (project_id, user_id) VALUES ('p1', 'u1')"))
+        conn.execute(text(
+            "INSERT INTO test_info (test_id, user_id, project_id, test_status, question, factual_answer, "
+            "student_answer, difficulty_level, hallucination_score, helpfullness_score, last_test_conducted) "
+            "VALUES ('t1', 'u1', 'p1', '1', 'q', 'f', 'a', 'easy', 0, 0.5, '2025-01-01 10:30:00.000000')"
+        ))
+
+    if create_tables_at:
+        command.upgrade(config, create_tables_at)
+        Base.metadata.create_all(engine)
+    command.upgrade(config, "head")
+
+    with engine.connect() as conn:
+        assert conn.execute(text(
+            "SELECT tests_total, hallucinations, helpfulness_sum, tests_compacted "
+            "FROM project_score_rollups WHERE project_id = 'p1'"
+        )).one() == (1, 1, 0.5, 0)
+        assert conn.execute(text(
+            "SELECT granularity, bucket_start, tests_total FROM project_score_buckets "
+            "WHERE project_id = 'p1' ORDER BY granularity"
+        )).all() == [
+            ("day", "2025-01-01 00:00:00.000000", 1),
+            ("hour", "2025-01-01 10:00:00.000000", 1),
+            ("week", "2024-12-30 00:00:00.000000", 1),
+        ]
+    engine.dispose()
@@ -0,0 +1,102 @@
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+# Add the root directory to the Python path to import modules properly
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, parent_dir)
+
+from modules.monitor import models  # noqa: E402
+from modules.monitor.pagination import (CountCache, ResultFilters,  # noqa: E402
+                                        decode_cursor, fetch_page)
+from modules.monitor.rollups import rebuild_rollups  # noqa: E402
+from tests.conftest import make_result  # noqa: E402
+
+START = datetime(2026, 1, 1)
+
+
+def add_results(db, first, count, at):
+    # runs insert several results with the same timestamp, test_id breaks the tie
+    db.add_all([
+        make_result(f"t{i:04d}", at + timedelta(minutes=i // 4), test_status="1" if i % 3 else "0",
+                    question=f"q{i}", difficulty="hard" if i % 2 else "easy")
+        for i in range(first, first + count)
+    ])
+    db.commit()
+
+
+def walk(db, filters, page_size, between_pages=None):
+    seen, cursor = [], None
+    while True:
+        rows, cursor = fetch_page(db, "p1", page_size, filters, cursor=cursor)
+        seen.extend(row.test_id for row in rows)
+        if cursor is None:
+            return seen
+        if between_pages:
+            between_pages()
+
+
+def test_cursor_pages_are_stable_under_inserts(db):
+    add_results(db, 0, 50, START)
+    expected = [
+        row.test_id for row in db.query(models.TestInfo).order_by(
+            models.TestInfo.last_test_conducted.desc(), models.TestInfo.test_id.desc()
+        )
+    ]
+    inserted = iter(range(1000, 1100, 10))
+    seen = walk(db, ResultFilters(), 7, lambda: add_results(db, next(inserted), 10, START + timedelta(days=1)))
+    # newer results land before the cursor: nothing skipped, nothing repeated
+    assert seen == expected
+
+
+def test_filters_and_counts(db):
+    add_results(db, 0, 40, START)
+    filters = ResultFilters(difficulty="hard", outcome="pass", since=START + timedelta(minutes=2))
+    seen = walk(db, filters, 3)
+    assert seen == sorted(
+        (f"t{i:04d}" for i in range(8, 40) if i % 2 and i % 3),
+        key=lambda test_id: (int(test_id[1:]) // 4, test_id),
+        reverse=True
+    )
+
+    cache = CountCache(ttl_seconds=60)
+    assert cache.count(db, "p1", filters) == len(seen)
+    add_results(db, 100, 8, START + timedelta(days=1))
+    # cached until the ttl expires
+    assert cache.count(db, "p1", filters) == len(seen)
+    assert CountCache(ttl_seconds=60).count(db, "p1", filters) == len(seen) + 3  # t0101, t0103, t0107
+
+
+def test_invalid_cursor(db):
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+    with pytest.raises(ValueError):
+        fetch_page(db, "p1", 10, ResultFilters(), cursor="e30")
+
+
+def test_qa_data_route_counts_a_project_without_rollup(db, get_route):
+    add_results(db, 0, 25, START)
+    response = get_route("/api/v1/qa_data/p1?page_size=10")
+    assert response.status_code == 200
+    assert response.json()["pagination"]["total_qa_pairs"] == 25
+    assert [qa["test_id"] for qa in response.json()["qa_pairs"]][:2] == ["t0024", "t0023"]
+    # the read does not build the rollup
+    assert db.get(models.ProjectScoreRollup, "p1") is None
+
+    cursor = response.json()["pagination"]["next_cursor"]
+    response = get_route(f"/api/v1/qa_data/p1?page_size=10&cursor={cursor}&difficulty=hard")
+    assert response.json()["pagination"]["total_qa_pairs"] == 12
+    assert all(qa["difficulty_level"] == "hard" for qa in response.json()["qa_pairs"])
+    assert get_route("/api/v1/qa_data/p2").status_code == 404
+
+
+def test_qa_data_route_total_from_the_rollup(db, get_route):
+    add_results(db, 0, 5, START)
+    rebuild_rollups(db)
+    add_results(db, 5, 3, START)
+    # results written behind the writer's back are not in the rollup's total
+    response = get_route("/api/v1/qa_data/p1?page=1&page_size=10")
+    assert response.json()["pagination"]["total_qa_pairs"] == 5
+    assert response.json()["pagination"]["current_page"] == 1
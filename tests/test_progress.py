@@ -0,0 +1,138 @@
+import asyncio
+import json
+import os
+import sys
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+# Add the root directory to the Python path to import modules properly
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, parent_dir)
+
+from core.database import Base, get_async_db, get_mongodb  # noqa: E402
+from modules.Auth.models import Users  # noqa: E402
+from modules.benchmark import routes as benchmark_routes  # noqa: E402
+from modules.ingestion.progress import CoalescedStatusWriter, ProgressBroker  # noqa: E402
+from modules.project_connections.models import Projects  # noqa: E402
+from tests.memory_mongo import MemoryDatabase  # noqa: E402
+
+
+class RecordingCollection:
+    def __init__(self):
+        self.updates = []
+
+    async def update_one(self, query, update):
+        self.updates.append((query, update))
+
+
+def test_progress_updates_are_coalesced():
+    async def run():
+        collection = RecordingCollection()
+        writer = CoalescedStatusWriter(collection, max_writes_per_second=0.001)
+        await writer.update("p", "j", {"status": "processing"})
+        for count in range(1, 51):
+            await writer.update("p", "j", {"files_processed": count, "chunks_generated": count * 2})
+        # buffered fields are merged and written once on close
+        updates, writes = await writer.close("p", "j")
+        return collection.updates, updates, writes
+
+    recorded, updates, writes = asyncio.run(run())
+    assert updates == 51
+    assert writes == 2
+    assert recorded[-1][1] == {"$set": {"files_processed": 50, "chunks_generated": 100}}
+
+
+def test_status_changes_are_written_immediately():
+    async def run():
+        collection = RecordingCollection()
+        writer = CoalescedStatusWriter(collection, max_writes_per_second=0.001)
+        await writer.update("p", "j", {"files_processed": 1})
+        await writer.update("p", "j", {"files_processed": 2})
+        await writer.update("p", "j", {"status": "completed"})
+        return collection.updates
+
+    recorded = asyncio.run(run())
+    assert [update["$set"] for _, update in recorded] == [
+        {"files_processed": 1},
+        {"files_processed": 2, "status": "completed"},
+    ]
+
+
+def test_subscribers_share_one_watcher():
+    async def run():
+        reads = []
+        snapshots = iter([
+            {"status": "processing", "files_processed": 0},
+            {"status": "processing", "files_processed": 1},
+            {"status": "completed", "files_processed": 2},
+        ])
+        current = {}
+
+        async def fetch_status(project_id):
+            reads.append(project_id)
+            current.update(next(snapshots, current))
+            return dict(current)
+
+        broker = ProgressBroker(poll_seconds=0.01)
+
+        async def follow():
+            return [
+                doc["files_processed"]
+                async for doc in broker.subscribe("p", fetch_status, keepalive_seconds=1)
+                if doc is not None
+            ]
+
+        first, second = await asyncio.gather(follow(), follow())
+        await asyncio.sleep(0.05)
+        return first, second, reads, broker.subscriber_count("p")
+
+    first, second, reads, remaining = asyncio.run(run())
+    assert first == [0, 1, 2]
+    assert second == [0, 1, 2]
+    assert len(reads) == 3
+    assert remaining == 0
+
+
+def test_stream_route_authenticates_through_the_async_session(tmp_path):
+    path = tmp_path / "app.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine, tables=[Users.__table__, Projects.__table__])
+    db = sessionmaker(bind=engine)()
+    db.add(Users(user_id="u1", name="u1", email="u1@example.com", password="x",
+                 isVerified=True, verification_token="token-u1"))
+    db.add(Projects(project_id="p1", user_id="u1"))
+    db.commit()
+    db.close()
+    engine.dispose()
+    session_factory = async_sessionmaker(create_async_engine(f"sqlite+aiosqlite:///{path}"))
+
+    async def get_test_db():
+        async with session_factory() as session:
+            yield session
+
+    mongo_db = MemoryDatabase()
+    asyncio.run(mongo_db.process_status_collection.insert_one(
+        {"project_id": "p1", "status": "completed", "files_processed": 2}
+    ))
+    application = FastAPI()
+    application.include_router(benchmark_routes.router, prefix="/api/v1")
+    application.dependency_overrides[get_async_db] = get_test_db
+    application.dependency_overrides[get_mongodb] = lambda: mongo_db
+
+    async def get(url):
+        transport = httpx.ASGITransport(app=application)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get(url)
+
+    # a finished job closes the stream after its status
+    response = asyncio.run(get("/api/v1/project-status/p1/stream?access_token=token-u1"))
+    assert response.headers["content-type"].startswith("text/event-stream")
+    event, data = response.text.strip().split("\n")
+    assert event == "event: progress"
+    assert json.loads(data.removeprefix("data: "))["files_processed"] == 2
+    assert asyncio.run(get("/api/v1/project-status/p1/stream?access_token=bad")).status_code == 401
+    assert asyncio.run(get("/api/v1/project-status/p2/stream?access_token=token-u1")).status_code == 404
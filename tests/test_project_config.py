@@ -0,0 +1,63 @@
+import os
+import sys
+
+import pytest
+from pydantic import ValidationError
+
+# Add the root directory to the Python path to import modules properly
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, parent_dir)
+
+from modules.benchmark.project_config import ProjectConfig, masked_headers, parse_headers  # noqa: E402
+from modules.project_connections.models import Projects  # noqa: E402
+
+
+@pytest.mark.parametrize("header_keys, header_values", [
+    # as stored by /create-project
+    ("Authorization,X-Tenant", "Bearer abc,t1"),
+    # as stored by project_connections
+    ("['Authorization', 'X-Tenant']", "['Bearer abc', 't1']"),
+])
+def test_parse_headers(header_keys, header_values):
+    assert parse_headers(header_keys, header_values) == (
+        ("Content-Type", "application/json"), ("Authorization", "Bearer abc"), ("X-Tenant", "t1")
+    )
+
+
+def test_parse_headers_defaults():
+    assert parse_headers(None, None) == (("Content-Type", "application/json"),)
+    assert parse_headers("", "") == (("Content-Type", "application/json"),)
+    assert parse_headers("[]", "[]") == (("Content-Type", "application/json"),)
+    # the project's own content type replaces the default
+    assert parse_headers("content-type", "text/plain") == (("content-type", "text/plain"),)
+
+
+def test_masked_headers():
+    headers = dict(parse_headers("Authorization,X-Api-Key,Accept", "Bearer abc,k,text/plain"))
+    assert masked_headers(headers) == {
+        "Content-Type": "application/json", "Authorization": "***", "X-Api-Key": "***", "Accept": "text/plain"
+    }
+    assert headers["Authorization"] == "Bearer abc"
+
+
+def test_config_from_project():
+    project = Projects(project_id="p1", target_url="https://example.com", end_point="/chat",
+                       payload_method=None, header_keys="X-Key", header_values="k",
+                       payload_body="{'messages': [{'human': 'hi'}]}")
+    config = ProjectConfig.from_project(project)
+    assert config.payload_method == "post"
+    assert config.payload_template == "{'messages': [{'human': 'hi'}]}"
+    assert config.is_complete()
+
+    payload_config = config.payload_config({"messages": []})
+    assert payload_config == {
+        "target_url": "https://example.com", "end_point": "/chat", "payload_method": "post",
+        "body": {"messages": []}, "headers": {"Content-Type": "application/json", "X-Key": "k"},
+    }
+    # each request gets its own headers, the snapshot does not change
+    payload_config["headers"]["X-Key"] = "changed"
+    assert config.payload_config(None)["headers"]["X-Key"] == "k"
+    with pytest.raises(ValidationError):
+        config.target_url = "https://other.example.com"
+
+    assert not ProjectConfig.from_project(Projects(project_id="p2", target_url="https://example.com")).is_complete()
@@ -0,0 +1,87 @@
+import asyncio
+import json
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+# Add the root directory to the Python path to import modules properly
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, parent_dir)
+
+from core.config import get_settings  # noqa: E402
+from modules.benchmark.qa_generator import CHUNK_WRAPPER_TOKENS, QAGenerator, estimate_tokens  # noqa: E402
+
+
+class ScriptedLLM:
+    """Answers every request with the next scripted reply; an exception is raised."""
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.prompts = []
+
+    async def ainvoke(self, messages):
+        self.prompts.append(messages[-1].content)
+        reply = self.replies.pop(0)
+        if isinstance(reply, Exception):
+            raise reply
+        return SimpleNamespace(content=reply, usage_metadata={"input_tokens": 1234})
+
+
+def qa_reply(*pairs):
+    return json.dumps({"questions": [
+        {"question": question, "answer": "answer", "difficulty_level": "easy", "chunk_id": chunk_id}
+        for chunk_id, question in pairs
+    ]})
+
+
+def make_generator(replies=()):
+    generator = QAGenerator(get_settings(), SimpleNamespace(qa_collection=None))
+    generator.llm = ScriptedLLM(replies)
+    return generator
+
+
+def test_pack_chunks_token_budget_boundary():
+    generator = make_generator()
+    chunks = [(f"c{i}", " ".join(f"word{i}" for _ in range(40))) for i in range(3)]
+    chunk_tokens = estimate_tokens(chunks[0][1]) + CHUNK_WRAPPER_TOKENS
+    overhead = generator.prompt_overhead_tokens(packed=True)
+
+    # exactly two chunks fit
+    packs = generator.pack_chunks(chunks, overhead + 2 * chunk_tokens)
+    assert [[chunk_id for chunk_id, _ in pack] for pack in packs] == [["c0", "c1"], ["c2"]]
+    # one token less and every chunk goes alone
+    packs = generator.pack_chunks(chunks, overhead + 2 * chunk_tokens - 1)
+    assert [len(pack) for pack in packs] == [1, 1, 1]
+    # a chunk larger than the budget is still sent, on its own
+    assert [len(pack) for pack in generator.pack_chunks(chunks, overhead)] == [1, 1, 1]
+    assert [len(pack) for pack in generator.pack_chunks(chunks, 10 ** 6, max_chunks=2)] == [2, 1]
+    assert generator.pack_chunks([], 10 ** 6) == []
+
+
+def test_packed_pairs_map_to_their_chunks():
+    generator = make_generator([qa_reply(
+        ("c2", "second chunk question"), ("c1", "first chunk question"),
+        ("c9", "pair tagged with an unknown chunk"), ("c1", "another first chunk question")
+    )])
+    qa_by_chunk, usage = asyncio.run(generator.generate_qa_packed([("c1", "alpha"), ("c2", "beta")]))
+    assert {key: [qa.question for qa in pairs] for key, pairs in qa_by_chunk.items()} == {
+        "c1": ["first chunk question", "another first chunk question"],
+        "c2": ["second chunk question"],
+    }
+    assert usage["input_tokens"] == 1234 and usage["estimated_input_tokens"] > 0
+    assert '<chunk id="c1">\nalpha\n</chunk>' in generator.llm.prompts[0]
+
+
+def test_single_chunk_pack_takes_untagged_pairs():
+    generator = make_generator([qa_reply((None, "untagged question"))])
+    qa_by_chunk, _ = asyncio.run(generator.generate_qa_packed([("c1", "alpha")]))
+    assert [qa.question for qa in qa_by_chunk["c1"]] == ["untagged question"]
+
+
+@pytest.mark.parametrize("reply", ["not json at all", '{"questions": [{"question": "q"}]}', '{"questions": '])
+def test_malformed_reply_raises(reply):
+    generator = make_generator([reply])
+    with pytest.raises(RuntimeError, match="Packed QA generation failed"):
+        asyncio.run(generator.generate_qa_packed([("c1", "alpha"), ("c2", "beta")]))
@@ -0,0 +1,143 @@
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Add the root directory to the Python path to import modules properly
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, parent_dir)
+
+from core.database import Base, get_db  # noqa: E402
+from modules.Auth.models import Users  # noqa: E402
+from modules.ingestion import router as ingestion_router  # noqa: E402
+from modules.ingestion.models import IngestionJob, IngestionJobFile  # noqa: E402
+from modules.ingestion.queue import (LeaseLostError, claim_next_job, enqueue_job,  # noqa: E402
+                                     fail_exhausted_jobs, release_failed_attempt, renew_lease)
+from modules.project_connections.models import Projects  # noqa: E402
+
+
+@pytest.fixture
+def make_session(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine, tables=[
+        Users.__table__, Projects.__table__, IngestionJob.__table__, IngestionJobFile.__table__
+    ])
+    session_factory = sessionmaker(bind=engine)
+    db = session_factory()
+    for user_id in ("u1", "u2"):
+        db.add(Users(user_id=user_id, name=user_id, email=f"{user_id}@example.com", password="x",
+                     isVerified=True, verification_token=f"token-{user_id}"))
+    db.add_all([Projects(project_id="p1", user_id="u1"), Projects(project_id="p2", user_id="u2")])
+    db.commit()
+    db.close()
+    return session_factory
+
+
+def enqueue(db, job_id, project_id="p1", user_id="u1"):
+    return enqueue_job(db, job_id, project_id, user_id, f"r-{job_id}", [
+        {"filename": "a.txt", "spool_path": f"/spool/{job_id}/0_a.txt", "size_bytes": 10}
+    ])
+
+
+def expire_lease(db, job_id):
+    db.get(IngestionJob, job_id).lease_expires_at = datetime.utcnow() - timedelta(seconds=1)
+    db.commit()
+
+
+def test_expired_lease_is_claimed_again(make_session):
+    db = make_session()
+    enqueue(db, "j1")
+    job = claim_next_job(db, "w1", lease_seconds=300)
+    assert (job.job_id, job.status, job.attempts, job.lease_owner) == ("j1", "running", 1, "w1")
+    # held by w1, and its project runs one job at a time
+    enqueue(db, "j2")
+    assert claim_next_job(db, "w2", lease_seconds=300) is None
+
+    # w1 crashed: once the lease runs out another worker takes the job over
+    expire_lease(db, "j1")
+    job = claim_next_job(db, "w2", lease_seconds=300)
+    db.refresh(job)
+    assert (job.job_id, job.attempts, job.lease_owner) == ("j1", 2, "w2")
+    with pytest.raises(LeaseLostError):
+        renew_lease(db, "j1", "w1", 300)
+    renew_lease(db, "j1", "w2", 300)
+    db.close()
+
+
+def test_failed_attempts_are_retried_until_max_attempts(make_session):
+    db = make_session()
+    enqueue(db, "j1")
+    for attempt in range(1, 4):
+        job = claim_next_job(db, "w1", lease_seconds=300)
+        assert job.attempts == attempt
+        retry = release_failed_attempt(db, "j1", "w1", f"boom {attempt}")
+        job = db.get(IngestionJob, "j1")
+        if attempt < 3:
+            # back in the queue after a backoff
+            assert retry and job.status == "queued" and job.available_at > datetime.utcnow()
+            job.available_at = datetime.utcnow() - timedelta(seconds=1)
+            db.commit()
+    assert not retry
+    assert (job.status, job.last_error, job.lease_owner) == ("failed", "boom 3", None)
+    assert job.finished_at is not None
+    assert claim_next_job(db, "w1", lease_seconds=300) is None
+    db.close()
+
+
+def test_lease_expired_on_last_attempt_fails_the_job(make_session):
+    db = make_session()
+    enqueue(db, "j1")
+    db.get(IngestionJob, "j1").max_attempts = 1
+    db.commit()
+    claim_next_job(db, "w1", lease_seconds=300)
+    assert fail_exhausted_jobs(db) == []
+
+    expire_lease(db, "j1")
+    # out of attempts, so not claimable although its lease expired
+    assert claim_next_job(db, "w2", lease_seconds=300) is None
+    assert [job.job_id for job in fail_exhausted_jobs(db)] == ["j1"]
+    job = db.get(IngestionJob, "j1")
+    assert (job.status, job.last_error) == ("failed", "Lease expired on final attempt")
+    db.close()
+
+
+def test_queue_status_shows_only_the_users_jobs(make_session):
+    db = make_session()
+    enqueue(db, "j1")
+    enqueue(db, "j2", project_id="p2", user_id="u2")
+    enqueue(db, "j3", project_id="p2", user_id="u2")
+    claim_next_job(db, "w1", lease_seconds=300)
+    db.close()
+
+    application = FastAPI()
+    application.include_router(ingestion_router.router, prefix="/api/v1")
+
+    def get_test_db():
+        session = make_session()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    application.dependency_overrides[get_db] = get_test_db
+
+    async def get(url):
+        transport = httpx.ASGITransport(app=application)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get(url)
+
+    stats = asyncio.run(get("/api/v1/ingestion/queue-status?access_token=token-u2")).json()
+    assert [job["job_id"] for job in stats["jobs"]] == ["j2", "j3"]
+    assert (stats["queue_depth"], stats["running"]) == (2, 0)
+    stats = asyncio.run(get("/api/v1/ingestion/queue-status?access_token=token-u1")).json()
+    assert [(job["job_id"], job["status"]) for job in stats["jobs"]] == [("j1", "running")]
+    assert "admission" in stats
+
+    assert asyncio.run(get("/api/v1/ingestion/queue-status?access_token=bad")).status_code == 401
+    assert asyncio.run(get("/api/v1/ingestion/queue-status")).status_code == 422
@@ -0,0 +1,110 @@
+import os
+import sys
+import threading
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Add the root directory to the Python path to import modules properly
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, parent_dir)
+
+from core.config import get_settings  # noqa: E402
+from core.database import Base, configure_sqlite  # noqa: E402
+from modules.monitor import models  # noqa: E402
+from modules.monitor.pagination import ResultFilters, fetch_page  # noqa: E402
+from modules.monitor.writer import ResultWriter  # noqa: E402
+from modules.project_connections.models import Projects  # noqa: E402
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    configure_sqlite(engine, get_settings())
+    Base.metadata.create_all(engine, tables=[
+        Projects.__table__, models.QAPairs.__table__, models.TestInfo.__table__,
+        models.ProjectScoreRollup.__table__, models.ProjectScoreBucket.__table__
+    ])
+    return sessionmaker(bind=engine)
+
+
+def make_results(project_id, count, prefix="t"):
+    return [
+        models.TestInfo(
+            test_id=f"{prefix}-{project_id}-{i}",
+            user_id="u1",
+            project_id=project_id,
+            test_status="1",
+            hallucination_score=1,
+            helpfullness_score=1.0,
+            last_test_conducted=datetime(2025, 1, 1, 12),
+            question="q",
+            student_answer="a",
+            factual_answer="f",
+            difficulty_level="easy"
+        )
+        for i in range(count)
+    ]
+
+
+def test_connections_use_configured_pragmas(session_factory):
+    db = session_factory()
+    connection = db.connection()
+    assert connection.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+    assert connection.exec_driver_sql("PRAGMA synchronous").scalar() == 1  # NORMAL
+    assert connection.exec_driver_sql("PRAGMA busy_timeout").scalar() == get_settings().SQLITE_BUSY_TIMEOUT_MS
+    db.close()
+
+
+def test_concurrent_submissions_share_a_transaction(session_factory):
+    writer = ResultWriter(session_factory, batch_size=1000, max_delay_seconds=0.2)
+    futures = []
+    threads = [
+        threading.Thread(target=lambda p=p: futures.append(writer.submit(p, make_results(p, 5))))
+        for p in ("p1", "p2", "p3")
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(future.result(timeout=5) for future in futures) == [5, 5, 5]
+    assert writer.transactions == 1
+
+    db = session_factory()
+    assert db.query(models.TestInfo).count() == 15
+    assert db.get(models.ProjectScoreRollup, "p2").tests_total == 5
+    assert db.query(models.ProjectScoreBucket).filter_by(project_id="p3", granularity="day").one().tests_total == 5
+    db.close()
+
+
+def test_failed_submission_does_not_fail_the_batch(session_factory):
+    writer = ResultWriter(session_factory, batch_size=1000, max_delay_seconds=0.2)
+    assert writer.write("p1", make_results("p1", 2)) == 2
+
+    good = writer.submit("p2", make_results("p2", 3))
+    # same primary keys as the committed results
+    duplicate = writer.submit("p1", make_results("p1", 2))
+    assert good.result(timeout=5) == 3
+    with pytest.raises(Exception):
+        duplicate.result(timeout=5)
+
+    db = session_factory()
+    assert db.query(models.TestInfo).count() == 5
+    assert db.get(models.ProjectScoreRollup, "p1").tests_total == 2
+    db.close()
+
+
+def test_qa_texts_are_stored_once_per_pair(session_factory):
+    writer = ResultWriter(session_factory, batch_size=1000, max_delay_seconds=0.2)
+    writer.write("p1", make_results("p1", 3, prefix="run1"))
+    writer.write("p1", make_results("p1", 3, prefix="run2"))
+
+    db = session_factory()
+    assert db.query(models.QAPairs).count() == 1
+    rows, _ = fetch_page(db, "p1", 10, ResultFilters())
+    assert len(rows) == 6
+    assert {(row.question, row.factual_answer) for row in rows} == {("q", "f")}
+    assert rows[0].qa_hash == models.qa_pair_hash("q", "f")
+    db.close()
@@ -0,0 +1,171 @@
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+from pydantic import ValidationError
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Add the root directory to the Python path to import modules properly
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, parent_dir)
+
+from core.config import get_settings  # noqa: E402
+from core.database import Base, configure_sqlite  # noqa: E402
+from modules.monitor import models  # noqa: E402
+from modules.monitor.history import rebuild_buckets, score_history  # noqa: E402
+from modules.monitor.retention import (compact_project, incremental_vacuum,  # noqa: E402
+                                       retention_cutoff, run_maintenance)
+from modules.monitor.rollups import rebuild_rollups  # noqa: E402
+from modules.monitor.writer import write_results  # noqa: E402
+from modules.project_connections.models import Projects  # noqa: E402
+from modules.project_connections.schemas import ProjectCreate, ProjectUpdate  # noqa: E402
+
+NOW = datetime(2025, 3, 5, 12)  # a Wednesday
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    configure_sqlite(engine, get_settings())
+    Base.metadata.create_all(engine, tables=[
+        Projects.__table__, models.QAPairs.__table__, models.TestInfo.__table__,
+        models.ProjectScoreRollup.__table__, models.ProjectScoreBucket.__table__
+    ])
+    session = sessionmaker(bind=engine)()
+    session.add_all([Projects(project_id="p1", retention_days=14), Projects(project_id="p2")])
+    # a run every 6 hours for 8 weeks; each day has its own QA pair and one shared with p2
+    for hour in range(0, 56 * 24, 6):
+        at = NOW - timedelta(hours=hour)
+        write_results(session, "p1", [
+            models.TestInfo(
+                test_id=f"p1-{hour}-{i}", user_id="u1", project_id="p1", test_status=str(i % 2),
+                hallucination_score=1, helpfullness_score=0.5, last_test_conducted=at,
+                question=question, factual_answer="f", student_answer="a" * 200,
+                difficulty_level="easy", response_latency_ms=100.0
+            )
+            for i, question in enumerate((f"day {at.date()}", "shared"))
+        ])
+    write_results(session, "p2", [models.TestInfo(
+        test_id="p2-0", user_id="u1", project_id="p2", test_status="1", hallucination_score=1,
+        helpfullness_score=1.0, last_test_conducted=NOW - timedelta(days=50), question="shared",
+        factual_answer="f", student_answer="a", difficulty_level="easy"
+    )])
+    session.commit()
+    yield session
+    session.close()
+
+
+def day_totals(db, project_id):
+    return {
+        (bucket.bucket_start, bucket.tests_total, bucket.tests_passed)
+        for bucket in db.query(models.ProjectScoreBucket).filter_by(project_id=project_id, granularity="day")
+    }
+
+
+def test_cutoff_is_the_monday_before_the_retention_period():
+    assert retention_cutoff(NOW, 14) == datetime(2025, 2, 17)
+    assert retention_cutoff(NOW, 14).weekday() == 0
+
+
+def test_compaction_keeps_totals_and_drops_old_rows(db):
+    rollup = db.get(models.ProjectScoreRollup, "p1")
+    total, passed = rollup.tests_total, rollup.tests_passed
+    days_before = day_totals(db, "p1")
+    cutoff = retention_cutoff(NOW, 14)
+
+    deleted = compact_project(db, db.get(Projects, "p1"), cutoff, batch_size=50)
+
+    assert deleted["results"] == db.get(models.ProjectScoreRollup, "p1").tests_compacted > 0
+    assert db.query(models.TestInfo).filter(
+        models.TestInfo.project_id == "p1", models.TestInfo.last_test_conducted < cutoff
+    ).count() == 0
+    assert db.query(models.TestInfo).filter_by(project_id="p1").count() == total - deleted["results"]
+    assert db.get(Projects, "p1").results_compacted_before == cutoff
+    # aggregates survive, hour buckets only after the cutoff
+    rollup = db.get(models.ProjectScoreRollup, "p1")
+    assert (rollup.tests_total, rollup.tests_passed) == (total, passed)
+    assert day_totals(db, "p1") == days_before
+    assert db.query(models.ProjectScoreBucket).filter(
+        models.ProjectScoreBucket.granularity == "hour", models.ProjectScoreBucket.bucket_start < cutoff
+    ).filter_by(project_id="p1").count() == 0
+    # the texts of compacted days go, the pair p2 and recent results use stays
+    questions = {pair.question for pair in db.query(models.QAPairs)}
+    assert "shared" in questions
+    assert f"day {(cutoff - timedelta(days=1)).date()}" not in questions
+    assert f"day {cutoff.date()}" in questions
+    assert db.query(models.QAPairs).filter(models.QAPairs.question.like("day %")).count() == (
+        (NOW.date() - cutoff.date()).days + 1
+    )
+
+
+def test_rebuilds_after_compaction_count_compacted_results(db):
+    rollup = db.get(models.ProjectScoreRollup, "p1")
+    total, helpfulness = rollup.tests_total, rollup.helpfulness_sum
+    days_before = day_totals(db, "p1")
+    compact_project(db, db.get(Projects, "p1"), retention_cutoff(NOW, 14), batch_size=1000)
+
+    rebuild_rollups(db)
+    rebuild_buckets(db)
+
+    db.expire_all()
+    rollup = db.get(models.ProjectScoreRollup, "p1")
+    assert rollup.tests_total == total
+    assert rollup.helpfulness_sum == pytest.approx(helpfulness)
+    assert rollup.tests_compacted == total - db.query(models.TestInfo).filter_by(project_id="p1").count()
+    assert day_totals(db, "p1") == days_before
+    assert db.get(models.ProjectScoreRollup, "p2").tests_total == 1
+
+
+def test_score_history_reads_days_across_the_watermark(db):
+    project = db.get(Projects, "p1")
+    compact_project(db, project, retention_cutoff(NOW, 14), batch_size=1000)
+
+    history = score_history(
+        db, "p1", NOW - timedelta(days=20), NOW, "hour", 500,
+        compacted_before=project.results_compacted_before
+    )
+    assert history["granularity"] == "day"
+    assert len(history["points"]) == 21
+    assert history["points"][0] == {**history["points"][0], "bucket_start": "2025-02-13T00:00:00", "tests_total": 8}
+    recent = score_history(db, "p1", NOW - timedelta(days=5), NOW, None, 500,
+                           compacted_before=project.results_compacted_before)
+    assert recent["granularity"] == "hour"
+
+
+def test_maintenance_uses_project_or_default_retention(db):
+    settings = get_settings().model_copy(update={"RESULT_RETENTION_DAYS": None, "RETENTION_DELETE_BATCH": 100})
+    totals = run_maintenance(db, settings, now=NOW)
+    assert totals["projects"] == 1
+    assert db.query(models.TestInfo).filter_by(project_id="p2").count() == 1
+
+    settings = settings.model_copy(update={"RESULT_RETENTION_DAYS": 30})
+    totals = run_maintenance(db, settings, now=NOW)
+    assert totals["results"] == 1
+    assert db.get(models.ProjectScoreRollup, "p2").tests_total == 1
+    assert db.query(models.QAPairs).filter_by(question="shared").count() == 1
+
+
+def test_incremental_vacuum_releases_free_pages(db):
+    compact_project(db, db.get(Projects, "p1"), retention_cutoff(NOW, 7), batch_size=1000)
+    connection = db.connection()
+    assert connection.exec_driver_sql("PRAGMA auto_vacuum").scalar() == 2
+    assert connection.exec_driver_sql("PRAGMA freelist_count").scalar() > 0
+    assert incremental_vacuum(db, 5) == 5
+    assert incremental_vacuum(db, 100000) > 0
+    assert db.connection().exec_driver_sql("PRAGMA freelist_count").scalar() == 0
+
+
+@pytest.mark.parametrize("schema, fields", [
+    (ProjectCreate, dict(payload_body="{}")), (ProjectUpdate, dict(project_id="p1"))
+])
+def test_retention_days_must_be_positive(schema, fields):
+    fields = dict(fields, project_name="n", content_type="c", target_url="https://example.com",
+                  end_point="/chat", header_keys=[], header_values=[], is_active=True,
+                  test_interval_in_hrs=1.0, benchmark_knowledge_id="k")
+    assert schema(**fields, retention_days=14).retention_days == 14
+    assert schema(**fields).retention_days is None
+    for value in (0, -5):
+        with pytest.raises(ValidationError):
+            schema(**fields, retention_days=value)
@@ -0,0 +1,56 @@
+import os
+import sys
+from datetime import datetime, timedelta
+
+# Add the root directory to the Python path to import modules properly
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, parent_dir)
+
+from modules.monitor import models  # noqa: E402
+from modules.monitor.rollups import add_to_rollup, get_rollup, rebuild_rollups  # noqa: E402
+from tests.conftest import make_result  # noqa: E402
+
+ROLLUP_FIELDS = (
+    "tests_total", "tests_passed", "hallucination_scored", "hallucinations",
+    "helpfulness_scored", "helpfulness_sum", "last_test_conducted"
+)
+
+
+def make_results(project_id, start, scores):
+    return [
+        make_result(f"{project_id}-{start.isoformat()}-{i}", start + timedelta(minutes=i), project_id,
+                    hallucination, helpfulness)
+        for i, (hallucination, helpfulness) in enumerate(scores)
+    ]
+
+
+def snapshot(rollup):
+    return tuple(getattr(rollup, name) for name in ROLLUP_FIELDS)
+
+
+def test_incremental_rollup_matches_rebuild(db):
+    start = datetime(2026, 1, 1)
+    for batch, scores in enumerate([[(1, 1.0), (0, 0.0)], [(1, None), (None, 0.5), (0, 1.0)]]):
+        # later batches can carry earlier timestamps, last_test_conducted keeps the maximum
+        results = make_results("p1", start - timedelta(days=batch), scores)
+        db.add_all(results)
+        add_to_rollup(db, "p1", results)
+        db.commit()
+    db.add_all(make_results("p2", start, [(1, 1.0)]))
+    db.commit()
+
+    incremental = snapshot(db.get(models.ProjectScoreRollup, "p1"))
+    assert incremental == (5, 1, 4, 2, 4, 2.5, start + timedelta(minutes=1))
+
+    assert rebuild_rollups(db) == 2
+    db.expire_all()
+    assert snapshot(db.get(models.ProjectScoreRollup, "p1")) == incremental
+    assert db.get(models.ProjectScoreRollup, "p2").tests_total == 1
+
+
+def test_missing_rollup_is_built_on_first_read(db):
+    db.add_all(make_results("p1", datetime(2026, 1, 1), [(0, 0.0), (1, 1.0)]))
+    db.commit()
+    rollup = get_rollup(db, "p1")
+    assert (rollup.tests_total, rollup.hallucinations, rollup.helpfulness_sum) == (2, 1, 1.0)
+    assert get_rollup(db, "unknown") is None
@@ -0,0 +1,90 @@
+import os
+import sys
+from datetime import datetime, timedelta
+
+# Add the root directory to the Python path to import modules properly
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, parent_dir)
+
+from modules.monitor import models  # noqa: E402
+from modules.project_connections.models import Projects  # noqa: E402
+from modules.monitor.history import (add_to_buckets, choose_resolution,  # noqa: E402
+                                     rebuild_buckets, score_history)
+from tests.conftest import TOKEN, make_result  # noqa: E402
+
+BUCKET_FIELDS = (
+    "project_id", "granularity", "bucket_start", "tests_total", "tests_passed",
+    "hallucination_scored", "hallucinations", "helpfulness_scored", "helpfulness_sum",
+    "latency_measured", "latency_sum_ms", "latency_max_ms"
+)
+
+
+def all_buckets(db):
+    rows = db.query(models.ProjectScoreBucket).all()
+    return sorted(tuple(getattr(row, name) for name in BUCKET_FIELDS) for row in rows)
+
+
+def test_buckets_on_write_match_rebuild(db):
+    # Sunday 2026-03-01 23:30 and Monday 2026-03-02 fall in different weeks
+    start = datetime(2026, 3, 1, 23, 30)
+    batches = [
+        [make_result("t0", start, "p1", 1, 1.0, 120.0),
+         make_result("t1", start + timedelta(minutes=10), "p1", 0, 0.0, None)],
+        [make_result("t2", start + timedelta(minutes=40), "p1", 1, 0.5, 80.0)],
+        [make_result("t3", start + timedelta(days=2), "p1", 1, 1.0, 300.0)],
+    ]
+    for results in batches:
+        db.add_all(results)
+        add_to_buckets(db, "p1", results)
+        db.commit()
+    on_write = all_buckets(db)
+    weeks = [row[2] for row in on_write if row[1] == "week"]
+    assert weeks == [datetime(2026, 2, 23), datetime(2026, 3, 2)]
+
+    assert rebuild_buckets(db) == len(on_write)
+    db.expire_all()
+    assert all_buckets(db) == on_write
+
+    history = score_history(db, "p1", datetime(2026, 3, 1), datetime(2026, 3, 4), "hour", 500)
+    assert history["granularity"] == "hour"
+    first, second, third = history["points"]
+    assert (first["tests_total"], first["avg_latency_ms"], first["avg_hallucination_score"]) == (2, 120.0, 0.5)
+    assert (second["bucket_start"], second["pass_rate"]) == ("2026-03-02T00:00:00", 0.0)
+    assert third["max_latency_ms"] == 300.0
+
+
+def test_long_windows_are_downsampled():
+    start = datetime(2025, 1, 1)
+    assert choose_resolution(start, start + timedelta(days=7), None, 500) == ("hour", 1)
+    assert choose_resolution(start, start + timedelta(days=365), None, 500) == ("day", 1)
+    assert choose_resolution(start, start + timedelta(days=365), "hour", 500) == ("day", 1)
+    assert choose_resolution(start, start + timedelta(days=365), "week", 500) == ("week", 1)
+    assert choose_resolution(start, start + timedelta(days=365 * 20), None, 500) == ("week", 3)
+
+
+def test_merged_weeks(db):
+    results = [
+        make_result(f"t{i}", datetime(2026, 1, 5) + timedelta(weeks=i), "p1", 1, 1.0, 10.0 * i) for i in range(4)
+    ]
+    db.add_all(results)
+    add_to_buckets(db, "p1", results)
+    db.commit()
+    history = score_history(db, "p1", datetime(2025, 1, 1), datetime(2026, 3, 1), "week", 30)
+    assert history["buckets_per_point"] == 3
+    assert [point["tests_total"] for point in history["points"]] == [1, 3]
+    assert [point["max_latency_ms"] for point in history["points"]] == [0.0, 30.0]
+
+
+def test_score_history_route(db, get_route):
+    db.add_all([Projects(project_id="p1", user_id="u1"), Projects(project_id="p2", user_id="u2")])
+    results = [make_result("t0", datetime(2026, 3, 2, 10), "p1", 1, 1.0, 100.0)]
+    db.add_all(results)
+    add_to_buckets(db, "p1", results)
+    db.commit()
+    url = "/api/v1/score-history/{}?start=2026-03-01T00:00:00&end=2026-03-03T00:00:00&access_token={}"
+    response = get_route(url.format("p1", TOKEN))
+    assert response.status_code == 200
+    assert [point["tests_total"] for point in response.json()["points"]] == [1]
+    assert get_route(url.format("p1", "bad")).status_code == 401
+    assert get_route(url.format("p2", TOKEN)).status_code == 403
+    assert get_route(url.format("p3", TOKEN)).status_code == 404
@@ -0,0 +1,97 @@
+import asyncio
+import gzip
+import os
+import sqlite3
+import sys
+
+import httpx
+import pytest
+import zstandard
+from fastapi import FastAPI
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Add the root directory to the Python path to import modules properly
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, parent_dir)
+
+from core.config import get_settings  # noqa: E402
+from core.database import Base, configure_sqlite  # noqa: E402
+from core.snapshot import compressed_chunks, snapshot_database  # noqa: E402
+from modules import services  # noqa: E402
+from modules.Auth.models import Users  # noqa: E402
+
+TOKEN = "token-u1"
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}", connect_args={"check_same_thread": False})
+    configure_sqlite(engine, get_settings())
+    Base.metadata.create_all(engine, tables=[Users.__table__])
+    db = sessionmaker(bind=engine)()
+    db.add(Users(user_id="u1", name="u1", email="u1@example.com", password="x",
+                 isVerified=True, verification_token=TOKEN))
+    db.commit()
+    db.close()
+    return engine
+
+
+def test_snapshot_has_committed_rows_only(engine, tmp_path):
+    writer = sqlite3.connect(engine.url.database)
+    writer.execute("BEGIN IMMEDIATE")
+    writer.execute("INSERT INTO users (user_id, name, email, password) VALUES ('u2', 'pending', 'u2@example.com', 'x')")
+
+    # taken while the write transaction is open, without waiting for it
+    path = snapshot_database(engine.url.database, str(tmp_path))
+    writer.commit()
+    writer.close()
+
+    snapshot = sqlite3.connect(path)
+    assert snapshot.execute("SELECT user_id FROM users").fetchall() == [("u1",)]
+    assert snapshot.execute("PRAGMA journal_mode").fetchone() == ("delete",)
+    assert snapshot.execute("PRAGMA integrity_check").fetchone() == ("ok",)
+    snapshot.close()
+    assert not os.path.exists(path + "-wal")
+
+
+@pytest.mark.parametrize("compression, decompress", [
+    ("zstd", lambda data: zstandard.ZstdDecompressor().decompressobj().decompress(data)),
+    ("gzip", gzip.decompress),
+    ("none", lambda data: data),
+])
+def test_compressed_chunks_round_trip(tmp_path, compression, decompress):
+    path = tmp_path / "file.bin"
+    content = os.urandom(300_000) + b"\x00" * 3_000_000
+    path.write_bytes(content)
+    chunks = list(compressed_chunks(str(path), compression, chunk_bytes=64 * 1024))
+    assert decompress(b"".join(chunks)) == content
+    if compression != "none":
+        assert sum(map(len, chunks)) < len(content) / 2
+
+
+def test_download_database_route(engine, tmp_path, monkeypatch):
+    monkeypatch.setattr(services, "SessionLocal", sessionmaker(bind=engine))
+    monkeypatch.setattr(services, "engine", engine)
+    monkeypatch.setattr(services, "get_settings", lambda: get_settings().model_copy(
+        update={"DATABASE_SNAPSHOT_DIR": str(tmp_path)}
+    ))
+    application = FastAPI()
+    application.include_router(services.router, prefix="/api/v1")
+
+    async def send(url, token):
+        transport = httpx.ASGITransport(app=application)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post(url, json={"access_token": token})
+
+    response = asyncio.run(send("/api/v1/download-database?compression=gzip", TOKEN))
+    assert response.status_code == 200
+    assert 'filename="app_database.db.gz"' in response.headers["content-disposition"]
+    downloaded = tmp_path / "downloaded.db"
+    downloaded.write_bytes(gzip.decompress(response.content))
+    assert sqlite3.connect(downloaded).execute("SELECT user_id FROM users").fetchall() == [("u1",)]
+    # the temporary snapshot is gone once sent
+    assert not list(tmp_path.glob("snapshot-*"))
+
+    assert asyncio.run(send("/api/v1/download-database", "bad")).status_code == 401
+    assert asyncio.run(send("/api/v1/download-database?compression=xz", TOKEN)).status_code == 400